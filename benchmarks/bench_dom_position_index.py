@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'index de positions DOM (DOM_BATCH_EXTRACT_SCRIPT / XPath complets).
+
+Génère des pages de test de 1k / 10k / 50k éléments, puis mesure dans Chrome headless :
+- la construction de l'index (une fois par frame) ;
+- l'extraction par lots de 20 sur un échantillon de lots répartis dans le document ;
+- le calcul des XPath complets pour tous les éléments (un seul appel JS) ;
+- en option (--legacy), le coût de l'ancien parcours linéaire `querySelectorAll('*')` par élément.
+
+Usage :
+    python -m benchmarks.bench_dom_position_index [--sizes 1000 10000 50000] [--legacy]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.dom_accessibility_from_batch import (  # noqa: E402
+    DOM_BATCH_EXTRACT_SCRIPT,
+    DOM_FULL_XPATHS_SCRIPT,
+    DOM_POSITION_INDEX_SCRIPT,
+)
+
+BATCH_SIZE = 20
+SAMPLE_BATCHES = 50
+
+# Ancien calcul (avant index) : un parcours complet du document par élément
+LEGACY_ABS_INDEX_SCRIPT = r"""
+var elements = arguments[0];
+var out = [];
+for (var i = 0; i < elements.length; i++) {
+    var el = elements[i];
+    var all = document.querySelectorAll('*');
+    var found = -1;
+    for (var k = 0; k < all.length; k++) { if (all[k] === el) { found = k + 1; break; } }
+    var parent = el.parentNode, pfound = -1;
+    if (parent && parent.nodeType === 1) {
+        var all2 = document.querySelectorAll('*');
+        for (var k2 = 0; k2 < all2.length; k2++) { if (all2[k2] === parent) { pfound = k2 + 1; break; } }
+    }
+    out.push([found, pfound]);
+}
+return out;
+"""
+
+
+def write_fixture(path, total_nodes, fanout=6):
+    """Écrit une page HTML d'environ `total_nodes` éléments (arbre équilibré, balises variées)."""
+    # Balises sans règles d’auto-fermeture du parseur HTML (pas de p/a/li imbriqués)
+    tags = ("div", "section", "article", "span", "nav", "aside", "header", "footer")
+    # Arbre construit en largeur pour des profondeurs réalistes
+    children = {0: []}
+    made = 1
+    queue = [0]
+    while made < total_nodes and queue:
+        parent = queue.pop(0)
+        for _ in range(fanout):
+            if made >= total_nodes:
+                break
+            children[parent].append(made)
+            children[made] = []
+            queue.append(made)
+            made += 1
+
+    def render(node_id, out):
+        tag = tags[node_id % len(tags)]
+        attrs = f' id="n{node_id}"' if node_id % 7 == 0 else f' class="c{node_id % 13}"'
+        out.append(f"<{tag}{attrs}>")
+        if not children[node_id]:
+            out.append(f"t{node_id}")
+        for child in children[node_id]:
+            render(child, out)
+        out.append(f"</{tag}>")
+
+    sys.setrecursionlimit(max(10000, total_nodes))
+    parts = ["<!DOCTYPE html><html lang='fr'><head><title>bench</title></head><body>"]
+    render(0, parts)
+    parts.append("</body></html>")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(parts))
+
+
+def make_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    return webdriver.Chrome(options=options)
+
+
+def sample_batches(elements):
+    """Lots de BATCH_SIZE répartis uniformément dans le document (début, milieu, fin)."""
+    total = len(elements)
+    n_batches = max(1, total // BATCH_SIZE)
+    step = max(1, n_batches // SAMPLE_BATCHES)
+    return [
+        elements[b * BATCH_SIZE:(b + 1) * BATCH_SIZE]
+        for b in range(0, n_batches, step)
+    ][:SAMPLE_BATCHES]
+
+
+def run_size(driver, size, legacy, tmpdir):
+    from selenium.webdriver.common.by import By
+
+    path = os.path.join(tmpdir, f"fixture_{size}.html")
+    write_fixture(path, size)
+    driver.get("file://" + path)
+    elements = driver.find_elements(By.XPATH, "//*")
+    total = len(elements)
+    batches = sample_batches(elements)
+    sampled = sum(len(b) for b in batches)
+
+    start = time.perf_counter()
+    driver.execute_script(DOM_POSITION_INDEX_SCRIPT)
+    index_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    abs_indices = []
+    for batch in batches:
+        abs_indices.extend(a.get("absIndex") for a in driver.execute_script(DOM_BATCH_EXTRACT_SCRIPT, batch))
+    batch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    driver.execute_script(DOM_FULL_XPATHS_SCRIPT, list(range(1, total + 1)))
+    xpath_s = time.perf_counter() - start
+
+    line = (
+        f"{total:>7} éléments | index {index_s * 1000:8.1f} ms | "
+        f"lots {batch_s / sampled * 1000:6.2f} ms/élément ({len(batches)} lots) | "
+        f"XPath complets {xpath_s * 1000:8.1f} ms | estimation totale {index_s + xpath_s + batch_s / sampled * total:7.2f} s"
+    )
+    if legacy:
+        start = time.perf_counter()
+        for batch in batches:
+            driver.execute_script(LEGACY_ABS_INDEX_SCRIPT, batch)
+        legacy_s = time.perf_counter() - start
+        line += f" | ancien absIndex {legacy_s / sampled * 1000:8.2f} ms/élément"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'index de positions DOM")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 50000])
+    parser.add_argument("--legacy", action="store_true", help="Mesurer aussi l'ancien parcours linéaire")
+    args = parser.parse_args()
+
+    driver = make_driver()
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for size in args.sizes:
+                run_size(driver, size, args.legacy, tmpdir)
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
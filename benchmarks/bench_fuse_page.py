@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la fusion DOM + vision (`modules.synthesys.fuse_page`).
+
+Génère une page synthétique (par défaut 2 000 blocs OCR × 20 000 lignes DOM : conteneurs pleine
+largeur, grilles de cartes, texte, quelques lignes sans coordonnées), puis mesure :
+- la fusion indexée (`DomRectIndex`, construction comprise) sur tous les blocs ;
+- l'ancienne boucle `iterrows()` × `iou` sur un échantillon de blocs, extrapolée à la page ;
+et vérifie que les deux donnent la même ligne DOM et le même score pour chaque bloc échantillonné.
+Même mesure pour l'appariement sans coordonnées (`DomTextIndex` : textes puis XPath).
+
+Usage :
+    python -m benchmarks.bench_fuse_page [--blocks 2000] [--rows 20000] [--legacy-sample 4]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.synthesys import DomRectIndex, fuse_page, iou  # noqa: E402
+
+PAGE_WIDTH = 1920
+
+
+def make_page(blocks, rows, seed=7):
+    """(DataFrame DOM, structure vision) d'une longue page synthétique."""
+    rng = np.random.default_rng(seed)
+    height = max(4000, rows // 2)
+    containers = max(1, rows // 50)
+    x = np.concatenate([np.zeros(containers), rng.integers(0, PAGE_WIDTH - 40, rows - containers)])
+    y = np.concatenate([rng.integers(0, height, containers), rng.integers(0, height, rows - containers)])
+    w = np.concatenate([np.full(containers, PAGE_WIDTH), rng.integers(8, 400, rows - containers)])
+    h = np.concatenate([rng.integers(200, 2000, containers), rng.integers(8, 120, rows - containers)])
+    df = pd.DataFrame({
+        "dom_x": x.astype(int).astype(str), "dom_y": y.astype(int).astype(str),
+        "dom_w": w.astype(int).astype(str), "dom_h": h.astype(int).astype(str),
+        "xpath": [f"/html/body/div[{i + 1}]" for i in range(rows)], "tag": "div",
+    })
+    df.loc[df.index[::997], "dom_w"] = ""  # lignes sans coordonnées exploitables
+    vision = {"page": "bench", "blocks": [
+        {"id": i, "type_detected": "contenu", "text": "", "confidence": 0.5,
+         "bbox": [int(rng.integers(0, PAGE_WIDTH - 400)), int(rng.integers(0, height)),
+                  int(rng.integers(30, 400)), int(rng.integers(15, 120))]}
+        for i in range(blocks)
+    ]}
+    return df, vision
+
+
+def make_text_page(blocks, rows, seed=11):
+    """Page sans coordonnées DOM : textes de lignes et de blocs tirés d'un vocabulaire commun."""
+    rng = np.random.default_rng(seed)
+    vocabulary = [f"mot{i}" for i in range(5000)]
+
+    def phrase(low, high):
+        return " ".join(rng.choice(vocabulary, int(rng.integers(low, high))))
+
+    df = pd.DataFrame({"texte_dom": [phrase(2, 30) for _ in range(rows)], "tag": "p",
+                       "xpath": [f"/html/body/p[{i + 1}]" for i in range(rows)]})
+    vision = {"page": "bench", "blocks": [
+        {"id": i, "type_detected": "contenu", "text": phrase(1, 4) if i % 4 else f"absent {i}",
+         "confidence": 0.5, "bbox": [0, i * 20, 300, 18]}
+        for i in range(blocks)
+    ]}
+    return df, vision
+
+
+def legacy_text_match(dom_df_page, vision_page_struct, block_text):
+    for _, row in dom_df_page.iterrows():
+        row_text = row.get("texte_dom") or ""
+        if isinstance(row_text, str) and block_text and (
+                block_text.lower() in row_text.lower() or row_text.lower() in block_text.lower()):
+            return row["xpath"]
+    for _, row in dom_df_page.iterrows():
+        row_xpath = row.get("xpath") or ""
+        if isinstance(row_xpath, str) and row_xpath.strip() and row_xpath.strip() in json.dumps(vision_page_struct):
+            return row["xpath"]
+    return None
+
+
+def legacy_best(dom_df_page, bbox):
+    best_row, best_score = None, 0.0
+    for _, row in dom_df_page.iterrows():
+        try:
+            dom_bbox = (float(row["dom_x"]), float(row["dom_y"]), float(row["dom_w"]), float(row["dom_h"]))
+        except Exception:
+            continue
+        score = iou(bbox, dom_bbox)
+        if score > best_score:
+            best_score, best_row = score, row
+    return best_row, best_score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--legacy-sample", type=int, default=4,
+                        help="Blocs traités par l'ancienne boucle (0 = aucun ; repli XPath : ~1 min par bloc)")
+    args = parser.parse_args()
+
+    df, vision = make_page(args.blocks, args.rows)
+    print(f"Page : {args.blocks} blocs × {args.rows} lignes DOM")
+
+    started = time.perf_counter()
+    index = DomRectIndex(df)
+    build_s = time.perf_counter() - started
+    fused = fuse_page(df, vision)
+    fuse_s = time.perf_counter() - started
+    matched = sum(1 for r in fused if r["dom_xpath"] is not None)
+    print(f"Indexé   : {fuse_s:.2f}s (index {build_s * 1000:.0f} ms, cellule {index.cell_size:.0f}px, "
+          f"{len(index.large)} rectangles hors grille) — {matched}/{len(fused)} blocs appariés")
+
+    sample = vision["blocks"][:args.legacy_sample]
+    if sample:
+        started = time.perf_counter()
+        legacy = [legacy_best(df, block["bbox"]) for block in sample]
+        legacy_s = time.perf_counter() - started
+        for block, (row, score) in zip(sample, legacy):
+            pos, new_score = index.best_match(block["bbox"])
+            same_row = (row is None and pos is None) or (
+                row is not None and pos is not None and df.iloc[pos]["xpath"] == row["xpath"])
+            if not same_row or new_score != score:
+                raise SystemExit(f"Écart sur le bloc {block['id']} : {row and row['xpath']} / {score} "
+                                 f"contre {pos} / {new_score}")
+        estimate = legacy_s / len(sample) * len(vision["blocks"])
+        print(f"Ancien   : {legacy_s:.2f}s pour {len(sample)} blocs, ~{estimate:.0f}s extrapolé "
+              f"(×{estimate / fuse_s:.0f}) — résultats identiques sur l'échantillon")
+
+    df, vision = make_text_page(args.blocks, args.rows)
+    started = time.perf_counter()
+    fused = fuse_page(df, vision)
+    fuse_s = time.perf_counter() - started
+    matched = sum(1 for r in fused if r["dom_xpath"] is not None)
+    print(f"Texte    : {fuse_s:.2f}s (sans coordonnées) — {matched}/{len(fused)} blocs appariés")
+    if sample:
+        sample = vision["blocks"][:args.legacy_sample]
+        started = time.perf_counter()
+        legacy = [legacy_text_match(df, vision, (block["text"] or "").strip()) for block in sample]
+        legacy_s = time.perf_counter() - started
+        if legacy != [r["dom_xpath"] for r in fused[:len(sample)]]:
+            raise SystemExit("Écart entre l'appariement par texte indexé et l'ancienne boucle")
+        estimate = legacy_s / len(sample) * len(vision["blocks"])
+        print(f"Ancien   : {legacy_s:.2f}s pour {len(sample)} blocs, ~{estimate:.0f}s extrapolé "
+              f"(×{estimate / fuse_s:.0f}) — résultats identiques sur l'échantillon")
+
+
+if __name__ == "__main__":
+    main()
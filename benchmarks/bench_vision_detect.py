@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la détection d'image de `modules.synthesys` sur des captures pleine page 1920 × 15 000.
+
+Génère des pages synthétiques (bandeau, colonne de contenu centrée avec paragraphes de texte
+rendu par OpenCV, images, grands espaces blancs ; un encadré rouge une page sur deux), puis
+compare par page :
+- l'ancien chemin : cadre rouge et blocs de texte calculés sur l'image entière (`stride=1`,
+  `tile=None`), niveaux de gris recalculés pour les blocs ;
+- le chemin rapide : proposition à basse résolution puis affinage en pleine résolution dans les
+  zones candidates, niveaux de gris partagés ;
+et vérifie que les deux donnent le même cadre et les mêmes blocs.
+
+Usage :
+    python -m benchmarks.bench_vision_detect [--pages 3] [--height 15000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.synthesys import detect_red_frame, detect_text_boxes  # noqa: E402
+
+WIDTH = 1920
+WORDS = ["accessibilite", "navigation", "contenu", "menu", "lien", "image", "titre", "page",
+         "formulaire", "bouton", "tabulation", "contraste", "lecteur", "ecran", "liste"]
+
+
+def make_capture(height, seed, framed=True):
+    """Capture pleine page synthétique (BGR)."""
+    rng = np.random.default_rng(seed)
+    image = np.full((height, WIDTH, 3), 255, np.uint8)
+    image[:120] = (60, 40, 20)
+    for x in range(400, 1500, 160):
+        cv2.putText(image, str(rng.choice(WORDS)), (x, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    left, right = 410, 1510
+    y = 200
+    while y < height - 300:
+        kind = rng.random()
+        if kind < 0.15:
+            h = int(rng.integers(200, 500))
+            gradient = np.linspace(0, 255, right - left, dtype=np.uint8)
+            image[y:y + h, left:right] = np.stack([gradient, gradient[::-1], np.full_like(gradient, 128)], axis=1)
+            y += h + int(rng.integers(40, 120))
+        elif kind < 0.2:
+            y += int(rng.integers(300, 900))  # section vide
+        else:
+            cv2.putText(image, " ".join(rng.choice(WORDS, 3)), (left, y + 30), cv2.FONT_HERSHEY_SIMPLEX, 1.1,
+                        (30, 30, 30), 2)
+            y += 60
+            for _ in range(int(rng.integers(3, 9))):
+                line, x = [], left
+                while True:
+                    word = str(rng.choice(WORDS))
+                    x += 12 * len(word) + 10
+                    if x > right:
+                        break
+                    line.append(word)
+                cv2.putText(image, " ".join(line), (left, y + 18), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (50, 50, 50), 1)
+                y += 28
+            y += int(rng.integers(40, 90))
+    if framed:
+        top = int(rng.integers(height // 4, height // 2))
+        cv2.rectangle(image, (left - 20, top), (right + 20, top + 900), (0, 0, 255), 8)
+    image[height - 250:] = (240, 240, 240)
+    return image
+
+
+def legacy(image):
+    red = detect_red_frame(image, stride=1)
+    roi = image if red is None else image[red[1]:red[1] + red[3], red[0]:red[0] + red[2]]
+    return red, detect_text_boxes(roi, tile=None)
+
+
+def fast(image):
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    red = detect_red_frame(image)
+    if red is not None:
+        gray = gray[red[1]:red[1] + red[3], red[0]:red[0] + red[2]]
+    return red, detect_text_boxes(None, gray=gray)
+
+
+def best_of(function, image, repeat):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(image)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--height", type=int, default=15000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    total_old = total_new = 0.0
+    for page in range(args.pages):
+        image = make_capture(args.height, seed=page, framed=page % 2 == 0)
+        old_s, old = best_of(legacy, image, args.repeat)
+        new_s, new = best_of(fast, image, args.repeat)
+        if old != new:
+            raise SystemExit(f"Écart sur la page {page} : {old[0]} / {len(old[1])} blocs contre "
+                             f"{new[0]} / {len(new[1])} blocs")
+        total_old += old_s
+        total_new += new_s
+        print(f"Page {page} : {old_s * 1000:6.0f} ms -> {new_s * 1000:5.0f} ms (×{old_s / new_s:.1f}) — "
+              f"cadre {new[0]}, {len(new[1])} blocs identiques")
+    print(f"Total : {total_old:.2f}s -> {total_new:.2f}s (×{total_old / total_new:.1f})")
+
+
+if __name__ == "__main__":
+    main()
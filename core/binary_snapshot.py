@@ -0,0 +1,425 @@
+"""
+Format binaire colonnaire des snapshots de page (`.rgsnap`), pour l'archivage et la relecture de
+pages volumineuses. Toutes les chaînes (balises, classes, attributs, styles, noms accessibles) sont
+internées dans une table unique ; balise, rôle et visibilité sont des colonnes entières denses ;
+rectangles, parents et drapeaux sont des tableaux de largeur fixe. Le fichier se lit par `mmap` :
+les colonnes sont des vues NumPy sans copie et une chaîne n'est décodée que lorsqu'elle est lue,
+si bien qu'une page de 100 000 éléments s'ouvre sans créer un dict Python par nœud.
+
+Disposition (petit-boutiste) :
+    MAGIC (8 octets) | longueur de l'en-tête (uint64) | en-tête JSON | sections alignées sur 8 octets
+L'en-tête décrit chaque section (décalage depuis le début des données, dtype, forme), les frames
+(avec leurs vocabulaires de balises et de rôles : chaîne → identifiant, pour sélectionner des
+lignes sans parcourir la table des chaînes) et les parties non colonnaires du snapshot
+(métadonnées, collecte des contrastes, titres).
+"""
+import base64
+import json
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from modules.dom_accessibility_from_batch import SNAPSHOT_STYLE_KEYS, snapshot_row
+
+MAGIC = b"RGSNAP\x00\x01"
+BINARY_VERSION = 1
+BINARY_SUFFIX = ".rgsnap"
+_ALIGN = 8
+_HEADER = struct.Struct("<8sQ")
+
+# Visibilité calculée (colonne `visibility`, uint8) ; 0 = style non relevé
+VISIBILITY_CODES = {"visible": 1, "hidden": 2, "collapse": 3}
+_VISIBILITY_INDEX = SNAPSHOT_STYLE_KEYS.index("visibility")
+
+NO_STRING = -1
+
+
+def _align(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def is_binary_snapshot(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class _StringPool:
+    """Internement à l'écriture : chaîne → identifiant (ordre de première apparition)."""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def add(self, value):
+        if value is None:
+            return NO_STRING
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return sid
+
+    def add_many(self, values):
+        return np.fromiter((self.add(v) for v in values), dtype=np.int32, count=len(values))
+
+
+class _Writer:
+    def __init__(self):
+        self.sections = {}
+        self.chunks = []
+        self.size = 0
+
+    def add(self, name, array):
+        array = np.ascontiguousarray(array)
+        pad = _align(self.size) - self.size
+        if pad:
+            self.chunks.append(b"\x00" * pad)
+            self.size += pad
+        self.sections[name] = {"offset": self.size, "dtype": array.dtype.str, "shape": list(array.shape)}
+        self.chunks.append(array.tobytes())
+        self.size += array.nbytes
+        return name
+
+    def add_bytes(self, name, data):
+        return self.add(name, np.frombuffer(data, dtype=np.uint8))
+
+
+def _encode_frame(writer, pool, prefix, dom):
+    count = int(dom.get("count") or 0)
+    tags = dom.get("tags") or []
+    tag_ids = pool.add_many(tags)
+    writer.add(f"{prefix}.tag", tag_ids[np.asarray(dom.get("tag") or [], dtype=np.int64)])
+    for key in ("parent", "domIndex", "parentIndex"):
+        writer.add(f"{prefix}.{key}", np.asarray(dom.get(key) or [], dtype=np.int32))
+    writer.add(f"{prefix}.rect", np.asarray(dom.get("rect") or [], dtype=np.float32).reshape(-1, 4))
+    writer.add(f"{prefix}.flags", np.asarray(dom.get("flags") or [], dtype=np.uint8))
+
+    attrs = dict(dom.get("attrs") or {})
+    role = np.full(count, NO_STRING, dtype=np.int32)
+    role_col = attrs.pop("role", None) or {}
+    role_values = role_col.get("values") or []
+    role[np.asarray(role_col.get("rows") or [], dtype=np.int64)] = pool.add_many(role_values)
+    writer.add(f"{prefix}.role", role)
+
+    fields = {}
+    for key, col in attrs.items():
+        values = col.get("values") or []
+        # Valeurs non textuelles (nombres, booléens, objets) internées sous forme JSON
+        kind = "str" if all(isinstance(v, str) for v in values) else "json"
+        encoded = values if kind == "str" else [json.dumps(v, ensure_ascii=False) for v in values]
+        writer.add(f"{prefix}.a.{key}.rows", np.asarray(col.get("rows") or [], dtype=np.int32))
+        writer.add(f"{prefix}.a.{key}.values", pool.add_many(encoded))
+        fields[key] = kind
+
+    acc = dom.get("accName") or {}
+    writer.add(f"{prefix}.acc.rows", np.asarray(acc.get("rows") or [], dtype=np.int32))
+    writer.add(f"{prefix}.acc.name", pool.add_many(acc.get("name") or []))
+    writer.add(f"{prefix}.acc.source", pool.add_many(acc.get("source") or []))
+
+    style = dom.get("style") or {}
+    style_rows = np.asarray(style.get("rows") or [], dtype=np.int32)
+    style_values = style.get("values") or []
+    writer.add(f"{prefix}.style.rows", style_rows)
+    writer.add(f"{prefix}.style.values",
+               pool.add_many([str(v) for row in style_values for v in row]).reshape(-1, len(SNAPSHOT_STYLE_KEYS)))
+    visibility = np.zeros(count, dtype=np.uint8)
+    visibility[style_rows] = [VISIBILITY_CODES.get(row[_VISIBILITY_INDEX], 0) for row in style_values]
+    writer.add(f"{prefix}.visibility", visibility)
+    return {"count": count, "scroll": list(dom.get("scroll") or [0, 0]), "version": dom.get("version", 1),
+            "fields": fields, "vocab": {"tag": {t: int(sid) for t, sid in zip(tags, tag_ids)},
+                                        "role": {r: pool.ids[r] for r in role_values}}}
+
+
+def write_binary_snapshot(snapshot, path):
+    """Écrit un snapshot (`core.page_snapshot`) au format binaire ; écriture atomique."""
+    writer, pool = _Writer(), _StringPool()
+    frames = []
+    for k, frame in enumerate(snapshot.get("frames") or []):
+        entry = {key: frame[key] for key in ("index", "parent", "src", "error") if key in frame}
+        if frame.get("dom"):
+            entry["dom"] = _encode_frame(writer, pool, f"f{k}", frame["dom"])
+        frames.append(entry)
+
+    encoded = [s.encode("utf-8") for s in pool.values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    writer.add("strings.offsets", offsets)
+    writer.add_bytes("strings.data", b"".join(encoded))
+
+    screenshots = {}
+    shots = snapshot.get("screenshots") or {}
+    if shots.get("viewport"):
+        screenshots["viewport"] = writer.add_bytes("shot.viewport", base64.b64decode(shots["viewport"]))
+    if shots.get("full_page"):
+        full = shots["full_page"]
+        screenshots["full_page"] = {"section": writer.add_bytes("shot.full_page", base64.b64decode(full["png"])),
+                                    "origin": full["origin"], "css_width": full["css_width"]}
+
+    header = {key: value for key, value in snapshot.items() if key not in ("frames", "screenshots")}
+    header.update({"binary_version": BINARY_VERSION, "frames": frames, "screenshots": screenshots,
+                   "sections": writer.sections})
+    raw = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    data_start = _align(_HEADER.size + len(raw))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(raw)))
+        f.write(raw)
+        f.write(b"\x00" * (data_start - _HEADER.size - len(raw)))
+        for chunk in writer.chunks:
+            f.write(chunk)
+    os.replace(tmp, path)
+    return path
+
+
+class StringTable:
+    """Table des chaînes internées ; décodage à la demande depuis le fichier projeté."""
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, sid):
+        if sid < 0:
+            return None
+        return self.data[int(self.offsets[sid]):int(self.offsets[sid + 1])].tobytes().decode("utf-8")
+
+
+class FrameView:
+    """Colonnes d'un document du snapshot ; les éléments restent des indices de ligne."""
+
+    def __init__(self, snapshot, prefix, entry):
+        self.snapshot = snapshot
+        self.prefix = prefix
+        self.index = entry.get("index")
+        self.src = entry.get("src", "")
+        self.error = entry.get("error")
+        self.dom = entry.get("dom")
+        self.count = self.dom["count"] if self.dom else 0
+        self._positions = {}
+
+    def column(self, name):
+        """Colonne dense : tag, role (ids de chaînes), parent, domIndex, parentIndex, rect, flags, visibility."""
+        return self.snapshot.array(f"{self.prefix}.{name}")
+
+    def _vocab(self, name):
+        """
+        Vocabulaire chaîne → identifiant d'une colonne `tag` / `role` : lu dans l'en-tête, ou pour un
+        fichier qui ne l'a pas, décodé à partir des seuls identifiants distincts de la colonne.
+        """
+        vocab = self.dom.get("vocab", {}).get(name)
+        if vocab is None:
+            strings = self.snapshot.strings
+            vocab = {strings[int(sid)]: int(sid) for sid in np.unique(self.column(name)) if sid != NO_STRING}
+            self.dom.setdefault("vocab", {})[name] = vocab
+        return vocab
+
+    def rows_with_tag(self, tag):
+        return self.rows_with_tags((tag,))
+
+    def rows_with_role(self, role):
+        return np.flatnonzero(self.column("role") == self._vocab("role").get(role, NO_STRING))
+
+    def tag(self, row):
+        return self.snapshot.strings[int(self.column("tag")[row])]
+
+    def attr(self, field, row):
+        """Valeur d'un attribut creux pour une ligne (None si absent)."""
+        if field == "role":
+            return self.snapshot.strings[int(self.column("role")[row])]
+        kind = self.dom["fields"].get(field)
+        if kind is None:
+            return None
+        rows = self.snapshot.array(f"{self.prefix}.a.{field}.rows")
+        pos = int(np.searchsorted(rows, row))
+        if pos >= len(rows) or rows[pos] != row:
+            return None
+        value = self.snapshot.strings[int(self.snapshot.array(f"{self.prefix}.a.{field}.values")[pos])]
+        return value if kind == "str" else json.loads(value)
+
+    def rows_with_tags(self, tags):
+        """Lignes (ordre du document) dont la balise fait partie de `tags`."""
+        vocab = self._vocab("tag")
+        ids = [vocab[t] for t in tags if t in vocab]
+        return np.flatnonzero(np.isin(self.column("tag"), ids))
+
+    def sparse(self, field):
+        """(lignes, ids de chaînes) d'un attribut creux ; tableaux vides s'il n'est jamais renseigné."""
+        if field not in self.dom["fields"]:
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, empty
+        return (self.snapshot.array(f"{self.prefix}.a.{field}.rows"),
+                self.snapshot.array(f"{self.prefix}.a.{field}.values"))
+
+    def _position(self, name, rows):
+        """Index dense ligne → position dans une colonne creuse (-1 si absente), construit une fois."""
+        pos = self._positions.get(name)
+        if pos is None:
+            pos = np.full(self.count, -1, dtype=np.int64)
+            pos[rows] = np.arange(len(rows))
+            self._positions[name] = pos
+        return pos
+
+    def row_attrs(self, row):
+        """
+        Dict d'une seule ligne au format de `snapshot_to_attrs` (mode lots + `xpath`), décodé à la
+        demande : les analyses ne matérialisent que les éléments qu'elles examinent.
+        """
+        strings = self.snapshot.strings
+        attrs = {}
+        role = int(self.column("role")[row])
+        if role != NO_STRING:
+            attrs["role"] = strings[role]
+        for field, kind in self.dom["fields"].items():
+            rows, values = self.sparse(field)
+            pos = self._position(f"a.{field}", rows)[row]
+            if pos >= 0:
+                value = strings[int(values[pos])]
+                attrs[field] = value if kind == "str" else json.loads(value)
+        acc = None
+        pos = self._position("acc", self.snapshot.array(f"{self.prefix}.acc.rows"))[row]
+        if pos >= 0:
+            acc = (strings[int(self.snapshot.array(f"{self.prefix}.acc.name")[pos])],
+                   strings[int(self.snapshot.array(f"{self.prefix}.acc.source")[pos])])
+        style = None
+        pos = self._position("style", self.snapshot.array(f"{self.prefix}.style.rows"))[row]
+        if pos >= 0:
+            style = [strings[int(v)] for v in self.snapshot.array(f"{self.prefix}.style.values")[pos]]
+        x, y, w, h = (float(v) for v in self.column("rect")[row])
+        parent = int(self.column("parent")[row])
+        return snapshot_row(
+            row, self.tag(row) or "", int(self.column("flags")[row]), int(self.column("domIndex")[row]),
+            int(self.column("parentIndex")[row]), parent, (x, y, w, h), self.dom["scroll"], attrs, acc, style,
+        )
+
+    def to_columnar(self):
+        """Reconstruit la charge utile DOM_SNAPSHOT_SCRIPT (entrée de `snapshot_to_attrs`)."""
+        strings = self.snapshot.strings
+        tag_ids = self.column("tag")
+        unique, inverse = np.unique(tag_ids, return_inverse=True)
+        out = {
+            "version": self.dom.get("version", 1), "count": self.count, "scroll": self.dom["scroll"],
+            "tags": [strings[int(t)] for t in unique], "tag": inverse.tolist(),
+            "parent": self.column("parent").tolist(), "domIndex": self.column("domIndex").tolist(),
+            "parentIndex": self.column("parentIndex").tolist(),
+            "rect": self.column("rect").astype(np.float64).ravel().tolist(),
+            "flags": self.column("flags").tolist(), "attrs": {},
+        }
+        role = self.column("role")
+        role_rows = np.flatnonzero(role != NO_STRING)
+        if role_rows.size:
+            out["attrs"]["role"] = {"rows": role_rows.tolist(), "values": [strings[int(role[r])] for r in role_rows]}
+        for field, kind in self.dom["fields"].items():
+            values = [strings[int(v)] for v in self.snapshot.array(f"{self.prefix}.a.{field}.values")]
+            out["attrs"][field] = {
+                "rows": self.snapshot.array(f"{self.prefix}.a.{field}.rows").tolist(),
+                "values": values if kind == "str" else [json.loads(v) for v in values],
+            }
+        out["accName"] = {
+            "rows": self.snapshot.array(f"{self.prefix}.acc.rows").tolist(),
+            "name": [strings[int(v)] for v in self.snapshot.array(f"{self.prefix}.acc.name")],
+            "source": [strings[int(v)] for v in self.snapshot.array(f"{self.prefix}.acc.source")],
+        }
+        out["style"] = {
+            "rows": self.snapshot.array(f"{self.prefix}.style.rows").tolist(),
+            "values": [[strings[int(v)] for v in row] for row in self.snapshot.array(f"{self.prefix}.style.values")],
+        }
+        return out
+
+
+class BinarySnapshot:
+    """Snapshot `.rgsnap` ouvert par mmap ; à fermer (ou utiliser comme gestionnaire de contexte)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, header_len = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} n'est pas un snapshot binaire")
+            self.header = json.loads(self._mm[_HEADER.size:_HEADER.size + header_len].decode("utf-8"))
+        except Exception:
+            if hasattr(self, "_mm"):
+                self._mm.close()
+            self._file.close()
+            raise
+        if self.header.get("binary_version", 0) > BINARY_VERSION:
+            self.close()
+            raise ValueError(f"{path} : version binaire {self.header['binary_version']} non prise en charge")
+        self._data_start = _align(_HEADER.size + header_len)
+        self._arrays = {}
+        self.strings = StringTable(self.array("strings.offsets"), self.array("strings.data"))
+        self.frames = [FrameView(self, f"f{k}", entry) for k, entry in enumerate(self.header["frames"])]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, key, default=None):
+        """Partie non colonnaire du snapshot (meta, contrast, headings…), comme `dict.get`."""
+        if key in ("frames", "screenshots", "sections", "binary_version"):
+            return default
+        return self.header.get(key, default)
+
+    def array(self, name):
+        """Vue NumPy (lecture seule, sans copie) d'une section."""
+        arr = self._arrays.get(name)
+        if arr is None:
+            spec = self.header["sections"][name]
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+            arr = np.frombuffer(self._mm, dtype=dtype, count=count,
+                                offset=self._data_start + spec["offset"]).reshape(spec["shape"])
+            self._arrays[name] = arr
+        return arr
+
+    def screenshot(self, name):
+        """PNG d'une capture (`viewport` ou `full_page`), ou None."""
+        entry = self.header["screenshots"].get(name)
+        if not entry:
+            return None
+        return self.array(entry["section"] if isinstance(entry, dict) else entry).tobytes()
+
+    def to_snapshot(self):
+        """Snapshot complet au format `core.page_snapshot` (dicts et listes Python)."""
+
+        snapshot = {k: v for k, v in self.header.items() if k not in ("binary_version", "sections", "screenshots")}
+        frames = []
+        for view, entry in zip(self.frames, self.header["frames"]):
+            frame = {k: v for k, v in entry.items() if k != "dom"}
+            if view.dom:
+                frame["dom"] = view.to_columnar()
+            frames.append(frame)
+        snapshot["frames"] = frames
+        screenshots = {}
+        if self.screenshot("viewport"):
+            screenshots["viewport"] = base64.b64encode(self.screenshot("viewport")).decode("ascii")
+        full = self.header["screenshots"].get("full_page")
+        if full:
+            screenshots["full_page"] = {"png": base64.b64encode(self.screenshot("full_page")).decode("ascii"),
+                                        "origin": full["origin"], "css_width": full["css_width"]}
+        snapshot["screenshots"] = screenshots
+        return snapshot
+
+    def close(self):
+        self._arrays.clear()
+        self.strings = None
+        self.frames = []
+        try:
+            self._mm.close()
+        except BufferError:
+            # Des vues NumPy sont encore référencées : la projection sera libérée avec elles
+            pass
+        self._file.close()
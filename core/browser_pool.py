@@ -0,0 +1,225 @@
+"""
+Pool de navigateurs Selenium gardés chauds entre les audits : le chromedriver est résolu une seule
+fois, K navigateurs sont lancés à l'avance, chaque audit emprunte un navigateur remis à zéro
+(cookies, stockage, onglets) et le rend ensuite. Un navigateur qui ne répond plus, ou qui a servi
+`max_pages` pages, est fermé et remplacé pour borner la croissance mémoire.
+"""
+import functools
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from utils.log_utils import log_with_step
+
+
+class _PooledBrowser:
+    def __init__(self, driver, serial):
+        self.driver = driver
+        self.serial = serial
+        self.pages = 0
+
+
+def _origin(url):
+    """Origine (schéma://hôte[:port]) d'une URL HTTP(S), None sinon."""
+    parts = urlsplit(url or '')
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc.rsplit('@', 1)[-1]}"
+
+
+def _tab_origins(driver):
+    """
+    Origines touchées par l'onglet courant (CDP) : pages de l'historique de navigation et cadres
+    de la page affichée (iframes compris).
+    """
+    urls = [entry.get('url') for entry in
+            driver.execute_cdp_cmd('Page.getNavigationHistory', {}).get('entries', [])]
+    stack = [driver.execute_cdp_cmd('Page.getFrameTree', {}).get('frameTree', {})]
+    while stack:
+        node = stack.pop()
+        urls.append(node.get('frame', {}).get('url'))
+        stack.extend(node.get('childFrames', []))
+    return {origin for origin in map(_origin, urls) if origin}
+
+
+def _clear_origins(driver, origins):
+    """Efface tout le stockage des origines (IndexedDB, CacheStorage, service workers, local/sessionStorage…)."""
+    for origin in sorted(origins):
+        driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+
+
+def reset_browser_state(driver):
+    """
+    Remet un navigateur dans un état neutre entre deux audits : onglets supplémentaires fermés,
+    cookies et stockage effacés, page vide. Avec CDP, le stockage de chaque origine visitée
+    (historique et iframes de chaque onglet, domaines des cookies) est effacé entièrement ; sinon
+    seuls les local/sessionStorage de la page courante le sont. Le cache HTTP est conservé
+    (ressources partagées).
+    """
+    cdp = hasattr(driver, 'execute_cdp_cmd')
+    origins = set()
+    handles = driver.window_handles
+    for handle in reversed(handles):
+        driver.switch_to.window(handle)
+        if cdp:
+            origins |= _tab_origins(driver)
+        if handle != handles[0]:
+            driver.close()
+    driver.switch_to.window(handles[0])
+    if cdp:
+        for cookie in driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', []):
+            host = cookie.get('domain', '').lstrip('.')
+            if host:
+                origins.update((f"https://{host}", f"http://{host}"))
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        _clear_origins(driver, origins)
+    else:
+        driver.delete_all_cookies()
+        try:
+            driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+        except Exception:
+            pass
+    driver.get('about:blank')
+
+
+def browser_is_healthy(driver):
+    """Le navigateur répond-il encore (session WebDriver et moteur JS) ?"""
+    try:
+        return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+    except Exception:
+        return False
+
+
+class BrowserPool:
+    """
+    `size` navigateurs chauds. `lease()` fournit un driver propre (context manager) ; au retour, le
+    navigateur est remis à zéro, ou recyclé s'il est en erreur ou a atteint `max_pages` audits.
+    `factory` crée un driver (par défaut `create_chrome_driver`, chromedriver résolu une fois).
+    """
+
+    def __init__(self, size=1, factory=None, max_pages=50, logger=None, headless=False, extra_args=()):
+        from core.driver_factory import create_chrome_driver
+
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.factory = factory or functools.partial(create_chrome_driver, headless=headless, extra_args=tuple(extra_args))
+        self.logger = logger or logging.getLogger("AccessibilityCrawler")
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._serial = 0
+        self._all = []
+        self._started = False
+        self.launched = 0
+        self.recycled = 0
+
+    def _launch(self):
+        driver = self.factory()
+        with self._lock:
+            closed = not self._started
+            if not closed:
+                self._serial += 1
+                browser = _PooledBrowser(driver, self._serial)
+                self._all.append(browser)
+                self.launched += 1
+        if closed:
+            # Pool fermé pendant le lancement : le navigateur ne doit pas lui survivre
+            driver.quit()
+            raise RuntimeError("Pool de navigateurs fermé")
+        return browser
+
+    def _discard(self, browser):
+        with self._lock:
+            if browser in self._all:
+                self._all.remove(browser)
+        try:
+            browser.driver.quit()
+        except Exception:
+            pass
+
+    def start(self):
+        """Lance les navigateurs en parallèle (idempotent)."""
+        with self._lock:
+            if self._started:
+                return self
+            self._started = True
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = [executor.submit(self._launch) for _ in range(self.size)]
+        for future in futures:
+            try:
+                self._idle.put(future.result())
+            except Exception as e:
+                log_with_step(self.logger, logging.ERROR, "POOL", f"Lancement d'un navigateur impossible : {e}")
+        log_with_step(self.logger, logging.INFO, "POOL", f"{self._idle.qsize()}/{self.size} navigateurs prêts")
+        return self
+
+    def acquire(self, timeout=None):
+        """Emprunte un navigateur (vérifié) ; le relance s'il ne répond plus."""
+        self.start()
+        try:
+            browser = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("Aucun navigateur disponible dans le pool")
+        if not browser_is_healthy(browser.driver):
+            log_with_step(self.logger, logging.WARNING, "POOL", f"Navigateur {browser.serial} sans réponse, relancé")
+            self._discard(browser)
+            self.recycled += 1
+            browser = self._launch()
+        return browser
+
+    def release(self, browser, failed=False):
+        """Rend un navigateur : remise à zéro, ou remplacement si en erreur / usé."""
+        if not self._started:
+            # Pool fermé (close()) pendant l'audit : ni remise à zéro ni relance d'un remplaçant
+            self._discard(browser)
+            return
+        browser.pages += 1
+        recycle = failed or browser.pages >= self.max_pages
+        if not recycle:
+            try:
+                reset_browser_state(browser.driver)
+            except Exception as e:
+                log_with_step(self.logger, logging.WARNING, "POOL", f"Remise à zéro impossible ({e}), navigateur recyclé")
+                recycle = True
+        if recycle:
+            self._discard(browser)
+            self.recycled += 1
+            try:
+                browser = self._launch()
+            except Exception as e:
+                log_with_step(self.logger, logging.ERROR, "POOL", f"Relance d'un navigateur impossible : {e}")
+                return
+        self._idle.put(browser)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """`with pool.lease() as driver:` — driver propre pour un audit."""
+        browser = self.acquire(timeout)
+        failed = False
+        try:
+            yield browser.driver
+        except Exception:
+            failed = not browser_is_healthy(browser.driver)
+            raise
+        finally:
+            self.release(browser, failed=failed)
+
+    def close(self):
+        with self._lock:
+            browsers, self._all = list(self._all), []
+            self._started = False
+        for browser in browsers:
+            try:
+                browser.driver.quit()
+            except Exception:
+                pass
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
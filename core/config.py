@@ -22,6 +22,41 @@ class Config:
         # EnhancedTabNavigator : 2e capture après délai (désactivé par défaut = plus fluide)
         self.focus_second_screenshot = False
         self.focus_second_screenshot_delay = 0.5
+        # Captures focus : 'viewport' (viewport entier) ou 'clip' (zone autour de l'élément) ; vignette optionnelle
+        self.focus_capture_mode = 'viewport'
+        self.focus_thumbnail_scale = None
+        # Extraction DOM bornée : longueur max. des textes renvoyés par le navigateur
+        # (None = borne par défaut DOM_SNIPPET_MAX_TEXT, négatif = texte complet)
+        self.max_text_length = None
+        # Extraction DOM du lecteur d'écran : 'snapshot' (un appel par frame) ou 'batch' (lots de WebElements)
+        self.dom_extraction = 'snapshot'
+        # ContrastChecker : vérification complémentaire par échantillonnage d'une capture pleine page
+        self.contrast_pixel_sampling = False
+        # ImageAnalyzer : cache d'images persistant (ETag / Last-Modified), partagé entre exécutions
+        # et processus du parcours de site (None = désactivé), et sa taille max. en Mo
+        self.image_cache_dir = os.path.abspath('.image_cache')
+        self.image_cache_size_mb = 512
+        # Parcours de site (--site) : navigateurs parallèles, nombre de pages et profondeur max.
+        self.site_workers = 2
+        self.site_max_pages = 100
+        self.site_max_depth = 3
+        # Pool de navigateurs : relance d'un navigateur après ce nombre d'audits (mémoire bornée)
+        self.browser_recycle_pages = 50
+        # Stabilité de page : borne max. (s) et fenêtre de calme réseau/DOM (ms) remplaçant les attentes fixes
+        self.page_ready_timeout = 10.0
+        self.page_ready_quiet_ms = 500
+        # Filtrage réseau : profil 'off', 'audit', 'strict' ou chemin d'un profil JSON (utils.request_filter)
+        self.network_profile = 'off'
+        # État de consentement persistant par origine (cookies + localStorage) ; None = désactivé
+        self.consent_dir = os.path.abspath('.consent')
+        # Snapshot de page : fichier capturé, relatif au répertoire de l'audit (None = audit en direct),
+        # et nombre de processus de l'analyse hors navigateur (None = nombre de cœurs)
+        self.page_snapshot = None
+        self.offline_workers = None
+        # Contextes navigateur simultanés pour les modules en lecture seule (1 = exécution en série)
+        self.module_workers = 1
+        # Historique des durées par module et grandeurs de page (core.run_history) ; None = désactivé
+        self.run_history = os.path.abspath('.run_history.jsonl')
         # True = conserver l’ancienne phase 4 DOMAnalyzer (Selenium élément par élément)
         env_legacy = os.environ.get("USE_LEGACY_DOM_ANALYZER", "").strip().lower()
         self.use_legacy_dom_analyzer = env_legacy in ("1", "true", "yes", "on")
@@ -59,6 +94,107 @@ class Config:
     def get_focus_second_screenshot_delay(self):
         return self.focus_second_screenshot_delay
 
+    def set_focus_capture_mode(self, mode):
+        self.focus_capture_mode = mode
+
+    def get_focus_capture_mode(self):
+        return self.focus_capture_mode
+
+    def set_focus_thumbnail_scale(self, scale):
+        self.focus_thumbnail_scale = float(scale) if scale else None
+
+    def get_focus_thumbnail_scale(self):
+        return self.focus_thumbnail_scale
+
+    def set_max_text_length(self, max_length):
+        self.max_text_length = int(max_length) if max_length is not None else None
+
+    def get_max_text_length(self):
+        return self.max_text_length
+
+    def set_dom_extraction(self, mode):
+        self.dom_extraction = mode
+
+    def get_dom_extraction(self):
+        return self.dom_extraction
+
+    def set_contrast_pixel_sampling(self, enabled):
+        self.contrast_pixel_sampling = bool(enabled)
+
+    def get_contrast_pixel_sampling(self):
+        return self.contrast_pixel_sampling
+
+    def set_image_cache_dir(self, path):
+        # Chemin absolu : les processus du parcours de site changent de répertoire courant
+        self.image_cache_dir = os.path.abspath(path) if path else None
+
+    def get_image_cache_dir(self):
+        return self.image_cache_dir
+
+    def set_image_cache_size_mb(self, size_mb):
+        self.image_cache_size_mb = int(size_mb)
+
+    def get_image_cache_size_mb(self):
+        return self.image_cache_size_mb
+
+    def set_site_crawl(self, workers, max_pages, max_depth):
+        self.site_workers = max(1, int(workers))
+        self.site_max_pages = int(max_pages)
+        self.site_max_depth = int(max_depth)
+
+    def get_site_crawl(self):
+        return self.site_workers, self.site_max_pages, self.site_max_depth
+
+    def set_browser_recycle_pages(self, pages):
+        self.browser_recycle_pages = max(1, int(pages))
+
+    def get_browser_recycle_pages(self):
+        return self.browser_recycle_pages
+
+    def set_page_readiness(self, timeout, quiet_ms):
+        self.page_ready_timeout = max(0.0, float(timeout))
+        self.page_ready_quiet_ms = max(0, int(quiet_ms))
+
+    def get_page_readiness(self):
+        return self.page_ready_timeout, self.page_ready_quiet_ms
+
+    def set_network_profile(self, profile):
+        self.network_profile = profile or 'off'
+
+    def get_network_profile(self):
+        return self.network_profile
+
+    def set_consent_dir(self, path):
+        # Chemin absolu : les processus du parcours de site changent de répertoire courant
+        self.consent_dir = os.path.abspath(path) if path else None
+
+    def get_consent_dir(self):
+        return self.consent_dir
+
+    def set_page_snapshot(self, path):
+        self.page_snapshot = path or None
+
+    def get_page_snapshot(self):
+        return self.page_snapshot
+
+    def set_offline_workers(self, workers):
+        self.offline_workers = max(1, int(workers)) if workers else None
+
+    def get_offline_workers(self):
+        return self.offline_workers
+
+    def set_module_workers(self, workers):
+        self.module_workers = max(1, int(workers or 1))
+
+    def get_module_workers(self):
+        return self.module_workers
+
+    def set_run_history(self, path):
+        self.run_history = os.path.abspath(path) if path else None
+
+    def get_run_history(self):
+        return self.run_history
+
     def set_modules(self, module_flags):
         """
         Active les modules en fonction des flags binaires
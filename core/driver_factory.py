@@ -0,0 +1,73 @@
+"""
+Création du driver Chrome (Selenium) avec les options utilisées par l'analyse : en-têtes d'un
+navigateur réel, automatisation masquée, fenêtre 1920x1080 sur l'écran principal.
+"""
+import functools
+import glob
+import os
+
+
+@functools.lru_cache(maxsize=1)
+def find_chromedriver():
+    """Chemin du binaire chromedriver installé par webdriver_manager (résolu une fois par processus)."""
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    driver_dir = os.path.dirname(ChromeDriverManager().install())
+    for f in glob.glob(os.path.join(driver_dir, "chromedriver*")):
+        if os.access(f, os.X_OK) and not f.endswith('.txt') and not f.endswith('.chromedriver'):
+            return f
+    raise FileNotFoundError("Aucun binaire chromedriver exécutable trouvé dans " + driver_dir)
+
+
+def chrome_options(headless=False, extra_args=(), performance_log=False):
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    # Ajout des en-têtes pour simuler un navigateur réel
+    options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--log-level=3')
+    options.add_argument('--disable-logging')
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--window-position=0,0')  # Forcer la position de la fenêtre sur l'écran principal
+    options.add_argument('--force-device-scale-factor=1')  # Éviter les problèmes de zoom
+    if headless:
+        options.add_argument('--headless=new')
+    for arg in extra_args:
+        options.add_argument(arg)
+
+    if performance_log:
+        # Journal réseau CDP (requêtes bloquées par le filtrage, cf. utils.request_filter)
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    # Masquer l'automatisation
+    options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    # Ajouter des préférences pour simuler un navigateur normal
+    options.add_experimental_option('prefs', {
+        'profile.default_content_setting_values.notifications': 2,
+        'credentials_enable_service': False,
+        'profile.password_manager_enabled': False,
+        'profile.default_content_settings.popups': 0,
+        'profile.managed_default_content_settings.images': 1,
+        'profile.default_content_setting_values.cookies': 1
+    })
+    return options
+
+
+def create_chrome_driver(headless=False, chromedriver_path=None, extra_args=(), performance_log=False):
+    """
+    Lance Chrome ; `chromedriver_path` évite de relancer la résolution webdriver_manager. Le moniteur
+    de stabilité (`utils.page_readiness`) est enregistré avant la première navigation.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    from utils.page_readiness import install_page_readiness
+
+    service = Service(chromedriver_path or find_chromedriver())
+    driver = webdriver.Chrome(service=service, options=chrome_options(headless, extra_args, performance_log))
+    install_page_readiness(driver)
+    return driver
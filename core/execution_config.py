@@ -30,9 +30,24 @@ class ExecutionConfig:
         'dom_analyzer': 4        # En dernier
     }
     
+    # Temps par défaut (en secondes) d'un module absent de l'historique des exécutions (core.run_history)
+    MODULE_TIMES = {
+        'screen_reader': 30,
+        'tab_navigation': 20,
+        'enhanced_tab_navigation': 25,
+        'contrast': 15,
+        'daltonism': 10,
+        'image_analyzer': 20,
+        'navigation': 15,
+        'dom_analyzer': 25,
+        'titles': 40,
+    }
+    DEFAULT_MODULE_TIME = 10
+
     # Modules qui peuvent s'exécuter en parallèle
     PARALLEL_MODULES = {
-        3: ['contrast', 'daltonism', 'image_analyzer', 'navigation', 'titles']
+        3: ['contrast', 'daltonism', 'image_analyzer', 'navigation', 'titles'],
+        4: ['dom_analyzer'],  # Lecture seule du DOM : aucune raison d'attendre la phase 3
     }
     
     @classmethod
@@ -125,12 +140,14 @@ class ExecutionConfig:
         return parallel_groups
     
     @classmethod
-    def get_execution_plan(cls, enabled_modules):
+    def get_execution_plan(cls, enabled_modules, history=None, url=None):
         """
         Génère un plan d'exécution complet
         
         Args:
             enabled_modules: Liste des modules activés
+            history: Historique des exécutions (core.run_history.RunHistory) pour l'estimation
+            url: Page visée, pour une estimation tirée de ses passages précédents
             
         Returns:
             dict: Plan d'exécution détaillé
@@ -153,35 +170,23 @@ class ExecutionConfig:
             'execution_order': execution_order,
             'parallel_groups': parallel_groups,
             'total_phases': len(execution_order),
-            'estimated_time': cls._estimate_execution_time(enabled_modules)
+            'estimated_time': cls._estimate_execution_time(enabled_modules, history, url)
         }
     
     @classmethod
-    def _estimate_execution_time(cls, enabled_modules):
+    def _estimate_execution_time(cls, enabled_modules, history=None, url=None):
         """
-        Estime le temps d'exécution basé sur les modules activés
+        Estime le temps d'exécution des modules activés
         
         Args:
             enabled_modules: Liste des modules activés
+            history: Historique des exécutions (core.run_history.RunHistory) ; sans historique,
+                temps fixes de MODULE_TIMES
+            url: Page visée (passages précédents et grandeurs connues de la page)
             
         Returns:
             int: Temps estimé en secondes
         """
-        # Temps estimés par module (en secondes)
-        module_times = {
-            'screen_reader': 30,
-            'tab_navigation': 20,
-            'enhanced_tab_navigation': 25,
-            'contrast': 15,
-            'daltonism': 10,
-            'image_analyzer': 20,
-            'navigation': 15,
-            'dom_analyzer': 25,
-            'titles': 40,
-        }
-        
-        total_time = 0
-        for module in enabled_modules:
-            total_time += module_times.get(module, 10)
-        
-        return total_time
+        if history is not None:
+            return round(sum(history.estimate_modules(enabled_modules, url).values()))
+        return sum(cls.MODULE_TIMES.get(module, cls.DEFAULT_MODULE_TIME) for module in enabled_modules)
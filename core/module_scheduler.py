@@ -0,0 +1,228 @@
+"""
+Ordonnancement des modules d'une page selon leurs dépendances (ExecutionConfig). Les modules
+interactifs (lecteur d'écran, navigation clavier) se suivent sur le driver principal, dans l'ordre
+des phases ; les modules des groupes parallèles (`ExecutionConfig.get_parallel_groups`) s'exécutent
+en même temps, chacun sur un contexte navigateur emprunté à un fournisseur (navigateurs Selenium du
+pool, ou contextes Playwright du même navigateur) déjà chargé sur la page. Sans fournisseur, tous les
+modules passent sur le driver principal, comme auparavant.
+
+Le rapport (`reports/module_schedule.json`) donne la durée de chaque module, le temps total, la
+somme des durées et le chemin critique (plus longue chaîne de dépendances, la file du driver
+principal comptant comme une chaîne).
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+from core.execution_config import ExecutionConfig
+from utils.log_utils import log_with_step
+from utils.page_readiness import wait_for_page_ready
+from utils.report_paths import reports_path
+
+MAIN_CONTEXT = "principal"
+ISOLATED_CONTEXT = "isolé"
+
+
+class ModuleTask:
+    def __init__(self, name, module, phase, deps=(), isolated=False):
+        self.name = name
+        self.module = module
+        self.phase = phase
+        self.deps = list(deps)
+        self.isolated = isolated
+        self.status = "en attente"
+        self.error = ""
+        self.start = self.end = None
+
+    @property
+    def duration(self):
+        return (self.end - self.start) if self.start is not None and self.end is not None else 0.0
+
+
+def build_tasks(modules_by_phase, enabled_modules, parallel=True):
+    """
+    Tâches à partir des modules chargés par phase ({phase: [(nom, module)]}) : dépendances déclarées
+    (limitées aux modules présents) et contexte isolé pour les modules des groupes parallèles.
+    """
+    isolated_names = set()
+    if parallel:
+        for group in ExecutionConfig.get_parallel_groups(enabled_modules).values():
+            isolated_names.update(group)
+    present = {name for entries in modules_by_phase.values() for name, _ in entries}
+    tasks = []
+    for phase in sorted(modules_by_phase):
+        for name, module in modules_by_phase[phase]:
+            deps = [d for d in ExecutionConfig.DEPENDENCIES.get(name, []) if d in present]
+            tasks.append(ModuleTask(name, module, phase, deps, isolated=name in isolated_names))
+    return tasks
+
+
+def critical_path(tasks):
+    """(noms, durée) de la plus longue chaîne de dépendances pondérée par les durées mesurées."""
+    finish, previous = {}, {}
+    for task in tasks:  # ordre topologique : les tâches sont construites phase par phase
+        best = max(task.deps, key=lambda d: finish.get(d, 0.0), default=None)
+        finish[task.name] = task.duration + (finish.get(best, 0.0) if best else 0.0)
+        previous[task.name] = best
+    if not finish:
+        return [], 0.0
+    name = max(finish, key=finish.get)
+    path = []
+    while name:
+        path.append(name)
+        name = previous.get(name)
+    path.reverse()
+    return path, finish[path[-1]]
+
+
+class ModuleScheduler:
+    """
+    Exécute les tâches : file séquentielle sur le driver principal (chaque tâche y dépend de la
+    précédente), tâches isolées en parallèle sur des drivers empruntés à `context_provider`
+    (objet exposant `lease()` → context manager fournissant un driver prêt sur la page).
+    """
+
+    def __init__(self, tasks, driver, context_provider=None, logger=None, on_start=None, on_done=None):
+        self.tasks = tasks
+        self.driver = driver
+        self.context_provider = context_provider
+        self.logger = logger or logging.getLogger("AccessibilityCrawler")
+        self.on_start = on_start
+        self.on_done = on_done
+        self.report = None
+        if context_provider is None:
+            for task in tasks:
+                task.isolated = False
+        # File du driver principal : dépendance implicite sur la tâche principale précédente
+        previous = None
+        for task in tasks:
+            if not task.isolated:
+                if previous and previous not in task.deps:
+                    task.deps.append(previous)
+                previous = task.name
+        # Un contexte isolé indisponible renvoie son module sur le driver principal, sous ce verrou
+        self._main_lock = threading.Lock()
+
+    def _run_on_main(self, task):
+        with self._main_lock:
+            task.module.driver = self.driver
+            task.module.run()
+
+    def _run_isolated(self, task):
+        leased = False
+        try:
+            with self.context_provider.lease() as driver:
+                leased = True
+                task.module.driver = driver
+                task.module.run()
+        except Exception as e:
+            if leased:
+                raise
+            log_with_step(self.logger, logging.WARNING, "CRAWLER",
+                          f"Contexte isolé indisponible pour {task.name} ({e}) : exécution sur le driver principal")
+            task.isolated = False
+            self._run_on_main(task)
+
+    def _execute(self, task, dependencies, origin):
+        wait(dependencies)
+        task.start = time.perf_counter() - origin
+        try:
+            if self.on_start:
+                self.on_start(task)
+            if task.isolated:
+                self._run_isolated(task)
+            else:
+                self._run_on_main(task)
+            task.status = "ok"
+        except Exception as e:
+            task.status = "erreur"
+            task.error = str(e)
+        task.end = time.perf_counter() - origin
+        if self.on_done:
+            self.on_done(task)
+
+    def run(self):
+        """Exécute toutes les tâches ; retourne le rapport d'ordonnancement."""
+        origin = time.perf_counter()
+        futures = {}
+        with ThreadPoolExecutor(max_workers=max(1, len(self.tasks))) as executor:
+            for task in self.tasks:
+                dependencies = [futures[d] for d in task.deps if d in futures]
+                # Chaque thread hérite du contexte de l'audit (répertoire de sortie run_directory)
+                context = contextvars.copy_context()
+                futures[task.name] = executor.submit(context.run, self._execute, task, dependencies, origin)
+            for future in futures.values():
+                future.result()
+        wall = time.perf_counter() - origin
+        path, path_s = critical_path(self.tasks)
+        self.report = {
+            "wall_s": round(wall, 3),
+            "serial_s": round(sum(t.duration for t in self.tasks), 3),
+            "critical_path": path,
+            "critical_path_s": round(path_s, 3),
+            "parallel_contexts": sum(1 for t in self.tasks if t.isolated),
+            "tasks": [
+                {"name": t.name, "phase": t.phase, "context": ISOLATED_CONTEXT if t.isolated else MAIN_CONTEXT,
+                 "deps": t.deps, "start_s": round(t.start or 0.0, 3), "end_s": round(t.end or 0.0, 3),
+                 "duration_s": round(t.duration, 3), "status": t.status, "error": t.error}
+                for t in self.tasks
+            ],
+        }
+        return self.report
+
+    def write_report(self, path=None):
+        path = path or reports_path("module_schedule.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report, f, ensure_ascii=False, indent=2)
+        return path
+
+    def log_report(self, step_tag="CRAWLER"):
+        report = self.report
+        log_with_step(
+            self.logger, logging.INFO, step_tag,
+            f"Modules terminés en {report['wall_s']:.1f}s (somme des modules {report['serial_s']:.1f}s, "
+            f"{report['parallel_contexts']} en contexte isolé) — chemin critique "
+            f"{' → '.join(report['critical_path'])} : {report['critical_path_s']:.1f}s",
+        )
+
+
+class SeleniumContextProvider:
+    """
+    Navigateurs Selenium supplémentaires (BrowserPool) pour les modules isolés : chaque emprunt
+    reçoit l'état de consentement et le filtrage réseau de l'audit, charge la page et attend sa
+    stabilité. Les navigateurs sont lancés au premier emprunt.
+    """
+
+    def __init__(self, url, size, consent_state=None, request_filter=None, logger=None, headless=True):
+        from core.browser_pool import BrowserPool
+        from core.driver_factory import create_chrome_driver
+
+        self.url = url
+        self.consent_state = consent_state
+        self.request_filter = request_filter
+        self.logger = logger or logging.getLogger("AccessibilityCrawler")
+        self.pool = BrowserPool(size=size, factory=functools.partial(create_chrome_driver, headless=headless,
+                                                                   performance_log=request_filter is not None),
+                                logger=self.logger)
+
+    @contextmanager
+    def lease(self):
+        with self.pool.lease() as driver:
+            if self.consent_state:
+                from utils.consent_state import ConsentStore
+                ConsentStore(logger=self.logger).inject_selenium(driver, self.consent_state)
+            if self.request_filter:
+                self.request_filter.apply_to_selenium(driver)
+            driver.get(self.url)
+            wait_for_page_ready(driver, logger=self.logger, label=self.url, step_tag="CRAWLER")
+            yield driver
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,233 @@
+"""
+Analyse hors navigateur de snapshots de page (`core.page_snapshot`) : les analyses non interactives
+(règles DOM, ids dupliqués, hiérarchie des titres, contrastes) sont rejouées sur le fichier, dans
+un pool de processus, sans occuper de navigateur. Les rapports sont écrits à côté du snapshot,
+aux mêmes emplacements qu'un audit en direct. Les snapshots `.rgsnap` sont lus par colonnes
+(`core.binary_snapshot.FrameView`) : règles DOM et ids dupliqués ne décodent que les éléments
+candidats, le rapport complet des éléments est écrit au fil de l'eau, un élément à la fois.
+"""
+import csv
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.binary_snapshot import NO_STRING, BinarySnapshot
+from core.page_snapshot import full_page_capture, open_snapshot
+from modules.contrast_checker import ContrastChecker
+from modules.dom_accessibility_from_batch import (
+    DOM_RULE_TAGS,
+    build_dom_element_record,
+    check_accessibility_issues_from_dict,
+    count_id_references,
+    duplicate_id_issues_from_attrs,
+    duplicate_id_issues_from_groups,
+    snapshot_to_attrs,
+    stable_css_selector_from_attrs,
+    write_dom_analysis_reports,
+)
+from modules.titles_analyzer import TitlesAnalyzer
+from utils.log_utils import log_with_step
+from utils.report_paths import reports_path, run_directory, run_path
+
+OFFLINE_ANALYZERS = ("dom", "ids", "titles", "contrast")
+
+# Modules de l'audit en direct (noms de Config.enabled_modules) → analyses rejouables sur snapshot
+_MODULE_ANALYZERS = {
+    "contrast": ("contrast",),
+    "dom_analyzer": ("dom", "ids"),
+    "screen_reader": ("ids",),
+    "titles": ("titles",),
+}
+
+
+def analyzers_for_modules(enabled_modules):
+    """Analyses hors navigateur correspondant aux modules activés (`Config.get_enabled_modules()`)."""
+    selected = {name for module in enabled_modules for name in _MODULE_ANALYZERS.get(module, ())}
+    return [name for name in OFFLINE_ANALYZERS if name in selected]
+
+
+def _documents(snapshot):
+    """(frame, attrs) pour chaque document capturé d'un snapshot JSON."""
+    for frame in snapshot.get("frames", []):
+        if frame.get("dom"):
+            yield frame, snapshot_to_attrs(frame["dom"])
+
+
+def _views(snapshot):
+    """Documents capturés d'un snapshot binaire (`FrameView`)."""
+    return [view for view in snapshot.frames if view.dom]
+
+
+def _frame_label(index, src):
+    return src or ("document" if index < 0 else f"frame #{index}")
+
+
+def _element_record(attrs):
+    return build_dom_element_record(attrs, attrs.get("xpath") or "", stable_css_selector_from_attrs(attrs))
+
+
+def _rule_candidates(view):
+    """Lignes soumises aux règles DOM : balises contrôlées et éléments portant un rôle."""
+    tags = DOM_RULE_TAGS + tuple(tag.upper() for tag in DOM_RULE_TAGS)
+    return np.union1d(view.rows_with_tags(tags), np.flatnonzero(view.column("role") != NO_STRING))
+
+
+def analyze_dom(snapshot, logger):
+    issues = []
+    if isinstance(snapshot, BinarySnapshot):
+        views = _views(snapshot)
+        total = sum(view.count for view in views)
+        for view in views:
+            for row in _rule_candidates(view):
+                check_accessibility_issues_from_dict(_element_record(view.row_attrs(int(row))), issues)
+        elements = (_element_record(view.row_attrs(row)) for view in views for row in range(view.count))
+    else:
+        elements, total = [], 0
+        for _, rows in _documents(snapshot):
+            total += len(rows)
+            for attrs in rows:
+                record = _element_record(attrs)
+                check_accessibility_issues_from_dict(record, issues)
+                elements.append(record)
+    summary = {"total_elements": total, "analyzed_elements": total, "issues_found": len(issues)}
+    write_dom_analysis_reports(
+        elements, issues, summary,
+        csv_filename=run_path("rapport_analyse_dom.csv"),
+        json_filename=run_path("rapport_analyse_dom.json"),
+        logger=logger,
+    )
+    return summary
+
+
+def _duplicate_id_issues_from_view(view):
+    """Ids dupliqués d'un document binaire : comparaison des identifiants de chaînes de la colonne `id`."""
+    rows, values = view.sparse("id")
+    unique, first, counts = np.unique(values, return_index=True, return_counts=True)
+    repeated = counts > 1
+    if not repeated.any():
+        return []
+    duplicates = {}
+    for sid in unique[repeated][np.argsort(first[repeated])]:
+        els = [view.row_attrs(int(row)) for row in rows[values == sid]]
+        duplicates[els[0]["id"]] = els
+    strings = view.snapshot.strings
+    references = count_id_references(
+        duplicates, lambda field: (strings[int(v)] for v in view.sparse(field)[1]))
+    return duplicate_id_issues_from_groups(duplicates, references)
+
+
+def analyze_duplicate_ids(snapshot, logger):
+    if isinstance(snapshot, BinarySnapshot):
+        documents = [(_frame_label(view.index, view.src), _duplicate_id_issues_from_view(view))
+                     for view in _views(snapshot)]
+    else:
+        documents = [(_frame_label(frame["index"], frame.get("src")), duplicate_id_issues_from_attrs(rows))
+                     for frame, rows in _documents(snapshot)]
+    issues = []
+    for label, found in documents:
+        for issue in found:
+            issue["frame"] = label
+            issues.append(issue)
+    path = reports_path("duplicate_ids.csv")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Frame", "Type", "Élément", "XPath", "Impact", "Sévérité", "Recommandation"])
+        for issue in issues:
+            writer.writerow([issue["frame"], issue["type"], issue["element"], issue["xpath"],
+                             issue["impact"], issue["severity"], issue["recommandation"]])
+    return {"duplicate_id_elements": len(issues)}
+
+
+def analyze_titles(snapshot, logger):
+    return TitlesAnalyzer(None, logger).run_offline(snapshot.get("headings"))
+
+
+def analyze_contrast(snapshot, logger):
+    capture = full_page_capture(snapshot)
+    checker = ContrastChecker(None, logger, pixel_sampling=capture is not None)
+    return {"contrast_failures": len(checker.analyze(snapshot.get("contrast") or {"count": 0}, capture))}
+
+
+_ANALYZERS = {
+    "dom": analyze_dom,
+    "ids": analyze_duplicate_ids,
+    "titles": analyze_titles,
+    "contrast": analyze_contrast,
+}
+
+
+def run_offline_analyzers(names, snapshot_path, output_dir=None, logger=None):
+    """
+    Exécute les analyses `names` sur un snapshot, chargé une seule fois ; rapports écrits dans
+    `output_dir` (par défaut le répertoire du snapshot). Un résultat par analyse. Point d'entrée
+    des processus du pool : ne lève jamais.
+    """
+    logger = logger or logging.getLogger(__name__)
+    output_dir = os.path.dirname(os.path.abspath(snapshot_path)) if output_dir is None else output_dir
+    results = [{"snapshot": snapshot_path, "analyzer": name, "status": "ok", "error": ""} for name in names]
+    started = time.perf_counter()
+    try:
+        with open_snapshot(snapshot_path) as snapshot, run_directory(output_dir):
+            for result in results:
+                try:
+                    result.update(_ANALYZERS[result["analyzer"]](snapshot, logger) or {})
+                except Exception as e:
+                    result["status"] = "error"
+                    result["error"] = str(e)
+                result["duration_s"] = round(time.perf_counter() - started, 3)
+                started = time.perf_counter()
+    except Exception as e:
+        # Snapshot illisible : toutes les analyses échouent
+        for result in results:
+            if "duration_s" not in result:
+                result.update(status="error", error=str(e), duration_s=round(time.perf_counter() - started, 3))
+    return results
+
+
+def run_offline_analyzer(name, snapshot_path, output_dir=None, logger=None):
+    """Exécute une seule analyse sur un snapshot (cf. `run_offline_analyzers`)."""
+    return run_offline_analyzers([name], snapshot_path, output_dir, logger)[0]
+
+
+class OfflineRunner:
+    """
+    Rejoue `analyzers` sur une liste de snapshots : une tâche par snapshot et par processus, le
+    fichier étant chargé une fois pour toutes ses analyses.
+    """
+
+    def __init__(self, logger, workers=None, analyzers=OFFLINE_ANALYZERS):
+        self.logger = logger
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.analyzers = [name for name in analyzers if name in _ANALYZERS]
+
+    def run(self, snapshot_paths):
+        """Retourne la liste des résultats (un par snapshot et par analyse)."""
+        tasks = list(snapshot_paths) if self.analyzers else []
+        if not tasks:
+            return []
+        started = time.perf_counter()
+        if self.workers == 1 or len(tasks) == 1:
+            # Pas de pool pour une seule tâche : journal complet des modules dans le logger de l'audit
+            results = [r for path in tasks for r in run_offline_analyzers(self.analyzers, path, logger=self.logger)]
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)), mp_context=ctx) as pool:
+                futures = [pool.submit(run_offline_analyzers, self.analyzers, path) for path in tasks]
+                results = [r for future in futures for r in future.result()]
+        for result in results:
+            detail = ", ".join(f"{k}={v}" for k, v in result.items()
+                               if k not in ("snapshot", "analyzer", "status", "error", "duration_s"))
+            log_with_step(
+                self.logger, logging.INFO if result["status"] == "ok" else logging.WARNING, "OFFLINE",
+                f"{result['analyzer']} sur {result['snapshot']} — {result['status']} en {result['duration_s']:.2f}s"
+                + (f" : {result['error']}" if result["error"] else f" ({detail})" if detail else ""),
+            )
+        log_with_step(self.logger, logging.INFO, "OFFLINE",
+                      f"{len(results)} analyse(s) hors navigateur sur {len(tasks)} snapshot(s) "
+                      f"en {time.perf_counter() - started:.2f}s ({min(self.workers, len(tasks))} processus)")
+        return results
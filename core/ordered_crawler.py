@@ -8,7 +8,10 @@ from modules.hierarchical_screen_reader import HierarchicalScreenReader
 from modules.image_analyzer import ImageAnalyzer
 from modules.navigation import NavigationModule
 import logging
+import threading
 
+from core.module_scheduler import ModuleScheduler, build_tasks
+from core.run_history import RunHistory, collect_page_features
 from core.shared_data import SharedData
 
 class OrderedAccessibilityCrawler:
@@ -31,6 +34,11 @@ class OrderedAccessibilityCrawler:
         }
         
         self.modules_by_priority = {}
+        # Nom d'exécution (ExecutionConfig) de chaque module chargé, pour l'ordonnanceur
+        self.module_names = {}
+        # Fournisseur de contextes navigateur pour les modules des groupes parallèles (None = tout en série)
+        self.context_provider = None
+        self.schedule_report = None
 
     def _load_modules(self):
         """Charge les modules dans l'ordre optimal"""
@@ -44,10 +52,13 @@ class OrderedAccessibilityCrawler:
                 self.logger.info("✓ HierarchicalScreenReader chargé (Phase 1 - Collecte des données ARIA avec algorithme hiérarchique)")
             else:
                 screen_reader = EnhancedScreenReader(self.driver, self.logger)
+                screen_reader.max_text_length = getattr(self.config, "max_text_length", None)
+                screen_reader.use_dom_snapshot = getattr(self.config, "dom_extraction", "snapshot") == "snapshot"
                 self.logger.info("✓ EnhancedScreenReader chargé (Phase 1 - Collecte des données ARIA)")
             
             screen_reader.shared_data = self.shared_data
             self.modules_by_priority[1] = [screen_reader]
+            self.module_names[screen_reader] = 'screen_reader'
         
         # Phase 2: TabNavigator (utilise les données ARIA)
         if 'tab_navigation' in enabled_modules:
@@ -58,21 +69,30 @@ class OrderedAccessibilityCrawler:
                 self.shared_data,
                 second_screenshot=self.config.get_focus_second_screenshot(),
                 second_screenshot_delay=self.config.get_focus_second_screenshot_delay(),
+                focus_capture_mode=self.config.get_focus_capture_mode(),
+                thumbnail_scale=self.config.get_focus_thumbnail_scale(),
             )
             if 2 not in self.modules_by_priority:
                 self.modules_by_priority[2] = []
             self.modules_by_priority[2].append(tab_navigator)
+            self.module_names[tab_navigator] = 'tab_navigation'
             self.logger.info("✓ TabNavigator chargé (Phase 2 - Utilisation des données ARIA)")
         
         # Phase 3: Modules parallèles (peuvent s'exécuter en même temps)
         phase_3_modules = []
         
         if 'contrast' in enabled_modules:
-            phase_3_modules.append(ContrastChecker(self.driver, self.logger))
+            phase_3_modules.append(ContrastChecker(
+                self.driver,
+                self.logger,
+                pixel_sampling=getattr(self.config, "contrast_pixel_sampling", False),
+            ))
+            self.module_names[phase_3_modules[-1]] = 'contrast'
             self.logger.info("✓ ContrastChecker chargé (Phase 3)")
             
         if 'daltonism' in enabled_modules:
             phase_3_modules.append(ColorSimulator(self.driver, self.logger))
+            self.module_names[phase_3_modules[-1]] = 'daltonism'
             self.logger.info("✓ ColorSimulator chargé (Phase 3)")
             
         if 'image_analyzer' in enabled_modules:
@@ -80,17 +100,22 @@ class OrderedAccessibilityCrawler:
                 self.driver, 
                 self.logger, 
                 self.config.base_url, 
-                self.config.output_dir
+                self.config.output_dir,
+                cache_dir=self.config.get_image_cache_dir() or '',
+                cache_max_bytes=self.config.get_image_cache_size_mb() * 1024 * 1024
             ))
+            self.module_names[phase_3_modules[-1]] = 'image_analyzer'
             self.logger.info("✓ ImageAnalyzer chargé (Phase 3)")
             
         if 'navigation' in enabled_modules:
             phase_3_modules.append(NavigationModule(self.driver, self.logger))
+            self.module_names[phase_3_modules[-1]] = 'navigation'
             self.logger.info("✓ NavigationModule chargé (Phase 3)")
 
         if 'titles' in enabled_modules:
             from modules.titles_analyzer import TitlesAnalyzer
             phase_3_modules.append(TitlesAnalyzer(self.driver, self.logger))
+            self.module_names[phase_3_modules[-1]] = 'titles'
             self.logger.info("✓ TitlesAnalyzer chargé (Phase 3)")
         
         if phase_3_modules:
@@ -118,57 +143,71 @@ class OrderedAccessibilityCrawler:
 
             dom_analyzer = DOMAnalyzer(self.driver, self.logger)
             self.modules_by_priority[4] = [dom_analyzer]
+            self.module_names[dom_analyzer] = 'dom_analyzer'
             self.logger.info("✓ DOMAnalyzer chargé (Phase 4)")
 
+    _PHASE_BANNERS = {
+        1: "\n📊 PHASE 1 — collecte ARIA (tous les éléments de la page)",
+        2: "\n🎯 PHASE 2 — navigation clavier avec données ARIA enrichies",
+        3: "\n⚡ PHASE 3 — analyses parallèles (modules restants)",
+        4: "\n🔍 PHASE 4 — analyse DOM complète (legacy)",
+    }
+
     def crawl(self, export_csv=False, csv_filename=None):
-        """Exécute les modules dans l'ordre optimal"""
+        """Exécute les modules selon leurs dépendances (ModuleScheduler)"""
         if self.driver is None:
             raise ValueError("Le driver n'est pas initialisé.")
         
         self.logger.info("\n🚀 Démarrage de l'analyse d'accessibilité avec ordre optimisé")
         self.logger.info("=" * 60)
-        
-        # Exécuter les modules par phase dans l'ordre
-        for phase in sorted(self.modules_by_priority.keys()):
-            modules = self.modules_by_priority[phase]
-            
-            if phase == 1:
-                self.logger.info(
-                    f"\n📊 PHASE {phase} — collecte ARIA (tous les éléments de la page)"
-                )
-            elif phase == 2:
-                self.logger.info(
-                    f"\n🎯 PHASE {phase} — navigation clavier avec données ARIA enrichies"
-                )
-            elif phase == 3:
-                self.logger.info(f"\n⚡ PHASE {phase} — analyses parallèles (modules restants)")
-            elif phase == 4:
-                self.logger.info(f"\n🔍 PHASE {phase} — analyse DOM complète (legacy)")
-            
-            # Exécuter les modules de cette phase
-            for module in modules:
-                try:
-                    module_name = module.__class__.__name__
-                    self.logger.info(f"\n▶️  Exécution de {module_name}...")
-                    
-                    # Exécuter le module
-                    result = module.run()
-                    
-                    # Si c'est le ScreenReader, extraire les données ARIA
-                    if hasattr(module, "get_all_aria_data"):
-                        self._extract_aria_data_from_screen_reader(module)
-                        self.logger.info(f"✅ {module_name} terminé - Données ARIA collectées")
-                    else:
-                        self.logger.info(f"✅ {module_name} terminé")
-                        
-                except Exception as e:
-                    self.logger.error(f"❌ Erreur dans {module_name}: {str(e)}")
-                    continue
-            
-            # Afficher le statut des données partagées après chaque phase
-            if phase >= 2:  # Après la phase 1 (ScreenReader)
-                aria_count = len(self.shared_data.aria_data)
-                self.logger.info(f"📈 Données ARIA disponibles: {aria_count} éléments")
+
+        modules_by_phase = {
+            phase: [(self.module_names.get(module, module.__class__.__name__), module) for module in modules]
+            for phase, modules in self.modules_by_priority.items()
+        }
+        tasks = build_tasks(modules_by_phase, self.config.get_enabled_modules())
+
+        # Historique des durées : grandeurs de la page relevées avant que les modules ne la modifient
+        history = RunHistory(self.config.get_run_history(), logger=self.logger) if self.config.get_run_history() else None
+        features = collect_page_features(self.driver) if history else None
+        if history:
+            estimated = history.estimate_page(
+                [task.name for task in tasks], self.config.base_url, features,
+                module_workers=self.config.get_module_workers() if self.context_provider else 1,
+            )
+            self.logger.info(f"⏱️  Durée estimée des modules (historique) : {estimated:.0f}s")
+        announced = set()
+        announce_lock = threading.Lock()
+
+        def on_start(task):
+            with announce_lock:
+                if task.phase not in announced:
+                    announced.add(task.phase)
+                    if task.phase in self._PHASE_BANNERS:
+                        self.logger.info(self._PHASE_BANNERS[task.phase])
+            self.logger.info(f"\n▶️  Exécution de {task.module.__class__.__name__}...")
+
+        def on_done(task):
+            module_name = task.module.__class__.__name__
+            if task.status != "ok":
+                self.logger.error(f"❌ Erreur dans {module_name}: {task.error}")
+            elif hasattr(task.module, "get_all_aria_data"):
+                # ScreenReader : extraire les données ARIA avant le démarrage des modules dépendants
+                self._extract_aria_data_from_screen_reader(task.module)
+                self.logger.info(f"✅ {module_name} terminé - Données ARIA collectées")
+            else:
+                self.logger.info(f"✅ {module_name} terminé ({task.duration:.1f}s)")
+
+        scheduler = ModuleScheduler(tasks, self.driver, self.context_provider, self.logger,
+                                    on_start=on_start, on_done=on_done)
+        self.schedule_report = scheduler.run()
+        scheduler.write_report()
+        scheduler.log_report()
+        durations = {task.name: task.duration for task in tasks if task.status == "ok"}
+        if history and durations:
+            # Aucun module réussi : pas de ligne vide qui fausserait les estimations
+            history.record(self.config.base_url, features, durations)
+        self.logger.info(f"📈 Données ARIA disponibles: {len(self.shared_data.aria_data)} éléments")
         
         self.logger.info("\n🎉 Analyse terminée avec succès !")
         self.logger.info("=" * 60)
@@ -225,6 +264,10 @@ class OrderedAccessibilityCrawler:
         
         self.logger.info("✅ Rapport généré avec succès.")
 
+    def set_context_provider(self, provider):
+        """Contextes navigateur isolés (méthode `lease()`) pour les modules des groupes parallèles"""
+        self.context_provider = provider
+
     def set_driver(self, driver):
         """Initialise le driver et charge les modules"""
         self.driver = driver
@@ -0,0 +1,159 @@
+"""
+Snapshot de page pour l'analyse hors navigateur : une seule capture (table des éléments de chaque
+document au format colonnaire DOM_SNAPSHOT_SCRIPT, arbre des frames, collecte des contrastes,
+titres, captures viewport et pleine page) écrite dans un fichier JSON compressé (gzip) ou au
+format binaire colonnaire `.rgsnap` (`core.binary_snapshot`). Le navigateur peut être libéré aussitôt ; `core.offline_runner` rejoue ensuite les analyses non
+interactives sur le fichier, y compris sur des snapshots anciens.
+"""
+import base64
+import gzip
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from core.binary_snapshot import BINARY_SUFFIX, BinarySnapshot, is_binary_snapshot, write_binary_snapshot
+from modules.contrast_checker import CONTRAST_COLLECT_SCRIPT, CONTRAST_MAX_TEXT
+from modules.dom_accessibility_from_batch import (
+    DOM_SNAPSHOT_SCRIPT,
+    batch_extract_options,
+    estimate_payload_bytes,
+)
+from modules.titles_analyzer import TITLES_EXTRACT_SCRIPT
+from utils.log_utils import log_with_step
+from utils.pixel_contrast import capture_full_page
+
+SNAPSHOT_FORMAT = "rgaa-page-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FILENAME = "snapshot.json.gz"
+
+PAGE_META_SCRIPT = r"""
+return {
+  url: location.href,
+  title: document.title,
+  lang: document.documentElement.getAttribute('lang') || '',
+  userAgent: navigator.userAgent,
+  viewport: [window.innerWidth, window.innerHeight, window.devicePixelRatio || 1],
+  scroll: [window.scrollX, window.scrollY]
+};
+"""
+
+
+def _collect_document(driver, options):
+    snapshot = driver.execute_script(DOM_SNAPSHOT_SCRIPT, options)
+    if not isinstance(snapshot, dict):
+        raise ValueError("DOM_SNAPSHOT_SCRIPT n'a pas renvoyé de snapshot")
+    return snapshot
+
+
+def capture_page_snapshot(driver, max_text_length=None, screenshots=True, logger=None):
+    """
+    Capture complète de la page courante. Frame -1 = document principal ; chaque iframe/frame de
+    premier niveau suit avec son `src` (les frames inaccessibles, ex. cross-origin, portent `error`).
+    """
+    started = time.perf_counter()
+    options = batch_extract_options(max_text_length)
+    driver.switch_to.default_content()
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "captured_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "meta": driver.execute_script(PAGE_META_SCRIPT) or {},
+        "frames": [{"index": -1, "parent": None, "src": "", "dom": _collect_document(driver, options)}],
+        "contrast": driver.execute_script(CONTRAST_COLLECT_SCRIPT, {"maxText": CONTRAST_MAX_TEXT}) or {},
+        "headings": driver.execute_script(TITLES_EXTRACT_SCRIPT) or {},
+        "screenshots": {},
+    }
+
+    for idx, frame in enumerate(driver.find_elements("css selector", "iframe, frame")):
+        entry = {"index": idx, "parent": -1, "src": ""}
+        try:
+            entry["src"] = frame.get_attribute("src") or frame.get_attribute("name") or ""
+            driver.switch_to.frame(frame)
+            entry["dom"] = _collect_document(driver, options)
+        except Exception as e:
+            entry["error"] = str(e)
+        finally:
+            try:
+                driver.switch_to.default_content()
+            except Exception:
+                pass
+        snapshot["frames"].append(entry)
+
+    if screenshots:
+        try:
+            snapshot["screenshots"]["viewport"] = base64.b64encode(driver.get_screenshot_as_png()).decode("ascii")
+            png, origin_x, origin_y, css_width = capture_full_page(driver)
+            snapshot["screenshots"]["full_page"] = {
+                "png": base64.b64encode(png).decode("ascii"),
+                "origin": [origin_x, origin_y],
+                "css_width": css_width,
+            }
+        except Exception as e:
+            if logger:
+                log_with_step(logger, logging.WARNING, "SNAPSHOT", f"Captures d'écran impossibles : {e}")
+
+    if logger:
+        elements = sum(int((f.get("dom") or {}).get("count") or 0) for f in snapshot["frames"])
+        log_with_step(
+            logger, logging.INFO, "SNAPSHOT",
+            f"Snapshot capturé en {time.perf_counter() - started:.2f}s : {elements} éléments, "
+            f"{len(snapshot['frames'])} document(s), {estimate_payload_bytes(snapshot) / 1024:.0f} Ko",
+        )
+    return snapshot
+
+
+def save_snapshot(snapshot, path):
+    """
+    Écrit le snapshot (écriture atomique) ; retourne le chemin. Extension `.rgsnap` : format
+    binaire colonnaire lisible par mmap (`core.binary_snapshot`), sinon JSON compact compressé.
+    """
+    if path.endswith(BINARY_SUFFIX):
+        return write_binary_snapshot(snapshot, path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+    return path
+
+
+def load_snapshot(path):
+    """Snapshot complet en dicts Python, quel que soit le format du fichier (voir `open_snapshot`)."""
+    if is_binary_snapshot(path):
+        with BinarySnapshot(path) as binary:
+            return binary.to_snapshot()
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    if snapshot.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} n'est pas un snapshot de page")
+    if snapshot.get("version", 0) > SNAPSHOT_VERSION:
+        raise ValueError(f"{path} : version de snapshot {snapshot['version']} non prise en charge")
+    return snapshot
+
+
+@contextmanager
+def open_snapshot(path):
+    """
+    Snapshot à analyser : `.rgsnap` ouvert par mmap (`BinarySnapshot`, colonnes lues sans créer
+    de dict par élément), sinon dict JSON (`load_snapshot`).
+    """
+    if is_binary_snapshot(path):
+        with BinarySnapshot(path) as binary:
+            yield binary
+    else:
+        yield load_snapshot(path)
+
+
+def full_page_capture(snapshot):
+    """Capture pleine page du snapshot (dict ou `BinarySnapshot`) au format de `capture_full_page`, ou None."""
+    if isinstance(snapshot, BinarySnapshot):
+        full = snapshot.header["screenshots"].get("full_page")
+        png = snapshot.screenshot("full_page")
+    else:
+        full = (snapshot.get("screenshots") or {}).get("full_page")
+        png = base64.b64decode(full["png"]) if full else None
+    if not full:
+        return None
+    return png, full["origin"][0], full["origin"][1], full["css_width"]
@@ -1,66 +1,706 @@
-from playwright.sync_api import sync_playwright
+"""
+Moteur Playwright asynchrone : un seul processus navigateur, un contexte isolé par audit, tous
+pilotés depuis une boucle asyncio. Les modules d'analyse restent synchrones (API Selenium) : chaque
+audit les exécute dans un thread avec un `PlaywrightDriverAdapter`, qui renvoie chaque appel
+navigateur vers la boucle. Plusieurs dizaines d'audits peuvent ainsi avancer en parallèle.
+"""
+import asyncio
+import base64
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from core.run_history import RunHistory, predict_makespan
+from utils.consent_state import ConsentStore
+from utils.log_utils import log_with_step
+from utils.page_readiness import PAGE_READINESS_INSTALL_SCRIPT, wait_for_page_ready
+from utils.report_paths import run_directory
+from utils.request_filter import RequestFilter
+
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1920, "height": 1080},
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/122.0.0.0 Safari/537.36"
+    ),
+    "locale": "fr-FR",
+    "timezone_id": "Europe/Paris",
+}
+
+# Touches Selenium (Keys.*, zone Unicode privée) → noms de touches Playwright
+_KEY_NAMES = {
+    "\ue003": "Backspace", "\ue004": "Tab", "\ue006": "Enter", "\ue007": "Enter",
+    "\ue008": "Shift", "\ue009": "Control", "\ue00a": "Alt", "\ue00c": "Escape", "\ue00d": " ",
+    "\ue00e": "PageUp", "\ue00f": "PageDown", "\ue010": "End", "\ue011": "Home",
+    "\ue012": "ArrowLeft", "\ue013": "ArrowUp", "\ue014": "ArrowRight", "\ue015": "ArrowDown",
+    "\ue016": "Insert", "\ue017": "Delete", "\ue03d": "Meta", "\ue050": "Shift",
+    "\ue051": "Control", "\ue052": "Alt", "\ue053": "Meta",
+}
+_KEY_NAMES.update({chr(0xE031 + i): f"F{i + 1}" for i in range(12)})
+
+# Stratégies de localisation Selenium (valeurs de By.*) → sélecteurs Playwright
+_SELECTORS = {
+    "css selector": lambda v: f"css={v}",
+    "tag name": lambda v: f"css={v}",
+    "xpath": lambda v: f"xpath={v}",
+    "id": lambda v: f'css=[id="{v}"]',
+    "name": lambda v: f'css=[name="{v}"]',
+    "class name": lambda v: f"css=.{v}",
+    "link text": lambda v: f'xpath=.//a[normalize-space(.)="{v}"]',
+    "partial link text": lambda v: f'xpath=.//a[contains(., "{v}")]',
+}
+
+# Valeur de retour : les nœuds DOM ne sont pas sérialisables, ils sont gardés dans la page et
+# récupérés ensuite comme ElementHandle (un aller-retour de plus, uniquement dans ce cas).
+_RETURN_WRAPPER = """
+  var isNode = function (v) { return v instanceof Node; };
+  if (isNode(r) || (Array.isArray(r) && r.some(isNode))) {
+    window.__rgaaReturn = r;
+    return {__rgaa_handles__: Array.isArray(r) ? 'list' : 'node'};
+  }
+  return r;
+"""
+
+_TAKE_RETURN = "() => { var r = window.__rgaaReturn; window.__rgaaReturn = null; return r; }"
+
+
+def selenium_script(body, is_async=False):
+    """
+    Expression Playwright équivalente à un script `execute_script` Selenium (corps de fonction
+    utilisant `arguments` et `return`). Évaluée par le protocole, donc non soumise à la CSP.
+    """
+    if is_async:
+        return (
+            "(args) => new Promise(function (resolve) {\n"
+            "(function () {\n" + body + "\n}).apply(null, args.concat([resolve]));\n"
+            "}).then(function (r) {" + _RETURN_WRAPPER + "})"
+        )
+    return "(args) => {\nvar r = (function () {\n" + body + "\n}).apply(null, args);\n" + _RETURN_WRAPPER + "}"
+
+
+def playwright_selector(by, value):
+    try:
+        return _SELECTORS[by](value)
+    except KeyError:
+        raise ValueError(f"Stratégie de localisation non supportée par l'adaptateur Playwright : {by}")
+
+
+def _js_error(error):
+    from selenium.common.exceptions import JavascriptException
+    return JavascriptException(str(error))
+
+
+class PlaywrightElement:
+    """Élément au comportement de WebElement Selenium, adossé à un ElementHandle Playwright."""
+
+    def __init__(self, handle, driver):
+        self.handle = handle
+        self.parent = driver
+        self._id = None
+
+    def _eval(self, expression, arg=None):
+        return self.parent._run(self.handle.evaluate(expression, arg))
+
+    @property
+    def id(self):
+        # Identifiant stable par nœud (équivalent de la référence d'élément WebDriver)
+        if self._id is None:
+            self._id = self._eval(
+                "el => el.__rgaaId || (el.__rgaaId = 'pw-' + (window.__rgaaIdSeq = (window.__rgaaIdSeq || 0) + 1))"
+            )
+        return self._id
+
+    def __eq__(self, other):
+        return isinstance(other, PlaywrightElement) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    @property
+    def tag_name(self):
+        return self._eval("el => el.tagName.toLowerCase()")
+
+    @property
+    def text(self):
+        return self._eval("el => (el.innerText || '').trim()")
+
+    def get_attribute(self, name):
+        """Comme Selenium : propriété si elle existe (résolue, ex. href), sinon attribut."""
+        return self._eval(
+            """(el, n) => {
+              if (n === 'style') return el.getAttribute('style');
+              var p = n === 'class' ? el.className : el[n];
+              if (typeof p === 'boolean') return p ? 'true' : null;
+              if (p !== undefined && p !== null && typeof p !== 'object' && typeof p !== 'function') return String(p);
+              return el.getAttribute(n);
+            }""",
+            name,
+        )
+
+    def get_dom_attribute(self, name):
+        return self._eval("(el, n) => el.getAttribute(n)", name)
+
+    def get_property(self, name):
+        return self._eval("(el, n) => { var v = el[n]; return typeof v === 'object' ? null : v; }", name)
+
+    def is_displayed(self):
+        return self.parent._run(self.handle.is_visible())
+
+    def is_enabled(self):
+        return self.parent._run(self.handle.is_enabled())
+
+    def is_selected(self):
+        return bool(self._eval("el => !!(el.checked || el.selected)"))
+
+    def value_of_css_property(self, name):
+        return self._eval("(el, n) => getComputedStyle(el).getPropertyValue(n)", name)
+
+    @property
+    def rect(self):
+        return self._eval(
+            "el => { var r = el.getBoundingClientRect(); return {x: r.left + window.scrollX, "
+            "y: r.top + window.scrollY, width: r.width, height: r.height}; }"
+        )
+
+    @property
+    def location(self):
+        r = self.rect
+        return {"x": round(r["x"]), "y": round(r["y"])}
+
+    @property
+    def size(self):
+        r = self.rect
+        return {"width": round(r["width"]), "height": round(r["height"])}
+
+    @property
+    def location_once_scrolled_into_view(self):
+        self.parent._run(self.handle.scroll_into_view_if_needed())
+        r = self._eval("el => { var r = el.getBoundingClientRect(); return {x: r.left, y: r.top}; }")
+        return {"x": round(r["x"]), "y": round(r["y"])}
+
+    def find_elements(self, by="css selector", value=None):
+        if by == "xpath" and value.startswith("/"):
+            # Selenium : un XPath absolu depuis un élément porte sur tout le document
+            return self.parent.find_elements(by, value)
+        handles = self.parent._run(self.handle.query_selector_all(playwright_selector(by, value)))
+        return [PlaywrightElement(h, self.parent) for h in handles]
+
+    def find_element(self, by="css selector", value=None):
+        found = self.find_elements(by, value)
+        if not found:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(f"Aucun élément pour {by}={value}")
+        return found[0]
+
+    def click(self):
+        self.parent._run(self.handle.click())
+
+    def send_keys(self, *values):
+        for value in values:
+            for chunk in str(value):
+                key = _KEY_NAMES.get(chunk)
+                if key:
+                    self.parent._run(self.handle.press(key))
+                else:
+                    self.parent._run(self.handle.type(chunk))
+
+    def clear(self):
+        self.parent._run(self.handle.fill(""))
+
+    @property
+    def screenshot_as_png(self):
+        return self.parent._run(self.handle.screenshot())
+
+    def screenshot(self, filename):
+        self.parent._run(self.handle.screenshot(path=filename))
+        return True
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def default_content(self):
+        self._driver._frame = self._driver.page.main_frame
+
+    def parent_frame(self):
+        self._driver._frame = self._driver._frame.parent_frame or self._driver.page.main_frame
+
+    def frame(self, reference):
+        if isinstance(reference, PlaywrightElement):
+            frame = self._driver._run(reference.handle.content_frame())
+        elif isinstance(reference, int):
+            frame = self._driver._frame.child_frames[reference]
+        else:
+            frame = next((f for f in self._driver._frame.child_frames if f.name == reference), None)
+        if frame is None:
+            from selenium.common.exceptions import NoSuchFrameException
+            raise NoSuchFrameException(str(reference))
+        self._driver._frame = frame
+
+    @property
+    def active_element(self):
+        handle = self._driver._run(self._driver._frame.evaluate_handle("() => document.activeElement"))
+        return PlaywrightElement(handle.as_element(), self._driver)
+
+    def window(self, handle):
+        pass
 
 
 class PlaywrightDriverAdapter:
-    """Adaptateur minimal pour exposer une API proche du driver existant."""
+    """
+    Sous-ensemble de l'API WebDriver Selenium utilisé par les modules (scripts avec arguments et
+    retour d'éléments, recherche d'éléments, captures, CDP, actions clavier W3C, frames) au-dessus
+    d'une page Playwright asynchrone. Les méthodes sont synchrones et doivent être appelées depuis
+    un autre thread que celui de la boucle `loop`.
+    """
 
-    def __init__(self, page):
+    def __init__(self, page, loop, context=None, script_timeout=30):
         self.page = page
+        self.loop = loop
+        self.context = context or page.context
+        self.script_timeout = script_timeout
+        self._frame = page.main_frame
+        self._cdp = None
+        self.switch_to = _SwitchTo(self)
+
+    def _run(self, coro):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            coro.close()
+            raise RuntimeError("PlaywrightDriverAdapter ne peut pas être appelé depuis la boucle asyncio")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def _to_js(self, value):
+        if isinstance(value, PlaywrightElement):
+            return value.handle
+        if isinstance(value, (list, tuple)):
+            return [self._to_js(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self._to_js(v) for k, v in value.items()}
+        return value
+
+    async def _evaluate(self, script, args, is_async):
+        frame = self._frame
+        try:
+            coro = frame.evaluate(selenium_script(script, is_async), self._to_js(list(args)))
+            result = await asyncio.wait_for(coro, self.script_timeout) if is_async else await coro
+        except asyncio.TimeoutError:
+            from selenium.common.exceptions import TimeoutException
+            raise TimeoutException(f"Script asynchrone sans réponse après {self.script_timeout}s")
+        except Exception as e:
+            raise _js_error(e)
+        if isinstance(result, dict) and result.get("__rgaa_handles__"):
+            handle = await frame.evaluate_handle(_TAKE_RETURN)
+            if result["__rgaa_handles__"] == "node":
+                return PlaywrightElement(handle.as_element(), self)
+            props = await handle.get_properties()
+            out = []
+            for key in sorted((k for k in props if k.isdigit()), key=int):
+                element = props[key].as_element()
+                out.append(PlaywrightElement(element, self) if element else await props[key].json_value())
+            return out
+        return result
 
     def execute_script(self, script, *args):
-        # Mapping direct vers evaluate Playwright.
-        if args:
-            # Le module titles n'utilise pas encore d'arguments JS; on garde ce garde-fou explicite.
-            raise NotImplementedError("execute_script avec args n'est pas encore supporté par l'adaptateur Playwright.")
-        return self.page.evaluate(script)
+        return self._run(self._evaluate(script, args, False))
+
+    def execute_async_script(self, script, *args):
+        return self._run(self._evaluate(script, args, True))
+
+    def find_elements(self, by="css selector", value=None):
+        handles = self._run(self._frame.query_selector_all(playwright_selector(by, value)))
+        return [PlaywrightElement(h, self) for h in handles]
+
+    def find_element(self, by="css selector", value=None):
+        found = self.find_elements(by, value)
+        if not found:
+            from selenium.common.exceptions import NoSuchElementException
+            raise NoSuchElementException(f"Aucun élément pour {by}={value}")
+        return found[0]
+
+    async def _cdp_send(self, method, params):
+        if self._cdp is None:
+            self._cdp = await self.context.new_cdp_session(self.page)
+        return await self._cdp.send(method, params)
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self._run(self._cdp_send(cmd, cmd_args))
+
+    async def _perform_actions(self, sources):
+        keyboard, mouse = self.page.keyboard, self.page.mouse
+        for source in sources:
+            for action in source.get("actions", []):
+                kind = action.get("type")
+                if source.get("type") == "key" and kind in ("keyDown", "keyUp"):
+                    key = _KEY_NAMES.get(action["value"], action["value"])
+                    await (keyboard.down(key) if kind == "keyDown" else keyboard.up(key))
+                elif source.get("type") == "pointer" and kind == "pointerMove" and action.get("origin", "viewport") == "viewport":
+                    await mouse.move(action.get("x", 0), action.get("y", 0))
+                elif source.get("type") == "pointer" and kind in ("pointerDown", "pointerUp"):
+                    await (mouse.down() if kind == "pointerDown" else mouse.up())
+
+    def execute(self, driver_command, params=None):
+        """Commandes WebDriver brutes : seules les actions W3C (ActionChains) sont prises en charge."""
+        if driver_command == "actions":
+            self._run(self._perform_actions((params or {}).get("actions", [])))
+            return {"value": None}
+        if driver_command == "releaseActions":
+            return {"value": None}
+        raise NotImplementedError(f"Commande WebDriver non supportée par l'adaptateur Playwright : {driver_command}")
 
     @property
     def current_url(self):
         return self.page.url
 
+    @property
+    def title(self):
+        return self._run(self.page.title())
+
+    @property
+    def page_source(self):
+        return self._run(self.page.content())
+
+    @property
+    def window_handles(self):
+        return ["main"]
+
+    @property
+    def current_window_handle(self):
+        return "main"
+
+    def get(self, url):
+        self._run(self.page.goto(url, wait_until="load"))
+        self._frame = self.page.main_frame
+
+    def refresh(self):
+        self._run(self.page.reload(wait_until="load"))
+
+    def back(self):
+        self._run(self.page.go_back())
+
+    def get_screenshot_as_png(self):
+        return self._run(self.page.screenshot(full_page=False))
+
+    def get_screenshot_as_base64(self):
+        return base64.b64encode(self.get_screenshot_as_png()).decode("ascii")
+
     def save_screenshot(self, path):
-        self.page.screenshot(path=path, full_page=False)
+        self._run(self.page.screenshot(path=path, full_page=False))
         return True
 
+    def get_window_size(self):
+        return dict(self.page.viewport_size or CONTEXT_OPTIONS["viewport"])
 
-class PlaywrightCrawler:
-    def __init__(self, config, logger):
+    def set_window_size(self, width, height):
+        self._run(self.page.set_viewport_size({"width": int(width), "height": int(height)}))
+
+    def set_window_position(self, x, y):
+        pass
+
+    def maximize_window(self):
+        pass
+
+    def get_cookies(self):
+        return self._run(self.context.cookies())
+
+    def add_cookie(self, cookie):
+        cookie = dict(cookie)
+        if "domain" not in cookie and "url" not in cookie:
+            cookie["url"] = self.page.url
+        cookie.setdefault("path", "/")
+        self._run(self.context.add_cookies([cookie]))
+
+    def delete_all_cookies(self):
+        self._run(self.context.clear_cookies())
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def set_page_load_timeout(self, seconds):
+        self.page.set_default_navigation_timeout(seconds * 1000)
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    def close(self):
+        pass
+
+    def quit(self):
+        # Le contexte appartient au moteur, qui le ferme à la fin de l'audit
+        pass
+
+
+class PlaywrightContextProvider:
+    """
+    Contextes supplémentaires du même navigateur pour les modules isolés (`ModuleScheduler`) : au
+    plus `size` ouverts à la fois, chacun avec l'état de consentement et le filtrage réseau de
+    l'audit, chargé sur `url` puis fermé à la fin du module. `lease()` est appelé depuis un thread
+    de module, jamais depuis la boucle.
+    """
+
+    def __init__(self, browser, loop, url, size, consent_state=None, page_filter=None, page_timeout=30,
+                 logger=None):
+        self.browser = browser
+        self.loop = loop
+        self.url = url
+        self.consent_state = consent_state
+        self.page_filter = page_filter
+        self.page_timeout = page_timeout
+        self.logger = logger or logging.getLogger("AccessibilityCrawler")
+        self._slots = threading.BoundedSemaphore(max(1, size))
+
+    async def _open(self):
+        options = dict(CONTEXT_OPTIONS, storage_state=self.consent_state) if self.consent_state else CONTEXT_OPTIONS
+        context = await self.browser.new_context(**options)
+        try:
+            await context.add_init_script(PAGE_READINESS_INSTALL_SCRIPT)
+            if self.page_filter:
+                await AsyncPlaywrightEngine._route_filtered(context, self.page_filter, self.url)
+            page = await context.new_page()
+            page.set_default_timeout(self.page_timeout * 1000)
+            await page.goto(self.url, wait_until="domcontentloaded")
+        except Exception:
+            await context.close()
+            raise
+        return context, page
+
+    @contextmanager
+    def lease(self):
+        with self._slots:
+            context, page = asyncio.run_coroutine_threadsafe(self._open(), self.loop).result()
+            try:
+                driver = PlaywrightDriverAdapter(page, self.loop, context)
+                wait_for_page_ready(driver, logger=self.logger, label=self.url, step_tag="PLAYWRIGHT")
+                yield driver
+            finally:
+                asyncio.run_coroutine_threadsafe(context.close(), self.loop).result()
+
+
+class AsyncPlaywrightEngine:
+    """
+    Audits concurrents dans un seul navigateur Chromium : au plus `concurrency` contextes ouverts
+    à la fois, chacun exécutant l'analyse ordonnée complète (modules de `config`) sur son URL.
+    Avec plusieurs URL, chaque audit écrit ses rapports dans `output_root/<page>` et les résultats
+    sont diffusés au fil de l'eau dans `output_root/playwright_results.jsonl`.
+    """
+
+    def __init__(self, config, logger, concurrency=4, headless=True, output_root="reports/playwright",
+                 page_timeout=30, browser_type="chromium"):
         self.config = config
         self.logger = logger
+        self.concurrency = max(1, concurrency)
+        self.headless = headless
+        self.output_root = os.path.abspath(output_root)
+        self.page_timeout = page_timeout
+        self.browser_type = browser_type
+        # Profil de filtrage réseau (None = aucune interception)
+        self.request_filter = RequestFilter.from_profile(config.get_network_profile())
+        # État de consentement enregistré (cookies + localStorage) posé sur chaque contexte neuf
+        self.consent_store = ConsentStore(config.get_consent_dir()) if config.get_consent_dir() else None
+        # Historique des durées : audits les plus longs lancés d'abord, durée totale prévue
+        self.history = RunHistory(config.get_run_history(), logger=logger) if config.get_run_history() else None
+        self.results = []
 
-    def run(self):
-        enabled = set(self.config.get_enabled_modules())
-        if enabled != {"titles"}:
-            raise ValueError(
-                "Le moteur Playwright est actuellement implémenté pour le module 'titles' uniquement. "
-                "Utilisez '--modules titles' ou '--engine selenium' en attendant la migration complète."
-            )
+    async def _launch(self, playwright):
+        launcher = getattr(playwright, self.browser_type)
+        return await launcher.launch(headless=self.headless, args=["--disable-blink-features=AutomationControlled"])
 
-        from modules.titles_analyzer import TitlesAnalyzer
+    def _capture_snapshot(self, driver, run_dir):
+        from core.page_snapshot import capture_page_snapshot, save_snapshot
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--disable-blink-features=AutomationControlled"],
-            )
-            context = browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/122.0.0.0 Safari/537.36"
-                ),
-                locale="fr-FR",
-                timezone_id="Europe/Paris",
+        snapshot = capture_page_snapshot(driver, max_text_length=self.config.get_max_text_length(), logger=self.logger)
+        path = self.config.get_page_snapshot()
+        # Multi-URL : un fichier par page, toujours dans le répertoire de l'audit (même si le chemin
+        # configuré est absolu, sinon toutes les pages écriraient le même fichier)
+        return save_snapshot(snapshot, os.path.join(run_dir, os.path.basename(path)) if run_dir else path)
+
+    def _run_modules(self, driver, url, context_provider=None):
+        from core.ordered_crawler import OrderedAccessibilityCrawler
+
+        page_config = copy.copy(self.config)
+        page_config.set_base_url(url)
+        crawler = OrderedAccessibilityCrawler(page_config, logger=self.logger)
+        crawler.set_driver(driver)
+        crawler.set_context_provider(context_provider)
+        crawler.crawl()
+
+    @staticmethod
+    async def _route_filtered(context, request_filter, page_url):
+        """Intercepte les requêtes du contexte : celles que le profil désigne sont abandonnées et journalisées."""
+        async def handle(route, request):
+            reason = request_filter.match(request.url, request.resource_type, page_url)
+            if reason:
+                request_filter.record(request.url, request.resource_type, reason)
+                await route.abort("blockedbyclient")
+            else:
+                await route.continue_()
+
+        await context.route("**/*", handle)
+
+    async def audit(self, browser, url, run_dir=""):
+        """Audit d'une URL dans un contexte neuf ; retourne le résultat de la page."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        result = {"url": url, "final_url": url, "status": "ok", "error": "", "output_dir": run_dir}
+        consent_state = self.consent_store.load(url) if self.consent_store else None
+        if consent_state:
+            context = await browser.new_context(**CONTEXT_OPTIONS, storage_state=consent_state)
+            result["consent_restored"] = True
+        else:
+            context = await browser.new_context(**CONTEXT_OPTIONS)
+        page_filter = self.request_filter.for_page() if self.request_filter else None
+        try:
+            # Moniteur de stabilité actif dès la création du document (requêtes du chargement comprises)
+            await context.add_init_script(PAGE_READINESS_INSTALL_SCRIPT)
+            if page_filter:
+                await self._route_filtered(context, page_filter, url)
+            page = await context.new_page()
+            page.set_default_timeout(self.page_timeout * 1000)
+            load_started = time.perf_counter()
+            await page.goto(url, wait_until="domcontentloaded")
+            result["load_ms"] = round((time.perf_counter() - load_started) * 1000.0)
+            driver = PlaywrightDriverAdapter(page, loop, context)
+            # Stabilité mesurée (réseau, mutations, polices, images) plutôt qu'un networkidle fixe
+            readiness = await asyncio.to_thread(
+                wait_for_page_ready, driver, logger=self.logger, label=url, step_tag="PLAYWRIGHT"
             )
-            page = context.new_page()
-            page.goto(self.config.base_url, wait_until="domcontentloaded")
-            page.wait_for_load_state("networkidle")
+            result["settle_ms"] = readiness["settle_ms"]
+            result["final_url"] = page.url
+            # Modules synchrones dans un thread ; le répertoire de l'audit suit le contexte
+            if self.config.get_page_snapshot():
+                # Mode snapshot : capture seule, le contexte est libéré avant les analyses hors navigateur
+                result["snapshot"] = await asyncio.to_thread(self._capture_snapshot, driver, run_dir)
+            with run_directory(run_dir):
+                if not self.config.get_page_snapshot():
+                    if self.config.get_module_workers() > 1:
+                        # Modules en lecture seule dans des contextes voisins du même navigateur
+                        provider = PlaywrightContextProvider(
+                            browser, loop, page.url, self.config.get_module_workers(), consent_state,
+                            page_filter, self.page_timeout, self.logger,
+                        )
+                        await asyncio.to_thread(self._run_modules, driver, page.url, provider)
+                    else:
+                        await asyncio.to_thread(self._run_modules, driver, page.url)
+                if page_filter:
+                    result["blocked_requests"] = len(page_filter.blocked)
+                    page_filter.write_report()
+                    page_filter.log_summary(self.logger, label=url, step_tag="PLAYWRIGHT")
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = str(e)
+        finally:
+            await context.close()
+        result["duration_s"] = round(time.perf_counter() - started, 3)
+        return result
+
+    def plan(self, urls):
+        """
+        [(index, url)] dans l'ordre de lancement : plus longs d'abord d'après l'historique (l'index,
+        qui nomme le répertoire de la page, reste celui de la liste). Journalise la durée prévue.
+        """
+        indexed = list(enumerate(urls, 1))
+        if not self.history or len(urls) < 2:
+            return indexed
+        modules = self.config.get_enabled_modules()
+        estimates = {url: self.history.estimate_page(modules, url, module_workers=self.config.get_module_workers())
+                     for url in set(urls)}
+        indexed.sort(key=lambda item: estimates[item[1]], reverse=True)
+        durations = [estimates[url] for _, url in indexed]
+        log_with_step(
+            self.logger, logging.INFO, "PLAYWRIGHT",
+            f"{len(urls)} pages, plus longues d'abord : durée prévue des modules ~"
+            f"{predict_makespan(durations, self.concurrency):.0f}s ({self.concurrency} audits simultanés, "
+            f"{sum(durations):.0f}s en série)",
+        )
+        return indexed
+
+    async def run_many(self, urls, on_page=None):
+        """Audite `urls` avec au plus `concurrency` contextes simultanés ; retourne les résultats."""
+        from playwright.async_api import async_playwright
+        from core.site_crawler import page_slug
+
+        loop = asyncio.get_running_loop()
+        # Un thread par audit simultané pour les modules synchrones
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        many = len(urls) > 1
+        started = time.perf_counter()
+
+        async with async_playwright() as playwright:
+            browser = await self._launch(playwright)
+            try:
+                async def bounded(index, url):
+                    async with semaphore:
+                        run_dir = os.path.join(self.output_root, page_slug(index, url)) if many else ""
+                        if run_dir:
+                            os.makedirs(run_dir, exist_ok=True)
+                        result = await self.audit(browser, url, run_dir)
+                        result["index"] = index
+                        return result
+
+                # Tâches créées dans l'ordre du plan : le sémaphore (FIFO) les lance dans cet ordre
+                tasks = [asyncio.create_task(bounded(i, url)) for i, url in self.plan(urls)]
+                stream = None
+                if many:
+                    os.makedirs(self.output_root, exist_ok=True)
+                    stream = open(os.path.join(self.output_root, "playwright_results.jsonl"), "w", encoding="utf-8")
+                try:
+                    for done in asyncio.as_completed(tasks):
+                        result = await done
+                        self.results.append(result)
+                        elapsed = time.perf_counter() - started
+                        if stream:
+                            stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+                            stream.flush()
+                        log_with_step(
+                            self.logger, logging.INFO if result["status"] == "ok" else logging.WARNING, "PLAYWRIGHT",
+                            f"[{len(self.results)}/{len(urls)}] {result['url']} — {result['status']} en "
+                            f"{result['duration_s']:.1f}s ({len(self.results) * 60.0 / elapsed:.1f} pages/min)"
+                            f"{' : ' + result['error'] if result['error'] else ''}",
+                        )
+                        if on_page:
+                            on_page(result)
+                finally:
+                    if stream:
+                        stream.close()
+            finally:
+                await browser.close()
+        return self.results
+
+    def run(self, urls, on_page=None):
+        results = asyncio.run(self.run_many(list(urls), on_page))
+        snapshots = [r["snapshot"] for r in results if r.get("snapshot")]
+        if snapshots:
+            from core.offline_runner import OfflineRunner, analyzers_for_modules
 
-            adapter = PlaywrightDriverAdapter(page)
-            analyzer = TitlesAnalyzer(adapter, self.logger)
-            result = analyzer.run()
+            OfflineRunner(self.logger, workers=self.config.get_offline_workers(),
+                          analyzers=analyzers_for_modules(self.config.get_enabled_modules())).run(snapshots)
+        return results
 
-            context.close()
-            browser.close()
-            return result
+
+class PlaywrightCrawler:
+    """Point d'entrée du moteur Playwright (`--engine playwright`) : tous les modules activés."""
+
+    def __init__(self, config, logger, urls=None, concurrency=4, headless=True, output_root="reports/playwright"):
+        self.config = config
+        self.logger = logger
+        self.urls = urls or [config.base_url]
+        self.engine = AsyncPlaywrightEngine(config, logger, concurrency=concurrency, headless=headless,
+                                            output_root=output_root)
+
+    def run(self):
+        results = self.engine.run(self.urls)
+        failed = [r for r in results if r["status"] != "ok"]
+        if len(self.urls) == 1 and failed:
+            raise RuntimeError(failed[0]["error"])
+        return results
@@ -0,0 +1,206 @@
+"""
+Historique local des durées d'audit : chaque page analysée ajoute une ligne JSON (URL, grandeurs de
+la page — éléments, frames, focusables, images — et durée de chaque module). Les estimations en
+sont tirées : médiane des passages précédents pour une URL déjà vue, sinon régression linéaire de
+la durée du module sur la grandeur qui la gouverne, sinon médiane du module, sinon les valeurs
+fixes d'`ExecutionConfig.MODULE_TIMES`. Elles servent à ordonner les audits multi-pages (plus
+longs d'abord) et à prévoir leur durée totale.
+"""
+import heapq
+import json
+import logging
+import os
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from core.execution_config import ExecutionConfig
+from utils.log_utils import log_with_step
+
+DEFAULT_HISTORY_PATH = ".run_history.jsonl"
+FEATURE_NAMES = ("elements", "frames", "focusable", "images")
+
+# Grandeurs de la page relevées avant les modules (un seul aller-retour navigateur)
+PAGE_FEATURES_SCRIPT = r"""
+return {
+  elements: document.getElementsByTagName('*').length,
+  frames: document.querySelectorAll('iframe, frame').length,
+  focusable: document.querySelectorAll(
+    'a[href], area[href], button, input:not([type="hidden"]), select, textarea, summary, ' +
+    '[tabindex], [contenteditable=""], [contenteditable="true"]').length,
+  images: document.images.length + document.querySelectorAll('svg, [role="img"]').length
+};
+"""
+
+# Grandeur de la page qui gouverne la durée de chaque module (régression)
+MODULE_FEATURE = {
+    "screen_reader": "elements",
+    "tab_navigation": "focusable",
+    "enhanced_tab_navigation": "focusable",
+    "contrast": "elements",
+    "daltonism": "elements",
+    "image_analyzer": "images",
+    "navigation": "focusable",
+    "titles": "elements",
+    "dom_analyzer": "elements",
+}
+
+# Régression seulement à partir de ce nombre de pages mesurées
+MIN_FIT_SAMPLES = 3
+
+
+def collect_page_features(driver):
+    """Grandeurs de la page courante ({} si le script échoue)."""
+    try:
+        raw = driver.execute_script(PAGE_FEATURES_SCRIPT)
+        return {name: int(raw.get(name) or 0) for name in FEATURE_NAMES}
+    except Exception:
+        return {}
+
+
+def _url_key(url):
+    parts = urlsplit(url or "")
+    return f"{parts.scheme}://{parts.netloc.lower()}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+
+
+def _origin(url):
+    parts = urlsplit(url or "")
+    return f"{parts.scheme}://{parts.netloc.lower()}"
+
+
+def _linear_fit(points):
+    """(a, b) de y = a + b·x par moindres carrés ; None si x ne varie pas."""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+    return mean_y - slope * mean_x, slope
+
+
+def predict_makespan(durations, workers):
+    """Durée totale de `durations` (déjà ordonnées) réparties sur `workers` exécutants au premier libre."""
+    loads = [0.0] * max(1, workers)
+    for duration in durations:
+        heapq.heappush(loads, heapq.heappop(loads) + duration)
+    return max(loads)
+
+
+class RunHistory:
+    """
+    Fichier JSONL `path` en ajout seul (plusieurs processus peuvent écrire) ; seules les
+    `max_records` dernières pages sont relues pour les estimations.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, max_records=5000, logger=None):
+        self.path = os.path.abspath(path)
+        self.max_records = max_records
+        self.logger = logger
+        self._records = None
+
+    @property
+    def records(self):
+        if self._records is None:
+            self._records = self._load()
+        return self._records
+
+    def _load(self):
+        records = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # ligne tronquée par un arrêt brutal
+                    if isinstance(record, dict) and isinstance(record.get("modules"), dict):
+                        records.append(record)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            if self.logger:
+                log_with_step(self.logger, logging.WARNING, "HISTORIQUE", f"Historique illisible ({self.path}) : {e}")
+        return records[-self.max_records:]
+
+    def record(self, url, features, durations):
+        """Ajoute la mesure d'une page (durées en secondes par module)."""
+        record = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "url": _url_key(url),
+            "features": {name: int(features.get(name, 0)) for name in FEATURE_NAMES} if features else {},
+            "modules": {name: round(float(seconds), 3) for name, seconds in durations.items()},
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Une ligne par écriture en mode ajout : les processus du parcours de site ne s'entremêlent pas
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            if self.logger:
+                log_with_step(self.logger, logging.WARNING, "HISTORIQUE", f"Écriture de l'historique impossible : {e}")
+            return None
+        if self._records is not None:
+            self._records.append(record)
+        return record
+
+    def known_features(self, url):
+        """Grandeurs de la page : dernier passage sur l'URL, sinon médiane de l'origine, sinon None."""
+        key = _url_key(url)
+        for record in reversed(self.records):
+            if record["url"] == key and record.get("features"):
+                return record["features"]
+        origin = _origin(url)
+        same_origin = [r["features"] for r in self.records if r.get("features") and _origin(r["url"]) == origin]
+        if not same_origin:
+            return None
+        return {name: statistics.median(f.get(name, 0) for f in same_origin) for name in FEATURE_NAMES}
+
+    def estimate_module(self, module, url=None, features=None):
+        """Durée estimée (s) d'un module sur une page."""
+        samples = [r for r in self.records if module in r["modules"]]
+        if url:
+            key = _url_key(url)
+            same_url = [r["modules"][module] for r in samples if r["url"] == key][-5:]
+            if same_url:
+                return statistics.median(same_url)
+        if not samples:
+            return float(ExecutionConfig.MODULE_TIMES.get(module, ExecutionConfig.DEFAULT_MODULE_TIME))
+        feature = MODULE_FEATURE.get(module)
+        if url and features is None:
+            features = self.known_features(url)
+        if feature and features and feature in features:
+            points = [(r["features"][feature], r["modules"][module]) for r in samples
+                      if feature in r.get("features", {})]
+            fit = _linear_fit(points) if len(points) >= MIN_FIT_SAMPLES else None
+            if fit:
+                low, high = min(y for _, y in points), max(y for _, y in points)
+                # Estimation bornée aux durées observées : une page hors de l'historique ne donne pas
+                # d'estimation absurde
+                return min(max(fit[0] + fit[1] * features[feature], low), high)
+        return statistics.median(r["modules"][module] for r in samples)
+
+    def estimate_modules(self, modules, url=None, features=None):
+        """{module: durée estimée (s)} pour les modules activés."""
+        if url and features is None:
+            features = self.known_features(url)
+        return {module: self.estimate_module(module, url, features) for module in modules}
+
+    def estimate_page(self, modules, url=None, features=None, module_workers=1):
+        """
+        Durée estimée d'une page : somme des modules, ou avec `module_workers` > 1 la plus longue
+        des deux voies (file principale en série, groupes parallèles répartis sur les contextes).
+        """
+        estimates = self.estimate_modules(modules, url, features)
+        if module_workers <= 1:
+            return sum(estimates.values())
+        isolated = {name for group in ExecutionConfig.get_parallel_groups(modules).values() for name in group}
+        main = sum(s for name, s in estimates.items() if name not in isolated)
+        others = sorted((s for name, s in estimates.items() if name in isolated), reverse=True)
+        return max(main, predict_makespan(others, module_workers) if others else 0.0)
+
+    def order_longest_first(self, urls, modules, module_workers=1):
+        """[(url, durée estimée)] triés de la plus longue à la plus courte (tri stable)."""
+        estimated = [(url, self.estimate_page(modules, url, module_workers=module_workers)) for url in urls]
+        return sorted(estimated, key=lambda item: item[1], reverse=True)
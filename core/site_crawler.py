@@ -0,0 +1,392 @@
+"""
+Audit d'un site complet : une frontière d'URL dédoublonnée (URL normalisées, même origine,
+limites de profondeur et de pages) alimente N processus navigateurs. Chaque processus garde son
+Chrome chaud d'une page à l'autre (core.browser_pool) et exécute l'analyse ordonnée dans un
+dossier propre à la page (les modules écrivent dans `reports/` relatif). Les résultats sont
+diffusés page par page dans `site_results.jsonl` et le débit (pages/min) est journalisé.
+"""
+import copy
+import functools
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import re
+import time
+from collections import deque
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
+
+from core.run_history import RunHistory, predict_makespan
+from utils.consent_state import ConsentStore
+from utils.log_utils import log_with_step
+from utils.page_readiness import set_readiness_defaults, wait_for_page_ready
+from utils.request_filter import RequestFilter
+
+# Liens de la page (href résolus par le navigateur), dans l'ordre du document
+LINK_COLLECT_SCRIPT = r"""
+var out = [];
+var links = document.querySelectorAll('a[href], area[href]');
+for (var i = 0; i < links.length; i++) {
+  var a = links[i];
+  if (a.hasAttribute('download')) continue;
+  out.push(a.href);
+}
+return out;
+"""
+
+# Ressources non HTML jamais mises en file
+SKIPPED_EXTENSIONS = (
+    '.pdf', '.zip', '.gz', '.rar', '.7z', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.odt',
+    '.csv', '.xml', '.json', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.bmp',
+    '.mp3', '.mp4', '.webm', '.avi', '.mov', '.css', '.js', '.woff', '.woff2', '.ttf', '.exe', '.dmg',
+)
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+_SLUG_UNSAFE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def normalize_url(url, base=None):
+    """
+    Forme canonique d'une URL (clé de dédoublonnage) : résolue contre `base`, sans fragment,
+    schéma et hôte en minuscules, port par défaut retiré, chemin vide → '/', paramètres triés.
+    Retourne None pour les schémas non HTTP (mailto:, javascript:, tel:…).
+    """
+    if not url:
+        return None
+    url = urldefrag(urljoin(base, url.strip()) if base else url.strip())[0]
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and parts.port != _DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def page_slug(index, url):
+    """Nom de dossier d'une page : numéro d'ordre + chemin lisible + empreinte courte de l'URL."""
+    parts = urlsplit(url)
+    readable = _SLUG_UNSAFE.sub('_', parts.path.strip('/'))[:60].strip('_') or 'index'
+    digest = hashlib.md5(url.encode()).hexdigest()[:8]
+    return f"{index:05d}_{readable}_{digest}"
+
+
+class UrlFrontier:
+    """
+    File d'URL à visiter, en largeur d'abord. Une URL n'est mise en file qu'une fois (forme
+    normalisée) ; `max_pages` borne le nombre total de pages planifiées, `max_depth` la distance
+    en liens depuis l'URL de départ. `same_origin` limite le parcours au schéma + hôte de départ.
+    """
+
+    def __init__(self, start_url, max_pages=100, max_depth=3, same_origin=True):
+        self.start_url = normalize_url(start_url)
+        if not self.start_url:
+            raise ValueError(f"URL de départ invalide : {start_url}")
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.same_origin = same_origin
+        start = urlsplit(self.start_url)
+        self.origin = (start.scheme, start.netloc)
+        self.seen = set()
+        self.queue = deque()
+        self.scheduled = 0
+        self.add(self.start_url, 0)
+
+    def accepts(self, url):
+        parts = urlsplit(url)
+        if self.same_origin and (parts.scheme, parts.netloc) != self.origin:
+            return False
+        return not parts.path.lower().endswith(SKIPPED_EXTENSIONS)
+
+    def add(self, url, depth, base=None):
+        """Ajoute une URL découverte à la profondeur `depth` ; retourne True si elle est mise en file."""
+        url = normalize_url(url, base)
+        if not url or url in self.seen or depth > self.max_depth:
+            return False
+        if len(self.seen) >= self.max_pages or not self.accepts(url):
+            return False
+        self.seen.add(url)
+        self.queue.append((url, depth))
+        return True
+
+    def pop(self, key=None):
+        """
+        Prochaine (url, profondeur) ou None si la file est vide. Avec `key` (url → durée estimée),
+        l'URL en file la plus longue passe d'abord ; les limites de pages et de profondeur,
+        appliquées à l'ajout, ne changent pas.
+        """
+        if not self.queue:
+            return None
+        self.scheduled += 1
+        if key is None:
+            return self.queue.popleft()
+        item = max(self.queue, key=lambda entry: key(entry[0]))
+        self.queue.remove(item)
+        return item
+
+    def __len__(self):
+        return len(self.queue)
+
+
+def crawl_page(driver, config, logger, url, page_timeout=None):
+    """
+    Charge `url` dans `driver`, attend sa stabilité (au plus `page_timeout` s, défaut : configuration),
+    relève ses liens puis exécute l'analyse ordonnée (modules de `config`) dans le répertoire
+    courant. Retourne le résultat diffusé pour la page.
+    """
+    from core.ordered_crawler import OrderedAccessibilityCrawler
+
+    started = time.perf_counter()
+    result = {'url': url, 'final_url': url, 'status': 'ok', 'error': '', 'links': []}
+    request_filter = RequestFilter.from_profile(config.get_network_profile())
+    # État de consentement partagé par tous les processus (relu à chaque page : le pool efface les cookies)
+    consent_store = ConsentStore(config.get_consent_dir()) if config.get_consent_dir() else None
+    consent_state = consent_store.load(url) if consent_store else None
+    try:
+        if consent_state:
+            result['consent_restored'] = consent_store.inject_selenium(driver, consent_state)
+        if request_filter and not request_filter.apply_to_selenium(driver):
+            request_filter = None
+        driver.get(url)
+        result['load_ms'] = round((time.perf_counter() - started) * 1000.0)
+        readiness = wait_for_page_ready(driver, timeout=page_timeout, logger=logger, label=url, step_tag="SITE")
+        result['settle_ms'] = readiness['settle_ms']
+        result['final_url'] = driver.current_url or url
+        # Liens relevés avant les modules (la navigation clavier peut quitter la page)
+        result['links'] = [link for link in (driver.execute_script(LINK_COLLECT_SCRIPT) or []) if link]
+        page_config = copy.copy(config)
+        page_config.set_base_url(result['final_url'])
+        crawler = OrderedAccessibilityCrawler(page_config, logger=logger)
+        crawler.set_driver(driver)
+        crawler.crawl()
+        if request_filter:
+            request_filter.collect_selenium_log(driver, url)
+            result['blocked_requests'] = len(request_filter.blocked)
+            request_filter.write_report()
+            request_filter.log_summary(logger, label=url, step_tag="SITE")
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = str(e)
+    result['duration_s'] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def _site_worker(worker_id, config, tasks, results, output_root, driver_factory, page_timeout, debug,
+                 recycle_after=50):
+    """
+    Processus navigateur : un navigateur chaud (BrowserPool de taille 1) remis à zéro entre deux
+    pages et recyclé toutes les `recycle_after` pages.
+    """
+    from core.browser_pool import BrowserPool
+    from utils.log_utils import setup_logger
+
+    # Processus lancé par spawn : les bornes d'attente de main.py ne sont pas héritées
+    set_readiness_defaults(*config.get_page_readiness())
+    worker_dir = os.path.join(output_root, f"worker_{worker_id}")
+    os.makedirs(worker_dir, exist_ok=True)
+    os.chdir(worker_dir)
+    logger = setup_logger(debug=debug)
+    pool = BrowserPool(size=1, factory=driver_factory, max_pages=recycle_after, logger=logger)
+    pool.start()
+    if not pool.launched:
+        results.put({'worker': worker_id, 'fatal': "lancement du navigateur impossible"})
+        return
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            index, url, depth = task
+            page_dir = os.path.join(output_root, 'pages', page_slug(index, url))
+            os.makedirs(page_dir, exist_ok=True)
+            os.chdir(page_dir)
+            log_with_step(logger, logging.INFO, "SITE", f"Page {index} (profondeur {depth}) : {url}")
+            try:
+                with pool.lease() as driver:
+                    result = crawl_page(driver, config, logger, url, page_timeout)
+            except Exception as e:
+                result = {'url': url, 'final_url': url, 'status': 'error', 'error': str(e), 'links': []}
+            result.update(index=index, depth=depth, worker=worker_id, output_dir=page_dir)
+            results.put(result)
+    finally:
+        pool.close()
+
+
+class SiteCrawler:
+    """
+    Parcours d'un site par `workers` processus navigateurs partageant une frontière d'URL.
+    La frontière vit dans le processus principal : chaque page terminée renvoie ses liens, qui
+    sont dédoublonnés puis distribués au prochain navigateur libre.
+    """
+
+    def __init__(self, config, logger, workers=2, max_pages=100, max_depth=3, same_origin=True,
+                 output_root='reports/site', driver_factory=None, page_timeout=None, debug=False,
+                 on_page=None, recycle_after=50):
+        from core.driver_factory import create_chrome_driver
+
+        self.config = config
+        self.logger = logger
+        self.workers = max(1, workers)
+        self.frontier = UrlFrontier(config.base_url, max_pages=max_pages, max_depth=max_depth,
+                                    same_origin=same_origin)
+        # Chemin absolu : les processus navigateurs changent de répertoire courant
+        self.output_root = os.path.abspath(output_root)
+        # Journal réseau CDP nécessaire au relevé des requêtes bloquées par le profil
+        self.driver_factory = driver_factory or (
+            functools.partial(create_chrome_driver, performance_log=True)
+            if config.get_network_profile() != 'off' else create_chrome_driver
+        )
+        self.page_timeout = page_timeout
+        self.debug = debug
+        self.on_page = on_page
+        # Navigateur de chaque processus relancé après ce nombre de pages (mémoire bornée)
+        self.recycle_after = recycle_after
+        self.results_path = os.path.join(self.output_root, 'site_results.jsonl')
+        self.pages_done = 0
+        self.pages_failed = 0
+        self.elapsed = 0.0
+        # Durées estimées par URL (historique des exécutions) : pages longues d'abord, temps restant
+        self.history = RunHistory(config.get_run_history(), logger=logger) if config.get_run_history() else None
+        self._estimates = {}
+
+    def estimate(self, url):
+        """Durée estimée (s) des modules sur `url`, mémorisée pour le parcours."""
+        if url not in self._estimates:
+            self._estimates[url] = self.history.estimate_page(
+                self.config.get_enabled_modules(), url, module_workers=self.config.get_module_workers()
+            )
+        return self._estimates[url]
+
+    def remaining_estimate(self):
+        """Durée estimée (s) des pages encore en file, réparties sur les navigateurs."""
+        if not self.history:
+            return None
+        pending = sorted((self.estimate(url) for url, _ in self.frontier.queue), reverse=True)
+        return predict_makespan(pending, self.workers)
+
+    @property
+    def pages_per_minute(self):
+        return self.pages_done * 60.0 / self.elapsed if self.elapsed else 0.0
+
+    def _handle_result(self, result, stream):
+        for link in result.get('links', []):
+            self.frontier.add(link, result['depth'] + 1, base=result['final_url'])
+        self.pages_done += 1
+        if result['status'] != 'ok':
+            self.pages_failed += 1
+        record = {k: v for k, v in result.items() if k != 'links'}
+        record['links_found'] = len(result.get('links', []))
+        stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        stream.flush()
+        self.elapsed = time.perf_counter() - self._started
+        level = logging.INFO if result['status'] == 'ok' else logging.WARNING
+        remaining = self.remaining_estimate()
+        log_with_step(
+            self.logger, level, "SITE",
+            f"[{self.pages_done}/{self.frontier.scheduled + len(self.frontier)}] {result['url']} "
+            f"— {result['status']} en {result.get('duration_s', 0):.1f}s "
+            f"({self.pages_per_minute:.1f} pages/min"
+            f"{f', ~{remaining:.0f}s pour la file' if remaining else ''})"
+            f"{' : ' + result['error'] if result['error'] else ''}",
+        )
+        if self.on_page:
+            self.on_page(record)
+
+    def _lost_result(self, worker, task, exitcode):
+        """Résultat en erreur d'une page dont le navigateur s'est arrêté en cours d'analyse."""
+        index, url, depth = task
+        return {
+            'url': url, 'final_url': url, 'status': 'error', 'links': [],
+            'error': f"navigateur {worker} arrêté pendant l'analyse (code {exitcode})",
+            'index': index, 'depth': depth, 'worker': worker,
+            'output_dir': os.path.join(self.output_root, 'pages', page_slug(index, url)),
+        }
+
+    def run(self):
+        """Parcourt le site ; retourne le nombre de pages analysées."""
+        os.makedirs(self.output_root, exist_ok=True)
+        ctx = multiprocessing.get_context('spawn')
+        # Une file de tâches par navigateur : le processus principal sait quelle page chacun traite
+        task_queues = [ctx.Queue() for _ in range(self.workers)]
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=_site_worker, daemon=True,
+                        args=(i, self.config, task_queues[i], results, self.output_root, self.driver_factory,
+                              self.page_timeout, self.debug, self.recycle_after))
+            for i in range(self.workers)
+        ]
+        for p in processes:
+            p.start()
+        log_with_step(self.logger, logging.INFO, "SITE",
+                      f"Parcours de {self.frontier.start_url} : {self.workers} navigateurs, "
+                      f"{self.frontier.max_pages} pages max., profondeur {self.frontier.max_depth}")
+
+        self._started = time.perf_counter()
+        busy = {}            # navigateur → page en cours d'analyse (index, url, profondeur)
+        available = set(range(self.workers))
+        retry = deque()      # pages reçues par un navigateur devenu indisponible avant de les traiter
+        try:
+            with open(self.results_path, 'w', encoding='utf-8') as stream:
+                while True:
+                    for worker in sorted(available - busy.keys()):
+                        if retry:
+                            task = retry.popleft()
+                        elif len(self.frontier):
+                            url, depth = self.frontier.pop(key=self.estimate if self.history else None)
+                            task = (self.frontier.scheduled, url, depth)
+                        else:
+                            break
+                        task_queues[worker].put(task)
+                        busy[worker] = task
+                    if not busy:
+                        break
+                    try:
+                        result = results.get(timeout=5)
+                    except queue.Empty:
+                        # Processus tué en cours de page (mémoire, plantage de chromedriver) : il
+                        # n'enverra jamais de résultat, sa page est comptée en erreur
+                        for worker in sorted(available):
+                            process = processes[worker]
+                            if process.is_alive():
+                                continue
+                            available.discard(worker)
+                            log_with_step(self.logger, logging.ERROR, "SITE",
+                                          f"Navigateur {worker} arrêté (code {process.exitcode})")
+                            if worker in busy:
+                                self._handle_result(
+                                    self._lost_result(worker, busy.pop(worker), process.exitcode), stream)
+                        if not available:
+                            log_with_step(self.logger, logging.ERROR, "SITE",
+                                          "Tous les navigateurs se sont arrêtés, parcours interrompu")
+                            break
+                        continue
+                    worker = result['worker']
+                    if 'fatal' in result:
+                        available.discard(worker)
+                        if worker in busy:
+                            retry.append(busy.pop(worker))
+                        log_with_step(self.logger, logging.ERROR, "SITE",
+                                      f"Navigateur {worker} indisponible : {result['fatal']}")
+                        if not available:
+                            break
+                        continue
+                    busy.pop(worker, None)
+                    self._handle_result(result, stream)
+        finally:
+            for task_queue in task_queues:
+                task_queue.put(None)
+            for p in processes:
+                p.join(timeout=30)
+                if p.is_alive():
+                    p.terminate()
+
+        self.elapsed = time.perf_counter() - self._started
+        log_with_step(
+            self.logger, logging.INFO, "SITE",
+            f"Parcours terminé : {self.pages_done} pages ({self.pages_failed} en erreur) en "
+            f"{self.elapsed:.1f}s, {self.pages_per_minute:.1f} pages/min — résultats : {self.results_path}",
+        )
+        return self.pages_done
@@ -19,10 +19,8 @@ import glob
 from core.config import Config
 from core.crawler import AccessibilityCrawler
 from utils.log_utils import setup_logger, log_with_step
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from core.browser_pool import BrowserPool
+from utils.page_readiness import wait_for_page_ready
 
 class RGAAWebCheckerGUI:
     def __init__(self, root):
@@ -62,6 +60,13 @@ class RGAAWebCheckerGUI:
         self.config = Config()
         self.logger = None
         
+        # Navigateur headless gardé chaud entre les analyses (lancé en arrière-plan dès l'ouverture)
+        self.browser_pool = BrowserPool(
+            size=1, max_pages=self.config.get_browser_recycle_pages(), headless=True,
+            extra_args=('--no-sandbox', '--disable-dev-shm-usage'),
+        )
+        threading.Thread(target=self._warm_browser_pool, daemon=True).start()
+        
         self.setup_ui()
         self.setup_styles()
         
@@ -491,8 +496,22 @@ class RGAAWebCheckerGUI:
         self.analysis_thread.daemon = True
         self.analysis_thread.start()
     
+    def _warm_browser_pool(self):
+        try:
+            self.browser_pool.start()
+        except Exception:
+            # Le lancement sera retenté (et l'erreur affichée) à la première analyse
+            pass
+
+    def close(self):
+        """Fermeture de la fenêtre : arrêt des navigateurs du pool"""
+        self.browser_pool.close()
+        self.root.destroy()
+
     def run_analysis(self):
         """Exécute l'analyse"""
+        browser = None
+        failed = False
         try:
             # Configuration
             url = self.url_var.get().strip()
@@ -509,40 +528,17 @@ class RGAAWebCheckerGUI:
             # Logger
             self.logger = setup_logger(debug=self.debug_var.get(), encoding=self.encoding_var.get())
             
-            # Options Chrome
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--log-level=3')
-            chrome_options.add_argument('--disable-logging')
-            chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-            
-            # Driver
-            import glob
-            driver_dir = os.path.dirname(ChromeDriverManager().install())
-            chromedriver_path = None
-            for f in glob.glob(os.path.join(driver_dir, "chromedriver*")):
-                if os.path.basename(f) == 'chromedriver' and os.path.isfile(f) and os.access(f, os.X_OK):
-                    chromedriver_path = f
-                    break
-            if not chromedriver_path:
-                raise FileNotFoundError(f"Aucun binaire chromedriver exécutable trouvé dans {driver_dir}")
-            service = Service(chromedriver_path)
-            driver = webdriver.Chrome(service=service, options=chrome_options)
+            # Navigateur chaud emprunté au pool (remis à zéro au retour)
+            browser = self.browser_pool.acquire()
+            driver = browser.driver
             
             # Naviguer vers l'URL
             driver.get(url)
             self.update_logs(f"Navigation vers: {url}")
             
-            # Attendre que la page soit chargée
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-            WebDriverWait(driver, 10).until(
-                lambda d: d.execute_script('return document.readyState') == 'complete'
-            )
+            # Attendre que la page soit stable (attente adaptative bornée)
+            readiness = wait_for_page_ready(driver)
+            self.update_logs(f"Page {'stable' if readiness['ready'] else 'non stabilisée'} après {readiness['settle_ms']} ms")
             
             # Gérer la bannière de cookies si spécifiée
             if self.cookie_banner_var.get().strip():
@@ -604,11 +600,12 @@ class RGAAWebCheckerGUI:
             error_msg = f"Module manquant: {str(e)}\n\nVérifiez que tous les modules sont installés:\npip install -r requirements.txt"
             self.root.after(0, lambda: self.handle_analysis_error(error_msg))
         except Exception as e:
+            failed = True
             error_msg = str(e)
             self.root.after(0, lambda: self.handle_analysis_error(error_msg))
         finally:
-            if 'driver' in locals():
-                driver.quit()
+            if browser is not None:
+                self.browser_pool.release(browser, failed=failed)
             self.root.after(0, self.analysis_finished)
     
     def handle_cookie_banner(self, driver):
@@ -639,9 +636,9 @@ class RGAAWebCheckerGUI:
             button.click()
             self.update_logs("Clic sur le bouton cookie effectué")
             
-            # Attendre que la bannière disparaisse
-            import time
-            time.sleep(2)
+            # Attendre que la bannière disparaisse et que la page se stabilise
+            readiness = wait_for_page_ready(driver)
+            self.update_logs(f"Page {'stable' if readiness['ready'] else 'non stabilisée'} après {readiness['settle_ms']} ms")
             
         except Exception as e:
             self.update_logs(f"Erreur lors de la gestion de la bannière cookie: {str(e)}")
@@ -1848,6 +1845,7 @@ def main():
     """Fonction principale"""
     root = tk.Tk()
     app = RGAAWebCheckerGUI(root)
+    root.protocol("WM_DELETE_WINDOW", app.close)
     root.mainloop()
 
 if __name__ == "__main__":
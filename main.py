@@ -1,12 +1,10 @@
 from core.config import Config
 from core.ordered_crawler import OrderedAccessibilityCrawler
 from utils.log_utils import setup_logger, log_with_step
-import os
-import glob
+from utils.page_readiness import set_readiness_defaults, wait_for_page_ready
 import sys
 import time
 import argparse
-import random
 import subprocess
 import logging
 
@@ -28,18 +26,40 @@ def parse_module_flags(module_list):
     return total
 
 
-def run_with_playwright(config, logger):
+def run_site_crawl(config, logger, output_root, debug=False):
+    from core.site_crawler import SiteCrawler
+    workers, max_pages, max_depth = config.get_site_crawl()
+    crawler = SiteCrawler(config, logger, workers=workers, max_pages=max_pages, max_depth=max_depth,
+                          output_root=output_root, debug=debug,
+                          recycle_after=config.get_browser_recycle_pages())
+    return crawler.run()
+
+
+def run_with_playwright(config, logger, urls=None, concurrency=4, output_root='reports/playwright'):
     from core.playwright_crawler import PlaywrightCrawler
-    crawler = PlaywrightCrawler(config, logger)
+    crawler = PlaywrightCrawler(config, logger, urls=urls, concurrency=concurrency, output_root=output_root)
     return crawler.run()
 
+
+def run_offline_analysis(config, logger, snapshot_paths):
+    from core.offline_runner import OfflineRunner, analyzers_for_modules
+    runner = OfflineRunner(logger, workers=config.get_offline_workers(),
+                           analyzers=analyzers_for_modules(config.get_enabled_modules()))
+    return runner.run(snapshot_paths)
+
+
+def read_urls_file(path):
+    """Une URL par ligne ; lignes vides et commentaires (#) ignorés."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
 if __name__ == "__main__":
     # Forcer l'encodage UTF-8 pour stdout et stderr
     sys.stdout.reconfigure(encoding='utf-8')
     sys.stderr.reconfigure(encoding='utf-8')
 
     parser = argparse.ArgumentParser(description="Analyseur d'accessibilité web")
-    parser.add_argument('url', help='URL de la page à analyser')
+    parser.add_argument('url', nargs='?', help='URL de la page à analyser (facultative avec --analyze-snapshot)')
     parser.add_argument('--debug', action='store_true', help='Afficher les logs sur la console')
     parser.add_argument('--encoding', choices=['cp1252', 'utf-8'], default='utf-8', help="Encodage du rapport (utf-8 par défaut, ou cp1252)")
     parser.add_argument('--cookie-banner', help='Texte du bouton de la bannière de cookies à cliquer (ex: "Accepter tout")')
@@ -58,11 +78,77 @@ if __name__ == "__main__":
                       help='Deuxième capture par étape de focus après un délai (désactivé par défaut = exécution plus rapide)')
     parser.add_argument('--focus-second-delay', type=float, default=0.5,
                       help='Secondes d\'attente avant la 2e capture focus (défaut: 0.5 ; sans effet sans --focus-second-screenshot)')
+    parser.add_argument('--focus-capture', choices=['viewport', 'clip'], default='viewport',
+                      help='Captures focus : viewport entier (défaut) ou zone autour de l\'élément focalisé (clip, plus rapide)')
+    parser.add_argument('--focus-thumbnail', type=float, default=None,
+                      help='Ajoute une vignette du viewport à cette échelle (ex: 0.25) pour chaque capture focus')
+    parser.add_argument('--max-text-length', type=int, default=None,
+                      help='Extraction DOM bornée : longueur max. des textes renvoyés par le navigateur (défaut: 1000, -1 = texte complet)')
+    parser.add_argument('--dom-extraction', choices=['snapshot', 'batch'], default='snapshot',
+                      help="Extraction DOM du lecteur d'écran : snapshot (un appel par frame, défaut) ou batch (lots de 20 éléments)")
+    parser.add_argument('--contrast-pixels', action='store_true',
+                      help='Contrastes : vérifie aussi les textes sur image de fond ou dégradé par échantillonnage d\'une capture pleine page')
+    parser.add_argument('--image-cache-dir', default='.image_cache',
+                      help='Images : dossier du cache persistant, partagé entre exécutions et navigateurs (défaut: .image_cache)')
+    parser.add_argument('--no-image-cache', action='store_true',
+                      help='Images : désactive le cache persistant et retélécharge tout')
+    parser.add_argument('--image-cache-size', type=int, default=512,
+                      help='Images : taille max. du cache persistant en Mo, éviction LRU au-delà (défaut: 512)')
+    parser.add_argument('--site', action='store_true',
+                      help='Parcourt tout le site à partir de l\'URL (même origine) avec plusieurs navigateurs Selenium')
+    parser.add_argument('--site-workers', type=int, default=2,
+                      help='Parcours de site : nombre de navigateurs en parallèle (défaut: 2)')
+    parser.add_argument('--max-pages', type=int, default=100,
+                      help='Parcours de site : nombre maximal de pages analysées (défaut: 100)')
+    parser.add_argument('--max-depth', type=int, default=3,
+                      help='Parcours de site : profondeur maximale en liens depuis l\'URL de départ (défaut: 3)')
+    parser.add_argument('--site-output', default='reports/site',
+                      help='Parcours de site : répertoire des rapports par page et de site_results.jsonl (défaut: reports/site)')
+    parser.add_argument('--recycle-after', type=int, default=50,
+                      help='Parcours de site : relance chaque navigateur après ce nombre de pages (défaut: 50)')
+    parser.add_argument('--ready-timeout', type=float, default=10.0,
+                      help='Attente max. (s) de la stabilité de page, remplace les attentes fixes (défaut: 10)')
+    parser.add_argument('--ready-quiet', type=int, default=500,
+                      help='Fenêtre de calme réseau/DOM (ms) pour considérer la page stable (défaut: 500)')
+    parser.add_argument('--network-profile', default='off',
+                      help='Filtrage réseau : off (défaut), audit (traceurs, publicités, médias), strict '
+                           '(audit + scripts tiers) ou fichier JSON ; requêtes bloquées dans reports/blocked_requests.csv')
+    parser.add_argument('--consent-dir', default='.consent',
+                      help='Répertoire des états de consentement par origine (cookies + localStorage) réinjectés '
+                           'avant navigation, ce qui évite de retraiter le bandeau cookies (défaut: .consent)')
+    parser.add_argument('--no-consent-store', action='store_true',
+                      help='Désactive l\'enregistrement et la réinjection de l\'état de consentement')
+    parser.add_argument('--reset-consent', action='store_true',
+                      help='Oublie l\'état de consentement enregistré pour l\'origine de l\'URL avant l\'analyse')
+    parser.add_argument('--snapshot', nargs='?', const='snapshot.json.gz',
+                      help='Capture un snapshot de page (DOM de chaque frame, styles, contrastes, titres, captures) '
+                           'dans ce fichier (défaut: snapshot.json.gz), libère le navigateur puis lance les analyses '
+                           'non interactives hors navigateur')
+    parser.add_argument('--analyze-snapshot', nargs='+', metavar='FICHIER',
+                      help='Analyse hors navigateur de snapshots déjà capturés (rapports écrits à côté de chaque fichier)')
+    parser.add_argument('--offline-workers', type=int, default=None,
+                      help='Analyse hors navigateur : nombre de processus (défaut: nombre de cœurs)')
+    parser.add_argument('--module-workers', type=int, default=1,
+                      help='Contextes navigateur supplémentaires pour exécuter en parallèle les modules en lecture seule '
+                           '(contrastes, daltonisme, images, navigation, titres, DOM) ; défaut: 1 (en série)')
+    parser.add_argument('--run-history', default='.run_history.jsonl',
+                      help='Historique des durées par module et des grandeurs de page (éléments, frames, focusables, '
+                           'images), base des estimations et de l\'ordre des audits multi-pages (défaut: .run_history.jsonl)')
+    parser.add_argument('--no-run-history', action='store_true',
+                      help='N\'enregistre pas les durées et revient aux estimations fixes')
+    parser.add_argument('--urls-file',
+                      help='Moteur Playwright : fichier d\'URL à auditer en parallèle (une par ligne), en plus de l\'URL donnée')
+    parser.add_argument('--concurrency', type=int, default=4,
+                      help='Moteur Playwright : nombre d\'audits simultanés dans le navigateur (défaut: 4)')
+    parser.add_argument('--playwright-output', default='reports/playwright',
+                      help='Moteur Playwright, plusieurs URL : répertoire des rapports par page (défaut: reports/playwright)')
     parser.add_argument('--use-hierarchy', action='store_true',
                       help='Mode Selenium : lecteur d\'écran hiérarchique (OrderedAccessibilityCrawler, expérimental)')
     parser.add_argument('--export-csv', action='store_true', help='Exporter les données collectées en CSV')
     parser.add_argument('--csv-filename', help='Nom du fichier CSV pour l\'export (optionnel)')
     args = parser.parse_args()
+    if not args.url and not args.analyze_snapshot:
+        parser.error("l'URL est obligatoire (sauf avec --analyze-snapshot)")
     
     url = args.url
     logger = setup_logger(debug=args.debug, encoding=args.encoding)
@@ -72,6 +158,23 @@ if __name__ == "__main__":
     config.set_max_screenshots(args.max_screenshots)
     config.set_focus_second_screenshot(args.focus_second_screenshot)
     config.set_focus_second_screenshot_delay(args.focus_second_delay)
+    config.set_focus_capture_mode(args.focus_capture)
+    config.set_focus_thumbnail_scale(args.focus_thumbnail)
+    config.set_max_text_length(args.max_text_length)
+    config.set_dom_extraction(args.dom_extraction)
+    config.set_contrast_pixel_sampling(args.contrast_pixels)
+    config.set_image_cache_dir(None if args.no_image_cache else args.image_cache_dir)
+    config.set_image_cache_size_mb(args.image_cache_size)
+    config.set_site_crawl(args.site_workers, args.max_pages, args.max_depth)
+    config.set_browser_recycle_pages(args.recycle_after)
+    config.set_page_readiness(args.ready_timeout, args.ready_quiet)
+    set_readiness_defaults(*config.get_page_readiness())
+    config.set_network_profile(args.network_profile)
+    config.set_consent_dir(None if args.no_consent_store else args.consent_dir)
+    config.set_page_snapshot(args.snapshot)
+    config.set_offline_workers(args.offline_workers)
+    config.set_module_workers(args.module_workers)
+    config.set_run_history(None if args.no_run_history else args.run_history)
     
     # Configuration des modules
     if args.modules:
@@ -81,62 +184,62 @@ if __name__ == "__main__":
         # Par défaut, activer tous les modules
         config.set_modules(255)  # 1 + 2 + 4 + 8 + 16 + 32 + 64 + 128
 
+    if args.analyze_snapshot:
+        results = run_offline_analysis(config, logger, args.analyze_snapshot)
+        sys.exit(0 if all(r['status'] == 'ok' for r in results) else 1)
+
+    if args.site:
+        try:
+            run_site_crawl(config, logger, args.site_output, debug=args.debug)
+            sys.exit(0)
+        except Exception as e:
+            log_with_step(logger, logging.ERROR, "SITE", f"Erreur lors du parcours du site: {str(e)}")
+            sys.exit(1)
+
     if args.engine == 'playwright':
         try:
-            run_with_playwright(config, logger)
+            urls = [url] + (read_urls_file(args.urls_file) if args.urls_file else [])
+            run_with_playwright(config, logger, urls=list(dict.fromkeys(urls)),
+                                concurrency=args.concurrency, output_root=args.playwright_output)
             sys.exit(0)
         except Exception as e:
             log_with_step(logger, logging.ERROR, "PLAYWRIGHT", f"Erreur lors de l'analyse Playwright: {str(e)}")
             sys.exit(1)
     
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
     from selenium.webdriver.common.keys import Keys
     from selenium.webdriver.common.action_chains import ActionChains
-    from webdriver_manager.chrome import ChromeDriverManager
-    chrome_options = Options()
-    # Ajout des en-têtes pour simuler un navigateur réel
-    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--log-level=3')
-    chrome_options.add_argument('--disable-logging')
-    chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('--window-position=0,0')  # Forcer la position de la fenêtre sur l'écran principal
-    chrome_options.add_argument('--force-device-scale-factor=1')  # Éviter les problèmes de zoom
-    
-    # Masquer l'automatisation
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    
-    # Ajouter des préférences pour simuler un navigateur normal
-    chrome_options.add_experimental_option('prefs', {
-        'profile.default_content_setting_values.notifications': 2,
-        'credentials_enable_service': False,
-        'profile.password_manager_enabled': False,
-        'profile.default_content_settings.popups': 0,
-        'profile.managed_default_content_settings.images': 1,
-        'profile.default_content_setting_values.cookies': 1
-    })
-    
-    driver_dir = os.path.dirname(ChromeDriverManager().install())
-    chromedriver_path = None
-    for f in glob.glob(os.path.join(driver_dir, "chromedriver*")):
-        if os.access(f, os.X_OK) and not f.endswith('.txt') and not f.endswith('.chromedriver'):
-            chromedriver_path = f
-            break
-    if not chromedriver_path:
-        raise FileNotFoundError("Aucun binaire chromedriver exécutable trouvé dans " + driver_dir)
-    service = Service(chromedriver_path)
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    from core.driver_factory import create_chrome_driver
+    from utils.request_filter import RequestFilter
+    request_filter = RequestFilter.from_profile(config.get_network_profile())
+    driver = create_chrome_driver(performance_log=request_filter is not None)
     logger.info("Driver initialisé avec succès.")
+    if request_filter and not request_filter.apply_to_selenium(driver):
+        log_with_step(logger, logging.WARNING, "RESEAU", "Filtrage réseau indisponible (CDP) : profil ignoré")
+        request_filter = None
+    snapshot_path = None
+    context_provider = None
     
     try:
+        # État de consentement enregistré lors d'un audit précédent : injecté avant la navigation,
+        # le bandeau cookies n'est alors plus traité
+        from utils.consent_state import ConsentStore
+        consent_store = ConsentStore(config.get_consent_dir(), logger=logger) if config.get_consent_dir() else None
+        consent_restored = False
+        consent_accepted = False
+        banner_clicked = False
+        if consent_store:
+            if args.reset_consent:
+                consent_store.forget(url)
+            consent_state = consent_store.load(url)
+            if consent_state and consent_store.inject_selenium(driver, consent_state):
+                consent_restored = True
+                log_with_step(logger, logging.INFO, "CONSENTEMENT",
+                              f"État de consentement restauré ({len(consent_state['cookies'])} cookies) : bandeau ignoré")
+
         # Définir les cookies de consentement avant la navigation si spécifiés
-        if args.cookies:
+        if args.cookies and not consent_restored:
             logger.info("Définition des cookies de consentement...")
             # Aller d'abord sur le domaine pour pouvoir définir les cookies
             from urllib.parse import urlparse
@@ -162,9 +265,12 @@ if __name__ == "__main__":
                     logger.warning(f"Format de cookie invalide: {cookie_str} (attendu: nom=valeur)")
             
             logger.info("Cookies de consentement définis avec succès")
+            consent_accepted = True
         
         # Maintenant naviguer vers l'URL cible
+        load_started = time.perf_counter()
         driver.get(url)
+        log_with_step(logger, logging.INFO, "DRIVER", f"Page chargée en {(time.perf_counter() - load_started) * 1000:.0f} ms")
         
         # Forcer la fenêtre à rester sur l'écran principal
         try:
@@ -174,25 +280,26 @@ if __name__ == "__main__":
         except Exception as e:
             logger.warning(f"Impossible de forcer la position de la fenêtre: {e}")
         
-        # Attendre que la page soit chargée
-        time.sleep(10)
+        # Attendre que la page soit stable (borne configurable, temps mesuré journalisé)
+        wait_for_page_ready(driver, logger=logger, label=url, step_tag="DRIVER")
         
         # Analyser le focus initial sans l'afficher
         focused_element = driver.switch_to.active_element
 
-        if args.cookie_banner:
+        if args.cookie_banner and not consent_restored:
             try:
                 # Vérifie si l'élément focus contient un bouton avec le texte voulu
                 buttons_in_focus = focused_element.find_elements("tag name", "button")
                 for btn in buttons_in_focus:
                     if args.cookie_banner.lower() in btn.text.lower():
                         logger.info(f"Bouton '{args.cookie_banner}' trouvé via élément focus.")
-                        # Attendre un délai pour s'assurer que le bouton est bien interactif
-                        time.sleep(1)
+                        # Attendre que le bouton soit réellement interactif
+                        WebDriverWait(driver, 5).until(lambda d: btn.is_displayed() and btn.is_enabled())
                         btn.click()
-                        time.sleep(2)
+                        consent_accepted = banner_clicked = True
+                        wait_for_page_ready(driver, logger=logger, label="clic cookie", step_tag="DRIVER")
                         driver.refresh()  # recharge la page après clic
-                        WebDriverWait(driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
+                        wait_for_page_ready(driver, logger=logger, label=url, step_tag="DRIVER")
                         log_with_step(logger, logging.INFO, "DRIVER", "Page rechargée après clic sur le bouton cookie.")
                         break
             except Exception as e:
@@ -248,7 +355,7 @@ if __name__ == "__main__":
 
         
         # Traiter la bannière de cookies seulement si un texte est spécifié
-        if args.cookie_banner:
+        if args.cookie_banner and not consent_restored and not banner_clicked:
             try:
                 # Chercher le bouton avec le texte spécifié dans le texte visible ou les attributs d'accessibilité
                 button_xpath = f"""
@@ -267,14 +374,15 @@ if __name__ == "__main__":
                     log_with_step(logger, logging.WARNING, "DRIVER", "Le bouton n'est pas interactif")
                     raise Exception("Le bouton n'est pas interactif")
                 
-                # Attendre un délai pour s'assurer que le bouton est bien interactif
-                time.sleep(1)
+                # Attendre que le bouton soit réellement interactif
+                WebDriverWait(driver, 5).until(EC.element_to_be_clickable(continue_button))
                 continue_button.click()
+                consent_accepted = True
                 log_with_step(logger, logging.INFO, "DRIVER", f"Clic sur le bouton '{args.cookie_banner}'.")
 
-                time.sleep(2)
+                wait_for_page_ready(driver, logger=logger, label="clic cookie", step_tag="DRIVER")
                 driver.refresh()
-                WebDriverWait(driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
+                wait_for_page_ready(driver, logger=logger, label=url, step_tag="DRIVER")
                 log_with_step(logger, logging.INFO, "DRIVER", "Page rechargée après le clic sur le bouton cookie.")
 
                 
@@ -294,7 +402,6 @@ if __name__ == "__main__":
                         actions = ActionChains(driver)
                         actions.send_keys(Keys.TAB).perform()  # Tabulation avant
                         log_with_step(logger, logging.INFO, "DRIVER", "Tabulation avant effectuée")
-                        time.sleep(1)
                         actions.send_keys(Keys.SHIFT + Keys.TAB).perform()  # Tabulation arrière
                         log_with_step(logger, logging.INFO, "DRIVER", "Tabulation arrière effectuée")
                         
@@ -302,21 +409,14 @@ if __name__ == "__main__":
                         focused_after_popup = driver.switch_to.active_element
                         log_with_step(logger, logging.INFO, "DRIVER", f"Focus après tabulations: {focused_after_popup.get_attribute('outerHTML')}")
                         
-                        # Attendre un délai aléatoire
-                        wait_time = random.uniform(2, 4)
-                        log_with_step(logger, logging.INFO, "DRIVER", f"Attente de {wait_time:.1f} secondes...")
-                        time.sleep(wait_time)
+                        # Laisser la page réagir aux tabulations (réapparition éventuelle de la popin)
+                        wait_for_page_ready(driver, logger=logger, label="après tabulations", step_tag="DRIVER")
                         
                         # Vérifier une dernière fois que la popin n'est pas revenue
                         popin_elements = driver.find_elements("id", "popin_tc_privacy")
                         if not popin_elements or not popin_elements[0].is_displayed():
                             log_with_step(logger, logging.INFO, "DRIVER", "Vérification finale : la popin est toujours invisible")
                             
-                            # Attendre que la page soit complètement chargée
-                            WebDriverWait(driver, 10).until(
-                                lambda d: d.execute_script('return document.readyState') == 'complete'
-                            )
-                            log_with_step(logger, logging.INFO, "DRIVER", "Page complètement chargée")
                             
                             # Vérifier que les éléments principaux sont présents et stables
                             try:
@@ -327,7 +427,7 @@ if __name__ == "__main__":
                                 log_with_step(logger, logging.INFO, "DRIVER", "Éléments principaux de la page chargés")
                                 
                                 # Attendre que le DOM soit stable
-                                time.sleep(2)
+                                wait_for_page_ready(driver, logger=logger, label=url, step_tag="DRIVER")
                                 log_with_step(logger, logging.INFO, "DRIVER", "DOM stable, prêt pour l'analyse")
                                 
                             except Exception as e:
@@ -342,6 +442,10 @@ if __name__ == "__main__":
                     raise
             except Exception as e:
                 log_with_step(logger, logging.WARNING, "DRIVER", f"Bouton '{args.cookie_banner}' non trouvé : {e}")
+
+        # Consentement obtenu pendant cet audit : enregistré pour les suivants
+        if consent_store and consent_accepted:
+            consent_store.capture_selenium(driver, url)
         
         # Forcer l'encodage UTF-8 pour le contenu de la page
         driver.execute_script("""
@@ -372,15 +476,42 @@ if __name__ == "__main__":
             )
         else:
             log_with_step(logger, logging.INFO, "CONFIGURATION", "Délai de tabulation désactivé")
-            
-        log_with_step(logger, logging.INFO, "DRIVER", f"Page visitée: {url}")
-        crawler = OrderedAccessibilityCrawler(config, use_hierarchy=args.use_hierarchy, logger=logger)
-        crawler.set_driver(driver)
-        log_with_step(logger, logging.INFO, "DRIVER", "Driver assigné au crawler ordonné.")
-        for summary_line in crawler.get_execution_summary():
-            log_with_step(logger, logging.INFO, "CRAWLER", summary_line)
-        crawler.crawl(export_csv=args.export_csv, csv_filename=args.csv_filename)
+
+        # Mode snapshot : capture unique puis libération du navigateur, analyses rejouées hors navigateur
+        if config.get_page_snapshot():
+            from core.page_snapshot import capture_page_snapshot, save_snapshot
+            snapshot = capture_page_snapshot(driver, max_text_length=config.get_max_text_length(), logger=logger)
+            snapshot_path = save_snapshot(snapshot, config.get_page_snapshot())
+            log_with_step(logger, logging.INFO, "SNAPSHOT", f"Snapshot enregistré : {snapshot_path}")
+        else:
+            log_with_step(logger, logging.INFO, "DRIVER", f"Page visitée: {url}")
+            crawler = OrderedAccessibilityCrawler(config, use_hierarchy=args.use_hierarchy, logger=logger)
+            crawler.set_driver(driver)
+            log_with_step(logger, logging.INFO, "DRIVER", "Driver assigné au crawler ordonné.")
+            if config.get_module_workers() > 1:
+                # Navigateurs supplémentaires pour les modules en lecture seule, avec le consentement
+                # (éventuellement obtenu ci-dessus) et le filtrage réseau de l'audit
+                from core.module_scheduler import SeleniumContextProvider
+                context_provider = SeleniumContextProvider(
+                    url, config.get_module_workers(),
+                    consent_state=consent_store.load(url) if consent_store else None,
+                    request_filter=request_filter, logger=logger,
+                )
+                crawler.set_context_provider(context_provider)
+            for summary_line in crawler.get_execution_summary():
+                log_with_step(logger, logging.INFO, "CRAWLER", summary_line)
+            crawler.crawl(export_csv=args.export_csv, csv_filename=args.csv_filename)
+            if request_filter:
+                request_filter.collect_selenium_log(driver, url)
+                request_filter.write_report()
+                request_filter.log_summary(logger, label=url)
     except Exception as e:
         log_with_step(logger, logging.ERROR, "DRIVER", f"Erreur lors de l'analyse: {str(e)}")
     finally:
+        if context_provider:
+            context_provider.close()
         driver.quit()
+
+    # Navigateur libéré : analyses non interactives sur le snapshot capturé
+    if snapshot_path:
+        run_offline_analysis(config, logger, [snapshot_path])
@@ -1,23 +1,44 @@
 import os
-from utils.image_utils import simulate_daltonism
+from concurrent.futures import ThreadPoolExecutor
+from utils.image_utils import DALTONISM_MODES, decode_rgb, encode_png, simulate_daltonism_array
 from utils.log_utils import log_with_step
+from utils.pixel_contrast import capture_full_page
+from utils.report_paths import reports_path
 import logging
+import time
 
 class ColorSimulator:
-    def __init__(self, driver, logger):
+    def __init__(self, driver, logger, modes=DALTONISM_MODES, output_dir=None):
         self.driver = driver
         self.logger = logger
+        self.modes = tuple(modes)
+        self.output_dir = output_dir or reports_path()
+
+    def _save(self, mode, rgb):
+        file_path = os.path.join(self.output_dir, f"simulation_{mode}.png")
+        with open(file_path, 'wb') as f:
+            f.write(encode_png(rgb))
+        return file_path
 
     def run(self):
         log_with_step(self.logger, logging.INFO, "DALTONISME", "Simulation de daltonisme en cours…")
-        screenshot = self.driver.get_screenshot_as_png()
-        for mode in ['protanopia', 'deuteranopia', 'tritanopia']:
-            simulated = simulate_daltonism(screenshot, mode)
-            file_path = f"reports/simulation_{mode}.png"
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'wb') as f:
-                f.write(simulated)
-            log_with_step(self.logger, logging.INFO, "DALTONISME", f"Simulation {mode} sauvegardée: {file_path}")
+        t0 = time.perf_counter()
+        # Capture pleine page décodée une seule fois, partagée par tous les modes
+        screenshot = capture_full_page(self.driver)[0]
+        rgb = decode_rgb(screenshot)
+        simulated = simulate_daltonism_array(rgb, self.modes)
+        t1 = time.perf_counter()
+
+        # Encodages PNG en parallèle (la compression zlib de Pillow libère le GIL)
+        os.makedirs(self.output_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=len(self.modes) or 1) as executor:
+            paths = dict(zip(self.modes, executor.map(self._save, self.modes, (simulated[m] for m in self.modes))))
+        for mode in self.modes:
+            log_with_step(self.logger, logging.INFO, "DALTONISME", f"Simulation {mode} sauvegardée: {paths[mode]}")
+        log_with_step(
+            self.logger, logging.INFO, "DALTONISME",
+            f"{rgb.shape[1]}×{rgb.shape[0]} px : simulation {t1 - t0:.2f}s, encodage {time.perf_counter() - t1:.2f}s",
+        )
         
         # Retourner une liste vide pour éviter les erreurs d'itération
         return []
@@ -1,35 +1,282 @@
-from selenium.webdriver.common.by import By
+import csv
+import logging
+import os
+import time
+
+import numpy as np
 from selenium.common.exceptions import JavascriptException
-from utils.color_utils import calculate_contrast_ratio
+
+from utils.color_utils import (
+    contrast_ratio_array,
+    large_text_mask,
+    required_ratio_array,
+)
 from utils.log_utils import log_with_step
-import logging
+from utils.report_paths import reports_path
+from utils.image_utils import decode_rgb
+from utils.pixel_contrast import capture_full_page, sample_text_colors, scale_rects
+
+# Drapeaux renvoyés par CONTRAST_COLLECT_SCRIPT (colonne `flags`)
+CONTRAST_FLAG_BG_IMAGE = 1      # un ancêtre (non masqué par un fond opaque) porte un background-image
+CONTRAST_FLAG_FG_UNPARSED = 2   # couleur de texte non reconnue (color(), color-mix()…)
+
+CONTRAST_MAX_TEXT = 80
+
+# Collecte en une seule passe : pour chaque élément portant au moins un nœud texte non vide,
+# couleur du texte, fond effectif (composition des fonds des ancêtres, mémoïsée), taille et graisse.
+# Le résultat est columnaire (tableaux plats) pour limiter le volume sérialisé par WebDriver.
+CONTRAST_COLLECT_SCRIPT = r"""
+var opts = arguments[0] || {};
+var maxText = opts.maxText || 80;
+var SKIP = {SCRIPT:1, STYLE:1, NOSCRIPT:1, TEMPLATE:1, HEAD:1, TITLE:1, META:1, SVG:1};
+var WHITE = [255, 255, 255, 0];
+var bgMemo = new Map();
+
+function parseColor(s) {
+  if (!s) return null;
+  if (s === 'transparent') return [0, 0, 0, 0];
+  var m = /^rgba?\(([^)]*)\)$/.exec(s);
+  if (!m) return null;
+  var p = m[1].split(/[\s,\/]+/).filter(function (x) { return x.length; });
+  if (p.length < 3) return null;
+  var a = p.length > 3 ? (p[3].slice(-1) === '%' ? parseFloat(p[3]) / 100 : parseFloat(p[3])) : 1;
+  return [parseFloat(p[0]), parseFloat(p[1]), parseFloat(p[2]), isNaN(a) ? 1 : a];
+}
+
+// Fond effectif [r, g, b, bgImage] d'un élément, composé sur ses ancêtres jusqu'au blanc du canevas.
+function effectiveBg(el) {
+  var chain = [];
+  var base = null;
+  while (el && el.nodeType === 1) {
+    var known = bgMemo.get(el);
+    if (known) { base = known; break; }
+    chain.push(el);
+    el = el.parentElement;
+  }
+  if (!base) base = WHITE;
+  for (var i = chain.length - 1; i >= 0; i--) {
+    var cs = getComputedStyle(chain[i]);
+    var c = parseColor(cs.backgroundColor) || [0, 0, 0, 0];
+    var hasImage = cs.backgroundImage && cs.backgroundImage !== 'none' ? 1 : 0;
+    var a = c[3];
+    base = [
+      c[0] * a + base[0] * (1 - a),
+      c[1] * a + base[1] * (1 - a),
+      c[2] * a + base[2] * (1 - a),
+      hasImage || (a < 1 ? base[3] : 0)
+    ];
+    bgMemo.set(chain[i], base);
+  }
+  return base;
+}
+
+function fontWeight(w) {
+  if (w === 'bold' || w === 'bolder') return 700;
+  if (w === 'normal' || w === 'lighter') return 400;
+  var n = parseInt(w, 10);
+  return isNaN(n) ? 400 : n;
+}
+
+function shortSelector(el) {
+  if (el.id) return el.tagName.toLowerCase() + '#' + el.id;
+  var cls = (typeof el.className === 'string' ? el.className : '').trim().split(/\s+/)[0];
+  return el.tagName.toLowerCase() + (cls ? '.' + cls : '');
+}
+
+var out = {count: 0, tag: [], selector: [], text: [], fg: [], bg: [],
+           fontSize: [], fontWeight: [], flags: [], rect: []};
+var seen = new Set();
+var root = document.body || document.documentElement;
+var walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT, {
+  acceptNode: function (n) {
+    return /\S/.test(n.nodeValue) ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_REJECT;
+  }
+});
+var node;
+while ((node = walker.nextNode())) {
+  var el = node.parentElement;
+  if (!el || seen.has(el) || SKIP[el.tagName.toUpperCase()]) continue;
+  seen.add(el);
+  var cs = getComputedStyle(el);
+  if (cs.display === 'none' || cs.visibility === 'hidden' || cs.opacity === '0') continue;
+  var r = el.getBoundingClientRect();
+  if (r.width === 0 || r.height === 0) continue;
+  var fg = parseColor(cs.color);
+  var flags = 0;
+  if (!fg) { fg = [0, 0, 0, 1]; flags |= 2; }
+  var bg = effectiveBg(el);
+  if (bg[3]) flags |= 1;
+  var txt = (el.textContent || '').replace(/\s+/g, ' ').trim();
+  out.tag.push(el.tagName.toLowerCase());
+  out.selector.push(shortSelector(el));
+  out.text.push(txt.length > maxText ? txt.slice(0, maxText) : txt);
+  out.fg.push(fg[0], fg[1], fg[2], fg[3]);
+  out.bg.push(bg[0], bg[1], bg[2]);
+  out.fontSize.push(parseFloat(cs.fontSize) || 16);
+  out.fontWeight.push(fontWeight(cs.fontWeight));
+  out.flags.push(flags);
+  out.rect.push(Math.round(r.left + window.scrollX), Math.round(r.top + window.scrollY),
+                Math.round(r.width), Math.round(r.height));
+  out.count++;
+}
+return out;
+"""
+
+
+def evaluate_contrast_payload(payload, level="AA"):
+    """
+    Calcule en une passe NumPy les ratios de contraste de tous les éléments collectés
+    par CONTRAST_COLLECT_SCRIPT. Retourne un dict de tableaux : ratio, required, large, passed.
+    """
+    count = int(payload.get("count") or 0)
+    if count == 0:
+        empty = np.zeros(0)
+        return {"ratio": empty, "required": empty, "large": empty.astype(bool), "passed": empty.astype(bool)}
+    fg = np.asarray(payload["fg"], dtype=np.float64).reshape(count, 4)
+    bg = np.asarray(payload["bg"], dtype=np.float64).reshape(count, 3)
+    size = np.asarray(payload["fontSize"], dtype=np.float64)
+    weight = np.asarray(payload["fontWeight"], dtype=np.float64)
+    ratio = contrast_ratio_array(fg, bg)
+    required = required_ratio_array(size, weight, level)
+    # WCAG 2.x : le ratio n'est jamais arrondi avant comparaison (4.499:1 reste non conforme) ;
+    # l'arrondi à 2 décimales ne sert qu'à l'affichage dans les rapports
+    passed = ratio >= required
+    return {"ratio": ratio, "required": required, "large": large_text_mask(size, weight), "passed": passed}
+
+
+def apply_pixel_ratios(result, flags, pixel_ratio):
+    """
+    Remplace le ratio du style calculé par le ratio mesuré sur les pixels pour les éléments sur
+    image de fond ou dégradé (le style calculé n'y voit qu'une couleur de fond approximative).
+    """
+    flags = np.asarray(flags, dtype=np.int64)
+    use_pixels = ((flags & CONTRAST_FLAG_BG_IMAGE) != 0) & ~np.isnan(pixel_ratio)
+    ratio = np.where(use_pixels, pixel_ratio, result["ratio"])
+    return dict(result, ratio=ratio, passed=ratio >= result["required"],
+                pixel_ratio=pixel_ratio, pixel_used=use_pixels)
+
 
 class ContrastChecker:
-    def __init__(self, driver, logger):
+    def __init__(self, driver, logger, level="AA", output_dir=None, pixel_sampling=False):
         self.driver = driver
         self.logger = logger
+        self.level = level
+        self.output_dir = output_dir or reports_path()
+        # True = vérification complémentaire sur capture pleine page (images de fond, dégradés)
+        self.pixel_sampling = pixel_sampling
+
+    def collect(self):
+        """Collecte columnaire des styles calculés (un seul aller-retour WebDriver)."""
+        return self.driver.execute_script(CONTRAST_COLLECT_SCRIPT, {"maxText": CONTRAST_MAX_TEXT}) or {}
+
+    def sample_pixels(self, payload, capture=None):
+        """
+        Ratios mesurés sur une capture pleine page unique (décodée une fois, partagée par tous les
+        rectangles). `capture` = (png, origine_x, origine_y, largeur_css) déjà prise (snapshot),
+        sinon capturée sur le driver. Seuls les éléments sur image de fond ou dégradé
+        (CONTRAST_FLAG_BG_IMAGE, les seuls repris par `apply_pixel_ratios`) sont échantillonnés.
+        Retourne un tableau (N,) ; NaN pour les autres éléments et ceux hors capture.
+        """
+        count = int(payload.get("count") or 0)
+        ratio = np.full(count, np.nan)
+        idx = np.flatnonzero(np.asarray(payload["flags"], dtype=np.int64) & CONTRAST_FLAG_BG_IMAGE)
+        if not idx.size:
+            return ratio
+        png, origin_x, origin_y, css_width = capture or capture_full_page(self.driver)
+        image = decode_rgb(png)
+        rects = scale_rects(payload["rect"], origin_x, origin_y, css_width, image.shape[1])
+        fg, bg = sample_text_colors(image, rects[idx])
+        valid = ~np.isnan(bg[:, 0])
+        fg_rgba = np.concatenate([fg[valid], np.ones((int(valid.sum()), 1))], axis=1)
+        ratio[idx[valid]] = contrast_ratio_array(fg_rgba, bg[valid])
+        return ratio
 
     def run(self):
         log_with_step(self.logger, logging.INFO, "CONTRASTE", "Analyse des contrastes WCAG en cours…")
-        elements = self.driver.find_elements(By.XPATH, "//*[text() or @alt or @title]")
-        contrast_report = []
-        for element in elements:
+        t0 = time.perf_counter()
+        try:
+            payload = self.collect()
+        except JavascriptException as e:
+            log_with_step(self.logger, logging.ERROR, "CONTRASTE", f"Collecte des styles impossible : {e}")
+            return []
+        log_with_step(self.logger, logging.INFO, "CONTRASTE", f"Collecte des styles : {time.perf_counter() - t0:.3f}s")
+        return self.analyze(payload)
+
+    def analyze(self, payload, capture=None):
+        """Évalue une collecte CONTRAST_COLLECT_SCRIPT (live ou issue d'un snapshot) et écrit le rapport."""
+        t1 = time.perf_counter()
+        result = evaluate_contrast_payload(payload, self.level)
+        if self.pixel_sampling and result["ratio"].size:
             try:
-                color = self.driver.execute_script(
-                    "return window.getComputedStyle(arguments[0]).color;", element)
-                background = self.driver.execute_script(
-                    "return window.getComputedStyle(arguments[0]).backgroundColor;", element)
-                ratio = calculate_contrast_ratio(color, background)
-                if ratio < 4.5:
-                    contrast_report.append(f"Contraste insuffisant: {element.tag_name}, texte: {element.text}, ratio: {ratio:.2f}")
-            except JavascriptException:
-                continue
+                result = apply_pixel_ratios(result, payload["flags"], self.sample_pixels(payload, capture))
+                log_with_step(
+                    self.logger, logging.INFO, "CONTRASTE",
+                    f"Échantillonnage pixels : {int(result['pixel_used'].sum())} élément(s) sur fond image réévalué(s)",
+                )
+            except Exception as e:
+                log_with_step(self.logger, logging.WARNING, "CONTRASTE", f"Échantillonnage pixels impossible : {e}")
+        t2 = time.perf_counter()
+
+        contrast_report = []
+        rects = payload.get("rect") or []
+        pixel_used = result.get("pixel_used", np.zeros(result["passed"].shape, dtype=bool))
+        for i in np.flatnonzero(~result["passed"]):
+            i = int(i)
+            flags = int(payload["flags"][i])
+            contrast_report.append({
+                "tag": payload["tag"][i],
+                "selector": payload["selector"][i],
+                "text": payload["text"][i],
+                "ratio": round(float(result["ratio"][i]), 2),
+                "required": float(result["required"][i]),
+                "large_text": bool(result["large"][i]),
+                "background_image": bool(flags & CONTRAST_FLAG_BG_IMAGE),
+                "pixel_measured": bool(pixel_used[i]),
+                "rect": rects[i * 4:i * 4 + 4],
+            })
+
+        count = int(payload.get("count") or 0)
+        log_with_step(
+            self.logger, logging.INFO, "CONTRASTE",
+            f"{count} éléments texte analysés (calcul {t2 - t1:.3f}s)",
+        )
         if contrast_report:
-            log_with_step(self.logger, logging.WARNING, "CONTRASTE", "Rapport de contrastes insuffisants :")
-            for line in contrast_report:
-                log_with_step(self.logger, logging.WARNING, "CONTRASTE", line)
+            log_with_step(self.logger, logging.WARNING, "CONTRASTE",
+                          f"Rapport de contrastes insuffisants ({len(contrast_report)}) :")
+            for item in contrast_report:
+                note = ""
+                if item["background_image"]:
+                    note = " (mesuré sur capture)" if item["pixel_measured"] else " (fond image : à vérifier manuellement)"
+                log_with_step(
+                    self.logger, logging.WARNING, "CONTRASTE",
+                    f"Contraste insuffisant: {item['tag']}, texte: {item['text']}, "
+                    f"ratio: {item['ratio']:.2f} < {item['required']:.1f}{note}",
+                )
         else:
             log_with_step(self.logger, logging.INFO, "CONTRASTE", "Aucun contraste insuffisant détecté.")
-        
-        # Retourner une liste vide pour éviter les erreurs d'itération
-        return []
+
+        self._write_report(contrast_report)
+        return contrast_report
+
+    def _write_report(self, contrast_report):
+        """Écrit reports/contrast_report.csv (colonnes Type/Message/Sévérité lues par l'interface)."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, "contrast_report.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Type", "Message", "Sévérité", "Sélecteur", "Ratio", "Seuil",
+                             "Grand texte", "Fond image", "Mesure pixels", "Rect"])
+            for item in contrast_report:
+                writer.writerow([
+                    "Contraste insuffisant",
+                    f"{item['tag']} « {item['text']} » : ratio {item['ratio']:.2f} < {item['required']:.1f}",
+                    "medium" if item["background_image"] and not item["pixel_measured"] else "high",
+                    item["selector"],
+                    f"{item['ratio']:.2f}",
+                    item["required"],
+                    item["large_text"],
+                    item["background_image"],
+                    item["pixel_measured"],
+                    " ".join(str(v) for v in item["rect"]),
+                ])
+        log_with_step(self.logger, logging.INFO, "CONTRASTE", f"Rapport de contrastes : {path}")
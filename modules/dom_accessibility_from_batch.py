@@ -7,7 +7,7 @@ from __future__ import annotations
 import csv
 import json
 import logging
-from typing import Any, Dict, List, MutableSequence, Optional
+from typing import Any, Callable, Dict, Iterable, List, MutableSequence, Optional
 
 VALID_ARIA_ROLES = frozenset(
     {
@@ -84,45 +84,145 @@ VALID_ARIA_ROLES = frozenset(
     }
 )
 
-# Script exécuté via driver.execute_script(DOM_BATCH_EXTRACT_SCRIPT, list_of_webelements)
-DOM_BATCH_EXTRACT_SCRIPT = r"""
-var elements = arguments[0];
-var results = [];
-function domIndex(el) {
-    try {
-        var parent = el.parentNode;
-        if (!parent) return -1;
-        var children = Array.prototype.filter.call(parent.children, function(c){ return c.nodeType === 1; });
-        for (var k = 0; k < children.length; k++) { if (children[k] === el) return k + 1; }
-        return -1;
-    } catch (e) { return -1; }
-}
-function parentIndex(el) {
-    try {
-        var parent = el.parentNode;
-        if (!parent || !parent.parentNode) return -1;
-        var siblings = Array.prototype.filter.call(parent.parentNode.children, function(c){ return c.nodeType === 1; });
-        for (var k = 0; k < siblings.length; k++) { if (siblings[k] === parent) return k + 1; }
-        return -1;
-    } catch (e) { return -1; }
+# Index de positions par document (préambule JS partagé par les scripts ci-dessous).
+# Construit une seule fois par frame (stocké sur l'objet `document`) puis réutilisé par
+# tous les lots : position absolue, position parmi les frères et index XPath deviennent
+# des lectures O(1) au lieu d'un `querySelectorAll('*')` + parcours linéaire par élément.
+# Les positions absolues sont 1-based dans l'ordre de `document.querySelectorAll('*')`.
+_DOM_POSITION_INDEX_JS = r"""
+var _rgaaRebuilt = [];
+function rgaaPositionIndex(doc, rebuild) {
+    doc = doc || document;
+    var idx = doc.__rgaaPositionIndex;
+    if (idx && !rebuild) return idx;
+    var all = doc.querySelectorAll('*');
+    var abs = new Map(), sib = new Map(), sameTag = new Map();
+    function indexChildren(parent) {
+        var ch = parent.children;
+        if (!ch) return;
+        var counts = Object.create(null);
+        for (var i = 0; i < ch.length; i++) {
+            var c = ch[i];
+            var t = c.tagName.toLowerCase();
+            counts[t] = (counts[t] || 0) + 1;
+            sib.set(c, i + 1);
+            sameTag.set(c, counts[t]);
+        }
+    }
+    indexChildren(doc);
+    for (var k = 0; k < all.length; k++) {
+        abs.set(all[k], k + 1);
+        indexChildren(all[k]);
+    }
+    idx = { all: all, abs: abs, sib: sib, sameTag: sameTag, xpath: new Map() };
+    try { doc.__rgaaPositionIndex = idx; } catch (e) {}
+    _rgaaRebuilt.push(doc);
+    return idx;
 }
-function absIndex(el) {
+function rgaaLookup(el, field) {
     try {
         var doc = el.ownerDocument || document;
-        var all = doc.querySelectorAll('*');
-        for (var k = 0; k < all.length; k++) { if (all[k] === el) return k + 1; }
-        return -1;
+        var idx = rgaaPositionIndex(doc, false);
+        var v = idx[field].get(el);
+        // Élément ajouté depuis la construction de l'index : une reconstruction par appel au plus
+        if (v === undefined && _rgaaRebuilt.indexOf(doc) === -1) {
+            idx = rgaaPositionIndex(doc, true);
+            v = idx[field].get(el);
+        }
+        return v === undefined ? -1 : v;
     } catch (e) { return -1; }
 }
-function parentAbsIndex(el) {
-    try {
-        var parent = el.parentNode;
-        if (!parent || parent.nodeType !== 1) return -1;
-        var doc = el.ownerDocument || document;
-        var all = doc.querySelectorAll('*');
-        for (var k = 0; k < all.length; k++) { if (all[k] === parent) return k + 1; }
-        return -1;
-    } catch (e) { return -1; }
+function rgaaFullXPath(idx, el) {
+    var stack = [];
+    var current = el;
+    while (current && current.nodeType === 1 && !idx.xpath.has(current)) {
+        stack.push(current);
+        current = current.parentNode;
+    }
+    var base = (current && idx.xpath.has(current)) ? idx.xpath.get(current) : '';
+    for (var s = stack.length - 1; s >= 0; s--) {
+        var node = stack[s];
+        var tag = node.tagName.toLowerCase();
+        if (tag !== 'html' && node.parentNode) {
+            var n = idx.sameTag.get(node);
+            base = (base ? base + '/' : '') + tag + '[' + (n === undefined ? 1 : n) + ']';
+        }
+        idx.xpath.set(node, base);
+    }
+    return base ? '/html/' + base : '';
+}
+"""
+
+# Construit (ou reconstruit) l'index de positions du document courant ; retourne le nombre d'éléments.
+DOM_POSITION_INDEX_SCRIPT = _DOM_POSITION_INDEX_JS + r"""
+return rgaaPositionIndex(document, true).all.length;
+"""
+
+# XPath absolus complets pour une liste de positions absolues (1-based), via l'index partagé.
+DOM_FULL_XPATHS_SCRIPT = _DOM_POSITION_INDEX_JS + r"""
+var indices = arguments[0];
+var idx = rgaaPositionIndex(document, false);
+var result = [];
+for (var k = 0; k < indices.length; k++) {
+    var i = indices[k];
+    if (typeof i !== 'number' || i < 1 || i > idx.all.length) {
+        result.push('');
+        continue;
+    }
+    result.push(rgaaFullXPath(idx, idx.all[i - 1]));
+}
+return result;
+"""
+
+# Taille de l'extrait HTML conservé dans les rapports (colonne « Extrait HTML »)
+DOM_SNIPPET_MAX_HTML = 200
+# Longueur max. par défaut des textes / noms accessibles renvoyés par le navigateur (-1 = complet)
+DOM_SNIPPET_MAX_TEXT = 1000
+
+# Préambule JS partagé : lecture des options du mode borné (variable `opts` définie par le script
+# appelant) et extraction des champs d'un élément, commune au mode lots et au mode snapshot.
+_DOM_ELEMENT_HELPERS_JS = r"""
+var maxHtml = (typeof opts.maxHtml === 'number' && opts.maxHtml >= 0) ? opts.maxHtml : -1;
+var maxText = (typeof opts.maxText === 'number' && opts.maxText >= 0) ? opts.maxText : -1;
+var RAW_TEXT_TAGS = { script: 1, style: 1, xmp: 1, iframe: 1, noembed: 1, noframes: 1, plaintext: 1, noscript: 1 };
+function escapeHtmlText(t) {
+    return t.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/\u00a0/g, '&nbsp;');
+}
+// outerHTML borné : seuls les premiers enfants nécessaires sont sérialisés (pas la page entière pour <html>/<body>)
+function boundedOuterHTML(el, max) {
+    if (max < 0) return el.outerHTML;
+    var shallow = el.cloneNode(false).outerHTML;
+    var tag = el.tagName.toLowerCase();
+    var close = '</' + tag + '>';
+    var hasClose = shallow.length >= close.length && shallow.slice(-close.length).toLowerCase() === close;
+    var out = hasClose ? shallow.slice(0, shallow.length - close.length) : shallow;
+    var raw = RAW_TEXT_TAGS[tag] === 1;
+    for (var n = el.firstChild; n && out.length < max; n = n.nextSibling) {
+        if (n.nodeType === 1) out += boundedOuterHTML(n, max - out.length);
+        else if (n.nodeType === 3) out += raw ? n.data : escapeHtmlText(n.data);
+        else if (n.nodeType === 8) out += '<!--' + n.data + '-->';
+    }
+    if (hasClose && out.length < max) out += close;
+    return out.length > max ? out.substring(0, max) : out;
+}
+// textContent.trim() borné : parcours des nœuds texte arrêté dès que `max` caractères utiles sont lus
+function boundedText(el, max) {
+    if (max < 0) return el.textContent ? el.textContent.trim() : '';
+    var doc = el.ownerDocument || document;
+    var walker = doc.createTreeWalker(el, 4, null);
+    var acc = '';
+    var node;
+    while ((node = walker.nextNode())) {
+        acc += node.data;
+        if (acc.length > max && acc.replace(/^\s+/, '').length > max) {
+            return acc.replace(/^\s+/, '').substring(0, max);
+        }
+    }
+    acc = acc.trim();
+    return acc.length > max ? acc.substring(0, max) : acc;
+}
+function bounded(t) {
+    return (maxText >= 0 && t && t.length > maxText) ? t.substring(0, maxText) : t;
 }
 function mediaInfo(el) {
     var tag = el.tagName.toLowerCase();
@@ -152,7 +252,7 @@ function mediaInfo(el) {
     }
     return { mediaPath: path, mediaType: mtype };
 }
-function accName(el) {
+function accName(el, tx) {
     var tag = el.tagName.toLowerCase();
     var lb = el.getAttribute('aria-labelledby');
     if (lb && lb.trim()) {
@@ -165,14 +265,11 @@ function accName(el) {
                 name += t.trim() + ' ';
             }
         }
-        name = name.trim();
+        name = bounded(name.trim());
         if (name) return { name: name, source: 'aria-labelledby', priority: 1 };
     }
     var al = el.getAttribute('aria-label');
-    if (al && al.trim()) return { name: al.trim(), source: 'aria-label', priority: 2 };
-    var tx = '';
-    if (el.innerText != null && el.innerText.trim()) tx = el.innerText.trim();
-    else if (el.textContent) tx = el.textContent.trim();
+    if (al && al.trim()) return { name: bounded(al.trim()), source: 'aria-label', priority: 2 };
     if (tx) return { name: tx, source: 'text_content', priority: 3 };
     if (tag === 'img') {
         var alt = el.getAttribute('alt');
@@ -205,8 +302,8 @@ function isFocusableAligned(el) {
     if (ti !== null && ti !== '' && ti !== '-1') return true;
     return false;
 }
-for (var i = 0; i < elements.length; i++) {
-    var el = elements[i];
+// Attributs, textes bornés, visibilité, style, nom accessible (positions ajoutées par l'appelant)
+function extractElement(el) {
     var rect = el.getBoundingClientRect();
     var style = window.getComputedStyle(el);
     var op = parseFloat(style.opacity);
@@ -215,7 +312,9 @@ for (var i = 0; i < elements.length; i++) {
     isVisible = isVisible && op > 0;
     var isDisplayed = isVisible;
     var mi = mediaInfo(el);
-    var an = accName(el);
+    var inner = el.innerText != null ? bounded(el.innerText.trim()) : '';
+    var txt = boundedText(el, maxText);
+    var an = accName(el, inner || txt);
     var computedStyle = {};
     if (isVisible) {
         computedStyle = {
@@ -230,7 +329,7 @@ for (var i = 0; i < elements.length; i++) {
             font_weight: style.fontWeight
         };
     }
-    results.push({
+    return {
         tag: el.tagName,
         role: el.getAttribute('role'),
         ariaLabel: el.getAttribute('aria-label'),
@@ -275,8 +374,8 @@ for (var i = 0; i < elements.length; i++) {
         alt: el.getAttribute('alt'),
         id: el.getAttribute('id'),
         className: el.getAttribute('class'),
-        text: el.textContent ? el.textContent.trim() : '',
-        innerText: el.innerText != null ? el.innerText.trim() : '',
+        text: txt,
+        innerText: inner,
         href: el.getAttribute('href'),
         src: el.getAttribute('src'),
         inputType: el.getAttribute('type') || '',
@@ -289,11 +388,7 @@ for (var i = 0; i < elements.length; i++) {
         isFocusable: isFocusableAligned(el),
         mediaPath: mi.mediaPath,
         mediaType: mi.mediaType,
-        outerHTML: el.outerHTML,
-        domIndex: domIndex(el),
-        parentIndex: parentIndex(el),
-        absIndex: absIndex(el),
-        parentAbsIndex: parentAbsIndex(el),
+        outerHTML: boundedOuterHTML(el, maxHtml),
         rectViewport: { x: rect.x, y: rect.y, width: rect.width, height: rect.height },
         rectPage: {
             x: rect.left + window.scrollX,
@@ -304,12 +399,328 @@ for (var i = 0; i < elements.length; i++) {
         computedStyle: computedStyle,
         hasLabelFor: hasLabelFor(el),
         accessibleName: an
-    });
+    };
+}
+"""
+
+# Script exécuté via driver.execute_script(DOM_BATCH_EXTRACT_SCRIPT, list_of_webelements[, options])
+# options (facultatif) = {maxHtml: int, maxText: int} : mode borné, le navigateur ne renvoie que des
+# extraits tronqués (outerHTML sérialisé au plus `maxHtml` caractères, textes/nom accessible au plus
+# `maxText`). Sans options, comportement historique (valeurs complètes).
+DOM_BATCH_EXTRACT_SCRIPT = _DOM_POSITION_INDEX_JS + r"""
+var elements = arguments[0];
+var opts = arguments[1] || {};
+""" + _DOM_ELEMENT_HELPERS_JS + r"""
+function domIndex(el) {
+    return el.parentNode ? rgaaLookup(el, 'sib') : -1;
+}
+function parentIndex(el) {
+    var parent = el.parentNode;
+    if (!parent || !parent.parentNode) return -1;
+    return rgaaLookup(parent, 'sib');
+}
+function absIndex(el) {
+    return rgaaLookup(el, 'abs');
+}
+function parentAbsIndex(el) {
+    var parent = el.parentNode;
+    if (!parent || parent.nodeType !== 1) return -1;
+    return rgaaLookup(parent, 'abs');
+}
+var results = [];
+for (var i = 0; i < elements.length; i++) {
+    var el = elements[i];
+    var rec = extractElement(el);
+    rec.domIndex = domIndex(el);
+    rec.parentIndex = parentIndex(el);
+    rec.absIndex = absIndex(el);
+    rec.parentAbsIndex = parentAbsIndex(el);
+    results.push(rec);
 }
 return results;
 """
 
 
+# Snapshot complet du document courant en un seul appel (une frame = un appel) :
+#   driver.execute_script(DOM_SNAPSHOT_SCRIPT[, options])
+# Parcourt `querySelectorAll('*')` une fois et renvoie une charge utile colonnaire (tableaux parallèles,
+# ligne i = i-ème élément dans l'ordre du document, i.e. position absolue i + 1) :
+#   tags / tag      : table des noms de balise + indice par ligne
+#   parent          : ligne du parent élément (-1 si aucun)
+#   domIndex, parentIndex : positions parmi les frères (1-based, -1 si aucune)
+#   rect            : [x, y, width, height] page aplatis (4 valeurs par ligne) ; scroll = [scrollX, scrollY]
+#   flags           : bits SNAPSHOT_FLAG_*
+#   attrs           : colonnes creuses {champ: {rows: [...], values: [...]}} (mêmes clés que le mode lots + xpath)
+#   accName         : colonnes creuses {rows, name, source} ; style : {rows, values: [[9 propriétés]]}
+# `snapshot_to_attrs` reconstruit des dicts au format DOM_BATCH_EXTRACT_SCRIPT pour les consommateurs.
+DOM_SNAPSHOT_SCRIPT = _DOM_POSITION_INDEX_JS + r"""
+var opts = arguments[0] || {};
+""" + _DOM_ELEMENT_HELPERS_JS + r"""
+var idx = rgaaPositionIndex(document, true);
+var all = idx.all;
+var NOT_SPARSE = { tag: 1, isVisible: 1, isDisplayed: 1, isEnabled: 1, isFocusable: 1, hasLabelFor: 1,
+    rectViewport: 1, rectPage: 1, computedStyle: 1, accessibleName: 1 };
+var snap = {
+    version: 1, count: all.length, scroll: [window.scrollX, window.scrollY],
+    tags: [], tag: [], parent: [], domIndex: [], parentIndex: [], rect: [], flags: [],
+    attrs: {}, accName: { rows: [], name: [], source: [] }, style: { rows: [], values: [] }
+};
+var tagIds = Object.create(null);
+function pushSparse(key, row, v) {
+    if (v === null || v === undefined || v === '') return;
+    var col = snap.attrs[key];
+    if (!col) { col = snap.attrs[key] = { rows: [], values: [] }; }
+    col.rows.push(row);
+    col.values.push(v);
+}
+for (var r = 0; r < all.length; r++) {
+    var el = all[r];
+    var rec = extractElement(el);
+    var t = rec.tag;
+    if (tagIds[t] === undefined) { tagIds[t] = snap.tags.length; snap.tags.push(t); }
+    snap.tag.push(tagIds[t]);
+    var p = el.parentNode;
+    var pAbs = (p && p.nodeType === 1) ? idx.abs.get(p) : undefined;
+    snap.parent.push(pAbs === undefined ? -1 : pAbs - 1);
+    var si = idx.sib.get(el);
+    snap.domIndex.push(si === undefined ? -1 : si);
+    var psi = (p && p.parentNode) ? idx.sib.get(p) : undefined;
+    snap.parentIndex.push(psi === undefined ? -1 : psi);
+    var rp = rec.rectPage;
+    snap.rect.push(rp.x, rp.y, rp.width, rp.height);
+    snap.flags.push((rec.isVisible ? 1 : 0) | (rec.isDisplayed ? 2 : 0) | (rec.isEnabled ? 4 : 0)
+        | (rec.isFocusable ? 8 : 0) | (rec.hasLabelFor ? 16 : 0));
+    for (var key in rec) {
+        if (NOT_SPARSE[key] !== 1) pushSparse(key, r, rec[key]);
+    }
+    pushSparse('xpath', r, rgaaFullXPath(idx, el));
+    var an = rec.accessibleName;
+    if (an && an.source !== 'none') {
+        snap.accName.rows.push(r);
+        snap.accName.name.push(an.name);
+        snap.accName.source.push(an.source);
+    }
+    var cs = rec.computedStyle;
+    if (cs && cs.display !== undefined) {
+        snap.style.rows.push(r);
+        snap.style.values.push([cs.display, cs.visibility, cs.opacity, cs.position, cs.z_index,
+            cs.background_color, cs.color, cs.font_size, cs.font_weight]);
+    }
+}
+return snap;
+"""
+
+SNAPSHOT_FLAG_VISIBLE = 1
+SNAPSHOT_FLAG_DISPLAYED = 2
+SNAPSHOT_FLAG_ENABLED = 4
+SNAPSHOT_FLAG_FOCUSABLE = 8
+SNAPSHOT_FLAG_HAS_LABEL_FOR = 16
+
+# Ordre des propriétés de `style.values` dans le snapshot (clés de `computedStyle` du mode lots)
+SNAPSHOT_STYLE_KEYS = (
+    "display",
+    "visibility",
+    "opacity",
+    "position",
+    "z_index",
+    "background_color",
+    "color",
+    "font_size",
+    "font_weight",
+)
+
+# Champs valant '' (et non null) dans le mode lots lorsqu'ils sont absents
+_SNAPSHOT_EMPTY_STRING_FIELDS = (
+    "inputType",
+    "value",
+    "placeholder",
+    "nameAttr",
+    "mediaPath",
+    "mediaType",
+    "text",
+    "innerText",
+    "outerHTML",
+    "xpath",
+)
+
+# Champs issus de `getAttribute` (null lorsqu'absents dans le mode lots)
+_SNAPSHOT_ATTRIBUTE_FIELDS = (
+    "role",
+    "ariaLabel",
+    "ariaDescribedby",
+    "ariaLabelledby",
+    "ariaHidden",
+    "ariaExpanded",
+    "ariaControls",
+    "ariaLive",
+    "ariaAtomic",
+    "ariaRelevant",
+    "ariaBusy",
+    "ariaCurrent",
+    "ariaPosinset",
+    "ariaSetsize",
+    "ariaLevel",
+    "ariaSort",
+    "ariaValuemin",
+    "ariaValuemax",
+    "ariaValuenow",
+    "ariaValuetext",
+    "ariaHaspopup",
+    "ariaInvalid",
+    "ariaRequired",
+    "ariaReadonly",
+    "ariaDisabled",
+    "ariaSelected",
+    "ariaChecked",
+    "ariaPressed",
+    "ariaMultiline",
+    "ariaMultiselectable",
+    "ariaOrientation",
+    "ariaPlaceholder",
+    "ariaRoledescription",
+    "ariaKeyshortcuts",
+    "ariaDetails",
+    "ariaErrormessage",
+    "ariaFlowto",
+    "ariaOwns",
+    "tabindex",
+    "title",
+    "alt",
+    "id",
+    "className",
+    "href",
+    "src",
+)
+
+_SNAPSHOT_ROW_DEFAULTS = dict.fromkeys(_SNAPSHOT_ATTRIBUTE_FIELDS)
+_SNAPSHOT_ROW_DEFAULTS.update(dict.fromkeys(_SNAPSHOT_EMPTY_STRING_FIELDS, ""))
+
+_ACC_NAME_PRIORITIES = {
+    "aria-labelledby": 1,
+    "aria-label": 2,
+    "text_content": 3,
+    "alt": 4,
+    "alt (img enfant)": 4,
+}
+
+
+def snapshot_row(
+    row: int,
+    tag: str,
+    flag: int,
+    dom_index: int,
+    parent_index: int,
+    parent: Optional[int],
+    rect: Any,
+    scroll: Any,
+    attrs: Optional[Dict[str, Any]] = None,
+    acc: Optional[Any] = None,
+    style: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """Dict d'un élément au format DOM_BATCH_EXTRACT_SCRIPT depuis ses valeurs colonnaires
+    (`acc` = (nom, source) du nom accessible, `style` = valeurs dans l'ordre de SNAPSHOT_STYLE_KEYS)."""
+    x, y, w, h = rect
+    scroll_x, scroll_y = scroll
+    out: Dict[str, Any] = dict(_SNAPSHOT_ROW_DEFAULTS)
+    out.update(
+        {
+            "tag": tag,
+            "isVisible": bool(flag & SNAPSHOT_FLAG_VISIBLE),
+            "isDisplayed": bool(flag & SNAPSHOT_FLAG_DISPLAYED),
+            "isEnabled": bool(flag & SNAPSHOT_FLAG_ENABLED),
+            "isFocusable": bool(flag & SNAPSHOT_FLAG_FOCUSABLE),
+            "hasLabelFor": bool(flag & SNAPSHOT_FLAG_HAS_LABEL_FOR),
+            "domIndex": dom_index,
+            "parentIndex": parent_index,
+            "absIndex": row + 1,
+            "parentAbsIndex": parent + 1 if parent is not None and parent >= 0 else -1,
+            "rectPage": {"x": x, "y": y, "width": w, "height": h},
+            "rectViewport": {"x": x - scroll_x, "y": y - scroll_y, "width": w, "height": h},
+            "computedStyle": {},
+            "accessibleName": {"name": "", "source": "none", "priority": 0},
+        }
+    )
+    if attrs:
+        out.update(attrs)
+    if acc is not None:
+        out["accessibleName"] = {"name": acc[0], "source": acc[1], "priority": _ACC_NAME_PRIORITIES.get(acc[1], 0)}
+    if style is not None:
+        out["computedStyle"] = dict(zip(SNAPSHOT_STYLE_KEYS, style))
+    return out
+
+
+def snapshot_to_attrs(snapshot: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Reconstruit, depuis un snapshot colonnaire, la liste des dicts au format DOM_BATCH_EXTRACT_SCRIPT
+    (plus la clé `xpath` : XPath complet calculé dans la page)."""
+    count = int(snapshot.get("count") or 0)
+    tags = snapshot.get("tags") or []
+    tag_ids = snapshot.get("tag") or []
+    parents = snapshot.get("parent") or []
+    dom_index = snapshot.get("domIndex") or []
+    parent_index = snapshot.get("parentIndex") or []
+    rects = snapshot.get("rect") or []
+    flags = snapshot.get("flags") or []
+    scroll_x, scroll_y = (list(snapshot.get("scroll") or []) + [0, 0])[:2]
+
+    rows: List[Dict[str, Any]] = []
+    for i in range(count):
+        rows.append(
+            snapshot_row(
+                i,
+                tags[tag_ids[i]] if i < len(tag_ids) else "",
+                flags[i] if i < len(flags) else 0,
+                dom_index[i] if i < len(dom_index) else -1,
+                parent_index[i] if i < len(parent_index) else -1,
+                parents[i] if i < len(parents) else -1,
+                (list(rects[4 * i:4 * i + 4]) + [0, 0, 0, 0])[:4],
+                (scroll_x, scroll_y),
+            )
+        )
+
+    for key, col in (snapshot.get("attrs") or {}).items():
+        for r, v in zip(col.get("rows") or [], col.get("values") or []):
+            if 0 <= r < count:
+                rows[r][key] = v
+
+    acc = snapshot.get("accName") or {}
+    for r, name, source in zip(acc.get("rows") or [], acc.get("name") or [], acc.get("source") or []):
+        if 0 <= r < count:
+            rows[r]["accessibleName"] = {
+                "name": name,
+                "source": source,
+                "priority": _ACC_NAME_PRIORITIES.get(source, 0),
+            }
+
+    style = snapshot.get("style") or {}
+    for r, values in zip(style.get("rows") or [], style.get("values") or []):
+        if 0 <= r < count:
+            rows[r]["computedStyle"] = dict(zip(SNAPSHOT_STYLE_KEYS, values))
+    return rows
+
+
+def batch_extract_options(max_text: Optional[int] = None) -> Dict[str, int]:
+    """
+    Options du mode borné pour DOM_BATCH_EXTRACT_SCRIPT / DOM_SNAPSHOT_SCRIPT : extrait HTML et
+    textes toujours bornés (`max_text`, DOM_SNIPPET_MAX_TEXT par défaut), sauf `max_text` négatif
+    (texte complet).
+    """
+    max_text = DOM_SNIPPET_MAX_TEXT if max_text is None else int(max_text)
+    opts = {"maxHtml": DOM_SNIPPET_MAX_HTML}
+    if max_text >= 0:
+        opts["maxText"] = max_text
+    return opts
+
+
+def estimate_payload_bytes(payload: Any) -> int:
+    """Taille approximative (octets UTF-8, JSON compact) d'une réponse execute_script."""
+    try:
+        return len(
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        )
+    except Exception:
+        return 0
+
+
 def stable_css_selector_from_attrs(attrs: Dict[str, Any]) -> str:
     """Équivalent de DOMAnalyzer._get_element_selector sans WebElement."""
     try:
@@ -523,15 +934,144 @@ def check_accessibility_issues_from_dict(
         pass
 
 
+# Attributs ARIA référençant des id (IDREF / IDREFS)
+_ID_REFERENCE_FIELDS = (
+    "ariaLabelledby",
+    "ariaDescribedby",
+    "ariaControls",
+    "ariaOwns",
+    "ariaFlowto",
+    "ariaErrormessage",
+    "ariaDetails",
+)
+_ID_REFERENCE_ATTRIBUTES = {
+    "ariaLabelledby": "aria-labelledby",
+    "ariaDescribedby": "aria-describedby",
+    "ariaControls": "aria-controls",
+    "ariaOwns": "aria-owns",
+    "ariaFlowto": "aria-flowto",
+    "ariaErrormessage": "aria-errormessage",
+    "ariaDetails": "aria-details",
+}
+_SEVERITY_RANK = {"critical": 3, "high": 2, "medium": 1}
+
+# Balises examinées par check_accessibility_issues_from_dict (les autres n'y sont testées que sur le rôle)
+DOM_RULE_TAGS = ("img", "a", "button", "input", "textarea", "select", "h1", "h2", "h3", "h4", "h5", "h6")
+
+
+def duplicate_id_impacts_from_attrs(
+    rows_with_id: List[Dict[str, Any]],
+    references: Dict[str, int],
+) -> List[Dict[str, Any]]:
+    """Même classement que ScreenReader._analyze_duplicate_id_impact, sur dicts extraits (sans WebElement).
+    `references` = nombre de références à l'id par attribut ARIA (clé : nom de champ batch)."""
+    impacts: List[Dict[str, Any]] = []
+    labelled = any(r.get("hasLabelFor") for r in rows_with_id)
+    for attrs in rows_with_id:
+        tag_name = (attrs.get("tag") or "").lower()
+        role = attrs.get("role")
+        is_aria_block = role is not None or any(
+            attrs.get(k) for k in ("ariaLabel", "ariaLabelledby", "ariaDescribedby", "ariaControls", "ariaOwns")
+        )
+        if tag_name == "label" or tag_name in ("h1", "h2", "h3", "h4", "h5", "h6") or is_aria_block or labelled:
+            impacts.append({"categorie": "Label, titre ou bloc ARIA",
+                            "impact": "Le lecteur d'écran ne lit pas le bon texte", "severity": "critical"})
+        is_link = tag_name == "a" or role == "link"
+        is_button = tag_name == "button" or role in ("button", "menuitem")
+        href = attrs.get("href") or ""
+        is_internal_link = is_link and href and (href.startswith("#") or not href.startswith(("http://", "https://")))
+        if is_internal_link or is_button:
+            impacts.append({"categorie": "Lien interne ou bouton",
+                            "impact": "Mauvais focus / zone non atteinte", "severity": "critical"})
+        if attrs.get("ariaLive") in ("polite", "assertive", "off"):
+            impacts.append({"categorie": "Zone dynamique (aria-live)",
+                            "impact": "Annonces incohérentes ou non lues", "severity": "critical"})
+        for field, count in references.items():
+            if count:
+                impacts.append({"categorie": "Référence ARIA", "impact": "Arborescence d'accessibilité corrompue",
+                                "severity": "critical",
+                                "details": f"ID référencé par l'attribut {_ID_REFERENCE_ATTRIBUTES[field]}"})
+    if (sum(references.values()) + (1 if labelled else 0)) > 0 and len(rows_with_id) > 1:
+        impacts.append({"categorie": "Référence multiple dans le DOM",
+                        "impact": "Arborescence d'accessibilité corrompue", "severity": "critical"})
+    seen = set()
+    unique = []
+    for impact in impacts:
+        key = (impact["categorie"], impact["impact"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(impact)
+    return unique or [{"categorie": "ID dupliqué général",
+                       "impact": "Violation de l'unicité des IDs dans le DOM", "severity": "high"}]
+
+
+def duplicate_id_issues_from_attrs(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Non-conformités « id dupliqué » d'un document (dicts batch/snapshot), au format `non_conformites`."""
+    by_id: Dict[str, List[Dict[str, Any]]] = {}
+    for attrs in rows:
+        eid = attrs.get("id")
+        if eid:
+            by_id.setdefault(eid, []).append(attrs)
+    duplicates = {eid: els for eid, els in by_id.items() if len(els) > 1}
+    if not duplicates:
+        return []
+    references = count_id_references(duplicates, lambda field: (attrs.get(field) for attrs in rows))
+    return duplicate_id_issues_from_groups(duplicates, references)
+
+
+def count_id_references(
+    duplicates: Dict[str, Any],
+    values_of: Callable[[str], Iterable[Optional[str]]],
+) -> Dict[str, Dict[str, int]]:
+    """Références aux ids dupliqués par attribut ARIA ; `values_of(champ)` = valeurs IDREF(S) du document."""
+    references: Dict[str, Dict[str, int]] = {eid: dict.fromkeys(_ID_REFERENCE_FIELDS, 0) for eid in duplicates}
+    for field in _ID_REFERENCE_FIELDS:
+        for value in values_of(field):
+            for token in (value or "").split():
+                if token in references:
+                    references[token][field] += 1
+    return references
+
+
+def duplicate_id_issues_from_groups(
+    duplicates: Dict[str, List[Dict[str, Any]]],
+    references: Dict[str, Dict[str, int]],
+) -> List[Dict[str, Any]]:
+    """Non-conformités des groupes d'éléments partageant un id (ordre de première apparition)."""
+    issues: List[Dict[str, Any]] = []
+    for eid, els in duplicates.items():
+        impacts = duplicate_id_impacts_from_attrs(els, references[eid])
+        impact_text = " | ".join(f"{i['categorie']}: {i['impact']}" for i in impacts)
+        severity = max((i.get("severity", "medium") for i in impacts), key=lambda x: _SEVERITY_RANK.get(x, 0))
+        for attrs in els:
+            issues.append(
+                {
+                    "type": f"Attribut id dupliqué : '{eid}'",
+                    "element": stable_css_selector_from_attrs(attrs),
+                    "xpath": attrs.get("xpath") or "",
+                    "impact": impact_text,
+                    "severity": severity,
+                    "recommandation": f"L'attribut id '{eid}' doit être unique dans la page. {impact_text}",
+                }
+            )
+    return issues
+
+
+def _json_indented(value: Any, level: int) -> str:
+    """`json.dumps(value, indent=2)` décalé de `level` espaces (valeur imbriquée d'un document indenté)."""
+    return json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n" + " " * level)
+
+
 def write_dom_analysis_reports(
-    elements: List[Dict[str, Any]],
+    elements: Iterable[Dict[str, Any]],
     issues: List[Dict[str, Any]],
     summary: Dict[str, Any],
     csv_filename: str = "rapport_analyse_dom.csv",
     json_filename: str = "rapport_analyse_dom.json",
     logger: Optional[logging.Logger] = None,
 ) -> None:
-    """Écrit les rapports au même format que DOMAnalyzer (CSV + JSON racine projet)."""
+    """Écrit les rapports au même format que DOMAnalyzer (CSV + JSON racine projet).
+    `elements` est parcouru une seule fois (liste ou générateur) : les deux fichiers sont écrits au fil de l'eau."""
     log = logger or logging.getLogger(__name__)
 
     def _computed_style_str(cs: Dict[str, Any]) -> str:
@@ -543,9 +1083,19 @@ def write_dom_analysis_reports(
             f"{cs.get('color', 'N/A')} {cs.get('font_size', 'N/A')} {cs.get('font_weight', 'N/A')}"
         )
 
+    # Colonne « Problèmes » : problèmes de chaque sélecteur, regroupés une fois
+    issues_by_selector: Dict[Any, List[str]] = {}
+    for i in issues:
+        issues_by_selector.setdefault(i.get("element"), []).append(f"{i['type']} - {i['message']}")
+
     try:
-        with open(csv_filename, "w", newline="", encoding="utf-8-sig") as csvfile:
+        with open(csv_filename, "w", newline="", encoding="utf-8-sig") as csvfile, open(
+            json_filename, "w", encoding="utf-8"
+        ) as jsonfile:
             writer = csv.writer(csvfile)
+            # JSON écrit élément par élément, identique à json.dump(..., indent=2)
+            jsonfile.write('{\n  "schema_version": 2,\n  "elements": [')
+            written = 0
             # Même ordre logique que l’ancien DOMAnalyzer + colonnes batch (schéma v2 documenté dans ALIGNEMENT_DOM.md)
             writer.writerow(
                 [
@@ -586,11 +1136,7 @@ def write_dom_analysis_reports(
             for element in elements:
                 pos = element.get("position") or {}
                 css_sel = element.get("css_selector") or ""
-                issues_str = ", ".join(
-                    f"{i['type']} - {i['message']}"
-                    for i in issues
-                    if i.get("element") == css_sel
-                )
+                issues_str = ", ".join(issues_by_selector.get(css_sel, ()))
                 cs = element.get("computed_style") or {}
                 acc = element.get("accessible_name") or {}
                 writer.writerow(
@@ -629,19 +1175,12 @@ def write_dom_analysis_reports(
                         issues_str,
                     ]
                 )
+                jsonfile.write(("," if written else "") + "\n    " + _json_indented(element, 4))
+                written += 1
+            jsonfile.write("\n  ]" if written else "]")
+            jsonfile.write(',\n  "issues": ' + _json_indented(issues, 2))
+            jsonfile.write(',\n  "summary": ' + _json_indented(summary, 2) + "\n}")
         log.info("Rapport CSV généré : %s", csv_filename)
-    except Exception as e:
-        log.warning("Erreur génération CSV DOM : %s", e)
-
-    try:
-        payload = {
-            "schema_version": 2,
-            "elements": elements,
-            "issues": issues,
-            "summary": summary,
-        }
-        with open(json_filename, "w", encoding="utf-8") as jsonfile:
-            json.dump(payload, jsonfile, ensure_ascii=False, indent=2)
         log.info("Rapport JSON généré : %s", json_filename)
     except Exception as e:
-        log.warning("Erreur génération JSON DOM : %s", e)
+        log.warning("Erreur génération rapports DOM : %s", e)
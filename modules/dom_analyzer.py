@@ -1,11 +1,11 @@
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import StaleElementReferenceException
-import time
 import csv
 import json
 from utils.log_utils import log_with_step
+from utils.page_readiness import wait_for_page_ready
+from utils.report_paths import run_path
 import logging
 
 class DOMAnalyzer:
@@ -17,13 +17,8 @@ class DOMAnalyzer:
     def run(self):
         log_with_step(self.logger, logging.INFO, "DOM", "Analyse des éléments d'accessibilité…")
         
-        # Attendre que la page soit stable
-        WebDriverWait(self.driver, 10).until(
-            lambda d: d.execute_script('return document.readyState') == 'complete'
-        )
-        
-        # Attendre un peu plus pour s'assurer que les éléments dynamiques sont chargés
-        time.sleep(2)
+        # Attendre que la page soit stable (éléments dynamiques compris), sans délai fixe
+        wait_for_page_ready(self.driver, logger=self.logger, step_tag="DOM")
         
         # Récupérer tous les éléments une seule fois
         elements = self.driver.find_elements(By.XPATH, "//*")
@@ -669,7 +664,7 @@ class DOMAnalyzer:
             issues = result['issues']
             
             # Créer un fichier CSV
-            filename = 'rapport_analyse_dom.csv'
+            filename = run_path('rapport_analyse_dom.csv')
             with open(filename, 'w', newline='') as csvfile:
                 writer = csv.writer(csvfile)
                 
@@ -724,7 +719,7 @@ class DOMAnalyzer:
             issues = result['issues']
             
             # Créer un fichier JSON
-            filename = 'rapport_analyse_dom.json'
+            filename = run_path('rapport_analyse_dom.json')
             with open(filename, 'w') as jsonfile:
                 json.dump({
                     'elements': elements,
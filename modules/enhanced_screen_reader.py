@@ -13,13 +13,21 @@ import os
 from utils.css_selector_generator import CSSSelectorGenerator
 from modules.dom_accessibility_from_batch import (
     DOM_BATCH_EXTRACT_SCRIPT,
+    DOM_FULL_XPATHS_SCRIPT,
+    DOM_POSITION_INDEX_SCRIPT,
+    DOM_SNAPSHOT_SCRIPT,
+    DOM_SNIPPET_MAX_HTML,
+    batch_extract_options,
     build_dom_element_record,
     check_accessibility_issues_from_dict,
+    estimate_payload_bytes,
+    snapshot_to_attrs,
     stable_css_selector_from_attrs,
     write_dom_analysis_reports,
 )
 import logging
 from utils.log_utils import log_with_step
+from utils.report_paths import reports_path, run_path
 
 class EnhancedScreenReader:
     def __init__(self, driver, logger):
@@ -31,6 +39,12 @@ class EnhancedScreenReader:
         self.emit_dom_rapport = False
         self._dom_report_elements = []
         self._dom_report_issues = []
+        # Mode d'extraction borné : longueur max. des textes renvoyés par le navigateur
+        # (None = DOM_SNIPPET_MAX_TEXT, négatif = complet)
+        self.max_text_length = None
+        # Extraction par snapshot colonnaire (un appel JS par frame) ; False = lots de 20 WebElements
+        self.use_dom_snapshot = True
+        self._extraction_bytes = 0
         self.css_generator = CSSSelectorGenerator()  # Générateur de sélecteurs CSS
         self.non_conformites = {
             "images": [],
@@ -282,6 +296,7 @@ class EnhancedScreenReader:
         self._dom_report_elements = []
         self._dom_report_issues = []
         self._last_dom_total_elements = 0
+        self._extraction_bytes = 0
         self.aria_data_by_element = {}
 
         # Afficher l'URL de la page analysée en haut de l'analyse
@@ -362,6 +377,13 @@ class EnhancedScreenReader:
             self.logger.error(f"Erreur lors de l'analyse multi-frame du DOM : {str(e)}")
 
         self._write_accessibility_csv()
+        log_with_step(
+            self.logger,
+            logging.INFO,
+            "SCREEN",
+            f"Données transférées (extraction DOM) : {self._extraction_bytes} octets "
+            f"({self._extraction_bytes / 1024:.1f} Ko) pour {self._last_dom_total_elements} éléments",
+        )
 
         if self.emit_dom_rapport and self._dom_report_elements:
             summary = {
@@ -373,8 +395,8 @@ class EnhancedScreenReader:
                 self._dom_report_elements,
                 self._dom_report_issues,
                 summary,
-                csv_filename="rapport_analyse_dom.csv",
-                json_filename="rapport_analyse_dom.json",
+                csv_filename=run_path("rapport_analyse_dom.csv"),
+                json_filename=run_path("rapport_analyse_dom.json"),
                 logger=self.logger,
             )
 
@@ -494,23 +516,37 @@ class EnhancedScreenReader:
     def _analyze_document(self):
         """Analyse le document courant (contexte principal ou iframe)"""
         try:
-            # Récupérer tous les éléments en une seule fois (document order)
-            all_elements = self.driver.find_elements(By.XPATH, "//*")
-            total_elements = len(all_elements)
-            self._last_dom_total_elements += total_elements
             frame_ctx = getattr(self, "_current_frame_src", "") or "(principal)"
-            log_with_step(
-                self.logger,
-                logging.INFO,
-                "SCREEN",
-                f"DOM frame={frame_ctx!r} : {total_elements} éléments — export complet…",
-            )
-
-            # Important: on exporte tous les éléments du DOM (dans le contexte courant
-            # principal ou iframe) afin d'avoir la totalité des lignes dans
-            # `reports/accessibility_analysis.csv`.
             start = time.time()
-            self._analyze_elements_integrated(all_elements, "DOM_COMPLET")
+            # Mode snapshot : un seul appel JS par frame (charge utile colonnaire, sans WebElement)
+            snapshot_attrs = self._capture_dom_snapshot() if self.use_dom_snapshot else None
+            if snapshot_attrs is not None:
+                total_elements = len(snapshot_attrs)
+                self._last_dom_total_elements += total_elements
+                log_with_step(
+                    self.logger,
+                    logging.INFO,
+                    "SCREEN",
+                    f"DOM frame={frame_ctx!r} : {total_elements} éléments — export complet (snapshot)…",
+                )
+                self._analyze_snapshot_integrated(snapshot_attrs, "DOM_COMPLET")
+            else:
+                # Récupérer tous les éléments en une seule fois (document order)
+                all_elements = self.driver.find_elements(By.XPATH, "//*")
+                total_elements = len(all_elements)
+                self._last_dom_total_elements += total_elements
+                log_with_step(
+                    self.logger,
+                    logging.INFO,
+                    "SCREEN",
+                    f"DOM frame={frame_ctx!r} : {total_elements} éléments — export complet…",
+                )
+
+                # Important: on exporte tous les éléments du DOM (dans le contexte courant
+                # principal ou iframe) afin d'avoir la totalité des lignes dans
+                # `reports/accessibility_analysis.csv`.
+                self._build_position_index()
+                self._analyze_elements_integrated(all_elements, "DOM_COMPLET")
             self._log_aria_attributes()
             elapsed = time.time() - start
             log_with_step(
@@ -523,6 +559,33 @@ class EnhancedScreenReader:
         except Exception as e:
             self.logger.error(f"Erreur lors de l'analyse du DOM : {str(e)}")
 
+    def _capture_dom_snapshot(self):
+        """Snapshot colonnaire du document courant (DOM_SNAPSHOT_SCRIPT) converti en dicts au format batch.
+        Retourne None en cas d'échec (repli sur l'extraction par lots)."""
+        try:
+            snapshot = self.driver.execute_script(
+                DOM_SNAPSHOT_SCRIPT, batch_extract_options(self.max_text_length)
+            )
+            if not isinstance(snapshot, dict):
+                return None
+            self._extraction_bytes += estimate_payload_bytes(snapshot)
+            return snapshot_to_attrs(snapshot)
+        except Exception as e:
+            self.logger.warning(f"Snapshot DOM impossible, repli sur l'extraction par lots : {e}")
+            return None
+
+    def _build_position_index(self):
+        """Construit l'index de positions DOM du document courant (une fois par frame, réutilisé par tous les lots)."""
+        try:
+            start = time.time()
+            count = self.driver.execute_script(DOM_POSITION_INDEX_SCRIPT)
+            self.logger.debug(
+                f"Index de positions DOM construit : {count} éléments en {time.time() - start:.2f}s"
+            )
+        except Exception as e:
+            # Sans index préalable, le script batch le construit à la demande
+            self.logger.debug(f"Construction de l'index de positions DOM impossible : {e}")
+
     def _get_xpath(self, element):
         """Génère le X-path absolu complet de l'élément (chemin depuis /html avec indices), avec mise en cache par élément."""
         try:
@@ -604,8 +667,8 @@ class EnhancedScreenReader:
         value = value.replace(';', ',')
         return value
 
-    def _analyze_non_conformites(self, info, element_type, element):
-        """Analyse les non-conformités RGAA pour un élément"""
+    def _analyze_non_conformites(self, info, element_type, element, attrs=None):
+        """Analyse les non-conformités RGAA pour un élément (`attrs` extraits en lot/snapshot si disponibles)"""
         # On détermine la logique d'analyse à partir du tag courant (et pas du
         # nom de la catégorie), afin de rester cohérent quand on analyse le DOM
         # complet (au lieu de catégories).
@@ -632,7 +695,10 @@ class EnhancedScreenReader:
 
         elif tag == "a":
             # Critère liens
-            results = self._analyze_links_batch([element])
+            if attrs is not None:
+                results = self._analyze_link_from_attrs(attrs, info)
+            else:
+                results = self._analyze_links_batch([element])
             self.non_conformites["liens"].extend(results)
 
         elif tag.startswith("h") and tag[1:].isdigit():
@@ -735,6 +801,31 @@ class EnhancedScreenReader:
                 
         return results
 
+    def _analyze_link_from_attrs(self, attrs, info):
+        """
+        Mêmes règles que `_analyze_links_batch`, à partir des attributs déjà extraits (aucun appel JS).
+        XPath complet du snapshot (`xpath`) comme en direct ; à défaut (mode lots), XPath simple.
+        """
+        results = []
+        text = attrs.get('text') or ''
+        class_name = attrs.get('className')
+        xpath = attrs.get('xpath') or info["main_xpath"]
+        if not text or len(text.strip()) < 3:
+            results.append({
+                "type": "Lien sans texte explicite",
+                "element": info["Sélecteur"],
+                "xpath": xpath,
+                "recommandation": "Ajouter un texte descriptif au lien ou un aria-label"
+            })
+        if class_name and "btn--hide-txt" in class_name:
+            results.append({
+                "type": "Lien avec texte masqué",
+                "element": info["Sélecteur"],
+                "xpath": xpath,
+                "recommandation": "S'assurer que le texte est accessible aux lecteurs d'écran via aria-label"
+            })
+        return results
+
     def _analyze_duplicate_id_impact(self, duplicate_id, elements_with_id):
         """
         Analyse l'impact spécifique d'un ID dupliqué selon les catégories RGAA
@@ -893,11 +984,11 @@ class EnhancedScreenReader:
 
     def _write_accessibility_csv(self):
         """Écriture atomique ; repli si le fichier cible est verrouillé (ex. ouvert dans Excel)."""
-        path = "reports/accessibility_analysis.csv"
-        os.makedirs("reports", exist_ok=True)
+        path = reports_path("accessibility_analysis.csv")
+        os.makedirs(reports_path(), exist_ok=True)
         body = "\n".join(self.csv_lines)
         try:
-            fd, tmp_path = tempfile.mkstemp(prefix="acc_", suffix=".csv", dir="reports")
+            fd, tmp_path = tempfile.mkstemp(prefix="acc_", suffix=".csv", dir=reports_path())
             try:
                 with os.fdopen(fd, "w", encoding="utf-8-sig", newline="") as f:
                     f.write(body)
@@ -912,8 +1003,7 @@ class EnhancedScreenReader:
         except (PermissionError, OSError) as e:
             if not isinstance(e, PermissionError) and getattr(e, "errno", None) != 13:
                 raise
-            alt = os.path.join(
-                "reports",
+            alt = reports_path(
                 f"accessibility_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             )
             with open(alt, "w", encoding="utf-8-sig", newline="") as f:
@@ -1234,202 +1324,25 @@ class EnhancedScreenReader:
         batch_size = 20
         total_elements = len(elements)
         rows_data = []  # (info, row_list, attrs) pour XPath complet + rapport DOM batch
+        extract_options = batch_extract_options(self.max_text_length)
 
         for batch_start in range(0, total_elements, batch_size):
             batch_end = min(batch_start + batch_size, total_elements)
             batch = elements[batch_start:batch_end]
 
             # Récupération groupée (script partagé avec DOMAnalyzer — voir dom_accessibility_from_batch)
-            batch_attrs = self.driver.execute_script(DOM_BATCH_EXTRACT_SCRIPT, batch) or []
-            
+            batch_attrs = self.driver.execute_script(DOM_BATCH_EXTRACT_SCRIPT, batch, extract_options) or []
+            self._extraction_bytes += estimate_payload_bytes(batch_attrs)
+
             # Traitement des résultats du lot
             for j, attrs in enumerate(batch_attrs):
                 try:
-                    # Construction du dictionnaire d'informations
-                    info = {
-                        "Type": attrs['tag'],
-                        "Rôle": attrs['role'] or "non défini",
-                        "Aria-label": attrs['ariaLabel'] or "non défini",
-                        "Aria-describedby": attrs['ariaDescribedby'] or "non défini",
-                        "Aria-labelledby": attrs['ariaLabelledby'] or "non défini",
-                        "Aria-hidden": attrs['ariaHidden'] or "non défini",
-                        "Aria-expanded": attrs['ariaExpanded'] or "non défini",
-                        "Aria-controls": attrs['ariaControls'] or "non défini",
-                        "Aria-live": attrs['ariaLive'] or "non défini",
-                        "Aria-atomic": attrs['ariaAtomic'] or "non défini",
-                        "Aria-relevant": attrs['ariaRelevant'] or "non défini",
-                        "Aria-busy": attrs['ariaBusy'] or "non défini",
-                        "Aria-current": attrs['ariaCurrent'] or "non défini",
-                        "Aria-posinset": attrs['ariaPosinset'] or "non défini",
-                        "Aria-setsize": attrs['ariaSetsize'] or "non défini",
-                        "Aria-level": attrs['ariaLevel'] or "non défini",
-                        "Aria-sort": attrs['ariaSort'] or "non défini",
-                        "Aria-valuemin": attrs['ariaValuemin'] or "non défini",
-                        "Aria-valuemax": attrs['ariaValuemax'] or "non défini",
-                        "Aria-valuenow": attrs['ariaValuenow'] or "non défini",
-                        "Aria-valuetext": attrs['ariaValuetext'] or "non défini",
-                        "Aria-haspopup": attrs['ariaHaspopup'] or "non défini",
-                        "Aria-invalid": attrs['ariaInvalid'] or "non défini",
-                        "Aria-required": attrs['ariaRequired'] or "non défini",
-                        "Aria-readonly": attrs['ariaReadonly'] or "non défini",
-                        "Aria-disabled": attrs['ariaDisabled'] or "non défini",
-                        "Aria-selected": attrs['ariaSelected'] or "non défini",
-                        "Aria-checked": attrs['ariaChecked'] or "non défini",
-                        "Aria-pressed": attrs['ariaPressed'] or "non défini",
-                        "Aria-multiline": attrs['ariaMultiline'] or "non défini",
-                        "Aria-multiselectable": attrs['ariaMultiselectable'] or "non défini",
-                        "Aria-orientation": attrs['ariaOrientation'] or "non défini",
-                        "Aria-placeholder": attrs['ariaPlaceholder'] or "non défini",
-                        "Aria-roledescription": attrs['ariaRoledescription'] or "non défini",
-                        "Aria-keyshortcuts": attrs['ariaKeyshortcuts'] or "non défini",
-                        "Aria-details": attrs['ariaDetails'] or "non défini",
-                        "Aria-errormessage": attrs['ariaErrormessage'] or "non défini",
-                        "Aria-flowto": attrs['ariaFlowto'] or "non défini",
-                        "Aria-owns": attrs['ariaOwns'] or "non défini",
-                        "Tabindex": attrs['tabindex'] or "non défini",
-                        "Title": attrs['title'] or "non défini",
-                        "Alt": attrs['alt'] or "non défini",
-                        "Text": attrs['text'] or "non défini",
-                        "Visible": "Oui" if attrs['isVisible'] else "Non",
-                        "Focusable": "Oui" if attrs['isFocusable'] else "Non",
-                        "Id": attrs['id'] or "non défini",
-                        "Sélecteur": self._get_simple_selector_from_attrs(attrs),
-                        "Extrait HTML": (attrs['outerHTML'] or '')[:200] + '...',
-                        "MediaPath": attrs['mediaPath'] or "non défini",
-                        "MediaType": attrs['mediaType'] or "non défini",
-                        # Positions DOM si fournies
-                        "Dom-absolute-position": attrs.get('absIndex') if isinstance(attrs, dict) and 'absIndex' in attrs else ("non défini"),
-                        "Parent-absolute-position": attrs.get('parentAbsIndex') if isinstance(attrs, dict) and 'parentAbsIndex' in attrs else ("non défini"),
-                        "Dom-position": attrs.get('domIndex') if isinstance(attrs, dict) and 'domIndex' in attrs else ("non défini"),
-                        "Parent-position": attrs.get('parentIndex') if isinstance(attrs, dict) and 'parentIndex' in attrs else ("non défini")
-                    }
-                    
-                    # XPath pendant les lots : simple (chemin complet calculé après tous les lots)
-                    info["main_xpath"] = self._generate_simple_xpath(attrs)
-                    info["secondary_xpath1"] = self._generate_secondary_xpath1(attrs)
-                    info["secondary_xpath2"] = self._generate_secondary_xpath2(attrs)
-                    
-                    # Génération de sélecteurs CSS alternatifs
-                    css_selectors = self.css_generator.generate_css_selectors_from_attrs(attrs)
-                    info["main_css"] = css_selectors["main_css"]
-                    info["secondary_css1"] = css_selectors["secondary_css1"]
-                    info["secondary_css2"] = css_selectors["secondary_css2"]
-                    
-                    # Ajouter le contexte de frame
-                    info["Frame-src"] = getattr(self, '_current_frame_src', "")
-                    info["Frame-index"] = getattr(self, '_current_frame_index', -1)
-
-                    # Construction de la ligne CSV avec toutes les données ARIA
-                    row = [
-                        self._clean_csv_field(info["Type"]),
-                        self._clean_csv_field(info["Sélecteur"]),
-                        self._clean_csv_field(info["Extrait HTML"]),
-                        self._clean_csv_field(info["Rôle"]),
-                        self._clean_csv_field(info["Aria-label"]),
-                        self._clean_csv_field(info["Text"]),
-                        self._clean_csv_field(info["Alt"]),
-                        self._clean_csv_field(info["Title"]),
-                        self._clean_csv_field(info["Visible"]),
-                        self._clean_csv_field(info["Focusable"]),
-                        self._clean_csv_field(info["Id"]),
-                        # Nouvelles colonnes ARIA pour les outils de narration
-                        self._clean_csv_field(info["Aria-describedby"]),
-                        self._clean_csv_field(info["Aria-labelledby"]),
-                        self._clean_csv_field(info["Aria-hidden"]),
-                        self._clean_csv_field(info["Aria-expanded"]),
-                        self._clean_csv_field(info["Aria-controls"]),
-                        self._clean_csv_field(info["Aria-live"]),
-                        self._clean_csv_field(info["Aria-atomic"]),
-                        self._clean_csv_field(info["Aria-relevant"]),
-                        self._clean_csv_field(info["Aria-busy"]),
-                        self._clean_csv_field(info["Aria-current"]),
-                        self._clean_csv_field(info["Aria-posinset"]),
-                        self._clean_csv_field(info["Aria-setsize"]),
-                        self._clean_csv_field(info["Aria-level"]),
-                        self._clean_csv_field(info["Aria-sort"]),
-                        self._clean_csv_field(info["Aria-valuemin"]),
-                        self._clean_csv_field(info["Aria-valuemax"]),
-                        self._clean_csv_field(info["Aria-valuenow"]),
-                        self._clean_csv_field(info["Aria-valuetext"]),
-                        self._clean_csv_field(info["Aria-haspopup"]),
-                        self._clean_csv_field(info["Aria-invalid"]),
-                        self._clean_csv_field(info["Aria-required"]),
-                        self._clean_csv_field(info["Aria-readonly"]),
-                        self._clean_csv_field(info["Aria-disabled"]),
-                        self._clean_csv_field(info["Aria-selected"]),
-                        self._clean_csv_field(info["Aria-checked"]),
-                        self._clean_csv_field(info["Aria-pressed"]),
-                        self._clean_csv_field(info["Aria-multiline"]),
-                        self._clean_csv_field(info["Aria-multiselectable"]),
-                        self._clean_csv_field(info["Aria-orientation"]),
-                        self._clean_csv_field(info["Aria-placeholder"]),
-                        self._clean_csv_field(info["Aria-roledescription"]),
-                        self._clean_csv_field(info["Aria-keyshortcuts"]),
-                        self._clean_csv_field(info["Aria-details"]),
-                        self._clean_csv_field(info["Aria-errormessage"]),
-                        self._clean_csv_field(info["Aria-flowto"]),
-                        self._clean_csv_field(info["Aria-owns"]),
-                        self._clean_csv_field(info["Tabindex"]),
-                        # Positions DOM
-                        self._clean_csv_field(info.get("Dom-absolute-position", "")),
-                        self._clean_csv_field(info.get("Parent-absolute-position", "")),
-                        self._clean_csv_field(info.get("Dom-position", "")),
-                        self._clean_csv_field(info.get("Parent-position", "")),
-                        # Contexte iframe
-                        self._clean_csv_field(info.get("Frame-src", "")),
-                        self._clean_csv_field(info.get("Frame-index", "")),
-                        self._clean_csv_field(info["main_xpath"]),
-                        self._clean_csv_field(info.get("xpath_complet", "")),
-                        self._clean_csv_field(info["secondary_xpath1"]),
-                        self._clean_csv_field(info["secondary_xpath2"]),
-                        # Sélecteurs CSS alternatifs
-                        self._clean_csv_field(info["main_css"]),
-                        self._clean_csv_field(info["secondary_css1"]),
-                        self._clean_csv_field(info["secondary_css2"])
-                    ]
-                    an = attrs.get("accessibleName") or {}
-                    rpg = attrs.get("rectPage") or {}
-                    cs = attrs.get("computedStyle") or {}
-                    style_short = " ".join(
-                        x for x in (cs.get("display"), cs.get("visibility"), cs.get("opacity")) if x
-                    ).strip()
-                    rect_s = ""
-                    if isinstance(rpg, dict) and rpg:
-                        rect_s = f"{rpg.get('x', '')},{rpg.get('y', '')},{rpg.get('width', '')},{rpg.get('height', '')}"
-                    row.extend([
-                        self._clean_csv_field((attrs.get("innerText") or "").strip()),
-                        self._clean_csv_field(attrs.get("nameAttr") or ""),
-                        self._clean_csv_field(attrs.get("inputType") or ""),
-                        self._clean_csv_field(attrs.get("value") or ""),
-                        self._clean_csv_field(attrs.get("placeholder") or ""),
-                        self._clean_csv_field("Oui" if attrs.get("hasLabelFor") else "Non"),
-                        self._clean_csv_field(an.get("name", "")),
-                        self._clean_csv_field(an.get("source", "")),
-                        self._clean_csv_field("Oui" if attrs.get("isDisplayed") else "Non"),
-                        self._clean_csv_field(rect_s or "non défini"),
-                        self._clean_csv_field(style_short or "non défini"),
-                    ])
-                    rows_data.append((info, row, attrs))
-                    try:
-                        sk = self._get_shared_element_key(batch[j])
-                        self.aria_data_by_element[sk] = info
-                    except Exception:
-                        pass
+                    rows_data.append(self._integrate_attrs_row(attrs, category_name, batch[j]))
 
-                    # Analyse des non-conformités (avec XPath simple ; le CSV aura le XPath complet)
-                    self._analyze_non_conformites(info, category_name, batch[j])
-                    
-                    # Stocker les attributs ARIA pour affichage après la progression
-                    aria_attrs = {k: v for k, v in info.items() if k.startswith("Aria-") and v != "non défini"}
-                    if aria_attrs:
-                        if not hasattr(self, '_aria_attrs_to_log'):
-                            self._aria_attrs_to_log = []
-                        self._aria_attrs_to_log.append((category_name, aria_attrs))
-                    
                     # Affichage de la progression
                     current_index = batch_start + j + 1
                     self._print_progress(current_index, total_elements, prefix=f"Analyse {category_name}:", suffix=f"{current_index}/{total_elements}")
-                        
+
                 except Exception as e:
                     self.logger.debug(f"Erreur lors de l'analyse de l'élément {category_name}: {str(e)}")
                     continue
@@ -1438,32 +1351,236 @@ class EnhancedScreenReader:
         if rows_data:
             abs_indices = [info.get("Dom-absolute-position") for info, _, _ in rows_data]
             full_xpaths = self._compute_full_xpaths_from_abs_indices(abs_indices)
-            header_parts = self.csv_lines[0].split(";")
+            self._flush_integrated_rows(rows_data, full_xpaths)
+
+    def _analyze_snapshot_integrated(self, snapshot_attrs, category_name):
+        """Variante snapshot de `_analyze_elements_integrated` : les dicts viennent d'un seul appel
+        DOM_SNAPSHOT_SCRIPT (XPath complets déjà calculés dans la page), sans WebElement."""
+        total_elements = len(snapshot_attrs)
+        rows_data = []
+        for i, attrs in enumerate(snapshot_attrs):
             try:
-                ix_xpath_simple = header_parts.index("X-path simplifié")
-                ix_xpath_full = header_parts.index("X-path complet")
-            except ValueError:
-                ix_xpath_simple = ix_xpath_full = None
-            for i, (info, row_list, attrs) in enumerate(rows_data):
-                xp = ""
-                if i < len(full_xpaths) and full_xpaths[i]:
-                    xp = full_xpaths[i]
-                if xp:
-                    info["main_xpath"] = xp
-                    if ix_xpath_simple is not None and ix_xpath_simple < len(row_list):
-                        row_list[ix_xpath_simple] = self._clean_csv_field(xp)
-                    if ix_xpath_full is not None and ix_xpath_full < len(row_list):
-                        row_list[ix_xpath_full] = self._clean_csv_field(xp)
-                if self.emit_dom_rapport:
-                    rec = build_dom_element_record(
-                        attrs, info["main_xpath"], stable_css_selector_from_attrs(attrs)
-                    )
-                    check_accessibility_issues_from_dict(rec, self._dom_report_issues)
-                    self._dom_report_elements.append(rec)
-                self.csv_lines.append(";".join(row_list))
+                rows_data.append(self._integrate_attrs_row(attrs, category_name))
+                self._print_progress(i + 1, total_elements, prefix=f"Analyse {category_name}:", suffix=f"{i + 1}/{total_elements}")
+            except Exception as e:
+                self.logger.debug(f"Erreur lors de l'analyse de l'élément {category_name}: {str(e)}")
+                continue
+        if rows_data:
+            self._flush_integrated_rows(rows_data, [attrs.get("xpath") or "" for _, _, attrs in rows_data])
+
+    def _integrate_attrs_row(self, attrs, category_name, element=None):
+        """Construit info + ligne CSV pour un dict extrait (lots ou snapshot) et analyse les non-conformités.
+        Retourne (info, row, attrs) ; `element` (WebElement) est facultatif."""
+        # Construction du dictionnaire d'informations
+        info = {
+            "Type": attrs['tag'],
+            "Rôle": attrs['role'] or "non défini",
+            "Aria-label": attrs['ariaLabel'] or "non défini",
+            "Aria-describedby": attrs['ariaDescribedby'] or "non défini",
+            "Aria-labelledby": attrs['ariaLabelledby'] or "non défini",
+            "Aria-hidden": attrs['ariaHidden'] or "non défini",
+            "Aria-expanded": attrs['ariaExpanded'] or "non défini",
+            "Aria-controls": attrs['ariaControls'] or "non défini",
+            "Aria-live": attrs['ariaLive'] or "non défini",
+            "Aria-atomic": attrs['ariaAtomic'] or "non défini",
+            "Aria-relevant": attrs['ariaRelevant'] or "non défini",
+            "Aria-busy": attrs['ariaBusy'] or "non défini",
+            "Aria-current": attrs['ariaCurrent'] or "non défini",
+            "Aria-posinset": attrs['ariaPosinset'] or "non défini",
+            "Aria-setsize": attrs['ariaSetsize'] or "non défini",
+            "Aria-level": attrs['ariaLevel'] or "non défini",
+            "Aria-sort": attrs['ariaSort'] or "non défini",
+            "Aria-valuemin": attrs['ariaValuemin'] or "non défini",
+            "Aria-valuemax": attrs['ariaValuemax'] or "non défini",
+            "Aria-valuenow": attrs['ariaValuenow'] or "non défini",
+            "Aria-valuetext": attrs['ariaValuetext'] or "non défini",
+            "Aria-haspopup": attrs['ariaHaspopup'] or "non défini",
+            "Aria-invalid": attrs['ariaInvalid'] or "non défini",
+            "Aria-required": attrs['ariaRequired'] or "non défini",
+            "Aria-readonly": attrs['ariaReadonly'] or "non défini",
+            "Aria-disabled": attrs['ariaDisabled'] or "non défini",
+            "Aria-selected": attrs['ariaSelected'] or "non défini",
+            "Aria-checked": attrs['ariaChecked'] or "non défini",
+            "Aria-pressed": attrs['ariaPressed'] or "non défini",
+            "Aria-multiline": attrs['ariaMultiline'] or "non défini",
+            "Aria-multiselectable": attrs['ariaMultiselectable'] or "non défini",
+            "Aria-orientation": attrs['ariaOrientation'] or "non défini",
+            "Aria-placeholder": attrs['ariaPlaceholder'] or "non défini",
+            "Aria-roledescription": attrs['ariaRoledescription'] or "non défini",
+            "Aria-keyshortcuts": attrs['ariaKeyshortcuts'] or "non défini",
+            "Aria-details": attrs['ariaDetails'] or "non défini",
+            "Aria-errormessage": attrs['ariaErrormessage'] or "non défini",
+            "Aria-flowto": attrs['ariaFlowto'] or "non défini",
+            "Aria-owns": attrs['ariaOwns'] or "non défini",
+            "Tabindex": attrs['tabindex'] or "non défini",
+            "Title": attrs['title'] or "non défini",
+            "Alt": attrs['alt'] or "non défini",
+            "Text": attrs['text'] or "non défini",
+            "Visible": "Oui" if attrs['isVisible'] else "Non",
+            "Focusable": "Oui" if attrs['isFocusable'] else "Non",
+            "Id": attrs['id'] or "non défini",
+            "Sélecteur": self._get_simple_selector_from_attrs(attrs),
+            "Extrait HTML": (attrs['outerHTML'] or '')[:DOM_SNIPPET_MAX_HTML] + '...',
+            "MediaPath": attrs['mediaPath'] or "non défini",
+            "MediaType": attrs['mediaType'] or "non défini",
+            # Positions DOM si fournies
+            "Dom-absolute-position": attrs.get('absIndex') if isinstance(attrs, dict) and 'absIndex' in attrs else ("non défini"),
+            "Parent-absolute-position": attrs.get('parentAbsIndex') if isinstance(attrs, dict) and 'parentAbsIndex' in attrs else ("non défini"),
+            "Dom-position": attrs.get('domIndex') if isinstance(attrs, dict) and 'domIndex' in attrs else ("non défini"),
+            "Parent-position": attrs.get('parentIndex') if isinstance(attrs, dict) and 'parentIndex' in attrs else ("non défini")
+        }
+        
+        # XPath pendant les lots : simple (chemin complet calculé après tous les lots)
+        info["main_xpath"] = self._generate_simple_xpath(attrs)
+        info["secondary_xpath1"] = self._generate_secondary_xpath1(attrs)
+        info["secondary_xpath2"] = self._generate_secondary_xpath2(attrs)
+        
+        # Génération de sélecteurs CSS alternatifs
+        css_selectors = self.css_generator.generate_css_selectors_from_attrs(attrs)
+        info["main_css"] = css_selectors["main_css"]
+        info["secondary_css1"] = css_selectors["secondary_css1"]
+        info["secondary_css2"] = css_selectors["secondary_css2"]
+        
+        # Ajouter le contexte de frame
+        info["Frame-src"] = getattr(self, '_current_frame_src', "")
+        info["Frame-index"] = getattr(self, '_current_frame_index', -1)
+
+        # Construction de la ligne CSV avec toutes les données ARIA
+        row = [
+            self._clean_csv_field(info["Type"]),
+            self._clean_csv_field(info["Sélecteur"]),
+            self._clean_csv_field(info["Extrait HTML"]),
+            self._clean_csv_field(info["Rôle"]),
+            self._clean_csv_field(info["Aria-label"]),
+            self._clean_csv_field(info["Text"]),
+            self._clean_csv_field(info["Alt"]),
+            self._clean_csv_field(info["Title"]),
+            self._clean_csv_field(info["Visible"]),
+            self._clean_csv_field(info["Focusable"]),
+            self._clean_csv_field(info["Id"]),
+            # Nouvelles colonnes ARIA pour les outils de narration
+            self._clean_csv_field(info["Aria-describedby"]),
+            self._clean_csv_field(info["Aria-labelledby"]),
+            self._clean_csv_field(info["Aria-hidden"]),
+            self._clean_csv_field(info["Aria-expanded"]),
+            self._clean_csv_field(info["Aria-controls"]),
+            self._clean_csv_field(info["Aria-live"]),
+            self._clean_csv_field(info["Aria-atomic"]),
+            self._clean_csv_field(info["Aria-relevant"]),
+            self._clean_csv_field(info["Aria-busy"]),
+            self._clean_csv_field(info["Aria-current"]),
+            self._clean_csv_field(info["Aria-posinset"]),
+            self._clean_csv_field(info["Aria-setsize"]),
+            self._clean_csv_field(info["Aria-level"]),
+            self._clean_csv_field(info["Aria-sort"]),
+            self._clean_csv_field(info["Aria-valuemin"]),
+            self._clean_csv_field(info["Aria-valuemax"]),
+            self._clean_csv_field(info["Aria-valuenow"]),
+            self._clean_csv_field(info["Aria-valuetext"]),
+            self._clean_csv_field(info["Aria-haspopup"]),
+            self._clean_csv_field(info["Aria-invalid"]),
+            self._clean_csv_field(info["Aria-required"]),
+            self._clean_csv_field(info["Aria-readonly"]),
+            self._clean_csv_field(info["Aria-disabled"]),
+            self._clean_csv_field(info["Aria-selected"]),
+            self._clean_csv_field(info["Aria-checked"]),
+            self._clean_csv_field(info["Aria-pressed"]),
+            self._clean_csv_field(info["Aria-multiline"]),
+            self._clean_csv_field(info["Aria-multiselectable"]),
+            self._clean_csv_field(info["Aria-orientation"]),
+            self._clean_csv_field(info["Aria-placeholder"]),
+            self._clean_csv_field(info["Aria-roledescription"]),
+            self._clean_csv_field(info["Aria-keyshortcuts"]),
+            self._clean_csv_field(info["Aria-details"]),
+            self._clean_csv_field(info["Aria-errormessage"]),
+            self._clean_csv_field(info["Aria-flowto"]),
+            self._clean_csv_field(info["Aria-owns"]),
+            self._clean_csv_field(info["Tabindex"]),
+            # Positions DOM
+            self._clean_csv_field(info.get("Dom-absolute-position", "")),
+            self._clean_csv_field(info.get("Parent-absolute-position", "")),
+            self._clean_csv_field(info.get("Dom-position", "")),
+            self._clean_csv_field(info.get("Parent-position", "")),
+            # Contexte iframe
+            self._clean_csv_field(info.get("Frame-src", "")),
+            self._clean_csv_field(info.get("Frame-index", "")),
+            self._clean_csv_field(info["main_xpath"]),
+            self._clean_csv_field(info.get("xpath_complet", "")),
+            self._clean_csv_field(info["secondary_xpath1"]),
+            self._clean_csv_field(info["secondary_xpath2"]),
+            # Sélecteurs CSS alternatifs
+            self._clean_csv_field(info["main_css"]),
+            self._clean_csv_field(info["secondary_css1"]),
+            self._clean_csv_field(info["secondary_css2"])
+        ]
+        an = attrs.get("accessibleName") or {}
+        rpg = attrs.get("rectPage") or {}
+        cs = attrs.get("computedStyle") or {}
+        style_short = " ".join(
+            x for x in (cs.get("display"), cs.get("visibility"), cs.get("opacity")) if x
+        ).strip()
+        rect_s = ""
+        if isinstance(rpg, dict) and rpg:
+            rect_s = f"{rpg.get('x', '')},{rpg.get('y', '')},{rpg.get('width', '')},{rpg.get('height', '')}"
+        row.extend([
+            self._clean_csv_field((attrs.get("innerText") or "").strip()),
+            self._clean_csv_field(attrs.get("nameAttr") or ""),
+            self._clean_csv_field(attrs.get("inputType") or ""),
+            self._clean_csv_field(attrs.get("value") or ""),
+            self._clean_csv_field(attrs.get("placeholder") or ""),
+            self._clean_csv_field("Oui" if attrs.get("hasLabelFor") else "Non"),
+            self._clean_csv_field(an.get("name", "")),
+            self._clean_csv_field(an.get("source", "")),
+            self._clean_csv_field("Oui" if attrs.get("isDisplayed") else "Non"),
+            self._clean_csv_field(rect_s or "non défini"),
+            self._clean_csv_field(style_short or "non défini"),
+        ])
+        if element is not None:
+            try:
+                sk = self._get_shared_element_key(element)
+                self.aria_data_by_element[sk] = info
+            except Exception:
+                pass
+
+        # Analyse des non-conformités (avec XPath simple ; le CSV aura le XPath complet)
+        self._analyze_non_conformites(info, category_name, element, attrs=attrs)
+        
+        # Stocker les attributs ARIA pour affichage après la progression
+        aria_attrs = {k: v for k, v in info.items() if k.startswith("Aria-") and v != "non défini"}
+        if aria_attrs:
+            if not hasattr(self, '_aria_attrs_to_log'):
+                self._aria_attrs_to_log = []
+            self._aria_attrs_to_log.append((category_name, aria_attrs))
+        return info, row, attrs
+
+    def _flush_integrated_rows(self, rows_data, full_xpaths):
+        """Applique les XPath complets, alimente le rapport DOM batch et ajoute les lignes au CSV."""
+        header_parts = self.csv_lines[0].split(";")
+        try:
+            ix_xpath_simple = header_parts.index("X-path simplifié")
+            ix_xpath_full = header_parts.index("X-path complet")
+        except ValueError:
+            ix_xpath_simple = ix_xpath_full = None
+        for i, (info, row_list, attrs) in enumerate(rows_data):
+            xp = ""
+            if i < len(full_xpaths) and full_xpaths[i]:
+                xp = full_xpaths[i]
+            if xp:
+                info["main_xpath"] = xp
+                if ix_xpath_simple is not None and ix_xpath_simple < len(row_list):
+                    row_list[ix_xpath_simple] = self._clean_csv_field(xp)
+                if ix_xpath_full is not None and ix_xpath_full < len(row_list):
+                    row_list[ix_xpath_full] = self._clean_csv_field(xp)
+            if self.emit_dom_rapport:
+                rec = build_dom_element_record(
+                    attrs, info["main_xpath"], stable_css_selector_from_attrs(attrs)
+                )
+                check_accessibility_issues_from_dict(rec, self._dom_report_issues)
+                self._dom_report_elements.append(rec)
+            self.csv_lines.append(";".join(row_list))
 
     def _compute_full_xpaths_from_abs_indices(self, abs_indices):
-        """Calcule les XPath absolus complets à partir des positions absolues (un seul appel JS)."""
+        """Calcule les XPath absolus complets à partir des positions absolues (un seul appel JS, index de positions partagé)."""
         if not abs_indices:
             return []
         try:
@@ -1478,42 +1595,8 @@ class EnhancedScreenReader:
                         indices.append(n if n >= 1 else -1)
                     except (TypeError, ValueError):
                         indices.append(-1)
-            xpaths = self.driver.execute_script('''
-                var indices = arguments[0];
-                var all = document.querySelectorAll("*");
-                var result = [];
-                function getPathForElement(el) {
-                    var path = [];
-                    var current = el;
-                    while (current && current.nodeType === 1) {
-                        var tag = current.tagName.toLowerCase();
-                        if (tag === "html") break;
-                        var parent = current.parentNode;
-                        if (!parent) break;
-                        var sameTag = 0;
-                        for (var i = 0; i < parent.children.length; i++) {
-                            var c = parent.children[i];
-                            if (c.tagName && c.tagName.toLowerCase() === tag) {
-                                sameTag++;
-                                if (c === current) break;
-                            }
-                        }
-                        path.unshift(tag + "[" + sameTag + "]");
-                        current = parent;
-                    }
-                    return path.length ? "/html/" + path.join("/") : "";
-                }
-                for (var k = 0; k < indices.length; k++) {
-                    var idx = indices[k];
-                    if (typeof idx !== "number" || idx < 1 || idx > all.length) {
-                        result.push("");
-                        continue;
-                    }
-                    var el = all[idx - 1];
-                    result.push(getPathForElement(el));
-                }
-                return result;
-            ''', indices)
+            xpaths = self.driver.execute_script(DOM_FULL_XPATHS_SCRIPT, indices)
+            self._extraction_bytes += estimate_payload_bytes(xpaths)
             return xpaths if isinstance(xpaths, list) else []
         except Exception as e:
             self.logger.debug(f"Calcul XPath par positions absolues : {e}")
@@ -1569,7 +1652,7 @@ class EnhancedScreenReader:
                     report.append(f"- **Recommandation**: {issue['recommandation']}\n")
 
         # Mini résumé Titles (si disponible)
-        titles_report_path = "reports/titles_report.md"
+        titles_report_path = reports_path("titles_report.md")
         if os.path.exists(titles_report_path):
             try:
                 with open(titles_report_path, "r", encoding="utf-8") as tf:
@@ -1614,5 +1697,5 @@ class EnhancedScreenReader:
                 self.logger.debug(f"Impossible d'ajouter le mini résumé Titles: {e}")
         
         # Écrire le rapport dans un fichier
-        with open('reports/accessibility_report.md', 'w', encoding='utf-8') as f:
+        with open(reports_path('accessibility_report.md'), 'w', encoding='utf-8') as f:
             f.write('\n'.join(report))
@@ -1,12 +1,9 @@
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.action_chains import ActionChains
-import os
-from PIL import Image, ImageDraw
-import io
 import time
-from selenium.webdriver.support.ui import WebDriverWait
 import logging
+from utils.focus_capture import FocusCapture
+from utils.focus_tracker import FocusTracker, focus_identifier
 from utils.log_utils import log_with_step
+from utils.page_readiness import wait_for_page_ready
 
 class EnhancedTabNavigator:
     def __init__(
@@ -17,6 +14,8 @@ class EnhancedTabNavigator:
         shared_data=None,
         second_screenshot=False,
         second_screenshot_delay=0.5,
+        focus_capture_mode='viewport',
+        thumbnail_scale=None,
     ):
         self.driver = driver
         self.logger = logger
@@ -24,67 +23,18 @@ class EnhancedTabNavigator:
         self.shared_data = shared_data  # Référence vers les données partagées
         self.second_screenshot = bool(second_screenshot)
         self.second_screenshot_delay = max(0.0, float(second_screenshot_delay))
+        # 'clip' = zone autour de l'élément seulement ; vignette du viewport si thumbnail_scale (ex. 0.25)
+        self.focus_capture_mode = focus_capture_mode
+        self.thumbnail_scale = thumbnail_scale
+        self.focus_capture = None
         self.aria_analysis_results = []  # Stockage des résultats d'analyse ARIA
 
-    def _get_image_alt_from_link(self, element):
-        """Récupère l'attribut alt d'une image associée à un lien"""
-        try:
-            # Vérifier si l'élément est un lien
-            if element.tag_name.lower() != 'a':
-                return None
-            
-            # Chercher une image dans le lien
-            img_alt = self.driver.execute_script("""
-                var link = arguments[0];
-                var img = link.querySelector('img');
-                if (img) {
-                    return img.getAttribute('alt');
-                }
-                return null;
-            """, element)
-            
-            return img_alt if img_alt else None
-        except Exception as e:
-            self.logger.debug(f"Erreur lors de la récupération de l'alt de l'image du lien: {e}")
-            return None
-
-    def _get_parent_aria_roles(self, element):
-        """Récupère les rôles ARIA des éléments parents"""
-        try:
-            # Remonter dans la hiérarchie DOM pour collecter les rôles ARIA des parents
-            parent_roles = self.driver.execute_script("""
-                var element = arguments[0];
-                var roles = [];
-                var parent = element.parentElement;
-                
-                // Parcourir les parents jusqu'à la racine
-                while (parent && parent !== document.body && parent !== document.documentElement) {
-                    var role = parent.getAttribute('role');
-                    if (role) {
-                        roles.push(role);
-                    }
-                    parent = parent.parentElement;
-                }
-                
-                return roles;
-            """, element)
-            
-            # Retourner les rôles séparés par " / " s'il y en a plusieurs
-            if parent_roles:
-                return " / ".join(parent_roles)
-            return None
-        except Exception as e:
-            self.logger.debug(f"Erreur lors de la récupération des rôles ARIA des parents: {e}")
-            return None
-
-    def _get_aria_data_for_element(self, element):
+    def _get_aria_data_for_element(self, element_id):
         """Récupère les données ARIA d'un élément depuis les données partagées"""
         if not self.shared_data:
             return {}
             
         try:
-            # Générer un identifiant unique pour l'élément
-            element_id = self._get_element_identifier(element)
             
             # Récupérer les données ARIA depuis les données partagées
             aria_data = self.shared_data.get_aria_data(element_id)
@@ -100,25 +50,26 @@ class EnhancedTabNavigator:
             self.logger.warning(f"Erreur lors de la récupération des données ARIA: {e}")
             return {}
 
-    def _analyze_element_with_aria(self, element, index):
-        """Analyse un élément avec ses données ARIA"""
+    def _analyze_element_with_aria(self, descriptor, index):
+        """Analyse un élément (descripteur focusin) avec ses données ARIA"""
         try:
+            # Identifiant unique (même format que _get_element_identifier)
+            element_id = focus_identifier(descriptor)
+            
             # Récupérer les données ARIA
-            aria_data = self._get_aria_data_for_element(element)
+            aria_data = self._get_aria_data_for_element(element_id)
             
             # Informations de base de l'élément
-            tag = element.tag_name
-            text = element.text.strip() or element.get_attribute("alt") or element.get_attribute("title")
-            href = element.get_attribute("href")
+            attrs = descriptor['basic_attributes']
+            tag = descriptor['tag']
+            text = descriptor['text'] or attrs.get('alt') or attrs.get('title') or None
+            href = descriptor['href']
             
-            # Récupérer l'attribut alt d'une image associée au lien si c'est un lien
-            image_alt = self._get_image_alt_from_link(element)
+            # Attribut alt d'une image associée au lien si c'est un lien
+            image_alt = descriptor['image_alt'] or None
             
-            # Récupérer les rôles ARIA des éléments parents
-            parent_roles = self._get_parent_aria_roles(element)
-            
-            # Créer un identifiant unique
-            element_id = self._get_element_identifier(element)
+            # Rôles ARIA des éléments parents
+            parent_roles = " / ".join(descriptor['parent_roles']) or None
             
             # Analyser les propriétés ARIA
             aria_analysis = {
@@ -213,47 +164,6 @@ class EnhancedTabNavigator:
             self.logger.error(f"Erreur lors de l'analyse ARIA de l'élément: {e}")
             return None
 
-    def _get_element_identifier(self, element):
-        """Génère un identifiant unique pour un élément basé sur ses propriétés"""
-        try:
-            # Obtenir les propriétés de l'élément
-            tag = element.tag_name
-            text = element.text.strip() or ""
-            href = element.get_attribute("href") or ""
-            id_attr = element.get_attribute("id") or ""
-            class_attr = element.get_attribute("class") or ""
-            type_attr = element.get_attribute("type") or ""
-            
-            # Créer un identifiant basé sur les propriétés les plus stables
-            identifier_parts = [tag]
-            
-            if id_attr:
-                identifier_parts.append(f"id={id_attr}")
-            elif text:
-                identifier_parts.append(f"text={text[:50]}")  # Limiter la longueur
-            elif href:
-                identifier_parts.append(f"href={href[:50]}")
-            elif class_attr:
-                identifier_parts.append(f"class={class_attr[:30]}")
-            elif type_attr:
-                identifier_parts.append(f"type={type_attr}")
-            
-            # Ajouter la position pour différencier les éléments similaires
-            try:
-                rect = self.driver.execute_script("""
-                    var element = arguments[0];
-                    var rect = element.getBoundingClientRect();
-                    return Math.round(rect.left) + ',' + Math.round(rect.top);
-                """, element)
-                identifier_parts.append(f"pos={rect}")
-            except:
-                pass
-            
-            return "|".join(identifier_parts)
-        except Exception as e:
-            self.logger.warning(f"Erreur lors de la génération de l'identifiant: {e}")
-            return f"unknown_{hash(str(element))}"
-
     def _log_aria_analysis(self, aria_analysis):
         """Une ligne INFO par focus ; le détail complet est en DEBUG (--debug)."""
         if not aria_analysis:
@@ -342,90 +252,85 @@ class EnhancedTabNavigator:
             elements_reached = []
             visited_elements = set()
             
-            # Attendre que la page soit complètement chargée
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    lambda d: d.execute_script('return document.readyState') == 'complete'
-                )
-            except Exception as e:
-                self.logger.warning(f"Erreur lors de l'attente du chargement de la page: {str(e)}")
-            
-            # Attendre un peu plus pour le JavaScript
-            time.sleep(2)
+            # Attendre que la page soit stable (borne configurable, temps mesuré journalisé)
+            wait_for_page_ready(self.driver, logger=self.logger, step_tag="TABULATION")
             
-            for i in range(self.max_screenshots):
-                try:
-                    # Créer une nouvelle instance d'ActionChains à chaque itération
-                    action = ActionChains(self.driver)
-                    
-                    # Envoyer la touche TAB
-                    action.send_keys(Keys.TAB)
-                    action.perform()
-                    
-                    # Attendre un court instant pour que le focus soit appliqué
-                    time.sleep(0.1)
-                    
-                    # Récupérer l'élément actif
-                    active = self.driver.execute_script("return document.activeElement;")
-                    
-                    if not active:
-                        self.logger.warning("Aucun élément actif trouvé")
-                        continue
-                    
-                    # Vérifier que l'élément est toujours valide
-                    if self._is_element_stale(active):
-                        self.logger.warning(f"L'élément actif n'est plus valide à l'itération {i+1}")
-                        continue
-                    
-                    # Vérifier si l'élément est vraiment focusable avant de continuer
-                    if not self._is_element_focusable(active):
-                        self.logger.debug(f"Itération {i+1} : élément non focusable, ignoré")
-                        continue
-                    
-                    # Générer un identifiant unique pour l'élément actif
-                    element_id = self._get_element_identifier(active)
-                    
-                    # Vérifier si on a déjà visité cet élément (détection de cycle)
-                    if element_id in visited_elements:
-                        log_with_step(
-                            self.logger,
-                            logging.INFO,
-                            "TAB",
-                            f"Cycle détecté après {i+1} tabulations — fin de la navigation.",
-                        )
-                        break
-                    
-                    # Ajouter l'élément à la liste des éléments visités
-                    visited_elements.add(element_id)
-                    
-                    # Analyser l'élément avec ses données ARIA
-                    aria_analysis = self._analyze_element_with_aria(active, i)
-                    
-                    # Afficher l'analyse ARIA dans les logs
-                    self._log_aria_analysis(aria_analysis)
-                    
-                    # Prendre les captures d'écran
-                    filename1, filename2 = self._take_screenshots(active, i+1)
-                    
-                    # Logger les informations avec les noms des fichiers
-                    image_alt = self._get_image_alt_from_link(active)
-                    log_text = f"Focus sur: {active.tag_name}, texte: {active.text.strip()}"
-                    if image_alt:
-                        log_text += f", alt de l'image: {image_alt}"
-                    self.logger.debug(log_text)
-                    if filename1:
-                        self.logger.debug(f"Capture immédiate: {filename1}")
-                    if filename2:
-                        self.logger.debug(f"Capture après délai: {filename2}")
-                    
-                    elements_reached.append((active.tag_name, active.text.strip(), active.get_attribute("href"), image_alt))
-                    
-                except Exception as e:
-                    self.logger.error(f"Erreur lors de la tabulation {i+1}: {str(e)}")
-                    if "NoneType" in str(e):
-                        self.logger.error("Le driver n'est plus valide, arrêt de l'analyse")
-                        break
+            # Transitions de focus enregistrées dans la page (focusin) : un envoi de TAB et une
+            # vidange du tampon par étape, la fin de l'étape étant signalée par l'événement.
+            tracker = FocusTracker(self.driver)
+            self.focus_capture = FocusCapture(
+                self.driver, mode=self.focus_capture_mode, thumbnail_scale=self.thumbnail_scale
+            )
+            started = time.perf_counter()
+            steps = 0
+
+            for descriptor in tracker.walk(self.max_screenshots):
+                steps += 1
+                if descriptor.get('error'):
+                    self.logger.warning(f"Focus {descriptor['seq']} non décrit: {descriptor['error']}")
+                    continue
+
+                # Vérifier si l'élément est vraiment focusable avant de continuer
+                if not descriptor['focusable']:
+                    self.logger.debug(f"Itération {steps} : élément non focusable, ignoré")
                     continue
+
+                # Identifiant unique de l'élément actif (détection de cycle)
+                element_id = focus_identifier(descriptor)
+                if element_id in visited_elements:
+                    log_with_step(
+                        self.logger,
+                        logging.INFO,
+                        "TAB",
+                        f"Cycle détecté après {steps} tabulations — fin de la navigation.",
+                    )
+                    break
+                visited_elements.add(element_id)
+
+                # Analyser l'élément avec ses données ARIA
+                aria_analysis = self._analyze_element_with_aria(descriptor, steps - 1)
+
+                # Afficher l'analyse ARIA dans les logs
+                self._log_aria_analysis(aria_analysis)
+
+                # Prendre les captures d'écran
+                filename1, filename2, thumbnail, capture_ms = self._take_screenshots(descriptor, steps)
+                if aria_analysis:
+                    aria_analysis['screenshots'] = {
+                        'immediate': filename1, 'delayed': filename2, 'thumbnail': thumbnail
+                    }
+                    aria_analysis['capture_ms'] = round(capture_ms, 1)
+
+                # Logger les informations avec les noms des fichiers
+                image_alt = descriptor['image_alt'] or None
+                log_text = f"Focus sur: {descriptor['tag']}, texte: {descriptor['text']}"
+                if image_alt:
+                    log_text += f", alt de l'image: {image_alt}"
+                self.logger.debug(log_text)
+                if filename1:
+                    self.logger.debug(f"Capture immédiate: {filename1}")
+                if filename2:
+                    self.logger.debug(f"Capture après délai: {filename2}")
+
+                elements_reached.append((descriptor['tag'], descriptor['text'], descriptor['href'], image_alt))
+
+            elapsed = time.perf_counter() - started
+            # Attendre les écritures PNG encore en file
+            failures = self.focus_capture.close()
+            if failures:
+                self.logger.warning(f"{failures} capture(s) focus non écrite(s)")
+            costs = self.focus_capture.step_costs_ms
+            capture_summary = (
+                f", capture {sum(costs) / len(costs):.1f} ms/étape (mode {self.focus_capture_mode})"
+                if costs else ""
+            )
+            log_with_step(
+                self.logger,
+                logging.INFO,
+                "TAB",
+                f"{steps} transitions de focus en {elapsed:.2f}s "
+                f"({tracker.round_trips} appels WebDriver{capture_summary}).",
+            )
             
             # Message de fin de navigation
             if len(visited_elements) > 0:
@@ -486,139 +391,33 @@ class EnhancedTabNavigator:
             for role, count in sorted(roles.items()):
                 self.logger.info(f"  {role}: {count} élément(s)")
         
+        # Coût des captures par étape de focus
+        costs = [elem['capture_ms'] for elem in self.aria_analysis_results if elem.get('capture_ms')]
+        if costs:
+            self.logger.info(
+                f"Coût de capture par étape: moyenne {sum(costs) / len(costs):.1f} ms, "
+                f"max {max(costs):.1f} ms (mode {self.focus_capture_mode})"
+            )
+        
         self.logger.info("=" * 50)
 
-    # Méthodes héritées du TabNavigator original
-    def _is_element_stale(self, element):
-        """Vérifie si l'élément est toujours valide"""
+    def _take_screenshots(self, descriptor, index):
+        """
+        Prend des captures de l'élément focusé (rectangle issu du descripteur focusin). Seule la
+        capture est synchrone : décodage, encadrement et écriture PNG sont faits en tâche de fond.
+        """
         try:
-            element.tag_name
-            return False
-        except:
-            return True
-
-    def _is_element_focusable(self, element):
-        """Vérifie si un élément est vraiment focusable (pas juste tabbable)"""
-        try:
-            # Vérifier si l'élément est visible et interactif
-            is_visible = self.driver.execute_script("""
-                var element = arguments[0];
-                var rect = element.getBoundingClientRect();
-                var style = window.getComputedStyle(element);
-                return !(style.display === 'none' || 
-                        style.visibility === 'hidden' || 
-                        rect.width === 0 || 
-                        rect.height === 0);
-            """, element)
-            
-            if not is_visible:
-                return False
-            
-            # Vérifier si l'élément est interactif
-            is_interactive = self.driver.execute_script("""
-                var element = arguments[0];
-                var tag = element.tagName.toLowerCase();
-                var tabIndex = element.tabIndex;
-                var disabled = element.disabled;
-                
-                // Éléments naturellement focusables
-                if (['a', 'button', 'input', 'select', 'textarea'].includes(tag)) {
-                    return !disabled;
-                }
-                
-                // Éléments avec tabindex >= 0
-                if (tabIndex >= 0) {
-                    return !disabled;
-                }
-                
-                // Éléments avec role interactif
-                var role = element.getAttribute('role');
-                var interactiveRoles = ['button', 'link', 'menuitem', 'tab', 'option', 
-                                      'checkbox', 'radio', 'textbox', 'combobox', 
-                                      'slider', 'spinbutton'];
-                if (interactiveRoles.includes(role)) {
-                    return !disabled;
-                }
-                
-                return false;
-            """, element)
-            
-            return is_interactive
-            
-        except Exception as e:
-            self.logger.warning(f"Erreur lors de la vérification de la focusabilité: {e}")
-            return False
-
-    def _take_screenshots(self, element, index):
-        """Prend des captures d'écran de l'élément focusé"""
-        try:
-            # Vérifier d'abord si l'élément est vraiment focusable
-            if not self._is_element_focusable(element):
-                self.logger.debug(f"Élément {index} non focusable, pas de capture d'écran")
-                return None, None
-            
-            # Créer le dossier pour les captures d'écran si nécessaire
-            os.makedirs('reports/focus_screenshots', exist_ok=True)
-            
-            # Première capture immédiate
-            screenshot1 = self.driver.get_screenshot_as_png()
-            highlighted_img1 = self._highlight_element(element, screenshot1)
-            filename1 = f"reports/focus_screenshots/focus_{index:03d}_1.png"
-            highlighted_img1.save(filename1)
+            filename1, thumbnail = self.focus_capture.capture(descriptor, index, '1')
+            cost_ms = self.focus_capture.last_cost_ms
 
             filename2 = None
             if self.second_screenshot:
                 time.sleep(self.second_screenshot_delay)
-                screenshot2 = self.driver.get_screenshot_as_png()
-                highlighted_img2 = self._highlight_element(element, screenshot2)
-                filename2 = f"reports/focus_screenshots/focus_{index:03d}_2.png"
-                highlighted_img2.save(filename2)
+                filename2, _ = self.focus_capture.capture(descriptor, index, '2')
+                cost_ms += self.focus_capture.last_cost_ms
 
-            return filename1, filename2
+            return filename1, filename2, thumbnail, cost_ms
             
         except Exception as e:
             self.logger.error(f"Erreur lors de la capture d'écran {index}: {str(e)}")
-            return None, None
-
-    def _highlight_element(self, element, screenshot):
-        """Met en évidence l'élément dans la capture d'écran"""
-        # Convertir la capture d'écran en image PIL
-        img = Image.open(io.BytesIO(screenshot))
-        draw = ImageDraw.Draw(img)
-        
-        # Obtenir les coordonnées de l'élément
-        try:
-            rect = self.driver.execute_script("""
-                var element = arguments[0];
-                var rect = element.getBoundingClientRect();
-                return {
-                    x: Math.round(rect.left),
-                    y: Math.round(rect.top),
-                    width: Math.round(rect.width),
-                    height: Math.round(rect.height)
-                };
-            """, element)
-            
-            x1, y1 = rect['x'], rect['y']
-            x2, y2 = x1 + rect['width'], y1 + rect['height']
-            
-        except Exception as e:
-            self.logger.warning(f"Erreur lors du calcul des coordonnées: {e}")
-            location = element.location
-            size = element.size
-            x1, y1 = location['x'], location['y']
-            x2, y2 = x1 + size['width'], y1 + size['height']
-        
-        # Vérifier que les coordonnées sont dans les limites de l'image
-        img_width, img_height = img.size
-        x1 = max(0, min(x1, img_width))
-        y1 = max(0, min(y1, img_height))
-        x2 = max(0, min(x2, img_width))
-        y2 = max(0, min(y2, img_height))
-        
-        # Dessiner un rectangle rouge/jaune/rouge autour de l'élément
-        draw.rectangle([x1-2, y1-2, x2+2, y2+2], outline='red', width=2)
-        draw.rectangle([x1-1, y1-1, x2+1, y2+1], outline='yellow', width=1)
-        draw.rectangle([x1, y1, x2, y2], outline='red', width=1)
-        
-        return img
+            return None, None, None, 0.0
@@ -1,33 +1,41 @@
 import os
-import requests
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
-import hashlib
 from pathlib import Path
 import urllib3
 import warnings
 import logging
 import csv
 import codecs
+from utils.image_cache import DEFAULT_CACHE_DIR, ImageCache
+from utils.image_downloader import ImageDownloader
 from utils.log_utils import log_with_step
+from utils.page_readiness import wait_for_page_ready
+from utils.report_paths import run_path
 
 # Désactiver les avertissements SSL
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class ImageAnalyzer:
-    def __init__(self, driver, logger, base_url, output_dir="site_images"):
+    def __init__(self, driver, logger, base_url, output_dir="site_images", download_workers=8, download_per_host=4,
+                 cache_dir=None, cache_max_bytes=512 * 1024 * 1024):
         self.driver = driver
         self.logger = logger
         self.base_url = base_url
-        self.output_dir = output_dir
+        self.output_dir = run_path(output_dir)
+        # Téléchargement : workers au total et connexions simultanées par hôte
+        self.download_workers = download_workers
+        self.download_per_host = download_per_host
+        # Cache persistant entre exécutions (None = DEFAULT_CACHE_DIR du répertoire courant, '' = désactivé)
+        self.cache_dir = os.path.abspath(DEFAULT_CACHE_DIR) if cache_dir is None else cache_dir
+        self.cache_max_bytes = cache_max_bytes
         self.image_info_list = []
         self.detected_images = []
         
         # Créer le répertoire de sortie s'il n'existe pas
-        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
 
     def run(self):
         log_with_step(self.logger, logging.INFO, "IMAGES", "Analyse des images du site…")
@@ -37,13 +45,8 @@ class ImageAnalyzer:
             if not self.driver:
                 raise Exception("Le driver n'est pas initialisé")
             
-            # Attendre que la page soit complètement chargée
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    lambda d: d.execute_script('return document.readyState') == 'complete'
-                )
-            except Exception as e:
-                log_with_step(self.logger, logging.WARNING, "IMAGES", f"Erreur lors de l'attente du chargement de la page: {str(e)}")
+            # Attendre que la page soit stable (borne configurable, temps mesuré journalisé)
+            wait_for_page_ready(self.driver, logger=self.logger, step_tag="IMAGES")
             
             # Récupérer toutes les images
             self.detected_images = self._get_all_images()
@@ -62,8 +65,6 @@ class ImageAnalyzer:
                         image_info = self._analyze_image(image)
                         if image_info:
                             self.image_info_list.append(image_info)
-                            if image_info['src']:
-                                self._save_image(image_info)
                         
                         # Afficher la progression
                         progress = (index / total_images) * 100
@@ -78,6 +79,12 @@ class ImageAnalyzer:
                     log_with_step(self.logger, logging.WARNING, "IMAGES", f"Erreur lors de l'analyse d'une image : {str(e)}")
                     continue
             
+            # Téléchargement découplé de l'analyse DOM : un lot concurrent, dédoublonné par URL
+            try:
+                self._download_images()
+            except Exception as e:
+                log_with_step(self.logger, logging.ERROR, "IMAGES", f"Erreur lors du téléchargement des images : {str(e)}")
+            
             # Sauvegarder le rapport d'analyse
             try:
                 self._save_report()
@@ -272,42 +279,41 @@ class ImageAnalyzer:
         except:
             return False
 
-    def _save_image(self, image_info):
-        """Sauvegarde l'image localement"""
-        if not image_info['src']:
-            image_info['status'] = 'no_source'
+    def _download_images(self):
+        """Télécharge en parallèle les images analysées et renseigne statut et chemin local"""
+        urls = {}
+        for image_info in self.image_info_list:
+            if not image_info['src']:
+                image_info['status'] = 'no_source'
+                continue
+            # URL complète (clé de dédoublonnage et du nom de fichier)
+            urls[id(image_info)] = urljoin(self.base_url, image_info['src'])
+        if not urls:
             return
-            
+        
+        cache = ImageCache(self.cache_dir, max_bytes=self.cache_max_bytes) if self.cache_dir else None
+        downloader = ImageDownloader(self.output_dir, max_workers=self.download_workers,
+                                     per_host=self.download_per_host, cache=cache)
         try:
-            # Construire l'URL complète
-            image_url = urljoin(self.base_url, image_info['src'])
-            
-            # Générer un nom de fichier unique
-            file_hash = hashlib.md5(image_url.encode()).hexdigest()
-            file_extension = os.path.splitext(urlparse(image_url).path)[1] or '.jpg'
-            filename = f"{file_hash}{file_extension}"
-            local_path = os.path.join(self.output_dir, filename)
-            
-            # Télécharger l'image en désactivant la vérification SSL
-            session = requests.Session()
-            session.verify = False
-            response = session.get(image_url, stream=True, timeout=10)
-            
-            if response.status_code == 200:
-                with open(local_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                image_info['local_path'] = local_path
-                image_info['status'] = 'success'
-            else:
-                image_info['status'] = f'error_http_{response.status_code}'
-                
-        except requests.exceptions.Timeout:
-            image_info['status'] = 'error_timeout'
-        except requests.exceptions.RequestException as e:
-            image_info['status'] = f'error_request_{str(e)}'
-        except Exception as e:
-            image_info['status'] = f'error_unknown_{str(e)}'
+            results = downloader.download_all(list(urls.values()))
+        finally:
+            downloader.close()
+        
+        for image_info in self.image_info_list:
+            result = results.get(urls.get(id(image_info)))
+            if result:
+                image_info['status'] = result['status']
+                image_info['local_path'] = result['local_path']
+                # Caractéristiques du fichier (calculées une fois, réutilisées depuis le cache)
+                facts = result.get('facts') or {}
+                image_info['file_format'] = facts.get('format', '')
+                image_info['intrinsic_width'] = facts.get('width')
+                image_info['intrinsic_height'] = facts.get('height')
+                image_info['file_size'] = facts.get('size')
+                image_info['sha256'] = facts.get('sha256', '')
+                image_info['cache_status'] = result.get('cache', '')
+        
+        log_with_step(self.logger, logging.INFO, "IMAGES", f"Téléchargement : {downloader.summary(results)}")
 
     def _save_report(self):
         """Sauvegarde le rapport d'analyse dans un fichier CSV"""
@@ -338,7 +344,13 @@ class ImageAnalyzer:
             'Largeur Affichée',
             'Hauteur Affichée',
             'Est Arrière-plan',
-            'Statut'
+            'Statut',
+            'Format Fichier',
+            'Largeur Intrinsèque',
+            'Hauteur Intrinsèque',
+            'Taille Fichier',
+            'SHA256',
+            'Cache'
         ]
         
         try:
@@ -384,7 +396,13 @@ class ImageAnalyzer:
                     # Ajouter les informations supplémentaires
                     row.extend([
                         'Oui' if info.get('is_background') else 'Non',
-                        info.get('status', '')
+                        info.get('status', ''),
+                        info.get('file_format', ''),
+                        info.get('intrinsic_width') or '',
+                        info.get('intrinsic_height') or '',
+                        info.get('file_size') or '',
+                        info.get('sha256', ''),
+                        info.get('cache_status', '')
                     ])
                     
                     writer.writerow(row)
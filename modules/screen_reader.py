@@ -2,13 +2,13 @@ import os
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import JavascriptException
 import re
-import time
 from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import math
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from utils.log_utils import log_with_step
+from utils.page_readiness import wait_for_page_ready
 from utils.css_selector_generator import CSSSelectorGenerator
 import logging
 
@@ -1098,7 +1098,8 @@ class ScreenReader:
     def _handle_cookie_popup(self):
         """Gère la popin de cookies comme une fenêtre complémentaire et clique sur le bon bouton"""
         try:
-            time.sleep(2)  # Attente pour le chargement de la page
+            # Attente adaptative du chargement de la page (popin injectée par script comprise)
+            wait_for_page_ready(self.driver, logger=self.logger, step_tag="LECTEUR_ECRAN")
             # 1. Chercher une popin de type dialog ou contenant 'cookie' dans la classe ou l'id
             popup_selectors = [
                 "[role='dialog']",
@@ -1136,7 +1137,7 @@ class ScreenReader:
                         if btn.is_displayed():
                             btn.click()
                             self.logger.info(f"Popin de cookies fermée avec succès (bouton: {txt})")
-                            time.sleep(1)
+                            wait_for_page_ready(self.driver, logger=self.logger, label="popin cookies", step_tag="LECTEUR_ECRAN")
                             return True
                 # 4. Sinon, cliquer sur un bouton d'acceptation si besoin
                 for btn in boutons:
@@ -1145,7 +1146,7 @@ class ScreenReader:
                         if btn.is_displayed():
                             btn.click()
                             self.logger.info(f"Popin de cookies fermée avec succès (bouton: {txt})")
-                            time.sleep(1)
+                            wait_for_page_ready(self.driver, logger=self.logger, label="popin cookies", step_tag="LECTEUR_ECRAN")
                             return True
                 self.logger.warning("Popin détectée mais aucun bouton pertinent trouvé.")
                 return False
@@ -1156,7 +1157,7 @@ class ScreenReader:
                 if refuse_btn.is_displayed():
                     refuse_btn.click()
                     self.logger.info("Popin de cookies fermée avec succès (Continuer sans accepter)")
-                    time.sleep(1)
+                    wait_for_page_ready(self.driver, logger=self.logger, label="popin cookies", step_tag="LECTEUR_ECRAN")
                     return True
             except Exception:
                 pass
@@ -1165,7 +1166,7 @@ class ScreenReader:
                 if accept_btn.is_displayed():
                     accept_btn.click()
                     self.logger.info("Popin de cookies fermée avec succès (Accepter et fermer)")
-                    time.sleep(1)
+                    wait_for_page_ready(self.driver, logger=self.logger, label="popin cookies", step_tag="LECTEUR_ECRAN")
                     return True
             except Exception:
                 pass
@@ -1184,7 +1185,7 @@ class ScreenReader:
                     if accept_button.is_displayed():
                         accept_button.click()
                         self.logger.info("Popin de cookies fermée avec succès (autre bouton)")
-                        time.sleep(1)
+                        wait_for_page_ready(self.driver, logger=self.logger, label="popin cookies", step_tag="LECTEUR_ECRAN")
                         return True
                 except:
                     continue
@@ -33,48 +33,23 @@ Usage (exemples) :
 """
 
 import os
+import re
 import json
 import base64
+import bisect
+import hashlib
 import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
 from typing import List, Tuple, Dict, Any, Optional
 
 import cv2
 import numpy as np
 import pandas as pd
-import requests
 import csv
-from typing import Dict
 
-
-def load_mistral_config(config_path: str = ".mistral_config.json") -> Dict[str, str]:
-    """
-    Tente de charger la configuration Mistral depuis un fichier JSON local.
-    Format attendu (exemple) :
-    {
-      "MISTRAL_API_URL": "https://mistral.example/v1/generate",
-      "MISTRAL_API_KEY": "sk-..."
-    }
-    """
-    if not os.path.exists(config_path):
-        return {}
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            cfg = json.load(f)
-            return {
-                "MISTRAL_API_URL": cfg.get("MISTRAL_API_URL"),
-                "MISTRAL_API_KEY": cfg.get("MISTRAL_API_KEY")
-            }
-    except Exception as e:
-        print(f"[load_mistral_config] Erreur lecture {config_path}: {e}")
-        return {}
-
-
-# Optionnel : client officiel Mistral (si installé)
-try:
-    from mistralai import Mistral  # type: ignore
-except Exception:
-    Mistral = None
+from utils.vision_client import VisionClient, extract_json
 
 
 # =====================================================================
@@ -155,30 +130,139 @@ class TabEvent:
 # 2. Outils image / OCR / vision
 # =====================================================================
 
-def detect_text_boxes(image):
-    """Détection de blocs de texte (MVP simple basé sur OpenCV)."""
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    thresh = cv2.adaptiveThreshold(
-        gray, 255,
-        cv2.ADAPTIVE_THRESH_MEAN_C,
-        cv2.THRESH_BINARY_INV, 15, 10
-    )
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 3))
-    dilated = cv2.dilate(thresh, kernel, iterations=2)
-
-    contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    boxes = []
+# Seuillage adaptatif des blocs de texte (fenêtre, constante) et dilatation qui relie les lettres
+TEXT_THRESHOLD_BLOCK = 15
+TEXT_THRESHOLD_C = 10
+_TEXT_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 3))
+# Côté des tuiles de la proposition de zones de texte (>= 9 : couvre le rayon de la fenêtre et
+# dépasse la portée cumulée de la dilatation de deux zones voisines, 2 × 4 px)
+TEXT_PROPOSAL_TILE = 16
+# Au-delà de cette part de l'image couverte par les zones proposées, l'image entière est traitée d'un bloc
+TEXT_PROPOSAL_MAX_COVER = 0.6
+
+
+def _tile_reduce(plane, tile, op):
+    """Réduction (np.max / np.min) de `plane` par tuiles tile × tile (dernières tuiles partielles)."""
+    h, w = plane.shape
+    hh, ww = h - h % tile, w - w % tile
+    rows = op(plane[:hh].reshape(-1, tile, w), axis=1)
+    if hh < h:
+        rows = np.vstack([rows, op(plane[hh:], axis=0, keepdims=True)])
+    tiles = op(rows[:, :ww].reshape(len(rows), -1, tile), axis=2)
+    if ww < w:
+        tiles = np.hstack([tiles, op(rows[:, ww:], axis=1, keepdims=True)])
+    return tiles
+
+
+def _text_regions(gray, tile):
+    """
+    Zones où le seuillage adaptatif peut marquer un pixel : un pixel n'est retenu que si la moyenne
+    de sa fenêtre le dépasse d'au moins TEXT_THRESHOLD_C, donc seulement dans les tuiles dont le
+    voisinage 3 × 3 varie d'au moins autant. Retourne (x0, y0, x1, y1, masque des tuiles de la
+    zone ou None) par composante connexe de tuiles actives, élargie d'une tuile : chaque zone
+    contient toute la fenêtre de ses pixels et la dilatation ne relie jamais deux zones.
+    """
+    h, w = gray.shape
+    kernel = np.ones((3, 3), np.uint8)
+    spread = cv2.dilate(_tile_reduce(gray, tile, np.max), kernel) - cv2.erode(_tile_reduce(gray, tile, np.min), kernel)
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(
+        (spread >= TEXT_THRESHOLD_C).astype(np.uint8), connectivity=8)
+    regions = []
+    for k in range(1, count):
+        tx, ty, tw, th = stats[k, :4]
+        tx0, ty0 = max(0, tx - 1), max(0, ty - 1)
+        tx1, ty1 = min(labels.shape[1], tx + tw + 1), min(labels.shape[0], ty + th + 1)
+        window = labels[ty0:ty1, tx0:tx1]
+        own = window == k
+        # D'autres composantes dans le rectangle : leurs pixels seront effacés du seuillage
+        mask = None if np.all(own | (window == 0)) else own
+        regions.append((tx0 * tile, ty0 * tile, min(w, tx1 * tile), min(h, ty1 * tile), mask))
+    return regions
+
+
+def _outside_holes(rects, starts, holes):
+    """
+    Masque des contours extérieurs (rects, premier point `starts`) qui ne sont dans aucun trou
+    (`holes`) : ce que RETR_EXTERNAL garderait sur l'image entière.
+    """
+    keep = np.ones(len(rects), dtype=bool)
+    if not holes or not len(rects):
+        return keep
+    hole_rects = np.array([cv2.boundingRect(hole) for hole in holes], dtype=np.int64)
+    x, y, w, h = rects.T
+    hx, hy, hw, hh = (hole_rects[:, i:i + 1] for i in range(4))
+    inside = (x >= hx) & (y >= hy) & (x + w <= hx + hw) & (y + h <= hy + hh)
+    for hole_index, rect_index in zip(*np.nonzero(inside)):
+        if keep[rect_index]:
+            point = (float(starts[rect_index, 0]), float(starts[rect_index, 1]))
+            keep[rect_index] = cv2.pointPolygonTest(holes[hole_index], point, False) <= 0
+    return keep
+
+
+def detect_text_boxes(image, gray=None, tile=TEXT_PROPOSAL_TILE):
+    """
+    Détection de blocs de texte (MVP simple basé sur OpenCV). `gray` : niveaux de gris de `image`
+    s'ils sont déjà calculés. Avec `tile`, le seuillage et les contours ne sont calculés que dans
+    les zones proposées par `_text_regions` ; les contours situés dans un trou d'un autre contour
+    sont écartés comme sur l'image entière (`tile=None`), d'où les mêmes blocs.
+    """
+    if gray is None:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     h_img, w_img = gray.shape
-    for cnt in contours:
-        x, y, w, h = cv2.boundingRect(cnt)
-        if w < 30 or h < 15:
-            continue
-        if w > 0.95 * w_img and h > 0.95 * h_img:
+    regions = _text_regions(gray, tile) if tile else None
+    if regions is not None and (sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1, _ in regions)
+                                > TEXT_PROPOSAL_MAX_COVER * h_img * w_img):
+        regions = None  # page dense : le découpage coûterait plus qu'il ne fait gagner
+    mode = cv2.RETR_EXTERNAL if regions is None else cv2.RETR_CCOMP
+    if regions is None:
+        regions = [(0, 0, w_img, h_img, None)]
+
+    rects, starts, holes = [], [], []
+    for x0, y0, x1, y1, mask in regions:
+        thresh = cv2.adaptiveThreshold(
+            gray[y0:y1, x0:x1], 255,
+            cv2.ADAPTIVE_THRESH_MEAN_C,
+            cv2.THRESH_BINARY_INV, TEXT_THRESHOLD_BLOCK, TEXT_THRESHOLD_C
+        )
+        if mask is not None:
+            pixels = np.repeat(np.repeat(mask, tile, axis=0), tile, axis=1)[:y1 - y0, :x1 - x0]
+            thresh[~pixels] = 0
+        dilated = cv2.dilate(thresh, _TEXT_KERNEL, iterations=2)
+        contours, hierarchy = cv2.findContours(dilated, mode, cv2.CHAIN_APPROX_SIMPLE)
+        if hierarchy is None:
             continue
-        boxes.append((x, y, w, h))
-
-    boxes = sorted(boxes, key=lambda b: (b[1], b[0]))
-    return boxes
+        for cnt, (_, _, _, parent) in zip(contours, hierarchy[0]):
+            if parent >= 0:
+                holes.append(cnt + np.array([x0, y0], dtype=cnt.dtype))
+                continue
+            x, y, w, h = cv2.boundingRect(cnt)
+            rects.append((x + x0, y + y0, w, h))
+            starts.append((cnt[0, 0, 0] + x0, cnt[0, 0, 1] + y0))
+    if not rects:
+        return []
+
+    boxes = np.asarray(rects, dtype=np.int64)
+    x, y, w, h = boxes.T
+    keep = (w >= 30) & (h >= 15) & ~((w > 0.95 * w_img) & (h > 0.95 * h_img))
+    keep[keep] = _outside_holes(boxes[keep], np.asarray(starts, dtype=np.int64)[keep], holes)
+    boxes = boxes[keep]
+    # Tri stable par (y, x)
+    boxes = boxes[np.lexsort((boxes[:, 0], boxes[:, 1]))]
+    return [tuple(box) for box in boxes.tolist()]
+
+
+def _ocr_confidence(conf_raw):
+    """Confiance tesseract en float (int, float ou chaîne) ; -1.0 si absente ou illisible."""
+    if conf_raw is None:
+        return -1.0
+    try:
+        # supporte int, float, ou string
+        return float(conf_raw)
+    except Exception:
+        try:
+            return float(str(conf_raw).strip())
+        except Exception:
+            return -1.0
 
 
 def ocr_block(image, bbox, lang="eng+fra"):
@@ -196,19 +280,7 @@ def ocr_block(image, bbox, lang="eng+fra"):
     for i in range(len(text_list)):
         txt = text_list[i] or ""
         # récupérer la confidence correspondante en étant robuste aux types
-        conf_raw = conf_list[i] if i < len(conf_list) else None
-        conf_val = None
-        if conf_raw is None:
-            conf_val = -1.0
-        else:
-            try:
-                # supporte int, float, ou string
-                conf_val = float(conf_raw)
-            except Exception:
-                try:
-                    conf_val = float(str(conf_raw).strip())
-                except Exception:
-                    conf_val = -1.0
+        conf_val = _ocr_confidence(conf_list[i] if i < len(conf_list) else None)
 
         # conserver les textes dont la confidence est positive
         if conf_val is not None and conf_val > 0 and txt.strip():
@@ -265,81 +337,167 @@ def classify_block(bbox, text, img_width, img_height):
     return "contenu", 0.6
 
 
-def detect_red_frame(image, min_area_ratio=0.0005):
-    """
-    Détecte une zone encadrée en rouge sur l'image et retourne son bbox (x, y, w, h).
-    Si aucune zone rouge pertinente n'est trouvée, retourne None.
-    - min_area_ratio: surface minimale du cadre rouge par rapport à l'image pour être considéré.
-    """
+# Plages HSV pour le rouge (deux intervalles dû à la circularité de la teinte)
+RED_RANGES = (
+    (np.array([0, 70, 50]), np.array([10, 255, 255])),
+    (np.array([170, 70, 50]), np.array([180, 255, 255])),
+)
+_RED_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (7, 7))
+# Portée du nettoyage du masque (fermeture 2 × 7×7 puis ouverture 7×7), arrondie
+RED_CLEANUP_REACH = 24
+# Pas de l'échantillonnage de la proposition de cadres rouges (1 = image entière)
+RED_PROPOSAL_STRIDE = 4
+
+
+def _red_mask(image):
+    """Masque des pixels rouges de `image` (BGR) ; None si l'image n'est pas convertible."""
     try:
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
     except Exception:
         return None
+    (lower1, upper1), (lower2, upper2) = RED_RANGES
+    return cv2.bitwise_or(cv2.inRange(hsv, lower1, upper1), cv2.inRange(hsv, lower2, upper2))
 
-    # Plages HSV pour le rouge (deux intervalles dû à la circularité de la teinte)
-    lower1 = np.array([0, 70, 50])
-    upper1 = np.array([10, 255, 255])
-    lower2 = np.array([170, 70, 50])
-    upper2 = np.array([180, 255, 255])
-
-    mask1 = cv2.inRange(hsv, lower1, upper1)
-    mask2 = cv2.inRange(hsv, lower2, upper2)
-    mask = cv2.bitwise_or(mask1, mask2)
-
-    # Nettoyage du masque
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (7, 7))
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=2)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
 
+def _red_regions(image, x0=0, y0=0):
+    """
+    (aire, bbox, premier point) des zones rouges de `image` après nettoyage du masque, coordonnées
+    décalées de (x0, y0).
+    """
+    mask = _red_mask(image)
+    if mask is None:
+        return []
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, _RED_KERNEL, iterations=2)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, _RED_KERNEL, iterations=1)
     contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    if not contours:
-        return None
+    regions = []
+    for cnt in contours:
+        x, y, w, h = cv2.boundingRect(cnt)
+        regions.append((cv2.contourArea(cnt), (x + x0, y + y0, w, h),
+                        (int(cnt[0, 0, 1]) + y0, int(cnt[0, 0, 0]) + x0)))
+    return regions
 
+
+def detect_red_frame(image, min_area_ratio=0.0005, stride=RED_PROPOSAL_STRIDE):
+    """
+    Détecte une zone encadrée en rouge sur l'image et retourne son bbox (x, y, w, h).
+    Si aucune zone rouge pertinente n'est trouvée, retourne None.
+    - min_area_ratio: surface minimale du cadre rouge par rapport à l'image pour être considéré.
+    - stride: le masque rouge est d'abord calculé sur un pixel sur `stride` dans chaque direction ;
+      le nettoyage et les contours ne sont faits en pleine résolution qu'autour des pixels rouges
+      trouvés. Une zone sans aucun bloc rouge plein de stride × stride pixels peut échapper à la
+      proposition ; stride=1 analyse l'image entière.
+    """
     h_img, w_img = image.shape[:2]
     img_area = max(1, w_img * h_img)
 
+    if stride > 1:
+        proposal = _red_mask(np.ascontiguousarray(image[::stride, ::stride]))
+        if proposal is None or not proposal.any():
+            return None
+        reach = -(-RED_CLEANUP_REACH // stride)
+        grown = cv2.dilate(proposal, np.ones((2 * reach + 1, 2 * reach + 1), np.uint8))
+        count, _, stats, _ = cv2.connectedComponentsWithStats(grown, connectivity=8)
+        regions = []
+        for sx, sy, sw, sh, _ in stats[1:count]:
+            x0, y0 = sx * stride, sy * stride
+            x1, y1 = min(w_img, (sx + sw) * stride), min(h_img, (sy + sh) * stride)
+            regions.extend(_red_regions(image[y0:y1, x0:x1], x0, y0))
+    else:
+        regions = _red_regions(image)
+    if not regions:
+        return None
+
     # Chercher le contour rouge le plus grand et raisonnablement rectangulaire
-    best = None
-    best_area = 0
-    for cnt in contours:
-        area = cv2.contourArea(cnt)
-        if area < min_area_ratio * img_area:
-            continue
-        x, y, w, h = cv2.boundingRect(cnt)
-        rect_area = w * h
-        if rect_area <= 0:
-            continue
-        fill_ratio = float(area) / float(rect_area)
-        # On favorise des contours qui remplissent bien leur bbox (cadre plein ou bordure épaisse)
-        if fill_ratio < 0.2 and area < 0.02 * img_area:
-            # trop creux et trop petit -> ignorer
+    areas = np.array([area for area, _, _ in regions], dtype=np.float64)
+    rects = np.array([rect for _, rect, _ in regions], dtype=np.int64)
+    rect_areas = (rects[:, 2] * rects[:, 3]).astype(np.float64)
+    fill_ratio = np.divide(areas, rect_areas, out=np.zeros_like(areas), where=rect_areas > 0)
+    keep = (areas > 0) & (areas >= min_area_ratio * img_area) & (rect_areas > 0)
+    # On favorise des contours qui remplissent bien leur bbox (cadre plein ou bordure épaisse) :
+    # trop creux et trop petit -> ignorer
+    keep &= ~((fill_ratio < 0.2) & (areas < 0.02 * img_area))
+    if not keep.any():
+        return None
+    # À aire égale, findContours (qui liste les contours du dernier trouvé au premier) donnait le
+    # contour commençant le plus bas dans l'ordre de balayage
+    candidates = np.flatnonzero(keep)
+    largest = candidates[areas[candidates] == areas[candidates].max()]
+    best = max(largest, key=lambda i: regions[i][2])
+    bx, by, bw, bh = rects[best].tolist()
+
+    # petit buffer pour inclure la bordure si nécessaire
+    pad_x = max(2, int(0.01 * w_img))
+    pad_y = max(2, int(0.01 * h_img))
+    x1 = max(0, bx - pad_x)
+    y1 = max(0, by - pad_y)
+    x2 = min(w_img, bx + bw + pad_x)
+    y2 = min(h_img, by + bh + pad_y)
+    return (x1, y1, x2 - x1, y2 - y1)
+
+
+def ocr_words(image, lang="eng+fra"):
+    """
+    OCR d'une image (ou d'un ROI) en un seul appel tesseract : mots (texte, confiance, x, y, w, h)
+    dans l'ordre de lecture de tesseract, coordonnées relatives à `image`.
+    """
+    roi_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    import pytesseract
+    data = pytesseract.image_to_data(roi_rgb, output_type=pytesseract.Output.DICT, lang=lang)
+    text_list = data.get("text", [])
+    conf_list = data.get("conf", [])
+    levels = data.get("level") or [5] * len(text_list)
+    words = []
+    for i in range(len(text_list)):
+        if levels[i] != 5:  # niveaux page / bloc / paragraphe / ligne : pas de mot
             continue
-        if area > best_area:
-            best_area = area
-            best = (x, y, w, h)
-
-    # Si on a trouvé un candidat, retourner son bbox
-    if best is not None:
-        # petit buffer pour inclure la bordure si nécessaire
-        bx, by, bw, bh = best
-        pad_x = max(2, int(0.01 * w_img))
-        pad_y = max(2, int(0.01 * h_img))
-        x1 = max(0, bx - pad_x)
-        y1 = max(0, by - pad_y)
-        x2 = min(w_img, bx + bw + pad_x)
-        y2 = min(h_img, by + bh + pad_y)
-        return (x1, y1, x2 - x1, y2 - y1)
-
-    return None
-
-
-def analyze_page_local(image_path: str) -> PageStructure:
-    """Construit la structure visuelle d'une page à partir d'une image."""
+        words.append((
+            text_list[i] or "",
+            _ocr_confidence(conf_list[i] if i < len(conf_list) else None),
+            int(data["left"][i]), int(data["top"][i]), int(data["width"][i]), int(data["height"][i]),
+        ))
+    return words
+
+
+def words_to_blocks(words, boxes):
+    """
+    Répartit les mots d'un OCR global entre les blocs détectés : chaque mot va au premier bloc
+    (ordre de lecture) contenant son centre. (texte, confiance) par bloc, calculés comme
+    `ocr_block` : mots de confiance > 0, moyenne des confiances >= 0 ramenée à [0, 1].
+    """
+    per_block = [([], []) for _ in boxes]
+    if words and boxes:
+        b = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        w = np.asarray([word[2:] for word in words], dtype=np.float64).reshape(-1, 4)
+        cx = (w[:, 0] + w[:, 2] / 2.0)[:, None]
+        cy = (w[:, 1] + w[:, 3] / 2.0)[:, None]
+        inside = (cx >= b[:, 0]) & (cx < b[:, 0] + b[:, 2]) & (cy >= b[:, 1]) & (cy < b[:, 1] + b[:, 3])
+        owner = np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
+        for (txt, conf, *_), k in zip(words, owner.tolist()):
+            if k < 0:
+                continue
+            texts, confs = per_block[k]
+            if conf > 0 and txt.strip():
+                texts.append(txt)
+            if conf >= 0:
+                confs.append(conf)
+    return [(" ".join(texts).strip(), float(sum(confs) / len(confs)) / 100.0 if confs else 0.0)
+            for texts, confs in per_block]
+
+
+def analyze_page_local(image_path: str, lang: str = "eng+fra", ocr=ocr_words) -> PageStructure:
+    """
+    Construit la structure visuelle d'une page à partir d'une image. Le ROI analysé est passé
+    une seule fois à `ocr` (un processus tesseract par image) et les mots sont répartis entre
+    les blocs détectés.
+    """
     image = cv2.imread(image_path)
     if image is None:
         raise ValueError(f"Impossible de lire l'image : {image_path}")
 
     h, w, _ = image.shape
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     # Si une zone encadrée en rouge est présente, limiter l'analyse à cette zone.
     red_bbox = detect_red_frame(image)
     crop_x = 0
@@ -347,19 +505,20 @@ def analyze_page_local(image_path: str) -> PageStructure:
     roi = image
     if red_bbox:
         rx, ry, rw, rh = red_bbox
-        # extraire le ROI correspondant à la zone rouge
+        # extraire le ROI correspondant à la zone rouge (niveaux de gris : même découpe)
         roi = image[ry:ry+rh, rx:rx+rw]
+        gray = gray[ry:ry+rh, rx:rx+rw]
         crop_x = int(rx)
         crop_y = int(ry)
 
-    boxes = detect_text_boxes(roi)
+    boxes = detect_text_boxes(roi, gray=gray)
     blocks: List[Block] = []
+    ocr_results = words_to_blocks(ocr(roi, lang), boxes) if boxes else []
 
-    for i, bbox in enumerate(boxes, start=1):
+    for i, (bbox, (text, ocr_conf)) in enumerate(zip(boxes, ocr_results), start=1):
         # bbox est relatif au ROI ; on le reconvertit en coordonnées image originales
         bx, by, bw_box, bh_box = bbox
         abs_bbox = (bx + crop_x, by + crop_y, bw_box, bh_box)
-        text, ocr_conf = ocr_block(roi, (bx, by, bw_box, bh_box))
         block_type, cls_conf = classify_block(abs_bbox, text, w, h)
         final_conf = (ocr_conf + cls_conf) / 2.0
         blocks.append(Block(
@@ -378,6 +537,121 @@ def analyze_page_local(image_path: str) -> PageStructure:
     )
 
 
+# Version de l'analyse d'image : fait partie de la clé du cache (à incrémenter si elle change)
+VISION_PIPELINE_VERSION = 1
+DEFAULT_VISION_CACHE_DIR = ".vision_cache"
+
+
+def page_structure_to_dict(page_struct: PageStructure) -> Dict[str, Any]:
+    return {
+        "page": page_struct.page,
+        "width": page_struct.width,
+        "height": page_struct.height,
+        "blocks": [asdict(b) for b in page_struct.blocks]
+    }
+
+
+def image_digest(path: str) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier image."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class VisionCache:
+    """
+    Structures visuelles déjà calculées, un fichier JSON par contenu d'image (empreinte SHA-256),
+    langue OCR et version du pipeline. Le nom de page n'en fait pas partie : une capture
+    renommée ou copiée est retrouvée.
+    """
+
+    def __init__(self, cache_dir: str, lang: str = "eng+fra"):
+        self.cache_dir = cache_dir
+        self.suffix = f"{lang.replace('+', '_')}-v{VISION_PIPELINE_VERSION}.json"
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}-{self.suffix}")
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(digest), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, digest: str, page_struct: Dict[str, Any]) -> None:
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(page_struct, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def _init_ocr_worker():
+    # Un tesseract par processus du pool : pas de threads OpenMP concurrents en plus
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _analyze_image_task(path: str, lang: str, ocr) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Point d'entrée des processus du pool : (structure, "") ou (None, erreur), ne lève jamais."""
+    try:
+        return page_structure_to_dict(analyze_page_local(path, lang, ocr)), ""
+    except Exception as e:
+        return None, str(e)
+
+
+def build_vision_structures(paths: List[str], workers: Optional[int] = None,
+                            cache_dir: Optional[str] = DEFAULT_VISION_CACHE_DIR,
+                            lang: str = "eng+fra", ocr=ocr_words) -> List[Tuple[str, Optional[Dict[str, Any]], str]]:
+    """
+    Structures visuelles des images `paths`, dans cet ordre : (chemin, structure ou None, erreur).
+    Les images déjà analysées sont lues dans le cache (`cache_dir`, None = désactivé) sans lancer
+    de processus ; les autres sont réparties sur `workers` processus (défaut : nombre de cœurs).
+    """
+    cache = VisionCache(cache_dir, lang) if cache_dir else None
+    results: List[Any] = [None] * len(paths)
+    todo = []
+    for k, path in enumerate(paths):
+        try:
+            digest = image_digest(path) if cache else None
+        except OSError as e:
+            # Image absente ou illisible : erreur propre à cette image, le lot continue
+            results[k] = (path, None, str(e))
+            continue
+        cached = cache.get(digest) if cache else None
+        if cached is not None:
+            results[k] = (path, dict(cached, page=os.path.basename(path)), "")
+        else:
+            todo.append((k, path, digest))
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo) or 1))
+    print(f"[build-vision-structure] {len(paths)} image(s) : {len(paths) - len(todo)} en cache, "
+          f"{len(todo)} à analyser ({workers} processus)")
+    if workers == 1:
+        outcomes = []
+        for _, path, _ in todo:
+            print(f"[build-vision-structure] Analyse de {path}...")
+            outcomes.append(_analyze_image_task(path, lang, ocr))
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_ocr_worker) as pool:
+            futures = []
+            for _, path, _ in todo:
+                print(f"[build-vision-structure] Analyse de {path}...")
+                futures.append(pool.submit(_analyze_image_task, path, lang, ocr))
+            outcomes = [future.result() for future in futures]
+
+    for (k, path, digest), (page_struct, error) in zip(todo, outcomes):
+        if page_struct is not None and cache:
+            cache.put(digest, page_struct)
+        results[k] = (path, page_struct, error)
+    return results
+
+
 # =====================================================================
 # 3. Fusion DOM + vision
 # =====================================================================
@@ -400,57 +674,303 @@ def iou(b1, b2):
     return inter / union
 
 
+# Un rectangle DOM couvrant plus de cellules que cela est hors grille (toujours candidat)
+GRID_MAX_CELLS_PER_RECT = 64
+# Au-delà de ce nombre de cellules couvertes par un bloc, comparaison directe à tous les rectangles
+GRID_MAX_CELLS_PER_QUERY = 256
+_GRID_KEY_OFFSET = 1 << 31
+_GRID_CELL_LIMIT = 1 << 30
+
+
+class DomRectIndex:
+    """
+    Index spatial des rectangles DOM d'une page (colonnes dom_x, dom_y, dom_w, dom_h), chargés
+    une fois dans des tableaux NumPy et rangés dans une grille uniforme. `best_match` ne calcule
+    l'IoU, vectorisée, que sur les rectangles des cellules couvertes par le bloc, avec le même
+    résultat que la boucle `iou` sur toutes les lignes : première ligne au meilleur score > 0.
+
+    Les rectangles vides ou de taille négative (IoU toujours nulle) sont écartés ; ceux dont une
+    coordonnée n'est pas finie sont comparés un par un avec `iou`, comme auparavant.
+    """
+
+    def __init__(self, dom_df_page, cell_size=None):
+        positions, coords, irregular = [], [], []
+        columns = [dom_df_page[c].tolist() for c in ("dom_x", "dom_y", "dom_w", "dom_h")]
+        for pos, values in enumerate(zip(*columns)):
+            try:
+                bbox = tuple(float(v) for v in values)
+            except Exception:
+                continue  # coordonnées illisibles : ligne ignorée
+            if not all(np.isfinite(bbox)):
+                irregular.append((pos, bbox))
+            elif bbox[2] > 0 and bbox[3] > 0:
+                positions.append(pos)
+                coords.append(bbox)
+        self.irregular = irregular
+        self.positions = np.asarray(positions, dtype=np.int64)
+        rects = np.asarray(coords, dtype=np.float64).reshape(-1, 4)
+        self.x, self.y, self.w, self.h = (rects[:, k].copy() for k in range(4))
+        self.x2 = self.x + self.w
+        self.y2 = self.y + self.h
+        self.area = self.w * self.h
+        if cell_size is None:
+            cell_size = max(32.0, float(np.median(np.maximum(self.w, self.h)))) if len(rects) else 32.0
+        self.cell_size = cell_size
+        self._build_grid()
+
+    def _cells(self, x, y, x2, y2):
+        # Bornées pour que les clés de cellule tiennent sur 64 bits, même pour des coordonnées aberrantes
+        return tuple(np.clip(np.floor(v / self.cell_size), -_GRID_CELL_LIMIT, _GRID_CELL_LIMIT).astype(np.int64)
+                     for v in (x, y, x2, y2))
+
+    def _build_grid(self):
+        cx0, cy0, cx1, cy1 = self._cells(self.x, self.y, self.x2, self.y2)
+        ncx, ncy = cx1 - cx0 + 1, cy1 - cy0 + 1
+        counts = ncx * ncy
+        small = counts <= GRID_MAX_CELLS_PER_RECT
+        self.large = np.flatnonzero(~small)
+        ids = np.flatnonzero(small)
+        counts = counts[ids]
+        # Une entrée (clé de cellule, rectangle) par cellule couverte
+        rect_of = np.repeat(ids, counts)
+        offset = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        width = ncx[rect_of]
+        keys = self._key(cx0[rect_of] + offset % width, cy0[rect_of] + offset // width)
+        order = np.argsort(keys, kind="stable")
+        keys, self._cell_rects = keys[order], rect_of[order]
+        self._cell_keys, self._cell_starts = np.unique(keys, return_index=True)
+        self._cell_ends = np.append(self._cell_starts[1:], len(keys))
+
+    @staticmethod
+    def _key(cx, cy):
+        return ((cy + _GRID_KEY_OFFSET) << 32) | (cx + _GRID_KEY_OFFSET)
+
+    def candidates(self, bbox):
+        """Indices (croissants) des rectangles pouvant recouvrir `bbox`."""
+        bx, by, bw, bh = (float(v) for v in bbox)
+        cx0, cy0, cx1, cy1 = (int(v) for v in self._cells(np.float64(bx), np.float64(by),
+                                                          np.float64(bx + bw), np.float64(by + bh)))
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > GRID_MAX_CELLS_PER_QUERY:
+            return np.arange(len(self.x))
+        cx, cy = np.meshgrid(np.arange(cx0, cx1 + 1), np.arange(cy0, cy1 + 1))
+        keys = self._key(cx.ravel(), cy.ravel())
+        slots = np.searchsorted(self._cell_keys, keys)
+        slots = slots[slots < len(self._cell_keys)]
+        slots = slots[np.isin(self._cell_keys[slots], keys)]
+        parts = [self._cell_rects[self._cell_starts[k]:self._cell_ends[k]] for k in slots]
+        parts.append(self.large)
+        return np.unique(np.concatenate(parts))
+
+    def best_match(self, bbox):
+        """(position de la ligne, score) du meilleur recouvrement de `bbox`, ou (None, 0.0)."""
+        best_pos, best_score = None, 0.0
+        if len(self.x) and all(np.isfinite(bbox)):
+            idx = self.candidates(bbox)
+            x1, y1, w1, h1 = bbox
+            # Mêmes opérations, dans le même ordre, que `iou`
+            inter_w = np.maximum(0, np.minimum(x1 + w1, self.x2[idx]) - np.maximum(x1, self.x[idx]))
+            inter_h = np.maximum(0, np.minimum(y1 + h1, self.y2[idx]) - np.maximum(y1, self.y[idx]))
+            inter = inter_w * inter_h
+            hit = inter > 0
+            if hit.any():
+                idx, inter = idx[hit], inter[hit]
+                scores = inter / (w1 * h1 + self.area[idx] - inter)
+                k = int(np.argmax(scores))  # premier maximum : la ligne la plus haute du tableau
+                best_pos, best_score = int(self.positions[idx[k]]), float(scores[k])
+        elif len(self.x):
+            # Bloc aux coordonnées non finies : comparaison exacte à chaque ligne
+            for pos, x, y, w, h in zip(self.positions, self.x, self.y, self.w, self.h):
+                score = iou(bbox, (float(x), float(y), float(w), float(h)))
+                if score > best_score or (score == best_score and best_pos is not None and pos < best_pos):
+                    best_pos, best_score = int(pos), score
+        for pos, dom_bbox in self.irregular:
+            score = iou(bbox, dom_bbox)
+            if score > best_score or (score == best_score and best_pos is not None and pos < best_pos):
+                best_pos, best_score = pos, score
+        return best_pos, best_score
+
+
+# Colonnes DOM utilisées par l'appariement sans coordonnées
+TEXT_COLUMNS = ("texte_dom", "Text", "Extrait HTML")
+XPATH_COLUMNS = ("xpath", "X-path principal")
+_NGRAM = 3
+_WORD = re.compile(r"\w+")
+
+
+def _ngrams(text):
+    return {text[i:i + _NGRAM] for i in range(len(text) - _NGRAM + 1)}
+
+
+def _tokens_with_prefix(sorted_tokens, prefix):
+    start = bisect.bisect_left(sorted_tokens, prefix)
+    end = start
+    while end < len(sorted_tokens) and sorted_tokens[end].startswith(prefix):
+        end += 1
+    return sorted_tokens[start:end]
+
+
+def _cell_text(value):
+    """Valeur de cellule telle que lue par l'appariement : `value or ""`, si c'est une chaîne."""
+    value = value or ""
+    return value if isinstance(value, str) else None
+
+
+class DomTextIndex:
+    """
+    Index des textes et XPath DOM d'une page pour la fusion sans coordonnées, construit une fois.
+    Même résultat que le parcours de toutes les lignes pour chaque bloc : première ligne dont un
+    texte (minuscules) contient le texte du bloc ou y est contenu, sinon première ligne dont
+    l'XPath apparaît dans la structure vision sérialisée.
+
+    - « bloc ⊂ ligne » : index inversé mot → lignes. Un mot du bloc encadré de séparateurs est
+      un mot entier de la ligne ; un mot en bord de bloc est un préfixe, un suffixe ou un
+      fragment de mot de la ligne (vocabulaire trié). Seules les lignes de la contrainte la plus
+      sélective sont vérifiées.
+    - « ligne ⊂ bloc » : table texte exact → première ligne ; seules les sous-chaînes du bloc
+      aux longueurs présentes dans la table sont cherchées.
+    - XPath : ne dépend pas du bloc, calculé une fois, trigrammes de la structure sérialisée
+      en préfiltre.
+    """
+
+    def __init__(self, dom_df_page, vision_page_struct):
+        self.vision_page_struct = vision_page_struct
+        text_cols = [c for c in TEXT_COLUMNS if c in dom_df_page.columns]
+        xpath_cols = [c for c in XPATH_COLUMNS if c in dom_df_page.columns]
+        self.has_text = bool(text_cols)
+        self.texts = [[] for _ in range(len(dom_df_page))]
+        self.first_row_of_text = {}
+        self.postings = {}
+        for tc in text_cols:
+            for pos, value in enumerate(dom_df_page[tc].tolist()):
+                text = _cell_text(value)
+                if text is None:
+                    continue
+                text = text.lower()
+                self.texts[pos].append(text)
+                if pos < self.first_row_of_text.get(text, len(self.texts)):
+                    self.first_row_of_text[text] = pos
+                for token in set(_WORD.findall(text)):
+                    rows = self.postings.setdefault(token, [])
+                    if not rows or rows[-1] != pos:
+                        rows.append(pos)
+        if len(text_cols) > 1:
+            for rows in self.postings.values():
+                rows.sort()  # plusieurs colonnes de texte : listes fusionnées
+        self.vocabulary = sorted(self.postings)
+        self.reversed_vocabulary = sorted(token[::-1] for token in self.postings)
+        self.text_lengths = sorted({len(t) for t in self.first_row_of_text})
+        self.xpaths = [[] for _ in range(len(dom_df_page))]
+        for xc in xpath_cols:
+            for pos, value in enumerate(dom_df_page[xc].tolist()):
+                xpath = _cell_text(value)
+                if xpath is not None and xpath.strip():
+                    self.xpaths[pos].append(xpath.strip())
+        self._text_matches = {}
+        self._xpath_match = None
+        self._xpath_done = False
+
+    def _rows_with_token(self, tokens):
+        if len(tokens) == 1:
+            return self.postings[tokens[0]]
+        return sorted({pos for token in tokens for pos in self.postings[token]})
+
+    def _candidate_rows(self, text):
+        """Lignes pouvant contenir `text` (croissantes), ou None si aucun mot ne les restreint."""
+        runs = [(m.start(), m.end()) for m in _WORD.finditer(text)]
+        if not runs:
+            return None
+        whole = [text[a:b] for a, b in runs if a > 0 and b < len(text)]
+        if whole:
+            return min((self.postings.get(token, []) for token in whole), key=len)
+        options = []
+        for a, b in {runs[0], runs[-1]}:
+            token = text[a:b]
+            if a > 0:  # début de mot dans la ligne
+                options.append(_tokens_with_prefix(self.vocabulary, token))
+            elif b < len(text):  # fin de mot dans la ligne
+                options.append([t[::-1] for t in _tokens_with_prefix(self.reversed_vocabulary, token[::-1])])
+            else:  # bloc d'un seul mot : fragment d'un mot de la ligne
+                options.append([t for t in self.vocabulary if token in t])
+        tokens = min(options, key=lambda ts: sum(len(self.postings[t]) for t in ts))
+        return self._rows_with_token(tokens) if tokens else []
+
+    def _row_containing(self, text, limit):
+        """Première ligne (< limit) dont un texte contient `text`, ou None."""
+        rows = self._candidate_rows(text)
+        if rows is None:
+            rows = range(min(limit, len(self.texts)))
+        for pos in rows:
+            if pos >= limit:
+                break
+            if any(text in t for t in self.texts[pos]):
+                return pos
+        return None
+
+    def _row_contained_in(self, text):
+        """Première ligne dont un texte est une sous-chaîne de `text`, ou None."""
+        best = None
+        for length in self.text_lengths:
+            if length > len(text):
+                break
+            for i in range(len(text) - length + 1):
+                pos = self.first_row_of_text.get(text[i:i + length])
+                if pos is not None and (best is None or pos < best):
+                    best = pos
+        return best
+
+    def text_match(self, block_text):
+        """Position de la ligne appariée au texte du bloc (déjà débarrassé des espaces), ou None."""
+        if not block_text or not self.has_text:
+            return None
+        text = block_text.lower()
+        if text not in self._text_matches:
+            contained = self._row_contained_in(text)
+            containing = self._row_containing(text, len(self.texts) if contained is None else contained)
+            self._text_matches[text] = containing if containing is not None else contained
+        return self._text_matches[text]
+
+    def xpath_match(self):
+        """Première ligne dont un XPath figure dans la structure vision sérialisée, ou None."""
+        if not self._xpath_done:
+            self._xpath_done = True
+            serialized = json.dumps(self.vision_page_struct)
+            grams = _ngrams(serialized)
+            for pos, xpaths in enumerate(self.xpaths):
+                if any((len(x) < _NGRAM or all(g in grams for g in _ngrams(x))) and x in serialized
+                       for x in xpaths):
+                    self._xpath_match = pos
+                    break
+        return self._xpath_match
+
+
 def fuse_page(dom_df_page, vision_page_struct, iou_threshold=0.1):
     fused_blocks = []
+    # Si les colonnes de coordonnées DOM existent, utiliser IoU (index spatial construit une fois par page)
+    rect_index = text_index = None
+    if {"dom_x", "dom_y", "dom_w", "dom_h"}.issubset(set(dom_df_page.columns)):
+        rect_index = DomRectIndex(dom_df_page)
+    else:
+        text_index = DomTextIndex(dom_df_page, vision_page_struct)
 
     for block in vision_page_struct["blocks"]:
         b_bbox = block["bbox"]
         best_row = None
         best_score = 0.0
-        # Si les colonnes de coordonnées DOM existent, utiliser IoU
-        if {"dom_x", "dom_y", "dom_w", "dom_h"}.issubset(set(dom_df_page.columns)):
-            for _, row in dom_df_page.iterrows():
-                try:
-                    dom_bbox = (float(row["dom_x"]), float(row["dom_y"]), float(row["dom_w"]), float(row["dom_h"]))
-                except Exception:
-                    continue
-                score = iou(b_bbox, dom_bbox)
-                if score > best_score:
-                    best_score = score
-                    best_row = row
+        if rect_index is not None:
+            best_pos, best_score = rect_index.best_match(b_bbox)
+            if best_pos is not None:
+                best_row = dom_df_page.iloc[best_pos]
         else:
-            # Pas de coordonnées DOM : tenter un appariement par texte ou par XPath si présent.
-            block_text = (block.get("text") or "").strip()
-            # Normaliser colonnes possibles
-            text_cols = [c for c in ["texte_dom", "Text", "Extrait HTML"] if c in dom_df_page.columns]
-            xpath_cols = [c for c in ["xpath", "X-path principal", "X-path principal".replace(" ", " ")] if c in dom_df_page.columns]
-            # Recherche par texte (contenu)
-            if block_text and text_cols:
-                for _, row in dom_df_page.iterrows():
-                    for tc in text_cols:
-                        row_text = (row.get(tc) or "")
-                        if not isinstance(row_text, str):
-                            continue
-                        if block_text.lower() in row_text.lower() or row_text.lower() in block_text.lower():
-                            best_row = row
-                            best_score = 1.0
-                            break
-                    if best_row is not None:
-                        break
-            # Si pas trouvé, tenter par xpath égal (exact match)
-            if best_row is None and xpath_cols:
-                for _, row in dom_df_page.iterrows():
-                    for xc in xpath_cols:
-                        row_xpath = (row.get(xc) or "")
-                        if not isinstance(row_xpath, str):
-                            continue
-                        # Comparaison simple : présence d'un xpath texte similaire
-                        if row_xpath.strip() and row_xpath.strip() in json.dumps(vision_page_struct):
-                            best_row = row
-                            best_score = 0.9
-                            break
-                    if best_row is not None:
-                        break
+            # Pas de coordonnées DOM : tenter un appariement par texte (contenu), puis par XPath si présent.
+            best_pos = text_index.text_match((block.get("text") or "").strip())
+            best_score = 1.0
+            if best_pos is None:
+                best_pos = text_index.xpath_match()
+                best_score = 0.9
+            if best_pos is not None:
+                best_row = dom_df_page.iloc[best_pos]
+            else:
+                best_score = 0.0
 
         if best_row is not None and best_score >= iou_threshold:
             fused_blocks.append({
@@ -682,173 +1202,78 @@ Voici le contexte DOM et navigation (NE PAS INCLURE CE BLOC DANS LA RÉPONSE) :
     return instructions.strip()
 
 
-def call_vision_ai_for_focus_event(event: TabEvent) -> TabEvent:
+# Analyse renvoyée quand l'IA n'est pas configurée ou que sa réponse est inexploitable
+STUB_FOCUS_ANALYSIS = {
+    "focus_visible": {
+        "ok": True,
+        "score": 0.9,
+        "comment": "PLACEHOLDER: focus visible selon la détection IA."
+    },
+    "role_appearance_match": {
+        "ok": True,
+        "score": 0.85,
+        "comment": "PLACEHOLDER: apparence cohérente avec le rôle."
+    },
+    "label_match": {
+        "ok": True,
+        "score": 0.88,
+        "comment": "PLACEHOLDER: texte visible cohérent avec le nom accessible."
+    },
+    "global_score": 0.87,
+    "issues": []
+}
+
+
+def _analysis_from_dict(candidate: Dict[str, Any]) -> A11yAnalysis:
+    return A11yAnalysis(
+        focus_visible=A11yCheckResult(**candidate["focus_visible"]),
+        role_appearance_match=A11yCheckResult(**candidate["role_appearance_match"]),
+        label_match=A11yCheckResult(**candidate["label_match"]),
+        global_score=candidate.get("global_score", 0.0),
+        issues=candidate.get("issues", [])
+    )
+
+
+def call_vision_ai_for_focus_events(events: List[TabEvent], client: Optional[VisionClient] = None) -> List[TabEvent]:
     """
-    Stub : à brancher sur ton fournisseur d'IA.
-    Pour l'instant, renvoie une analyse factice.
+    Analyse IA d'un lot d'évènements de focus : une requête par évènement (prompt, crop du focus,
+    capture complète), envoyées en parallèle par le client de vision partagé (cache disque, chaque
+    capture encodée une seule fois). Sans clé d'API ou sur réponse inexploitable : analyse factice.
     """
-    # S'assurer qu'on a un crop
-    if not event.visual.crop_file:
-        crop_path = crop_focus_area(
-            event.visual.screenshot_file,
-            event.visual.focus_bbox
-        )
-        event.visual.crop_file = crop_path
-
-    crop_b64 = image_to_base64(event.visual.crop_file)
-    full_b64 = image_to_base64(event.visual.screenshot_file)
-
-    prompt = build_focus_event_prompt(event)
-    # Essayer d'appeler l'API Mistral si configurée via variables d'environnement.
-    mistral_url = os.environ.get("MISTRAL_API_URL")
-    mistral_key = os.environ.get("MISTRAL_API_KEY")
-    # Si variables d'environnement absentes, tenter le chargement depuis le fichier de config local (gitignored)
-    if not (mistral_url and mistral_key):
-        cfg = load_mistral_config()
-        mistral_url = mistral_url or cfg.get("MISTRAL_API_URL")
-        mistral_key = mistral_key or cfg.get("MISTRAL_API_KEY")
-
-    if mistral_url and mistral_key:
-        # Si le client officiel `mistralai` est installé, l'utiliser en priorité
-        mistral_model = os.environ.get("MISTRAL_MODEL", "mistral-small-2506")
-        if Mistral is not None and mistral_key:
-            try:
-                client = Mistral(api_key=mistral_key)
-                # Construire messages multimodaux : prompt + image encodée (crop)
-                messages = [
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {"type": "image_url", "image_url": f"data:image/jpeg;base64,{crop_b64}"}
-                        ]
-                    }
-                ]
-                resp = client.chat.complete(model=mistral_model, messages=messages)
-                # Resp peut être dict-like ou objet : tenter d'extraire le texte de sortie
-                candidate = None
-                text_out = None
-                if isinstance(resp, dict):
-                    text_out = resp.get("output") or resp.get("result") or resp.get("text")
-                else:
-                    # essayer attributs courants ou str()
-                    text_out = getattr(resp, "output", None) or getattr(resp, "result", None) or getattr(resp, "text", None) or str(resp)
-
-                if isinstance(text_out, str):
-                    try:
-                        candidate = json.loads(text_out)
-                    except Exception:
-                        candidate = None
-                elif isinstance(text_out, dict):
-                    candidate = text_out
-
-                if candidate and "focus_visible" in candidate:
-                    fa = candidate["focus_visible"]
-                    ra = candidate["role_appearance_match"]
-                    la = candidate["label_match"]
-                    event.a11y_analysis = A11yAnalysis(
-                        focus_visible=A11yCheckResult(**fa),
-                        role_appearance_match=A11yCheckResult(**ra),
-                        label_match=A11yCheckResult(**la),
-                        global_score=candidate.get("global_score", 0.0),
-                        issues=candidate.get("issues", [])
-                    )
-                    return event
-                else:
-                    print("[call_vision_ai_for_focus_event] Réponse client Mistral non exploitable, fallback vers HTTP ou stub.")
-            except Exception as e:
-                print(f"[call_vision_ai_for_focus_event] Erreur client Mistral : {e}. Tentative fallback.")
-
-        # Sinon, tenter l'appel HTTP classique si mistral_url est fourni
-        if mistral_url:
-            headers = {
-                "Authorization": f"Bearer {mistral_key}",
-                "Content-Type": "application/json",
-            }
-            payload = {
-                # Payload générique : on envoie le prompt et les images encodées en base64.
-                "input": prompt,
-                "attachments": {
-                    "crop_base64": crop_b64,
-                    "full_base64": full_b64
-                },
-                # Tu peux ajouter d'autres paramètres spécifiques au fournisseur ici.
-            }
-
+    if client is None:
+        client = VisionClient.from_settings("mistral-small-2506")
+
+    items = []
+    for event in events:
+        # S'assurer qu'on a un crop
+        if not event.visual.crop_file:
+            event.visual.crop_file = crop_focus_area(
+                event.visual.screenshot_file,
+                event.visual.focus_bbox
+            )
+        items.append((build_focus_event_prompt(event),
+                      [event.visual.crop_file, event.visual.screenshot_file]))
+
+    results = client.run(items) if client else [(None, "missing_api_key")] * len(events)
+    for event, (output, provider) in zip(events, results):
+        candidate = extract_json(output) if isinstance(output, str) else output
+        if isinstance(candidate, dict) and "focus_visible" in candidate:
             try:
-                resp = requests.post(mistral_url, headers=headers, json=payload, timeout=60)
-                resp.raise_for_status()
-                # On tente d'extraire une sortie textuelle / JSON.
-                try:
-                    body = resp.json()
-                except Exception:
-                    body = {"output": resp.text}
-
-                # Le modèle devrait idéalement renvoyer un JSON conforme au prompt.
-                candidate = None
-                if isinstance(body, dict):
-                    # Cas courant : la réponse contient un champ 'output' (string ou JSON)
-                    out = body.get("output") or body.get("result") or body.get("text") or body
-                    if isinstance(out, str):
-                        try:
-                            candidate = json.loads(out)
-                        except Exception:
-                            # pas JSON, on laisse candidate = None
-                            candidate = None
-                    elif isinstance(out, dict):
-                        candidate = out
-                # Si la parsing a réussi et que la structure attendue est présente, on l'utilise.
-                if candidate and "focus_visible" in candidate:
-                    fa = candidate["focus_visible"]
-                    ra = candidate["role_appearance_match"]
-                    la = candidate["label_match"]
-                    event.a11y_analysis = A11yAnalysis(
-                        focus_visible=A11yCheckResult(**fa),
-                        role_appearance_match=A11yCheckResult(**ra),
-                        label_match=A11yCheckResult(**la),
-                        global_score=candidate.get("global_score", 0.0),
-                        issues=candidate.get("issues", [])
-                    )
-                    return event
-                else:
-                    print("[call_vision_ai_for_focus_event] Réponse Mistral HTTP non exploitable, fallback vers stub.")
-            except Exception as e:
-                print(f"[call_vision_ai_for_focus_event] Erreur appel Mistral HTTP : {e}. Utilisation du fallback stub.")
-
-    # Fallback / comportement par défaut (stub) si Mistral non configuré ou erreur
-    analysis_dict = {
-        "focus_visible": {
-            "ok": True,
-            "score": 0.9,
-            "comment": "PLACEHOLDER: focus visible selon la détection IA."
-        },
-        "role_appearance_match": {
-            "ok": True,
-            "score": 0.85,
-            "comment": "PLACEHOLDER: apparence cohérente avec le rôle."
-        },
-        "label_match": {
-            "ok": True,
-            "score": 0.88,
-            "comment": "PLACEHOLDER: texte visible cohérent avec le nom accessible."
-        },
-        "global_score": 0.87,
-        "issues": []
-    }
+                event.a11y_analysis = _analysis_from_dict(candidate)
+                continue
+            except (KeyError, TypeError):
+                pass
+        if client:
+            print(f"[call_vision_ai_for_focus_event] Réponse IA non exploitable ({provider}) pour "
+                  f"page={event.page_id} step={event.step_index}, fallback vers stub.")
+        # Fallback / comportement par défaut (stub) si Mistral non configuré ou erreur
+        event.a11y_analysis = _analysis_from_dict(STUB_FOCUS_ANALYSIS)
+    return events
 
-    fa = analysis_dict["focus_visible"]
-    ra = analysis_dict["role_appearance_match"]
-    la = analysis_dict["label_match"]
 
-    event.a11y_analysis = A11yAnalysis(
-        focus_visible=A11yCheckResult(**fa),
-        role_appearance_match=A11yCheckResult(**ra),
-        label_match=A11yCheckResult(**la),
-        global_score=analysis_dict["global_score"],
-        issues=analysis_dict.get("issues", [])
-    )
-
-    return event
+def call_vision_ai_for_focus_event(event: TabEvent, client: Optional[VisionClient] = None) -> TabEvent:
+    """Analyse IA d'un seul évènement de focus (voir `call_vision_ai_for_focus_events`)."""
+    return call_vision_ai_for_focus_events([event], client)[0]
 
 
 # =====================================================================
@@ -859,21 +1284,18 @@ def cmd_build_vision_structure(args):
     images_dir = args.images_dir
     output_json = args.output_json
 
+    paths = [
+        os.path.join(images_dir, filename)
+        for filename in os.listdir(images_dir)
+        if filename.lower().endswith((".png", ".jpg", ".jpeg"))
+    ]
     results = []
-    for filename in os.listdir(images_dir):
-        if filename.lower().endswith((".png", ".jpg", ".jpeg")):
-            path = os.path.join(images_dir, filename)
-            print(f"[build-vision-structure] Analyse de {path}...")
-            try:
-                page_struct = analyze_page_local(path)
-                results.append({
-                    "page": page_struct.page,
-                    "width": page_struct.width,
-                    "height": page_struct.height,
-                    "blocks": [asdict(b) for b in page_struct.blocks]
-                })
-            except Exception as e:
-                print(f"Erreur sur {path}: {e}")
+    cache_dir = None if args.no_cache else args.cache_dir
+    for path, page_struct, error in build_vision_structures(paths, args.workers, cache_dir, args.lang):
+        if page_struct is None:
+            print(f"Erreur sur {path}: {error}")
+        else:
+            results.append(page_struct)
 
     with open(output_json, "w", encoding="utf-8") as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
@@ -984,7 +1406,7 @@ def cmd_analyze_tab_events(args):
     with open(events_json, "r", encoding="utf-8") as f:
         raw_events = json.load(f)
 
-    analyzed = []
+    events = []
     for ev_dict in raw_events:
         # On reconstruit le TabEvent minimalement (en supposant que ton JSON respecte cette structure)
         dom = DomInfo(**ev_dict["dom"])
@@ -998,9 +1420,20 @@ def cmd_analyze_tab_events(args):
             dom=dom,
             visual=visual
         )
-        print(f"[analyze-tab-events] Analyse event page={event.page_id} step={event.step_index}...")
-        event = call_vision_ai_for_focus_event(event)
-        analyzed.append(event.to_dict())
+        events.append(event)
+
+    client = VisionClient.from_settings(
+        "mistral-small-2506",
+        concurrency=args.concurrency,
+        cache_dir="" if args.no_cache else args.cache_dir,
+    )
+    print(f"[analyze-tab-events] Analyse de {len(events)} évènement(s)"
+          + (f" ({client.concurrency} requête(s) simultanée(s))..." if client else " (IA non configurée : stub)..."))
+    analyzed = [event.to_dict() for event in call_vision_ai_for_focus_events(events, client)]
+    if client:
+        print(f"[analyze-tab-events] Requêtes : {client.stats['requests']}, réponses en cache : "
+              f"{client.stats['cache_hits']}, reprises : {client.stats['retries']}, échecs : {client.stats['errors']}")
+        client.close()
 
     with open(output_json, "w", encoding="utf-8") as f:
         json.dump(analyzed, f, ensure_ascii=False, indent=2)
@@ -1021,6 +1454,11 @@ def main():
     p_build = subparsers.add_parser("build-vision-structure", help="Construire la structure visuelle à partir d'un dossier d'images.")
     p_build.add_argument("--images-dir", required=True, help="Dossier contenant les captures écran.")
     p_build.add_argument("--output-json", required=True, help="Fichier JSON de sortie pour la structure visuelle.")
+    p_build.add_argument("--workers", type=int, default=None, help="Processus d'analyse en parallèle (défaut : nombre de cœurs).")
+    p_build.add_argument("--cache-dir", default=DEFAULT_VISION_CACHE_DIR,
+                         help="Cache des structures par contenu d'image (défaut : .vision_cache).")
+    p_build.add_argument("--no-cache", action="store_true", help="Réanalyse toutes les images sans lire ni écrire le cache.")
+    p_build.add_argument("--lang", default="eng+fra", help="Langues tesseract (défaut : eng+fra).")
     p_build.set_defaults(func=cmd_build_vision_structure)
 
     # fuse-dom-vision
@@ -1040,6 +1478,11 @@ def main():
     p_tab = subparsers.add_parser("analyze-tab-events", help="Analyser les évènements de tabulation via une IA de vision (stub).")
     p_tab.add_argument("--events-json", required=True, help="JSON d'évènements de tabulation bruts.")
     p_tab.add_argument("--output-json", required=True, help="JSON de sortie avec analyse a11y.")
+    p_tab.add_argument("--concurrency", type=int, default=None,
+                       help="Requêtes IA simultanées (défaut : MISTRAL_MAX_CONCURRENCY ou 4).")
+    p_tab.add_argument("--cache-dir", default=None,
+                       help="Cache des réponses IA (défaut : MISTRAL_CACHE_DIR ou .vision_ai_cache).")
+    p_tab.add_argument("--no-cache", action="store_true", help="Ni lecture ni écriture du cache des réponses IA.")
     p_tab.set_defaults(func=cmd_analyze_tab_events)
 
     args = parser.parse_args()
@@ -4,12 +4,107 @@ import os
 import re
 import unicodedata
 import time
-import base64
-import requests
 from utils.log_utils import log_with_step
+from utils.report_paths import reports_path
+from utils.vision_client import VisionClient, extract_json
 import logging
 
 
+# Titres du document (RGAA 9.1.x) : landmarks hors dialogues, repli hors dialogues si aucun
+TITLES_EXTRACT_SCRIPT = """
+function getXPath(el) {
+    if (!el || el.nodeType !== 1) return '';
+    if (el.id) return '//*[@id="' + el.id + '"]';
+    const parts = [];
+    let cur = el;
+    while (cur && cur.nodeType === 1) {
+        let index = 1;
+        let sib = cur.previousElementSibling;
+        while (sib) {
+            if (sib.tagName === cur.tagName) index += 1;
+            sib = sib.previousElementSibling;
+        }
+        parts.unshift(cur.tagName.toLowerCase() + '[' + index + ']');
+        cur = cur.parentElement;
+    }
+    return '/' + parts.join('/');
+}
+
+function hasMaskedAncestor(el) {
+    let cur = el;
+    while (cur && cur.nodeType === 1) {
+        const style = window.getComputedStyle(cur);
+        const className = (cur.className || '').toString().toLowerCase();
+        const ariaHidden = (cur.getAttribute('aria-hidden') || '').toLowerCase() === 'true';
+        const isVisuallyHiddenClass =
+            className.includes('sr-only') || className.includes('visually-hidden');
+        const cssHidden =
+            style.display === 'none' ||
+            style.visibility === 'hidden' ||
+            parseFloat(style.opacity || '1') === 0;
+        if (ariaHidden || isVisuallyHiddenClass || cssHidden) {
+            return true;
+        }
+        cur = cur.parentElement;
+    }
+    return false;
+}
+
+function isInsideModal(el) {
+    return !!el.closest('[role="dialog"], [role="alertdialog"], [aria-modal="true"]');
+}
+
+function isInsidePageLandmark(el) {
+    return !!el.closest(
+        'header, main, footer, [role="banner"], [role="main"], [role="contentinfo"]'
+    );
+}
+
+function mapHeading(el) {
+    const tag = (el.tagName || '').toLowerCase();
+    const ariaLevel = el.getAttribute('aria-level');
+    let level = null;
+    if (tag.length === 2 && tag[0] === 'h') {
+        const parsed = parseInt(tag[1], 10);
+        if (!Number.isNaN(parsed)) level = parsed;
+    }
+    if (level === null && ariaLevel) {
+        const parsed = parseInt(ariaLevel, 10);
+        if (!Number.isNaN(parsed)) level = parsed;
+    }
+
+    const rect = el.getBoundingClientRect();
+    const noBox = rect.width === 0 || rect.height === 0;
+    const isMasked = hasMaskedAncestor(el) || noBox;
+
+    const textRaw = (el.innerText || el.textContent || '').trim();
+    const selector = getXPath(el);
+
+    return {
+        text_raw: textRaw,
+        dom_level: level,
+        selector: selector,
+        is_masked: isMasked
+    };
+}
+
+const nodes = Array.from(document.querySelectorAll(
+    'h1,h2,h3,h4,h5,h6,[role="heading"][aria-level]'
+));
+let chosen = nodes.filter((el) => isInsidePageLandmark(el) && !isInsideModal(el));
+let extraction_mode = 'landmarks';
+if (chosen.length === 0 && nodes.length > 0) {
+    chosen = nodes.filter((el) => !isInsideModal(el));
+    extraction_mode = 'fallback_except_modal';
+}
+return {
+    headings: chosen.map(mapHeading),
+    extraction_mode: extraction_mode,
+    total_candidates: nodes.length
+};
+"""
+
+
 class TitlesAnalyzer:
     """
     Module Titles (RGAA 9.1.x) : collecte DOM et reporting.
@@ -37,6 +132,7 @@ class TitlesAnalyzer:
         self.note_9_1_1 = 1
         self.note_9_1_2 = 0
         self.note_9_1_3 = 0
+        self._client = None
 
     @staticmethod
     def normalize_heading_text(text):
@@ -47,100 +143,10 @@ class TitlesAnalyzer:
         normalized = re.sub(r"\s+", " ", normalized).strip()
         return normalized
 
-    def _extract_dom_headings(self):
-        script = """
-            function getXPath(el) {
-                if (!el || el.nodeType !== 1) return '';
-                if (el.id) return '//*[@id="' + el.id + '"]';
-                const parts = [];
-                let cur = el;
-                while (cur && cur.nodeType === 1) {
-                    let index = 1;
-                    let sib = cur.previousElementSibling;
-                    while (sib) {
-                        if (sib.tagName === cur.tagName) index += 1;
-                        sib = sib.previousElementSibling;
-                    }
-                    parts.unshift(cur.tagName.toLowerCase() + '[' + index + ']');
-                    cur = cur.parentElement;
-                }
-                return '/' + parts.join('/');
-            }
-
-            function hasMaskedAncestor(el) {
-                let cur = el;
-                while (cur && cur.nodeType === 1) {
-                    const style = window.getComputedStyle(cur);
-                    const className = (cur.className || '').toString().toLowerCase();
-                    const ariaHidden = (cur.getAttribute('aria-hidden') || '').toLowerCase() === 'true';
-                    const isVisuallyHiddenClass =
-                        className.includes('sr-only') || className.includes('visually-hidden');
-                    const cssHidden =
-                        style.display === 'none' ||
-                        style.visibility === 'hidden' ||
-                        parseFloat(style.opacity || '1') === 0;
-                    if (ariaHidden || isVisuallyHiddenClass || cssHidden) {
-                        return true;
-                    }
-                    cur = cur.parentElement;
-                }
-                return false;
-            }
-
-            function isInsideModal(el) {
-                return !!el.closest('[role="dialog"], [role="alertdialog"], [aria-modal="true"]');
-            }
-
-            function isInsidePageLandmark(el) {
-                return !!el.closest(
-                    'header, main, footer, [role="banner"], [role="main"], [role="contentinfo"]'
-                );
-            }
-
-            function mapHeading(el) {
-                const tag = (el.tagName || '').toLowerCase();
-                const ariaLevel = el.getAttribute('aria-level');
-                let level = null;
-                if (tag.length === 2 && tag[0] === 'h') {
-                    const parsed = parseInt(tag[1], 10);
-                    if (!Number.isNaN(parsed)) level = parsed;
-                }
-                if (level === null && ariaLevel) {
-                    const parsed = parseInt(ariaLevel, 10);
-                    if (!Number.isNaN(parsed)) level = parsed;
-                }
-
-                const rect = el.getBoundingClientRect();
-                const noBox = rect.width === 0 || rect.height === 0;
-                const isMasked = hasMaskedAncestor(el) || noBox;
-
-                const textRaw = (el.innerText || el.textContent || '').trim();
-                const selector = getXPath(el);
-
-                return {
-                    text_raw: textRaw,
-                    dom_level: level,
-                    selector: selector,
-                    is_masked: isMasked
-                };
-            }
-
-            const nodes = Array.from(document.querySelectorAll(
-                'h1,h2,h3,h4,h5,h6,[role="heading"][aria-level]'
-            ));
-            let chosen = nodes.filter((el) => isInsidePageLandmark(el) && !isInsideModal(el));
-            let extraction_mode = 'landmarks';
-            if (chosen.length === 0 && nodes.length > 0) {
-                chosen = nodes.filter((el) => !isInsideModal(el));
-                extraction_mode = 'fallback_except_modal';
-            }
-            return {
-                headings: chosen.map(mapHeading),
-                extraction_mode: extraction_mode,
-                total_candidates: nodes.length
-            };
-        """
-        raw = self.driver.execute_script(script)
+    def _extract_dom_headings(self, raw=None):
+        """Titres du document courant ; `raw` = résultat déjà collecté de TITLES_EXTRACT_SCRIPT (snapshot)."""
+        if raw is None:
+            raw = self.driver.execute_script(TITLES_EXTRACT_SCRIPT)
         items = []
         self.titles_extraction_mode = ""
         if isinstance(raw, dict):
@@ -232,7 +238,7 @@ class TitlesAnalyzer:
         return mismatches
 
     def _load_ai_detections_9_1_3(self):
-        detections_path = "reports/titles_9_1_3_ai_detections.json"
+        detections_path = reports_path("titles_9_1_3_ai_detections.json")
         if not os.path.exists(detections_path):
             return []
         try:
@@ -249,106 +255,38 @@ class TitlesAnalyzer:
         return []
 
     @staticmethod
-    def _load_mistral_config(config_path=".mistral_config.json"):
-        if not os.path.exists(config_path):
-            return {}
-        try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                cfg = json.load(f)
-            return {
-                "MISTRAL_API_URL": cfg.get("MISTRAL_API_URL"),
-                "MISTRAL_API_KEY": cfg.get("MISTRAL_API_KEY"),
-                "MISTRAL_MODEL": cfg.get("MISTRAL_MODEL"),
-            }
-        except Exception:
-            return {}
+    def _extract_json_from_text(text):
+        return extract_json(text)
 
-    @staticmethod
-    def _image_to_data_url(path):
-        if not path or not os.path.exists(path):
-            return ""
-        ext = os.path.splitext(path)[1].lower()
-        mime = "image/png" if ext == ".png" else "image/jpeg"
-        with open(path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("utf-8")
-        return f"data:{mime};base64,{b64}"
+    def _vision_client(self):
+        """Client de vision partagé par les appels du module (None sans clé d'API)."""
+        if self._client is None:
+            self._client = VisionClient.from_settings("pixtral-12b-2409", logger=self.logger) or False
+        return self._client or None
 
-    @staticmethod
-    def _extract_json_from_text(text):
-        if not isinstance(text, str):
-            return None
-        stripped = text.strip()
-        try:
-            return json.loads(stripped)
-        except Exception:
-            pass
-        start = stripped.find("[")
-        end = stripped.rfind("]")
-        if start != -1 and end != -1 and end > start:
-            try:
-                return json.loads(stripped[start:end + 1])
-            except Exception:
-                pass
-        start = stripped.find("{")
-        end = stripped.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            try:
-                return json.loads(stripped[start:end + 1])
-            except Exception:
-                return None
-        return None
+    def _call_mistral_vision_many(self, requests_batch):
+        """
+        Requêtes (prompt, chemins d'images) envoyées en parallèle : [(réponse JSON ou None, provenance)]
+        dans l'ordre du lot.
+        """
+        client = self._vision_client()
+        if client is None:
+            return [(None, "missing_api_key")] * len(requests_batch)
+        results = []
+        for text_out, provider in client.run(requests_batch):
+            parsed = extract_json(text_out) if isinstance(text_out, str) else None
+            if parsed is None and isinstance(text_out, (dict, list)):
+                parsed = text_out
+            results.append((parsed, provider))
+        return results
 
     def _call_mistral_vision(self, prompt_text, image_paths):
-        mistral_url = os.environ.get("MISTRAL_API_URL")
-        mistral_key = os.environ.get("MISTRAL_API_KEY")
-        mistral_model = os.environ.get("MISTRAL_MODEL", "pixtral-12b-2409")
-        if not (mistral_url and mistral_key):
-            cfg = self._load_mistral_config()
-            mistral_url = mistral_url or cfg.get("MISTRAL_API_URL")
-            mistral_key = mistral_key or cfg.get("MISTRAL_API_KEY")
-            mistral_model = cfg.get("MISTRAL_MODEL") or mistral_model
-        if not mistral_url:
-            mistral_url = "https://api.mistral.ai/v1/chat/completions"
-        if not mistral_key:
-            return None, "missing_api_key"
-
-        content = [{"type": "text", "text": prompt_text}]
-        for image_path in image_paths:
-            data_url = self._image_to_data_url(image_path)
-            if data_url:
-                content.append({"type": "image_url", "image_url": data_url})
-
-        payload = {
-            "model": mistral_model,
-            "messages": [{"role": "user", "content": content}],
-            "temperature": 0.1,
-        }
-        headers = {
-            "Authorization": f"Bearer {mistral_key}",
-            "Content-Type": "application/json",
-        }
-        try:
-            response = requests.post(mistral_url, headers=headers, json=payload, timeout=90)
-            response.raise_for_status()
-            body = response.json()
-            text_out = None
-            if isinstance(body, dict):
-                choices = body.get("choices")
-                if isinstance(choices, list) and choices:
-                    msg = choices[0].get("message", {})
-                    text_out = msg.get("content")
-                text_out = text_out or body.get("output") or body.get("result") or body.get("text")
-            parsed = self._extract_json_from_text(text_out) if isinstance(text_out, str) else None
-            if parsed is None and isinstance(text_out, dict):
-                parsed = text_out
-            return parsed, "api"
-        except Exception as exc:
-            log_with_step(self.logger, logging.WARNING, "TITLES", f"Appel vision IA impossible: {exc}")
-            return None, "api_error"
+        return self._call_mistral_vision_many([(prompt_text, image_paths)])[0]
 
     def _generate_ai_results_9_1_2(self, sections_9_1_2):
-        output_path = "reports/titles_9_1_2_ai_results.json"
+        output_path = reports_path("titles_9_1_2_ai_results.json")
         generated = []
+        pending = []
         for section in sections_9_1_2:
             screenshot_path = section.get("section_screenshot_path", "")
             heading_text = section.get("heading_text", "")
@@ -369,43 +307,50 @@ class TitlesAnalyzer:
                 f"Titre: {heading_text}\n"
                 f"Niveau: {heading_level}\n"
             )
-            ai_payload, provider = self._call_mistral_vision(prompt, [screenshot_path])
+            generated.append({"heading_index": heading_index})
+            pending.append((len(generated) - 1, prompt, screenshot_path))
+
+        answers = self._call_mistral_vision_many([(prompt, [path]) for _, prompt, path in pending])
+        for (position, _, _), (ai_payload, provider) in zip(pending, answers):
+            heading_index = generated[position]["heading_index"]
             if isinstance(ai_payload, dict):
-                generated.append({
+                generated[position] = {
                     "heading_index": heading_index,
                     "ok": self._coerce_ai_ok(ai_payload.get("ok")),
                     "score": ai_payload.get("score", ""),
                     "comment": ai_payload.get("comment", ""),
                     "provider": provider,
-                })
+                }
             else:
                 # Fallback neutre en absence d'API: garder une trace exploitable.
-                generated.append({
+                generated[position] = {
                     "heading_index": heading_index,
                     "ok": "",
                     "score": "",
                     "comment": "pending_ai_review_auto",
                     "provider": provider,
-                })
+                }
 
         with open(output_path, "w", encoding="utf-8") as f:
             json.dump({"results": generated}, f, ensure_ascii=False, indent=2)
         return generated
 
     def _generate_ai_detections_9_1_3(self, segments_9_1_3):
-        output_path = "reports/titles_9_1_3_ai_detections.json"
+        output_path = reports_path("titles_9_1_3_ai_detections.json")
         detections = []
-        for segment in segments_9_1_3:
-            segment_path = segment.get("segment_path", "")
-            if not segment_path or not os.path.exists(segment_path):
-                continue
-            prompt = (
-                "Repère les textes qui ressemblent à des titres sur cette capture de page web.\n"
-                "RENVOIE UNIQUEMENT un JSON strict de type liste:\n"
-                '[{"text_detected":"...", "ai_confidence":0.0, "level_estimated":1}]\n'
-                "Si aucun titre-like: []"
-            )
-            ai_payload, provider = self._call_mistral_vision(prompt, [segment_path])
+        prompt = (
+            "Repère les textes qui ressemblent à des titres sur cette capture de page web.\n"
+            "RENVOIE UNIQUEMENT un JSON strict de type liste:\n"
+            '[{"text_detected":"...", "ai_confidence":0.0, "level_estimated":1}]\n'
+            "Si aucun titre-like: []"
+        )
+        segments = [
+            segment for segment in segments_9_1_3
+            if segment.get("segment_path", "") and os.path.exists(segment.get("segment_path", ""))
+        ]
+        answers = self._call_mistral_vision_many([(prompt, [segment["segment_path"]]) for segment in segments])
+        for segment, (ai_payload, provider) in zip(segments, answers):
+            segment_path = segment["segment_path"]
             if isinstance(ai_payload, list):
                 for row in ai_payload:
                     if not isinstance(row, dict):
@@ -423,7 +368,7 @@ class TitlesAnalyzer:
         return detections
 
     def _capture_9_1_2_section_screenshots(self, sections_9_1_2):
-        output_dir = "reports/titles_9_1_2_sections"
+        output_dir = reports_path("titles_9_1_2_sections")
         os.makedirs(output_dir, exist_ok=True)
         for section in sections_9_1_2:
             section["section_screenshot_path"] = ""
@@ -466,7 +411,7 @@ class TitlesAnalyzer:
                 )
 
     def _capture_9_1_3_segments(self):
-        output_dir = "reports/titles_9_1_3_segments"
+        output_dir = reports_path("titles_9_1_3_segments")
         os.makedirs(output_dir, exist_ok=True)
         segments = []
         try:
@@ -489,14 +434,14 @@ class TitlesAnalyzer:
                 })
                 segment_idx += 1
                 y += step
-            with open("reports/titles_9_1_3_segments_manifest.json", "w", encoding="utf-8") as f:
+            with open(reports_path("titles_9_1_3_segments_manifest.json"), "w", encoding="utf-8") as f:
                 json.dump(segments, f, ensure_ascii=False, indent=2)
         except Exception as exc:
             log_with_step(self.logger, logging.WARNING, "TITLES", f"Capture segments impossible: {exc}")
         return segments
 
     def _load_ai_results_9_1_2(self):
-        results_path = "reports/titles_9_1_2_ai_results.json"
+        results_path = reports_path("titles_9_1_2_ai_results.json")
         if not os.path.exists(results_path):
             return {}
         try:
@@ -574,7 +519,7 @@ class TitlesAnalyzer:
         total = len(sections_9_1_2)
         with_screenshot = sum(1 for row in sections_9_1_2 if row.get("section_screenshot_path"))
         providers = [row.get("ai_provider", "") for row in sections_9_1_2]
-        api_count = sum(1 for p in providers if p == "api")
+        api_count = sum(1 for p in providers if p in {"api", "cache"})
         fallback_count = sum(1 for p in providers if p in {"api_error", "missing_api_key"})
         pending_count = sum(1 for row in sections_9_1_2 if row.get("ai_ok", "") == "")
         return {
@@ -608,9 +553,9 @@ class TitlesAnalyzer:
         }
 
     def _write_outputs(self, incoherences, sections_9_1_2, mismatches_9_1_3, segments_9_1_3, ai_detections_9_1_3):
-        os.makedirs("reports", exist_ok=True)
+        os.makedirs(reports_path(), exist_ok=True)
 
-        incoh_path = "reports/titles_9_1_1_incoherences.csv"
+        incoh_path = reports_path("titles_9_1_1_incoherences.csv")
         with open(incoh_path, "w", newline="", encoding="utf-8-sig") as f:
             writer = csv.writer(f)
             writer.writerow([
@@ -633,7 +578,7 @@ class TitlesAnalyzer:
                     row.get("curr_selector", ""),
                 ])
 
-        path_9_1_2 = "reports/titles_9_1_2_results.csv"
+        path_9_1_2 = reports_path("titles_9_1_2_results.csv")
         with open(path_9_1_2, "w", newline="", encoding="utf-8-sig") as f:
             writer = csv.writer(f)
             writer.writerow([
@@ -664,7 +609,7 @@ class TitlesAnalyzer:
                     row.get("ai_comment", "pending_ai_review"),
                 ])
 
-        path_9_1_3 = "reports/titles_9_1_3_ai_mismatches.csv"
+        path_9_1_3 = reports_path("titles_9_1_3_ai_mismatches.csv")
         with open(path_9_1_3, "w", newline="", encoding="utf-8-sig") as f:
             writer = csv.writer(f)
             writer.writerow(["text_detected", "text_normalized", "ai_confidence", "level_estimated"])
@@ -676,7 +621,7 @@ class TitlesAnalyzer:
                     row["level_estimated"],
                 ])
 
-        report_path = "reports/titles_report.md"
+        report_path = reports_path("titles_report.md")
         with open(report_path, "w", encoding="utf-8") as f:
             coverage_9_1_2 = self._compute_ai_coverage_9_1_2(sections_9_1_2)
             coverage_9_1_3 = self._compute_ai_coverage_9_1_3(segments_9_1_3, ai_detections_9_1_3)
@@ -782,3 +727,28 @@ class TitlesAnalyzer:
             "eligible_headings_9_1_1_count": len(self.eligible_headings_9_1_1),
             "titles_extraction_mode": self.titles_extraction_mode,
         }
+
+    def run_offline(self, headings_payload):
+        """
+        RGAA 9.1.x sans navigateur, depuis le résultat de TITLES_EXTRACT_SCRIPT conservé dans un
+        snapshot : 9.1.1 complet, sections 9.1.2 calculées (captures et revue IA en attente),
+        9.1.3 comparé aux détections IA déjà présentes dans le répertoire de l'audit.
+        """
+        self._extract_dom_headings(headings_payload or {})
+        incoherences = self._compute_9_1_1()
+        sections_9_1_2 = self.enrich_sections_with_ai_results(
+            self.compute_sections_boundaries(self.eligible_headings_9_1_1), self._load_ai_results_9_1_2()
+        )
+        self.note_9_1_2 = self.compute_note_9_1_2(sections_9_1_2)
+        ai_detections_9_1_3 = self._load_ai_detections_9_1_3()
+        mismatches_9_1_3 = self.compute_ai_mismatches(ai_detections_9_1_3, self.dom_headings_all)
+        self.note_9_1_3 = 1 if len(mismatches_9_1_3) == 0 else 0
+        self._write_outputs(incoherences, sections_9_1_2, mismatches_9_1_3, [], ai_detections_9_1_3)
+        return {
+            "note_9_1_1": self.note_9_1_1,
+            "note_9_1_2": self.note_9_1_2,
+            "note_9_1_3": self.note_9_1_3,
+            "dom_headings_count": len(self.dom_headings_all),
+            "incoherences": len(incoherences),
+            "titles_extraction_mode": self.titles_extraction_mode,
+        }
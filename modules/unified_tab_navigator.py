@@ -4,7 +4,7 @@ import os
 from PIL import Image, ImageDraw
 import io
 import time
-from selenium.webdriver.support.ui import WebDriverWait
+from utils.page_readiness import wait_for_page_ready
 from utils.element_identifier import ElementIdentifier
 
 class UnifiedTabNavigator:
@@ -301,16 +301,8 @@ class UnifiedTabNavigator:
             elements_reached = []
             visited_elements = set()
             
-            # Attendre que la page soit complètement chargée
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    lambda d: d.execute_script('return document.readyState') == 'complete'
-                )
-            except Exception as e:
-                self.logger.warning(f"Erreur lors de l'attente du chargement de la page: {str(e)}")
-            
-            # Attendre un peu plus pour le JavaScript
-            time.sleep(2)
+            # Attendre que la page soit stable (JavaScript compris), sans délai fixe
+            wait_for_page_ready(self.driver, logger=self.logger, step_tag="TABULATION")
             
             for i in range(self.max_screenshots):
                 try:
@@ -0,0 +1,144 @@
+import base64
+
+import numpy as np
+import pytest
+
+from core.binary_snapshot import BinarySnapshot, NO_STRING, is_binary_snapshot
+from core.offline_runner import run_offline_analyzer
+from core.page_snapshot import load_snapshot, save_snapshot
+from modules.dom_accessibility_from_batch import snapshot_to_attrs
+
+DOM = {
+    "version": 1,
+    "count": 4,
+    "scroll": [0, 50],
+    "tags": ["HTML", "BODY", "NAV", "A"],
+    "tag": [0, 1, 2, 3],
+    "parent": [-1, 0, 1, 2],
+    "domIndex": [1, 1, 1, 1],
+    "parentIndex": [-1, 1, 1, 1],
+    "rect": [0, 0, 800, 600, 0, 0, 800, 600, 0, 0, 800, 40, 10, 10, 60.5, 20],
+    "flags": [7, 7, 7, 15],
+    "attrs": {
+        "role": {"rows": [2], "values": ["navigation"]},
+        "href": {"rows": [3], "values": ["/contact"]},
+        "absIndex": {"rows": [3], "values": [4]},
+        "xpath": {"rows": [2, 3], "values": ["/html/body[1]/nav[1]", "/html/body[1]/nav[1]/a[1]"]},
+    },
+    "accName": {"rows": [3], "name": ["Contact"], "source": ["text_content"]},
+    "style": {"rows": [2, 3], "values": [["block", "visible", "1", "static", "auto", "", "", "16px", "400"],
+                                         ["inline", "hidden", "1", "static", "auto", "", "", "16px", "400"]]},
+}
+
+
+FOREIGN_FRAME = {"index": 0, "parent": -1, "src": "https://tiers.fr/widget", "error": "cross-origin"}
+CONTRAST = {"count": 1, "tag": ["a"], "selector": ["a"], "text": ["Contact"], "fg": [0, 0, 0, 1],
+            "bg": [255, 255, 255], "fontSize": [16], "fontWeight": [400], "flags": [0], "rect": [10, 10, 60, 20]}
+HEADINGS = {"headings": [{"text_raw": "Accueil", "dom_level": 1, "selector": "/html/body/h1"}],
+            "extraction_mode": "landmarks"}
+
+
+def _snapshot():
+    return {
+        "format": "rgaa-page-snapshot",
+        "version": 1,
+        "meta": {"url": "https://www.exemple.fr/"},
+        "frames": [{"index": -1, "parent": None, "src": "", "dom": DOM}, FOREIGN_FRAME],
+        "contrast": CONTRAST,
+        "headings": HEADINGS,
+        "screenshots": {"viewport": base64.b64encode(b"\x89PNG-viewport").decode("ascii")},
+    }
+
+
+def test_binary_round_trip_matches_json(tmp_path):
+    path = save_snapshot(_snapshot(), str(tmp_path / "page.rgsnap"))
+    assert is_binary_snapshot(path)
+    loaded = load_snapshot(path)
+    assert snapshot_to_attrs(loaded["frames"][0]["dom"]) == snapshot_to_attrs(DOM)
+    assert loaded["frames"][1] == FOREIGN_FRAME
+    assert loaded["contrast"] == CONTRAST and loaded["headings"] == HEADINGS
+    assert base64.b64decode(loaded["screenshots"]["viewport"]) == b"\x89PNG-viewport"
+
+
+def test_columns_are_memory_mapped_views(tmp_path):
+    path = save_snapshot(_snapshot(), str(tmp_path / "page.rgsnap"))
+    with BinarySnapshot(path) as snap:
+        frame = snap.frames[0]
+        rect = frame.column("rect")
+        assert rect.dtype == np.float32 and rect.shape == (4, 4) and not rect.flags.writeable
+        assert frame.rows_with_tag("A").tolist() == [3]
+        assert frame.rows_with_role("navigation").tolist() == [2]
+        assert frame.column("role")[3] == NO_STRING
+        assert frame.column("visibility").tolist() == [0, 0, 1, 2]
+        assert frame.attr("href", 3) == "/contact" and frame.attr("href", 2) is None
+        assert frame.attr("absIndex", 3) == 4 and frame.attr("role", 2) == "navigation"
+        assert snap.screenshot("viewport") == b"\x89PNG-viewport" and snap.screenshot("full_page") is None
+        # Chaînes internées une seule fois
+        assert len(snap.strings) == len(set(snap.strings[i] for i in range(len(snap.strings))))
+
+
+def test_offline_analysis_reads_binary_snapshots(tmp_path):
+    path = save_snapshot(_snapshot(), str(tmp_path / "page.rgsnap"))
+    result = run_offline_analyzer("dom", path)
+    assert result["status"] == "ok" and result["analyzed_elements"] == 4
+
+
+def test_rejects_foreign_file(tmp_path):
+    other = tmp_path / "x.rgsnap"
+    other.write_bytes(b"NOTSNAP!" + b"\x00" * 16)
+    with pytest.raises(ValueError):
+        BinarySnapshot(str(other))
+
+
+def test_row_attrs_match_materialized_rows(tmp_path):
+    path = save_snapshot(_snapshot(), str(tmp_path / "page.rgsnap"))
+    with BinarySnapshot(path) as snap:
+        frame = snap.frames[0]
+        expected = snapshot_to_attrs(frame.to_columnar())
+        assert [frame.row_attrs(row) for row in range(frame.count)] == expected
+
+
+def test_offline_analyzers_read_columns_without_materializing(tmp_path, monkeypatch):
+    from core.binary_snapshot import FrameView
+    from core.offline_runner import analyze_dom, analyze_duplicate_ids
+    from utils.report_paths import run_directory
+    snapshot = _snapshot()
+    # Deux éléments partageant un id référencé par aria-controls, lien sans texte
+    snapshot["frames"][0]["dom"] = dict(DOM, attrs=dict(DOM["attrs"], id={"rows": [2, 3], "values": ["menu", "menu"]},
+                                                        ariaControls={"rows": [3], "values": ["menu"]}))
+    path = save_snapshot(snapshot, str(tmp_path / "page.rgsnap"))
+    # Référence : l'ancien chemin, snapshot binaire reconverti en dicts
+    reference = tmp_path / "reference"
+    reference.mkdir()
+    with run_directory(str(reference)):
+        expected = analyze_dom(load_snapshot(path), None), analyze_duplicate_ids(load_snapshot(path), None)
+
+    def forbidden(self):
+        raise AssertionError("snapshot binaire reconverti en dicts")
+
+    monkeypatch.setattr(FrameView, "to_columnar", forbidden)
+    assert run_offline_analyzer("dom", path)["issues_found"] == expected[0]["issues_found"]
+    assert run_offline_analyzer("ids", path)["duplicate_id_elements"] == expected[1]["duplicate_id_elements"] == 2
+    for name in ("rapport_analyse_dom.csv", "rapport_analyse_dom.json", "reports/duplicate_ids.csv"):
+        assert (tmp_path / name).read_bytes() == (reference / name).read_bytes()
+    for name in ("titles", "contrast"):
+        assert run_offline_analyzer(name, path)["status"] == "ok"
+
+
+def test_tag_and_role_lookup_does_not_decode_string_table(tmp_path, monkeypatch):
+    from core.binary_snapshot import StringTable
+    from core.offline_runner import _rule_candidates
+
+    path = save_snapshot(_snapshot(), str(tmp_path / "page.rgsnap"))
+    decoded = []
+    real_getitem = StringTable.__getitem__
+    monkeypatch.setattr(StringTable, "__getitem__", lambda self, sid: decoded.append(sid) or real_getitem(self, sid))
+    with BinarySnapshot(path) as snap:
+        frame = snap.frames[0]
+        assert frame.rows_with_tags(("A", "NAV")).tolist() == [2, 3]
+        assert frame.rows_with_role("navigation").tolist() == [2]
+        assert _rule_candidates(frame).tolist() == [2, 3]
+        assert decoded == []
+        # Fichier sans vocabulaire : seuls les identifiants distincts de la colonne sont décodés
+        del frame.dom["vocab"]
+        assert frame.rows_with_tag("A").tolist() == [3] and len(decoded) == 4
@@ -0,0 +1,127 @@
+import pytest
+
+from core.browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    launched = 0
+
+    def __init__(self):
+        FakeBrowser.launched += 1
+        self.window_handles = ["main"]
+        self.switch_to = self
+        self.cookies_cleared = 0
+        self.current_url = None
+        self.alive = True
+        self.quit_called = False
+
+    def window(self, handle):
+        pass
+
+    def close(self):
+        self.window_handles.pop()
+
+    def get(self, url):
+        self.current_url = url
+
+    def delete_all_cookies(self):
+        self.cookies_cleared += 1
+
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise RuntimeError("session perdue")
+        return 1 if script == "return 1" else None
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture(autouse=True)
+def _reset_counter():
+    FakeBrowser.launched = 0
+
+
+def test_browsers_are_warm_and_reset_between_audits():
+    with BrowserPool(size=2, factory=FakeBrowser, max_pages=10) as pool:
+        assert FakeBrowser.launched == 2
+        with pool.lease() as driver:
+            driver.get("https://exemple.fr/")
+            driver.window_handles.append("popup")
+        # Rendu remis à zéro : popup fermée, cookies effacés, page vide
+        assert driver.window_handles == ["main"]
+        assert driver.cookies_cleared == 1
+        assert driver.current_url == "about:blank"
+        for _ in range(5):
+            with pool.lease():
+                pass
+        assert FakeBrowser.launched == 2
+
+
+def test_browser_recycled_after_max_pages():
+    with BrowserPool(size=1, factory=FakeBrowser, max_pages=3) as pool:
+        drivers = []
+        for _ in range(4):
+            with pool.lease() as driver:
+                drivers.append(driver)
+        assert drivers[0] is drivers[2]
+        assert drivers[3] is not drivers[0]
+        assert drivers[0].quit_called
+        assert pool.recycled == 1
+
+
+def test_unhealthy_browser_replaced_on_acquire():
+    with BrowserPool(size=1, factory=FakeBrowser) as pool:
+        with pool.lease() as driver:
+            pass
+        driver.alive = False
+        with pool.lease() as replacement:
+            assert replacement is not driver
+        assert FakeBrowser.launched == 2
+
+
+class FakeCdpBrowser(FakeBrowser):
+    """Navigateur CDP : historique, iframes et cookies touchant plusieurs origines."""
+
+    def __init__(self):
+        super().__init__()
+        self.window_handles = ["main", "popup"]
+        self.current = "main"
+        self.cleared = []
+
+    def window(self, handle):
+        self.current = handle
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Page.getNavigationHistory":
+            urls = ["about:blank", "https://exemple.fr/", "https://www.exemple.fr:8443/page"]
+            if self.current == "popup":
+                urls = ["https://paiement.example/"]
+            return {"entries": [{"url": url} for url in urls]}
+        if cmd == "Page.getFrameTree":
+            return {"frameTree": {"frame": {"url": "https://exemple.fr/"}, "childFrames": [
+                {"frame": {"url": "https://video.example/embed"},
+                 "childFrames": [{"frame": {"url": "about:srcdoc"}}]}]}}
+        if cmd == "Network.getAllCookies":
+            return {"cookies": [{"domain": ".pub.example"}]}
+        if cmd == "Storage.clearDataForOrigin":
+            self.cleared.append((params["origin"], params["storageTypes"]))
+        return {}
+
+
+def test_reset_clears_storage_of_every_visited_origin():
+    with BrowserPool(size=1, factory=FakeCdpBrowser) as pool:
+        with pool.lease() as driver:
+            pass
+    assert driver.window_handles == ["main"]
+    assert {types for _, types in driver.cleared} == {"all"}
+    assert sorted(origin for origin, _ in driver.cleared) == [
+        "http://pub.example", "https://exemple.fr", "https://paiement.example", "https://pub.example",
+        "https://video.example", "https://www.exemple.fr:8443"]
+
+
+def test_release_after_close_does_not_relaunch():
+    pool = BrowserPool(size=1, factory=FakeBrowser, max_pages=1).start()
+    with pool.lease() as driver:
+        pool.close()
+    assert driver.quit_called
+    assert FakeBrowser.launched == 1 and pool._all == []
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from modules.contrast_checker import evaluate_contrast_payload
+from utils.color_utils import (
+    calculate_contrast_ratio,
+    contrast_ratio_array,
+    large_text_mask,
+    parse_css_color,
+)
+
+
+def test_parse_css_color_formats():
+    assert parse_css_color("rgb(255, 0, 0)") == (255.0, 0.0, 0.0, 1.0)
+    assert parse_css_color("rgba(0, 0, 0, 0.5)") == (0.0, 0.0, 0.0, 0.5)
+    assert parse_css_color("rgb(0 128 255 / 50%)") == (0.0, 128.0, 255.0, 0.5)
+    assert parse_css_color("#fff") == (255.0, 255.0, 255.0, 1.0)
+    assert parse_css_color("transparent")[3] == 0.0
+    assert parse_css_color("color(srgb 1 0 0)") is None
+
+
+def test_calculate_contrast_ratio_reference_values():
+    assert calculate_contrast_ratio("rgb(0, 0, 0)", "rgb(255, 255, 255)") == pytest.approx(21.0)
+    assert calculate_contrast_ratio("#777777", "#ffffff") == pytest.approx(4.48, abs=0.01)
+    assert calculate_contrast_ratio("#ffffff", "#ffffff") == pytest.approx(1.0)
+    # Texte noir à 50 % sur blanc ≈ gris #808080
+    assert calculate_contrast_ratio("rgba(0, 0, 0, 0.5)", "#ffffff") == pytest.approx(3.98, abs=0.01)
+
+
+def test_contrast_ratio_array_matches_scalar():
+    fg = np.array([[0, 0, 0, 1], [119, 119, 119, 1], [255, 0, 0, 0.7]], dtype=float)
+    bg = np.array([[255, 255, 255], [255, 255, 255], [0, 0, 64]], dtype=float)
+    ratios = contrast_ratio_array(fg, bg)
+    for i in range(3):
+        scalar = calculate_contrast_ratio(tuple(fg[i]), tuple(bg[i]))
+        assert ratios[i] == pytest.approx(scalar)
+
+
+def test_large_text_thresholds():
+    mask = large_text_mask([24, 19, 19, 16], [400, 700, 400, 900])
+    assert mask.tolist() == [True, True, False, False]
+
+
+def test_evaluate_contrast_payload_applies_size_thresholds():
+    payload = {
+        "count": 3,
+        "fg": [119, 119, 119, 1] * 3,
+        "bg": [255, 255, 255] * 3,
+        "fontSize": [16, 24, 16],
+        "fontWeight": [400, 400, 400],
+        "flags": [0, 0, 1],
+    }
+    result = evaluate_contrast_payload(payload)
+    # 4.48 : non conforme en texte normal, conforme en grand texte
+    assert result["passed"].tolist() == [False, True, False]
+    assert result["required"].tolist() == [4.5, 3.0, 4.5]
+
+
+def test_contrast_ratio_is_not_rounded_before_comparison():
+    # #767776 sur blanc ≈ 4.496:1, affiché 4.50 mais non conforme au seuil de 4.5:1
+    payload = {
+        "count": 1,
+        "fg": [118, 119, 118, 1],
+        "bg": [255, 255, 255],
+        "fontSize": [16],
+        "fontWeight": [400],
+        "flags": [0],
+    }
+    result = evaluate_contrast_payload(payload)
+    assert 4.495 < result["ratio"][0] < 4.5
+    assert round(float(result["ratio"][0]), 2) == 4.5
+    assert result["passed"].tolist() == [False]
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+
+from utils.consent_state import ConsentStore, origin_of
+
+URL = "https://www.exemple.fr/page?x=1"
+
+
+class CdpDriver:
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+        if cmd == "Page.addScriptToEvaluateOnNewDocument":
+            return {"identifier": str(len(self.commands))}
+        return {}
+
+    def get_cookies(self):
+        return [{"name": "didomi_token", "value": "abc", "domain": ".exemple.fr", "path": "/",
+                 "expiry": int(time.time()) + 3600, "httpOnly": False, "secure": True, "sameSite": "Lax"},
+                {"name": "session", "value": "1", "domain": "www.exemple.fr", "path": "/",
+                 "httpOnly": True, "secure": False}]
+
+    def execute_script(self, script, *args):
+        return {"euconsent-v2": "CP123"}
+
+
+def test_capture_and_load_round_trip(tmp_path):
+    store = ConsentStore(str(tmp_path))
+    store.capture_selenium(CdpDriver(), URL)
+    assert os.path.basename(store.path_for(URL)) == "https_www.exemple.fr.json"
+
+    state = store.load("https://www.exemple.fr/autre")
+    assert [c["name"] for c in state["cookies"]] == ["didomi_token", "session"]
+    assert state["cookies"][1]["expires"] == -1 and state["cookies"][1]["sameSite"] == "Lax"
+    assert state["origins"] == [{"origin": "https://www.exemple.fr",
+                                 "localStorage": [{"name": "euconsent-v2", "value": "CP123"}]}]
+    # Autre origine : rien à réinjecter
+    assert store.load("https://autre.fr/") is None
+
+
+def test_expired_state_is_ignored(tmp_path):
+    store = ConsentStore(str(tmp_path), max_age_days=1)
+    store.save(URL, [{"name": "old", "value": "1", "domain": "www.exemple.fr", "expiry": 10}], {})
+    assert store.load(URL) is None
+    store.save(URL, [{"name": "ok", "value": "1", "domain": "www.exemple.fr"}], {})
+    old = time.time() - 3 * 86400
+    os.utime(store.path_for(URL), (old, old))
+    assert store.load(URL) is None
+    assert store.forget(URL) and not store.forget(URL)
+
+
+def test_inject_uses_cdp_before_navigation(tmp_path):
+    store = ConsentStore(str(tmp_path))
+    state = store.capture_selenium(CdpDriver(), URL)
+    driver = CdpDriver()
+    assert store.inject_selenium(driver, state)
+    assert store.inject_selenium(driver, state)
+    names = [cmd for cmd, _ in driver.commands]
+    assert names.count("Network.setCookie") == 4
+    assert "expires" in driver.commands[0][1] and "expires" not in driver.commands[1][1]
+    # Le script de restauration précédent est retiré avant d'en ajouter un nouveau
+    assert names.count("Page.removeScriptToEvaluateOnNewDocument") == 1
+    source = driver.commands[-1][1]["source"]
+    assert json.dumps(origin_of(URL)) in source and "euconsent-v2" in source
+
+
+def test_inject_falls_back_to_navigation_without_cdp(tmp_path):
+    class PlainDriver:
+        def __init__(self):
+            self.visited, self.cookies, self.storage = [], [], {}
+
+        def get(self, url):
+            self.visited.append(url)
+
+        def add_cookie(self, cookie):
+            self.cookies.append(cookie)
+
+        def execute_script(self, script, *args):
+            self.storage[args[0]] = args[1]
+
+    store = ConsentStore(str(tmp_path))
+    state = store.capture_selenium(CdpDriver(), URL)
+    driver = PlainDriver()
+    assert store.inject_selenium(driver, state)
+    assert driver.visited == ["https://www.exemple.fr"]
+    assert [c["name"] for c in driver.cookies] == ["didomi_token", "session"]
+    assert driver.storage == {"euconsent-v2": "CP123"}
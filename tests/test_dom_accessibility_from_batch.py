@@ -4,8 +4,13 @@ import os
 import tempfile
 
 from modules.dom_accessibility_from_batch import (
+    DOM_SNIPPET_MAX_HTML,
+    DOM_SNIPPET_MAX_TEXT,
+    batch_extract_options,
     build_dom_element_record,
     check_accessibility_issues_from_dict,
+    estimate_payload_bytes,
+    snapshot_to_attrs,
     stable_css_selector_from_attrs,
     write_dom_analysis_reports,
 )
@@ -157,6 +162,28 @@ def test_write_dom_reports_roundtrip():
         assert len(data["elements"]) == 1
 
 
+def test_write_dom_analysis_reports_streams_same_json():
+    records = [
+        build_dom_element_record({"tag": "a", "text": "é\n", "rectPage": {"x": 1.5}}, "//a", "a.lien"),
+        build_dom_element_record({"tag": "img", "id": "logo"}, "//img", "#logo"),
+    ]
+    issues = []
+    for record in records:
+        check_accessibility_issues_from_dict(record, issues)
+    summary = {"total_elements": 2, "analyzed_elements": 2, "issues_found": len(issues)}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, elements in (("liste", records), ("flux", iter(records)), ("vide", iter(()))):
+            json_p = os.path.join(tmp, f"{name}.json")
+            write_dom_analysis_reports(elements, issues, summary, os.path.join(tmp, f"{name}.csv"), json_p)
+            expected = {"schema_version": 2, "elements": records if name != "vide" else [],
+                        "issues": issues, "summary": summary}
+            with open(json_p, encoding="utf-8") as f:
+                assert f.read() == json.dumps(expected, ensure_ascii=False, indent=2)
+        with open(os.path.join(tmp, "flux.csv"), encoding="utf-8-sig") as f:
+            rows = f.read().splitlines()
+        assert rows[-1].endswith("Image sans alternative textuelle - Image sans attribut alt ou role='presentation'")
+
+
 def test_build_dom_element_record_bad_accessible_name():
     rec = build_dom_element_record(
         {"tag": "span", "accessibleName": "not-a-dict"},
@@ -164,3 +191,51 @@ def test_build_dom_element_record_bad_accessible_name():
         "span",
     )
     assert rec["accessible_name"]["source"] == "none"
+
+
+def test_batch_extract_options_bounded_text():
+    assert batch_extract_options() == {"maxHtml": DOM_SNIPPET_MAX_HTML, "maxText": DOM_SNIPPET_MAX_TEXT}
+    assert batch_extract_options(500) == {"maxHtml": DOM_SNIPPET_MAX_HTML, "maxText": 500}
+    # Texte complet uniquement sur demande explicite
+    assert batch_extract_options(-1) == {"maxHtml": DOM_SNIPPET_MAX_HTML}
+
+
+def test_estimate_payload_bytes_utf8():
+    assert estimate_payload_bytes([{"text": "é"}]) == len('[{"text":"é"}]'.encode("utf-8"))
+
+
+def test_snapshot_to_attrs_feeds_dom_record():
+    snapshot = {
+        "version": 1,
+        "count": 3,
+        "scroll": [0, 100],
+        "tags": ["HTML", "BODY", "IMG"],
+        "tag": [0, 1, 2],
+        "parent": [-1, 0, 1],
+        "domIndex": [1, 1, 1],
+        "parentIndex": [-1, 1, 1],
+        "rect": [0, 0, 800, 600, 0, 0, 800, 600, 10, 120, 50, 40],
+        "flags": [7, 7, 7],
+        "attrs": {
+            "src": {"rows": [2], "values": ["logo.png"]},
+            "mediaPath": {"rows": [2], "values": ["logo.png"]},
+            "mediaType": {"rows": [2], "values": ["image"]},
+            "xpath": {"rows": [1, 2], "values": ["/html/body[1]", "/html/body[1]/img[1]"]},
+        },
+        "accName": {"rows": [], "name": [], "source": []},
+        "style": {"rows": [2], "values": [["inline", "visible", "1", "static", "auto", "", "", "16px", "400"]]},
+    }
+    rows = snapshot_to_attrs(snapshot)
+    assert len(rows) == 3
+    img = rows[2]
+    assert img["absIndex"] == 3 and img["parentAbsIndex"] == 2
+    assert img["alt"] is None and img["inputType"] == ""
+    assert img["rectViewport"]["y"] == 20
+    assert img["computedStyle"]["display"] == "inline"
+
+    rec = build_dom_element_record(img, img["xpath"], stable_css_selector_from_attrs(img))
+    assert rec["xpath"] == "/html/body[1]/img[1]"
+    assert rec["position"] == {"x": 10, "y": 120, "width": 50, "height": 40}
+    issues = []
+    check_accessibility_issues_from_dict(rec, issues)
+    assert issues and issues[0]["type"] == "Image sans alternative textuelle"
@@ -0,0 +1,34 @@
+import logging
+
+from modules.dom_accessibility_from_batch import snapshot_to_attrs
+from modules.enhanced_screen_reader import EnhancedScreenReader
+
+DOM = {
+    "version": 1,
+    "count": 3,
+    "scroll": [0, 0],
+    "tags": ["HTML", "BODY", "A"],
+    "tag": [0, 1, 2],
+    "parent": [-1, 0, 1],
+    "domIndex": [1, 1, 2],
+    "parentIndex": [-1, 1, 1],
+    "rect": [0, 0, 800, 600, 0, 0, 800, 600, 10, 10, 20, 20],
+    "flags": [7, 7, 15],
+    "attrs": {
+        "className": {"rows": [2], "values": ["btn--hide-txt"]},
+        "xpath": {"rows": [1, 2], "values": ["/html/body[1]", "/html/body[1]/a[2]"]},
+    },
+    "accName": {"rows": [], "name": [], "source": []},
+    "style": {"rows": [], "values": []},
+}
+
+
+def test_snapshot_links_report_full_xpath():
+    reader = EnhancedScreenReader(None, logging.getLogger("test"))
+    attrs = snapshot_to_attrs(DOM)[2]
+    results = reader._analyze_link_from_attrs(attrs, {"Sélecteur": "a.btn--hide-txt", "main_xpath": "//a"})
+    assert [r["type"] for r in results] == ["Lien sans texte explicite", "Lien avec texte masqué"]
+    assert all(r["xpath"] == "/html/body[1]/a[2]" for r in results)
+    # Mode lots (pas de colonne XPath) : XPath simple
+    del attrs["xpath"]
+    assert reader._analyze_link_from_attrs(attrs, {"Sélecteur": "a", "main_xpath": "//a"})[0]["xpath"] == "//a"
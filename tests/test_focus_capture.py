@@ -0,0 +1,75 @@
+import base64
+import io
+
+from PIL import Image
+
+from utils.focus_capture import FocusCapture
+
+
+def _png(width, height, color=(255, 255, 255)):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(output, format="PNG")
+    return output.getvalue()
+
+
+class ViewportDriver:
+    """Driver sans CDP : seule la capture du viewport (800×600) est disponible."""
+
+    def __init__(self):
+        self.screenshots = 0
+
+    def get_screenshot_as_png(self):
+        self.screenshots += 1
+        return _png(800, 600)
+
+
+class CdpDriver(ViewportDriver):
+    def __init__(self):
+        super().__init__()
+        self.clips = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        clip = params["clip"]
+        self.clips.append(clip)
+        w, h = int(clip["width"] * clip["scale"]), int(clip["height"] * clip["scale"])
+        return {"data": base64.b64encode(_png(w, h)).decode()}
+
+
+DESCRIPTOR = {
+    "rect": {"x": 100, "y": 50, "width": 40, "height": 20},
+    "position": {"x": 100, "y": 1050, "width": 40, "height": 20},
+    "viewport": {"width": 800, "height": 600},
+}
+
+
+def test_clip_mode_requests_padded_region_in_document_coordinates(tmp_path):
+    driver = CdpDriver()
+    capture = FocusCapture(driver, output_dir=str(tmp_path), mode="clip", padding=10, thumbnail_scale=0.25)
+    path, thumb = capture.capture(DESCRIPTOR, 1)
+    assert capture.close() == 0
+    assert driver.screenshots == 0
+    assert driver.clips[0] == {"x": 90, "y": 1040, "width": 60, "height": 40, "scale": 1}
+    with Image.open(path) as img:
+        assert img.size == (60, 40)
+        assert img.getpixel((10, 10)) == (255, 0, 0)  # cadre rouge au bord de l'élément
+    with Image.open(thumb) as img:
+        assert img.size == (200, 150)
+    assert capture.last_cost_ms > 0
+
+
+def test_clip_mode_without_cdp_crops_viewport_in_background(tmp_path):
+    capture = FocusCapture(ViewportDriver(), output_dir=str(tmp_path), mode="clip", padding=10)
+    path, thumb = capture.capture(DESCRIPTOR, 2)
+    assert capture.close() == 0
+    assert thumb is None
+    with Image.open(path) as img:
+        assert img.size == (60, 40)
+
+
+def test_viewport_mode_keeps_full_frame(tmp_path):
+    capture = FocusCapture(CdpDriver(), output_dir=str(tmp_path), mode="viewport")
+    path, _ = capture.capture(DESCRIPTOR, 3)
+    capture.close()
+    with Image.open(path) as img:
+        assert img.size == (800, 600)
+        assert img.getpixel((100, 50)) == (255, 0, 0)
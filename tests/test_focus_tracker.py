@@ -0,0 +1,109 @@
+import logging
+
+from modules.tab_navigator import TabNavigator
+from utils.focus_tracker import FocusTracker, focus_identifier
+
+
+def _descriptor(seq, tag="a", element_id="", text="", focusable=True):
+    return {
+        "seq": seq,
+        "tag": tag,
+        "text": text,
+        "href": None,
+        "xpath": f"/html/body[1]/{tag}[{seq}]",
+        "css_selector": f"{tag}:nth-of-type({seq})",
+        "accessible_name": {"name": text, "source": "text" if text else "none", "priority": 6 if text else 0},
+        "aria_attributes": {},
+        "basic_attributes": {"id": element_id, "class": "", "title": "", "alt": "", "type": "",
+                             "value": "", "placeholder": "", "tabindex": ""},
+        "rect": {"x": 10, "y": 20 * seq, "width": 50, "height": 10},
+        "position": {"x": 10, "y": 20 * seq, "width": 50, "height": 10},
+        "is_visible": True,
+        "is_enabled": True,
+        "focusable": focusable,
+        "image_alt": None,
+        "parent_roles": [],
+    }
+
+
+class FakeDriver:
+    """Page simulée : chaque TAB fait passer le focus à l'élément suivant (cycle)."""
+
+    def __init__(self, order):
+        self.order = order
+        self.position = 0
+        self.buffer = []
+        self.calls = 0
+
+    def execute_script(self, script, *args):
+        self.calls += 1
+        return 0
+
+    def execute_async_script(self, script, expected, timeout_ms):
+        self.calls += 1
+        out, self.buffer = self.buffer, []
+        return out
+
+    def execute(self, command, params=None):
+        # ActionChains : une action par TAB
+        self.calls += 1
+        keys = [a for source in params["actions"] if source["type"] == "key" for a in source["actions"]]
+        for action in keys:
+            if action["type"] == "keyDown":
+                d = dict(self.order[self.position % len(self.order)])
+                d["seq"] = self.position + 1
+                self.buffer.append(d)
+                self.position += 1
+        return {"value": None}
+
+
+def test_focus_identifier_matches_navigator_format():
+    assert focus_identifier(_descriptor(1, element_id="menu")) == "a|id=menu|pos=10,20"
+    assert focus_identifier(_descriptor(2, tag="button", text="Envoyer")) == "button|text=Envoyer|pos=10,40"
+
+
+def test_walk_batches_tab_presses_and_drains_once_per_batch():
+    driver = FakeDriver([_descriptor(i) for i in range(1, 8)])
+    tracker = FocusTracker(driver)
+    seqs = [d["seq"] for d in tracker.walk(20, drain_every=10)]
+    assert seqs == list(range(1, 21))
+    # install + 2 × (envoi des TAB + vidange)
+    assert tracker.round_trips == 5
+
+
+def test_tab_navigator_stops_on_cycle_without_screenshots(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    order = [_descriptor(1, text="Accueil"), _descriptor(2, focusable=False), _descriptor(3, text="Contact")]
+    driver = FakeDriver(order)
+    driver.execute_script = lambda script, *args: "complete" if "readyState" in script else 0
+    navigator = TabNavigator(driver, logging.getLogger("test"), max_screenshots=30, capture_screenshots=False)
+    results = navigator.run()
+    assert [r["text"] for r in results] == ["Accueil", "Contact"]
+    assert results[0]["xpath"] == "/html/body[1]/a[1]"
+    assert (tmp_path / "rapport_analyse_tab.csv").exists()
+
+
+def test_tab_navigator_with_screenshots_forces_single_step_drains(tmp_path, monkeypatch, caplog):
+    import modules.tab_navigator as tab_navigator
+
+    class FakeCapture:
+        last_cost_ms = 1.0
+
+        def __init__(self, driver, **options):
+            pass
+
+        def capture(self, descriptor, index, suffix):
+            return f"focus_{index}_{suffix}.png", None
+
+        def close(self):
+            pass
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tab_navigator, "FocusCapture", FakeCapture)
+    driver = FakeDriver([_descriptor(1, text="Accueil"), _descriptor(2, text="Contact")])
+    driver.execute_script = lambda script, *args: "complete" if "readyState" in script else 0
+    navigator = TabNavigator(driver, logging.getLogger("test"), max_screenshots=2, drain_every=10)
+    with caplog.at_level(logging.WARNING):
+        results = navigator.run()
+    assert [r["screenshots"]["immediate"] for r in results] == ["focus_1_1.png", "focus_2_1.png"]
+    assert "une tabulation à la fois" in caplog.text
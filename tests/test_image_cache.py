@@ -0,0 +1,145 @@
+import functools
+import io
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from utils.image_cache import ImageCache, image_facts
+from utils.image_downloader import ImageDownloader
+
+
+class _CountingHandler(SimpleHTTPRequestHandler):
+    statuses = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_response(self, code, message=None):
+        _CountingHandler.statuses.append(code)
+        super().send_response(code, message)
+
+
+def _png(width, height, color):
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def png_server(tmp_path):
+    root = tmp_path / "site"
+    root.mkdir()
+    for i in range(20):
+        (root / f"img_{i}.png").write_bytes(_png(10 + i, 5, (i, 0, 0)))
+    # Même contenu sous deux URL : un seul blob dans le cache
+    (root / "copie.png").write_bytes((root / "img_0.png").read_bytes())
+    _CountingHandler.statuses = []
+    handler = functools.partial(_CountingHandler, directory=str(root))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_second_run_revalidates_without_transfer(png_server, tmp_path):
+    urls = [f"{png_server}/img_{i}.png" for i in range(20)] + [f"{png_server}/copie.png"]
+    cache_dir = str(tmp_path / "cache")
+
+    first = ImageDownloader(str(tmp_path / "run1"), cache=ImageCache(cache_dir))
+    results = first.download_all(urls)
+    first.close()
+    assert all(r["cache"] == "miss" for r in results.values())
+    assert results[urls[3]]["facts"]["width"] == 13
+    assert results[urls[3]]["facts"]["format"] == "PNG"
+    assert results[urls[0]]["facts"]["sha256"] == results[urls[-1]]["facts"]["sha256"]
+
+    # Nouvelle exécution : index relu depuis le disque, requêtes conditionnelles (If-Modified-Since)
+    _CountingHandler.statuses = []
+    second = ImageDownloader(str(tmp_path / "run2"), cache=ImageCache(cache_dir))
+    results = second.download_all(urls)
+    second.close()
+    assert _CountingHandler.statuses == [304] * len(urls)
+    assert second.total_bytes == 0
+    assert all(r["cache"] == "revalidated" for r in results.values())
+    assert results[urls[3]]["facts"]["height"] == 5
+    with Image.open(results[urls[3]]["local_path"]) as img:
+        assert img.size == (13, 5)
+    assert f"{len(urls)} servies par le cache" in second.summary(results)
+
+
+def test_fresh_entry_skips_request(png_server, tmp_path):
+    url = f"{png_server}/img_1.png"
+    cache = ImageCache(str(tmp_path / "cache"))
+    downloader = ImageDownloader(str(tmp_path / "out"), cache=cache)
+    downloader.download_all([url])
+    # Réponse marquée fraîche pour une heure : aucune requête au prochain passage
+    cache.touch(url, {"Cache-Control": "max-age=3600"})
+    _CountingHandler.statuses = []
+    results = downloader.download_all([url])
+    downloader.close()
+    assert _CountingHandler.statuses == []
+    assert results[url]["cache"] == "fresh"
+
+
+def test_lru_eviction_keeps_recent_blobs(tmp_path):
+    cache = ImageCache(str(tmp_path / "cache"), max_bytes=250)
+    for i in range(3):
+        path = tmp_path / f"f{i}.bin"
+        path.write_bytes(bytes([i]) * 100)
+        cache.store_file(f"http://x/{i}", str(path), {})
+    cache.touch("http://x/0")
+    cache.save()
+
+    reloaded = ImageCache(str(tmp_path / "cache"), max_bytes=250)
+    assert reloaded.total_bytes() == 200
+    assert reloaded.lookup("http://x/1") is None
+    assert reloaded.lookup("http://x/0") is not None
+    assert reloaded.lookup("http://x/2") is not None
+
+
+def test_image_facts_detects_svg(tmp_path):
+    path = tmp_path / "logo.svg"
+    path.write_text('<?xml version="1.0"?><svg xmlns="http://www.w3.org/2000/svg"/>')
+    facts = image_facts(str(path))
+    assert facts["format"] == "SVG"
+    assert facts["width"] is None
+    assert facts["size"] == os.path.getsize(path)
+
+
+def test_concurrent_writers_merge_index(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first, second = ImageCache(cache_dir), ImageCache(cache_dir)
+    for i, cache in enumerate((first, second)):
+        path = tmp_path / f"f{i}.bin"
+        path.write_bytes(bytes([i]) * 10)
+        cache.store_file(f"http://x/{i}", str(path), {"ETag": f'"{i}"'})
+    first.save()
+    second.save()
+    # La seconde sauvegarde n'efface pas les entrées de la première
+    reloaded = ImageCache(cache_dir)
+    assert reloaded.lookup("http://x/0")["etag"] == '"0"'
+    assert reloaded.lookup("http://x/1")["etag"] == '"1"'
+    assert not any(name.endswith(".tmp") for name in os.listdir(cache_dir))
+
+
+def test_image_cache_dir_is_absolute_and_shared(tmp_path, monkeypatch):
+    from core.config import Config
+    from modules.image_analyzer import ImageAnalyzer
+
+    monkeypatch.chdir(tmp_path)
+    config = Config()
+    assert config.get_image_cache_dir() == str(tmp_path / ".image_cache")
+    config.set_image_cache_dir("partage")
+    (tmp_path / "pages" / "p1").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path / "pages" / "p1")
+    assert config.get_image_cache_dir() == str(tmp_path / "partage")
+    analyzer = ImageAnalyzer(None, None, "https://exemple.fr", str(tmp_path / "images"),
+                             cache_dir=config.get_image_cache_dir())
+    assert analyzer.cache_dir == str(tmp_path / "partage")
+    config.set_image_cache_dir(None)
+    assert config.get_image_cache_dir() is None
@@ -0,0 +1,64 @@
+import functools
+import os
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.image_downloader import ImageDownloader, image_local_path
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    requests_seen = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        _QuietHandler.requests_seen.append(self.path)
+        super().do_GET()
+
+
+@pytest.fixture
+def image_server(tmp_path):
+    """Serveur HTTP local servant 300 « images » de tailles différentes."""
+    root = tmp_path / "site"
+    root.mkdir()
+    for i in range(300):
+        (root / f"img_{i}.png").write_bytes(bytes([i % 256]) * (100 + i))
+    _QuietHandler.requests_seen = []
+    handler = functools.partial(_QuietHandler, directory=str(root))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_all_dedupes_and_reports_bytes(image_server, tmp_path):
+    out = tmp_path / "out"
+    urls = [f"{image_server}/img_{i}.png" for i in range(300)]
+    # Chaque image est référencée deux fois (sprites, logos répétés…)
+    downloader = ImageDownloader(str(out), max_workers=8, per_host=4)
+    results = downloader.download_all(urls + urls + [f"{image_server}/absente.png"])
+    downloader.close()
+
+    assert len(results) == 301
+    assert len(_QuietHandler.requests_seen) == 301
+    assert results[f"{image_server}/absente.png"]["status"] == "error_http_404"
+    ok = [r for r in results.values() if r["status"] == "success"]
+    assert len(ok) == 300
+    assert downloader.total_bytes == sum(100 + i for i in range(300))
+    assert downloader.requested == 601
+    assert "301 URL uniques pour 601 références" in downloader.summary(results)
+
+    first = results[urls[0]]
+    assert first["local_path"] == image_local_path(str(out), urls[0])
+    assert os.path.getsize(first["local_path"]) == 100
+
+
+def test_unsupported_scheme_is_not_fetched(tmp_path):
+    downloader = ImageDownloader(str(tmp_path))
+    results = downloader.download_all(["data:image/png;base64,AAAA"])
+    assert results["data:image/png;base64,AAAA"]["status"] == "error_unsupported_scheme"
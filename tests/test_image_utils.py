@@ -0,0 +1,51 @@
+import numpy as np
+
+from utils.image_utils import (
+    DALTONISM_MODES,
+    decode_rgb,
+    encode_png,
+    simulate_daltonism,
+    simulate_daltonism_array,
+)
+
+
+def test_grays_are_preserved_by_all_modes():
+    gray = np.repeat(np.arange(0, 256, 5, dtype=np.uint8)[None, :, None], 3, axis=2)
+    for mode, out in simulate_daltonism_array(gray).items():
+        assert np.abs(out.astype(int) - gray.astype(int)).max() <= 1, mode
+
+
+def test_achromatopsia_outputs_equal_channels():
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (32, 48, 3), dtype=np.uint8)
+    out = simulate_daltonism_array(img, ("achromatopsia",))["achromatopsia"]
+    assert (out[..., 0] == out[..., 1]).all() and (out[..., 1] == out[..., 2]).all()
+
+
+def test_red_green_confusion_under_protanopia_and_deuteranopia():
+    img = np.array([[[255, 0, 0], [0, 128, 0]]], dtype=np.uint8)
+    out = simulate_daltonism_array(img, ("protanopia", "deuteranopia"))
+    for mode in ("protanopia", "deuteranopia"):
+        red, green = out[mode][0].astype(int)
+        # Rouge et vert deviennent des teintes jaune/brun proches : plus de dominance rouge
+        assert red[0] - red[1] < 60, mode
+        assert abs(red[2] - green[2]) < 40, mode
+
+
+def test_chunked_processing_matches_single_block(monkeypatch):
+    import utils.image_utils as image_utils
+
+    rng = np.random.default_rng(1)
+    img = rng.integers(0, 256, (50, 20, 3), dtype=np.uint8)
+    full = simulate_daltonism_array(img)
+    monkeypatch.setattr(image_utils, "_CHUNK_PIXELS", 7 * 20)
+    chunked = simulate_daltonism_array(img)
+    for mode in DALTONISM_MODES:
+        np.testing.assert_array_equal(full[mode], chunked[mode])
+
+
+def test_simulate_daltonism_png_roundtrip():
+    img = np.zeros((4, 4, 3), dtype=np.uint8)
+    img[..., 0] = 200
+    out = decode_rgb(simulate_daltonism(encode_png(img), "tritanopia"))
+    assert out.shape == (4, 4, 3)
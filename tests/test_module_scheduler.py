@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from core.module_scheduler import ModuleScheduler, build_tasks, critical_path
+from utils.report_paths import run_directory
+
+
+class FakeModule:
+    def __init__(self, name, events, delay=0.0, fail=False):
+        self.name = name
+        self.events = events
+        self.delay = delay
+        self.fail = fail
+        self.driver = None
+
+    def run(self):
+        self.events.append(("start", self.name, self.driver))
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("échec")
+        self.events.append(("end", self.name, self.driver))
+
+
+class Provider:
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def lease(self):
+        if self.broken:
+            raise RuntimeError("navigateur indisponible")
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            yield "isolé"
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def _modules(events, delay=0.05):
+    return {
+        1: [("screen_reader", FakeModule("screen_reader", events, delay))],
+        2: [("tab_navigation", FakeModule("tab_navigation", events, delay))],
+        3: [(name, FakeModule(name, events, delay)) for name in ("contrast", "titles", "navigation")],
+        4: [("dom_analyzer", FakeModule("dom_analyzer", events, delay))],
+    }
+
+
+ENABLED = ["screen_reader", "tab_navigation", "contrast", "titles", "navigation", "dom_analyzer"]
+
+
+def test_build_tasks_marks_parallel_groups_isolated():
+    tasks = build_tasks(_modules([]), ENABLED)
+    assert {t.name: t.isolated for t in tasks} == {
+        "screen_reader": False, "tab_navigation": False, "contrast": True,
+        "titles": True, "navigation": True, "dom_analyzer": True,
+    }
+    assert next(t for t in tasks if t.name == "tab_navigation").deps == ["screen_reader"]
+    assert not any(t.isolated for t in build_tasks(_modules([]), ENABLED, parallel=False))
+
+
+def test_isolated_modules_run_concurrently_on_leased_contexts(tmp_path):
+    events = []
+    provider = Provider()
+    scheduler = ModuleScheduler(build_tasks(_modules(events, delay=0.2), ENABLED), "principal", provider)
+    with run_directory(str(tmp_path)):
+        report = scheduler.run()
+        path = scheduler.write_report()
+
+    drivers = {name: driver for kind, name, driver in events if kind == "start"}
+    assert drivers["screen_reader"] == drivers["tab_navigation"] == "principal"
+    assert all(drivers[n] == "isolé" for n in ("contrast", "titles", "navigation", "dom_analyzer"))
+    order = [name for kind, name, _ in events if kind == "end"]
+    assert order.index("screen_reader") < [n for k, n, _ in events if k == "start"].index("tab_navigation")
+    assert provider.peak == 4
+    # Série : 6 × 0.2 s ; en parallèle, la file principale (2 modules) domine
+    assert report["wall_s"] < report["serial_s"] - 0.4
+    assert report["critical_path"] == ["screen_reader", "tab_navigation"]
+    assert report["parallel_contexts"] == 4
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["tasks"][0]["name"] == "screen_reader"
+
+
+def test_unavailable_context_falls_back_to_main_driver():
+    events = []
+    modules = _modules(events, delay=0.0)
+    modules[3][1] = ("titles", FakeModule("titles", events, fail=True))
+    tasks = build_tasks(modules, ENABLED)
+    report = ModuleScheduler(tasks, "principal", Provider(broken=True)).run()
+    assert {driver for kind, _, driver in events} == {"principal"}
+    statuses = {t["name"]: (t["status"], t["context"]) for t in report["tasks"]}
+    assert statuses["titles"][0] == "erreur"
+    assert statuses["contrast"] == ("ok", "principal")
+
+
+def test_critical_path_follows_longest_chain():
+    tasks = build_tasks(_modules([]), ENABLED)
+    durations = {"screen_reader": 1.0, "tab_navigation": 2.0, "contrast": 4.0,
+                 "titles": 0.5, "navigation": 0.5, "dom_analyzer": 1.0}
+    for task in tasks:
+        task.start, task.end = 0.0, durations[task.name]
+    assert critical_path(tasks) == (["contrast"], 4.0)
@@ -0,0 +1,140 @@
+import csv
+import json
+import logging
+
+import pytest
+
+from core.offline_runner import OfflineRunner, analyzers_for_modules, run_offline_analyzer
+from core.page_snapshot import capture_page_snapshot, load_snapshot, save_snapshot
+from modules.dom_accessibility_from_batch import duplicate_id_issues_from_attrs, snapshot_to_attrs
+
+DOM = {
+    "version": 1,
+    "count": 5,
+    "scroll": [0, 0],
+    "tags": ["HTML", "BODY", "IMG", "BUTTON", "DIV"],
+    "tag": [0, 1, 2, 3, 4],
+    "parent": [-1, 0, 1, 1, 1],
+    "domIndex": [1, 1, 1, 1, 1],
+    "parentIndex": [-1, 1, 1, 1, 1],
+    "rect": [0, 0, 800, 600] * 2 + [10, 10, 50, 40, 10, 60, 80, 20, 10, 90, 80, 20],
+    "flags": [7, 7, 7, 15, 7],
+    "attrs": {
+        "id": {"rows": [3, 4], "values": ["menu", "menu"]},
+        "ariaControls": {"rows": [3], "values": ["menu"]},
+        "xpath": {"rows": [1, 2, 3, 4], "values": ["/html/body[1]", "/html/body[1]/img[1]",
+                                                   "/html/body[1]/button[1]", "/html/body[1]/div[1]"]},
+    },
+    "accName": {"rows": [], "name": [], "source": []},
+    "style": {"rows": [], "values": []},
+}
+
+SNAPSHOT = {
+    "format": "rgaa-page-snapshot",
+    "version": 1,
+    "meta": {"url": "https://www.exemple.fr/"},
+    "frames": [{"index": -1, "parent": None, "src": "", "dom": DOM},
+               {"index": 0, "parent": -1, "src": "https://tiers.fr/widget", "error": "cross-origin"}],
+    "contrast": {"count": 2, "tag": ["p", "span"], "selector": ["p", "span"], "text": ["lisible", "pâle"],
+                 "fg": [0, 0, 0, 1, 200, 200, 200, 1], "bg": [255, 255, 255, 255, 255, 255],
+                 "fontSize": [16, 16], "fontWeight": [400, 400], "flags": [0, 0], "rect": [0] * 8},
+    "headings": {"headings": [{"text_raw": "Accueil", "dom_level": 1, "selector": "/html/body/h1"},
+                              {"text_raw": "Détail", "dom_level": 3, "selector": "/html/body/h3"}],
+                 "extraction_mode": "landmarks"},
+    "screenshots": {},
+}
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return save_snapshot(SNAPSHOT, str(tmp_path / "page" / "snapshot.json.gz"))
+
+
+def test_save_and_load_round_trip(snapshot_path, tmp_path):
+    assert load_snapshot(snapshot_path)["frames"][0]["dom"]["count"] == 5
+    other = tmp_path / "autre.json.gz"
+    save_snapshot({"format": "autre"}, str(other))
+    with pytest.raises(ValueError):
+        load_snapshot(str(other))
+
+
+def test_duplicate_ids_from_attrs_rank_aria_references():
+    issues = duplicate_id_issues_from_attrs(snapshot_to_attrs(DOM))
+    assert [i["xpath"] for i in issues] == ["/html/body[1]/button[1]", "/html/body[1]/div[1]"]
+    assert all(i["severity"] == "critical" for i in issues)
+    assert "Référence ARIA" in issues[0]["impact"] and "Lien interne ou bouton" in issues[0]["impact"]
+
+
+def test_offline_analyzers_write_reports_next_to_snapshot(snapshot_path, tmp_path):
+    out = tmp_path / "page"
+    assert run_offline_analyzer("dom", snapshot_path)["issues_found"] >= 1
+    with open(out / "rapport_analyse_dom.json", encoding="utf-8") as f:
+        assert json.load(f)
+    assert run_offline_analyzer("ids", snapshot_path)["duplicate_id_elements"] == 2
+    with open(out / "reports" / "duplicate_ids.csv", encoding="utf-8") as f:
+        assert list(csv.reader(f))[1][0] == "document"
+    titles = run_offline_analyzer("titles", snapshot_path)
+    assert titles["status"] == "ok" and titles["note_9_1_1"] == 0
+    contrast = run_offline_analyzer("contrast", snapshot_path)
+    assert contrast["status"] == "ok" and contrast["contrast_failures"] == 1
+    assert (out / "reports" / "contrast_report.csv").exists()
+
+
+def test_runner_process_pool_and_module_mapping(snapshot_path):
+    assert analyzers_for_modules(["contrast", "screen_reader", "tab_navigation"]) == ["ids", "contrast"]
+    results = OfflineRunner(logging.getLogger("test"), workers=2,
+                            analyzers=["ids", "contrast"]).run([snapshot_path])
+    assert sorted(r["analyzer"] for r in results) == ["contrast", "ids"]
+    assert all(r["status"] == "ok" for r in results)
+
+
+def test_runner_loads_each_snapshot_once(snapshot_path, monkeypatch):
+    import core.offline_runner as offline_runner
+
+    opened = []
+    real_open = offline_runner.open_snapshot
+
+    def counting_open(path):
+        opened.append(path)
+        return real_open(path)
+
+    monkeypatch.setattr(offline_runner, "open_snapshot", counting_open)
+    results = OfflineRunner(logging.getLogger("test"), workers=1).run([snapshot_path])
+    assert [r["analyzer"] for r in results] == ["dom", "ids", "titles", "contrast"]
+    assert all(r["status"] == "ok" for r in results) and opened == [snapshot_path]
+    missing = OfflineRunner(logging.getLogger("test"), workers=1, analyzers=["dom", "ids"]).run(["absent.json.gz"])
+    assert [r["status"] for r in missing] == ["error", "error"]
+
+
+def test_capture_collects_every_frame():
+    class Frame:
+        def get_attribute(self, name):
+            return "https://tiers.fr/widget" if name == "src" else None
+
+    class SwitchTo:
+        def __init__(self, driver):
+            self.driver = driver
+
+        def default_content(self):
+            self.driver.in_frame = False
+
+        def frame(self, frame):
+            raise RuntimeError("cross-origin")
+
+    class Driver:
+        def __init__(self):
+            self.in_frame = False
+            self.switch_to = SwitchTo(self)
+
+        def execute_script(self, script, *args):
+            if "querySelectorAll('*')" in script:
+                return DOM
+            return {}
+
+        def find_elements(self, by, value):
+            return [Frame()]
+
+    snapshot = capture_page_snapshot(Driver(), screenshots=False)
+    assert [f["index"] for f in snapshot["frames"]] == [-1, 0]
+    assert snapshot["frames"][0]["dom"]["count"] == 5
+    assert snapshot["frames"][1]["src"] == "https://tiers.fr/widget" and "cross-origin" in snapshot["frames"][1]["error"]
@@ -0,0 +1,105 @@
+import logging
+
+import pytest
+
+from core.config import Config
+from utils import page_readiness
+from utils.page_readiness import (
+    PAGE_READINESS_INSTALL_SCRIPT,
+    PAGE_READINESS_WAIT_SCRIPT,
+    install_page_readiness,
+    set_readiness_defaults,
+    wait_for_page_ready,
+)
+
+
+class FakeDriver:
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.scripts = []
+        self.script_timeout = None
+        self.async_args = None
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        return True
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    def execute_async_script(self, script, *args):
+        assert script == PAGE_READINESS_WAIT_SCRIPT
+        self.async_args = args
+        self.timeout_during_wait = self.script_timeout
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+@pytest.fixture(autouse=True)
+def _defaults():
+    yield
+    set_readiness_defaults(10.0, 500)
+
+
+def test_ready_page_returns_measured_settle_time(caplog):
+    driver = FakeDriver({"ready": True, "elapsed_ms": 120, "pending": []})
+    with caplog.at_level(logging.INFO):
+        result = wait_for_page_ready(driver, timeout=3, quiet_ms=200, logger=logging.getLogger("test"), label="p1")
+    assert result["ready"] and result["settle_ms"] >= 0
+    assert driver.async_args == (200, 3000)
+    assert "__rgaaReadiness" in driver.scripts[0]
+    assert "Page stable en" in caplog.text and "(p1)" in caplog.text
+
+
+def test_unsettled_page_logs_pending_signals(caplog):
+    driver = FakeDriver({"ready": False, "elapsed_ms": 3000, "pending": ["network", "images"]})
+    with caplog.at_level(logging.WARNING):
+        result = wait_for_page_ready(driver, timeout=3, logger=logging.getLogger("test"))
+    assert not result["ready"]
+    assert "network, images" in caplog.text
+
+
+def test_driver_error_never_raises():
+    result = wait_for_page_ready(FakeDriver(RuntimeError("onglet fermé")))
+    assert result["ready"] is False and "onglet fermé" in result["pending"][0]
+
+
+def test_configured_defaults_are_used():
+    config = Config()
+    config.set_page_readiness(2.5, 300)
+    set_readiness_defaults(*config.get_page_readiness())
+    driver = FakeDriver({"ready": True, "elapsed_ms": 0, "pending": []})
+    wait_for_page_ready(driver)
+    assert driver.async_args == (300, 2500)
+    assert page_readiness.DEFAULT_TIMEOUT == 2.5
+    assert driver.script_timeout >= 30
+
+
+def test_caller_script_timeout_is_restored():
+    driver = FakeDriver({"ready": True, "elapsed_ms": 0, "pending": []})
+    driver.script_timeout = 12
+    wait_for_page_ready(driver, timeout=40)
+    assert driver.timeout_during_wait == 45 and driver.script_timeout == 12
+    failing = FakeDriver(RuntimeError("onglet fermé"))
+    failing.script_timeout = 12
+    wait_for_page_ready(failing)
+    assert failing.script_timeout == 12
+
+
+def test_monitor_is_registered_before_navigation():
+    class CdpDriver:
+        def __init__(self):
+            self.commands = []
+
+        def execute_cdp_cmd(self, cmd, params):
+            self.commands.append((cmd, params))
+            return {"identifier": "1"}
+
+    driver = CdpDriver()
+    assert install_page_readiness(driver) and install_page_readiness(driver)
+    assert driver.commands == [("Page.addScriptToEvaluateOnNewDocument", {"source": PAGE_READINESS_INSTALL_SCRIPT})]
+    # Script d'initialisation : pas de `return` hors fonction
+    assert PAGE_READINESS_INSTALL_SCRIPT.strip().startswith("(function")
+    assert not install_page_readiness(FakeDriver({}))
+    assert "m.pendingResources()" in PAGE_READINESS_WAIT_SCRIPT
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from modules.contrast_checker import CONTRAST_FLAG_BG_IMAGE, apply_pixel_ratios, evaluate_contrast_payload
+from utils.pixel_contrast import estimate_text_colors, sample_text_colors, scale_rects
+
+
+def _text_block(fg, bg, h=20, w=60):
+    """Bloc de « texte » synthétique : traits horizontaux de couleur fg sur fond bg."""
+    block = np.empty((h, w, 3), dtype=np.uint8)
+    block[:] = bg
+    block[5:8, 5:55] = fg
+    block[12:15, 5:40] = fg
+    return block
+
+
+def test_estimate_text_colors_separates_text_and_background():
+    fg, bg = estimate_text_colors(_text_block((20, 20, 20), (250, 250, 250)))
+    assert np.allclose(fg, 20)
+    assert np.allclose(bg, 250)
+
+
+def test_estimate_text_colors_on_gradient_background():
+    block = _text_block((255, 255, 255), (0, 0, 0))
+    block[:, :, 2] = np.where(block[:, :, 0] == 255, 255, np.linspace(60, 90, block.shape[1]).astype(np.uint8))
+    fg, bg = estimate_text_colors(block)
+    assert np.allclose(fg, 255)
+    assert bg[2] > 50
+
+
+def test_sample_text_colors_pool_matches_serial():
+    image = np.full((400, 600, 3), 255, dtype=np.uint8)
+    rects = []
+    for i in range(40):
+        y, x = (i // 8) * 60, (i % 8) * 70
+        image[y:y + 20, x:x + 60] = _text_block((i * 5, 0, 0), (255, 255, 255))
+        rects.append([x, y, 60, 20])
+    rects.append([1000, 1000, 10, 10])  # hors image
+    serial = sample_text_colors(image, rects)
+    pooled = sample_text_colors(image, rects, max_workers=2, pool_threshold=1)
+    np.testing.assert_array_equal(serial[0], pooled[0])
+    assert np.isnan(serial[1][-1]).all()
+
+
+def test_scale_rects_handles_device_pixel_ratio_and_origin():
+    rects = scale_rects([10, 110, 20, 5], origin_x=0, origin_y=100, css_width=800, image_width=1600)
+    assert rects.tolist() == [[20, 20, 40, 10]]
+
+
+def test_apply_pixel_ratios_only_overrides_background_images():
+    payload = {
+        "count": 2,
+        "fg": [255, 255, 255, 1] * 2,
+        "bg": [255, 255, 255] * 2,
+        "fontSize": [16, 16],
+        "fontWeight": [400, 400],
+    }
+    result = evaluate_contrast_payload(payload)
+    merged = apply_pixel_ratios(result, [0, CONTRAST_FLAG_BG_IMAGE], np.array([21.0, 21.0]))
+    assert merged["passed"].tolist() == [False, True]
+    assert merged["ratio"][1] == pytest.approx(21.0)
+
+
+def test_sample_pixels_only_samples_background_image_rows(monkeypatch):
+    import modules.contrast_checker as contrast_checker
+
+    seen = []
+
+    def fake_sample(image, rects):
+        seen.append(np.asarray(rects).tolist())
+        return np.zeros((len(rects), 3)), np.full((len(rects), 3), 255.0)
+
+    monkeypatch.setattr(contrast_checker, "decode_rgb", lambda png: np.zeros((100, 100, 3), dtype=np.uint8))
+    monkeypatch.setattr(contrast_checker, "sample_text_colors", fake_sample)
+    checker = contrast_checker.ContrastChecker(None, None, pixel_sampling=True)
+    payload = {"count": 3, "flags": [0, CONTRAST_FLAG_BG_IMAGE, 0], "rect": [0, 0, 10, 10, 20, 20, 30, 10, 40, 40, 5, 5]}
+    ratio = checker.sample_pixels(payload, capture=(b"png", 0, 0, 100))
+    assert seen == [[[20, 20, 30, 10]]]
+    assert np.isnan(ratio[[0, 2]]).all() and ratio[1] == pytest.approx(21.0)
+    # Aucun fond image : ni capture ni échantillonnage
+    assert np.isnan(checker.sample_pixels(dict(payload, flags=[0, 0, 0]))).all() and len(seen) == 1
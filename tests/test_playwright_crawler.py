@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+import threading
+
+import pytest
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+
+from core.config import Config
+from core.playwright_crawler import AsyncPlaywrightEngine, PlaywrightDriverAdapter, PlaywrightElement
+from utils.report_paths import reports_path
+
+
+class FakeHandle:
+    def __init__(self, name):
+        self.name = name
+
+    def as_element(self):
+        return self
+
+    async def evaluate(self, expression, arg=None):
+        return self.name if "tagName" in expression else None
+
+
+class FakeKeyboard:
+    def __init__(self):
+        self.events = []
+
+    async def down(self, key):
+        self.events.append(("down", key))
+
+    async def up(self, key):
+        self.events.append(("up", key))
+
+
+class FakeFrame:
+    def __init__(self):
+        self.calls = []
+
+    async def evaluate(self, expression, arg=None):
+        self.calls.append((expression, arg))
+        if "document.title" in expression:
+            return {"__rgaa_handles__": "node"}
+        return {"args": arg}
+
+    async def evaluate_handle(self, expression):
+        return FakeHandle("h1")
+
+    async def query_selector_all(self, selector):
+        return [FakeHandle(selector)]
+
+
+class FakePage:
+    def __init__(self, url="https://exemple.fr/"):
+        self.url = url
+        self.main_frame = FakeFrame()
+        self.keyboard = FakeKeyboard()
+        self.mouse = None
+        self.context = None
+
+
+@pytest.fixture
+def adapter():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    page = FakePage()
+    yield PlaywrightDriverAdapter(page, loop)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def test_execute_script_passes_arguments_and_elements(adapter):
+    element = PlaywrightElement(FakeHandle("a"), adapter)
+    result = adapter.execute_script("return arguments[0];", 3, element, {"k": [element]})
+    expression, arg = adapter.page.main_frame.calls[-1]
+    assert "apply(null, args)" in expression and "return arguments[0];" in expression
+    assert arg[0] == 3 and arg[1] is element.handle and arg[2]["k"][0] is element.handle
+    assert result == {"args": arg}
+
+
+def test_returned_node_becomes_element(adapter):
+    element = adapter.execute_script("return document.title && document.body;")
+    assert isinstance(element, PlaywrightElement)
+    assert element.tag_name == "h1"
+
+
+def test_find_elements_maps_selenium_locators(adapter):
+    assert adapter.find_element("xpath", "//a").handle.name == "xpath=//a"
+    assert adapter.find_elements("id", "menu")[0].handle.name == 'css=[id="menu"]'
+    assert adapter.find_elements("tag name", "img")[0].handle.name == "css=img"
+
+
+def test_action_chains_keys_are_replayed(adapter):
+    ActionChains(adapter).send_keys(Keys.TAB, Keys.TAB).perform()
+    assert adapter.page.keyboard.events == [("down", "Tab"), ("up", "Tab"), ("down", "Tab"), ("up", "Tab")]
+
+
+class _Tracker:
+    open_contexts = 0
+    max_open = 0
+
+
+class FakeAsyncPage(FakePage):
+    def set_default_timeout(self, ms):
+        pass
+
+    async def goto(self, url, wait_until=None):
+        self.url = url
+        await asyncio.sleep(0.05)
+
+    async def wait_for_load_state(self, state, timeout=None):
+        pass
+
+
+class FakeContext:
+    async def add_init_script(self, script):
+        self.init_script = script
+
+    async def new_page(self):
+        return FakeAsyncPage()
+
+    async def close(self):
+        _Tracker.open_contexts -= 1
+
+
+class FakeBrowser:
+    async def new_context(self, **options):
+        _Tracker.open_contexts += 1
+        _Tracker.max_open = max(_Tracker.max_open, _Tracker.open_contexts)
+        return FakeContext()
+
+    async def close(self):
+        pass
+
+
+class FakeChromium:
+    async def launch(self, **options):
+        return FakeBrowser()
+
+
+class FakePlaywright:
+    chromium = FakeChromium()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+def test_engine_runs_audits_concurrently_in_separate_dirs(tmp_path, monkeypatch):
+    import playwright.async_api
+
+    monkeypatch.setattr(playwright.async_api, "async_playwright", FakePlaywright)
+    config = Config()
+    config.set_modules(0)
+    engine = AsyncPlaywrightEngine(config, logging.getLogger("test"), concurrency=3, output_root=str(tmp_path))
+    seen_dirs = {}
+
+    def run_modules(driver, url):
+        # Exécuté dans un thread : le répertoire de l'audit suit le contexte
+        seen_dirs[url] = reports_path()
+
+    monkeypatch.setattr(engine, "_run_modules", run_modules)
+    urls = [f"https://exemple.fr/p{i}" for i in range(8)]
+    results = engine.run(urls)
+
+    assert len(results) == 8 and all(r["status"] == "ok" for r in results)
+    assert _Tracker.max_open == 3 and _Tracker.open_contexts == 0
+    assert len(set(seen_dirs.values())) == 8
+    assert all(d.startswith(str(tmp_path)) for d in seen_dirs.values())
+    with open(tmp_path / "playwright_results.jsonl", encoding="utf-8") as f:
+        assert len([json.loads(line) for line in f]) == 8
+
+
+def test_multi_url_snapshot_stays_in_page_directory(tmp_path, monkeypatch):
+    import core.page_snapshot
+
+    monkeypatch.setattr(core.page_snapshot, "capture_page_snapshot", lambda driver, **kw: {})
+    monkeypatch.setattr(core.page_snapshot, "save_snapshot", lambda snapshot, path: path)
+    config = Config()
+    config.set_page_snapshot(str(tmp_path / "archive" / "page.rgsnap"))
+    engine = AsyncPlaywrightEngine(config, logging.getLogger("test"), output_root=str(tmp_path))
+    page_dir = str(tmp_path / "001_page")
+    assert engine._capture_snapshot(None, page_dir) == str(tmp_path / "001_page" / "page.rgsnap")
+    # URL unique : chemin configuré conservé
+    assert engine._capture_snapshot(None, "") == str(tmp_path / "archive" / "page.rgsnap")
@@ -0,0 +1,119 @@
+import asyncio
+import csv
+import json
+
+import pytest
+
+from core.playwright_crawler import AsyncPlaywrightEngine
+from utils.request_filter import RequestFilter
+
+PAGE = "https://www.exemple.fr/accueil"
+
+
+def test_off_profile_disables_filtering():
+    assert RequestFilter.from_profile("off") is None
+    with pytest.raises(ValueError):
+        RequestFilter.from_profile("inexistant")
+
+
+def test_audit_profile_blocks_trackers_and_media_but_keeps_rendering():
+    f = RequestFilter.from_profile("audit")
+    assert f.match("https://www.google-analytics.com/analytics.js", "script", PAGE) == "domaine:google-analytics.com"
+    assert f.match("https://cdn.exemple.fr/intro.mp4", "media", PAGE) == "type:media"
+    assert f.match("https://www.facebook.com/tr?id=1", "image", PAGE) == "domaine:facebook.com/tr"
+    assert f.match("https://www.facebook.com/page", "document", PAGE) is None
+    assert f.match("https://cdn.exemple.fr/site.css", "stylesheet", PAGE) is None
+    assert f.match("https://fonts.gstatic.com/f.woff2", "font", PAGE) is None
+    # Scripts tiers conservés en profil audit, bloqués en strict sauf plateformes de consentement
+    assert f.match("https://cdn.tiers.com/widget.js", "script", PAGE) is None
+    strict = RequestFilter.from_profile("strict")
+    assert strict.match("https://cdn.tiers.com/widget.js", "script", PAGE) == "script tiers"
+    assert strict.match("https://static.exemple.fr/app.js", "script", PAGE) is None
+    assert strict.match("https://sdk.privacy-center.org/loader.js", "script", PAGE) is None
+
+
+def test_url_patterns_keep_first_party_resources():
+    f = RequestFilter.from_profile("audit")
+    shop = "https://shop.example.fr/"
+    # `?` est littéral (chaîne de requête), comme dans Network.setBlockedURLs
+    assert f.match("https://shop.example.fr/collections/summer/banner.jpg", "image", shop) is None
+    assert f.match("https://shop.example.fr/collections?page=2", "document", shop) is None
+    assert f.match("https://shop.example.fr/pixels/art.css", "stylesheet", shop) is None
+    assert f.match("https://shop.example.fr/beacon-hill/index.html", "document", shop) is None
+    assert f.match("https://shop.example.fr/g/collections/a.png", "image", shop) is None
+    assert f.match("https://shop.example.fr/collect?v=2&tid=1", "xhr", shop) == "motif:*/collect?*"
+    assert f.match("https://shop.example.fr/g/collect?v=2", "xhr", shop) == "motif:*/collect?*"
+    assert f.match("https://shop.example.fr/pixel?id=3", "image", shop) == "motif:*/pixel?*"
+    assert f.match("https://shop.example.fr/api/beacon", "xhr", shop) == "motif:*/beacon"
+
+
+def test_json_profile_and_cdp_patterns(tmp_path):
+    path = tmp_path / "sobre.json"
+    path.write_text(json.dumps({"block_types": ["media"], "block_domains": ["pub.example"],
+                                "block_patterns": ["*/track/*"]}), encoding="utf-8")
+    f = RequestFilter.from_profile(str(path))
+    assert f.name == "sobre"
+    assert f.match("https://a.pub.example/x.js", "script") == "domaine:pub.example"
+    assert f.match("https://exemple.fr/track/1", "xhr") == "motif:*/track/*"
+    patterns = f.url_patterns()
+    assert "*://*.pub.example/*" in patterns and "*/track/*" in patterns and "*.mp4" in patterns
+
+
+def test_selenium_performance_log_and_report(tmp_path):
+    def entry(method, **params):
+        return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+    class Driver:
+        def get_log(self, kind):
+            return [
+                entry("Network.requestWillBeSent", requestId="1", type="Script",
+                      request={"url": "https://www.googletagmanager.com/gtm.js"}),
+                entry("Network.requestWillBeSent", requestId="2", type="Stylesheet",
+                      request={"url": "https://exemple.fr/site.css"}),
+                entry("Network.loadingFailed", requestId="1", type="Script", blockedReason="inspector"),
+                entry("Network.loadingFailed", requestId="2", type="Stylesheet", errorText="net::ERR_ABORTED"),
+                # Bloquée par la CSP de la page, pas par le profil
+                entry("Network.requestWillBeSent", requestId="3", type="Script",
+                      request={"url": "https://cdn.tiers.com/widget.js"}),
+                entry("Network.loadingFailed", requestId="3", type="Script", blockedReason="csp"),
+            ]
+
+    f = RequestFilter.from_profile("audit")
+    assert f.collect_selenium_log(Driver(), PAGE) == 1
+    path = f.write_report(str(tmp_path / "blocked_requests.csv"))
+    with open(path, encoding="utf-8") as fh:
+        rows = list(csv.reader(fh))
+    assert rows[1] == ["https://www.googletagmanager.com/gtm.js", "script", "domaine:googletagmanager.com"]
+    assert f.summary() == {"domaine:googletagmanager.com": 1}
+
+
+def test_playwright_route_aborts_blocked_requests():
+    class Request:
+        def __init__(self, url, resource_type):
+            self.url, self.resource_type = url, resource_type
+
+    class Route:
+        def __init__(self):
+            self.outcome = None
+
+        async def abort(self, code):
+            self.outcome = code
+
+        async def continue_(self):
+            self.outcome = "continue"
+
+    class Context:
+        async def route(self, pattern, handler):
+            self.handler = handler
+
+    async def scenario():
+        context, f = Context(), RequestFilter.from_profile("audit")
+        await AsyncPlaywrightEngine._route_filtered(context, f, PAGE)
+        blocked, allowed = Route(), Route()
+        await context.handler(blocked, Request("https://bat.bing.com/action/0", "script"))
+        await context.handler(allowed, Request("https://exemple.fr/logo.png", "image"))
+        return f, blocked, allowed
+
+    f, blocked, allowed = asyncio.run(scenario())
+    assert blocked.outcome == "blockedbyclient" and allowed.outcome == "continue"
+    assert [e["url"] for e in f.blocked] == ["https://bat.bing.com/action/0"]
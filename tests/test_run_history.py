@@ -0,0 +1,70 @@
+import json
+
+from core.execution_config import ExecutionConfig
+from core.run_history import RunHistory, collect_page_features, predict_makespan
+from core.site_crawler import UrlFrontier
+
+SITE = "https://exemple.fr"
+
+
+def _history(tmp_path):
+    history = RunHistory(str(tmp_path / "history.jsonl"))
+    for n, elements in enumerate((100, 200, 400)):
+        history.record(f"{SITE}/p{n}", {"elements": elements, "focusable": 10, "images": 1, "frames": 0},
+                       {"screen_reader": elements / 10.0, "tab_navigation": 2.0})
+    return history
+
+
+def test_record_appends_and_reloads(tmp_path):
+    history = _history(tmp_path)
+    with open(history.path, "a", encoding="utf-8") as f:
+        f.write('{"url": "tronqué"\n')
+    reloaded = RunHistory(history.path)
+    assert len(reloaded.records) == 3
+    assert reloaded.records[0]["features"]["elements"] == 100
+    with open(history.path, encoding="utf-8") as f:
+        assert json.loads(f.readline())["modules"]["screen_reader"] == 10.0
+
+
+def test_estimates_from_history(tmp_path):
+    history = _history(tmp_path)
+    # URL déjà vue : médiane de ses passages
+    assert history.estimate_module("screen_reader", f"{SITE}/p1#ancre") == 20.0
+    # Régression sur le nombre d'éléments, bornée par l'historique
+    assert abs(history.estimate_module("screen_reader", f"{SITE}/x", {"elements": 300}) - 30.0) < 1e-6
+    assert history.estimate_module("screen_reader", f"{SITE}/x", {"elements": 100000}) == 40.0
+    assert history.estimate_module("screen_reader", f"{SITE}/x", {"elements": 1}) == 10.0
+    # Grandeur constante : médiane ; module jamais mesuré : valeur fixe
+    assert history.estimate_module("tab_navigation", f"{SITE}/x", {"focusable": 50}) == 2.0
+    assert history.estimate_module("titles") == ExecutionConfig.MODULE_TIMES["titles"]
+    assert ExecutionConfig._estimate_execution_time(["screen_reader"], history, f"{SITE}/p2") == 40
+    assert ExecutionConfig._estimate_execution_time(["screen_reader", "titles"]) == 70
+
+
+def test_longest_first_order_and_makespan(tmp_path):
+    history = _history(tmp_path)
+    urls = [f"{SITE}/p0", f"{SITE}/p2", f"{SITE}/p1"]
+    ordered = history.order_longest_first(urls, ["screen_reader", "tab_navigation"])
+    assert [url for url, _ in ordered] == [f"{SITE}/p2", f"{SITE}/p1", f"{SITE}/p0"]
+    assert predict_makespan([42.0, 22.0, 12.0], 2) == 42.0
+    assert predict_makespan([42.0, 22.0, 12.0], 1) == 76.0
+
+    frontier = UrlFrontier(SITE)
+    frontier.pop()
+    for path in ("/p0", "/p2", "/p1"):
+        frontier.add(path, 1, base=SITE)
+    estimates = dict(ordered)
+    assert frontier.pop(key=lambda url: estimates.get(url, 0.0))[0] == f"{SITE}/p2"
+
+
+def test_collect_page_features_tolerates_driver_errors():
+    class Driver:
+        def execute_script(self, script):
+            return {"elements": 12, "frames": 1, "focusable": 3, "images": None}
+
+    class Broken:
+        def execute_script(self, script):
+            raise RuntimeError("page fermée")
+
+    assert collect_page_features(Driver()) == {"elements": 12, "frames": 1, "focusable": 3, "images": 0}
+    assert collect_page_features(Broken()) == {}
@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+
+from core.config import Config
+from core.site_crawler import SiteCrawler, UrlFrontier, crawl_page, normalize_url, page_slug
+
+# Mini-site : chaque page renvoie vers deux pages « enfants » et vers l'accueil
+SITE = "https://exemple.fr"
+
+
+def _links(url):
+    n = int(url.rstrip("/").rsplit("/p", 1)[-1]) if "/p" in url else 0
+    return [f"/p{2 * n + 1}", f"/p{2 * n + 2}#ancre", "/", "mailto:contact@exemple.fr",
+            "https://ailleurs.fr/p1", "/doc.pdf"]
+
+
+class FakeDriver:
+    window_handles = ["main"]
+
+    def __init__(self):
+        self.current_url = None
+        self.visited = []
+        self.switch_to = self
+        self.cookies_cleared = 0
+
+    def get(self, url):
+        self.current_url = url
+        self.visited.append(url)
+
+    def window(self, handle):
+        pass
+
+    def delete_all_cookies(self):
+        self.cookies_cleared += 1
+
+    def execute_script(self, script, *args):
+        if "readyState" in script:
+            return "complete"
+        if script == "return 1":
+            return 1
+        if "localStorage" in script or "__rgaaReadiness" in script:
+            return None
+        return [normalize_url(link, self.current_url) or link for link in _links(self.current_url)]
+
+    def execute_async_script(self, script, *args):
+        return {'ready': True, 'elapsed_ms': 0, 'pending': []}
+
+    def quit(self):
+        pass
+
+
+def fake_driver_factory():
+    return FakeDriver()
+
+
+class CrashingDriver(FakeDriver):
+    def get(self, url):
+        if url.endswith("/p3"):
+            os._exit(9)  # processus tué en pleine page, sans message au processus principal
+        super().get(url)
+
+
+def crashing_driver_factory():
+    return CrashingDriver()
+
+
+def _config(history=None):
+    config = Config()
+    config.set_base_url(SITE)
+    config.set_modules(0)
+    # Jamais l'historique du dépôt (`.run_history.jsonl`, activé par défaut)
+    config.set_run_history(history)
+    return config
+
+
+def test_normalize_url():
+    assert normalize_url("HTTPS://Exemple.FR:443") == "https://exemple.fr/"
+    assert normalize_url("page?b=2&a=1#x", "http://exemple.fr:8080/dir/") == "http://exemple.fr:8080/dir/page?a=1&b=2"
+    assert normalize_url("javascript:void(0)") is None
+    assert normalize_url("mailto:a@b.fr") is None
+
+
+def test_frontier_dedupes_and_respects_limits():
+    frontier = UrlFrontier(SITE, max_pages=5, max_depth=1)
+    assert frontier.add("/a#top", 1, base=SITE)
+    assert not frontier.add("/a", 1, base=SITE)
+    assert not frontier.add("https://ailleurs.fr/", 1)
+    assert not frontier.add("/fichier.PDF", 1, base=SITE)
+    assert not frontier.add("/profond", 2, base=SITE)
+    for name in "bcdef":
+        frontier.add(f"/{name}", 1, base=SITE)
+    assert len(frontier.seen) == 5
+    assert frontier.pop() == ("https://exemple.fr/", 0)
+
+
+def test_crawl_page_collects_links(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    driver = FakeDriver()
+    result = crawl_page(driver, _config(), logging.getLogger("test"), SITE + "/p1")
+    assert result["status"] == "ok" and result["settle_ms"] >= 0
+    assert SITE + "/p3" in result["links"]
+    assert page_slug(7, SITE + "/p1").startswith("00007_p1_")
+
+
+def test_site_crawler_streams_each_page(tmp_path):
+    seen = []
+    config = _config(str(tmp_path / "history.jsonl"))
+    crawler = SiteCrawler(config, logging.getLogger("test"), workers=2, max_pages=10, max_depth=5,
+                          output_root=str(tmp_path), driver_factory=fake_driver_factory,
+                          on_page=seen.append)
+    assert crawler.run() == 10
+    with open(crawler.results_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 10 == len(seen)
+    assert len({r["url"] for r in records}) == 10
+    assert all(r["url"].startswith(SITE) for r in records)
+    assert {r["worker"] for r in records} <= {0, 1}
+    assert crawler.pages_per_minute > 0
+    # Aucun module activé : aucune durée mesurée, donc aucune ligne d'historique
+    assert not (tmp_path / "history.jsonl").exists()
+
+
+def test_site_crawler_survives_worker_killed_mid_page(tmp_path):
+    crawler = SiteCrawler(_config(), logging.getLogger("test"), workers=2, max_pages=6, max_depth=5,
+                          output_root=str(tmp_path), driver_factory=crashing_driver_factory)
+    assert crawler.run() == 6
+    with open(crawler.results_path, encoding="utf-8") as f:
+        records = {r["url"]: r for r in map(json.loads, f)}
+    assert records[SITE + "/p3"]["status"] == "error"
+    assert "arrêté" in records[SITE + "/p3"]["error"]
+    assert crawler.pages_failed == 1
+    assert all(r["status"] == "ok" for url, r in records.items() if url != SITE + "/p3")
@@ -0,0 +1,51 @@
+import cv2
+import numpy as np
+
+from modules.synthesys import detect_red_frame, detect_text_boxes
+
+
+def _page(seed, height=1203, width=917):
+    """Page aux dimensions non multiples des tuiles : texte, cadres imbriqués, aplats, bruit."""
+    rng = np.random.default_rng(seed)
+    image = np.full((height, width, 3), 255, np.uint8)
+    image[:, :150] = (235, 235, 235)
+    for _ in range(60):
+        x, y = int(rng.integers(0, width - 60)), int(rng.integers(0, height - 20))
+        cv2.putText(image, "texte %d" % rng.integers(1000), (x, y + 15), cv2.FONT_HERSHEY_SIMPLEX,
+                    float(rng.uniform(0.3, 0.9)), (40, 40, 40), 1)
+    for _ in range(4):
+        x, y = int(rng.integers(0, width - 300)), int(rng.integers(0, height - 300))
+        cv2.rectangle(image, (x, y), (x + 280, y + 260), (20, 20, 20), 2)
+        cv2.putText(image, "dans le cadre", (x + 40, y + 120), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 1)
+    image[height - 80:height - 40, 300:500] = rng.integers(0, 255, (40, 200, 3), dtype=np.uint8)
+    return image
+
+
+def test_text_boxes_fast_path_matches_full_image():
+    for seed in range(6):
+        image = _page(seed)
+        expected = detect_text_boxes(image, tile=None)
+        assert expected
+        for tile in (10, 16, 24):
+            assert detect_text_boxes(image, tile=tile) == expected
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        assert detect_text_boxes(None, gray=gray[100:900, 50:800]) == detect_text_boxes(
+            np.ascontiguousarray(image[100:900, 50:800]), tile=None)
+    assert detect_text_boxes(np.full((300, 400, 3), 255, np.uint8)) == []
+
+
+def test_red_frame_fast_path_matches_full_image():
+    image = _page(1, height=3001, width=1500)
+    assert detect_red_frame(image) == detect_red_frame(image, stride=1)
+    image[-80:-40, 300:500] = 255  # bruit coloré
+    assert detect_red_frame(image) is None
+    cv2.rectangle(image, (200, 1500), (1100, 2300), (0, 0, 255), 9)
+    expected = detect_red_frame(image, stride=1)
+    assert expected is not None and detect_red_frame(image) == expected
+    # Deux zones de même aire : même choix que le parcours de l'image entière
+    image[400:520, 100:300] = (10, 10, 230)
+    image[2600:2720, 900:1100] = (10, 10, 230)
+    image[1500:2310, 190:1110] = 255
+    assert detect_red_frame(image) == detect_red_frame(image, stride=1)
+    assert detect_red_frame(image)[1] > 2000
+    assert detect_red_frame(np.zeros((50, 50), np.uint8)) is None
@@ -0,0 +1,113 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from modules.synthesys import DomRectIndex, fuse_page, iou
+
+
+def _legacy_best(dom_df_page, bbox):
+    """Boucle d'origine de fuse_page : IoU contre chaque ligne."""
+    best_row, best_score = None, 0.0
+    for _, row in dom_df_page.iterrows():
+        try:
+            dom_bbox = (float(row["dom_x"]), float(row["dom_y"]), float(row["dom_w"]), float(row["dom_h"]))
+        except Exception:
+            continue
+        score = iou(bbox, dom_bbox)
+        if score > best_score:
+            best_score, best_row = score, row
+    return best_row, best_score
+
+
+def _page(rows=300, blocks=60, seed=3):
+    rng = np.random.default_rng(seed)
+    x = rng.integers(-50, 1900, rows).astype(str).astype(object)
+    y = rng.integers(0, 8000, rows).astype(str).astype(object)
+    w = rng.integers(0, 300, rows).astype(str).astype(object)
+    h = rng.integers(0, 120, rows).astype(str).astype(object)
+    # Conteneurs pleine page, doublons (égalités), valeurs vides ou illisibles
+    w[:5], h[:5] = "1920", "8000"
+    x[10:20], y[10:20], w[10:20], h[10:20] = x[20:30], y[20:30], w[20:30], h[20:30]
+    x[40], w[41], h[42], y[43] = np.nan, "n/a", None, "inf"
+    df = pd.DataFrame({"dom_x": x, "dom_y": y, "dom_w": w, "dom_h": h,
+                       "xpath": [f"/html/body/div[{i}]" for i in range(rows)], "tag": "div"})
+    vision = {"page": "p1", "blocks": [
+        {"id": i, "type_detected": "contenu", "text": "", "confidence": 0.5,
+         "bbox": [int(rng.integers(0, 1900)), int(rng.integers(0, 8000)),
+                  int(rng.integers(30, 400)), int(rng.integers(15, 200))]}
+        for i in range(blocks)
+    ]}
+    vision["blocks"].append({"id": blocks, "type_detected": "contenu", "text": "", "confidence": 0.5,
+                             "bbox": [0, 0, 0, 10]})
+    return df, vision
+
+
+def test_index_matches_legacy_loop():
+    df, vision = _page()
+    index = DomRectIndex(df, cell_size=40.0)
+    for block in vision["blocks"]:
+        legacy_row, legacy_score = _legacy_best(df, block["bbox"])
+        pos, score = index.best_match(block["bbox"])
+        assert score == legacy_score
+        assert (pos is None) == (legacy_row is None)
+        if pos is not None:
+            assert df.iloc[pos]["xpath"] == legacy_row["xpath"]
+
+
+def test_fuse_page_uses_index():
+    df, vision = _page(rows=120, blocks=20, seed=8)
+    fused = fuse_page(df, vision)
+    assert len(fused) == len(vision["blocks"])
+    for block, record in zip(vision["blocks"], fused):
+        legacy_row, legacy_score = _legacy_best(df, block["bbox"])
+        expected = legacy_row["xpath"] if legacy_row is not None and legacy_score >= 0.1 else None
+        assert record["dom_xpath"] == expected
+
+
+def _legacy_fallback(dom_df_page, vision_page_struct, block_text):
+    """Appariement d'origine sans coordonnées : texte puis XPath, ligne par ligne."""
+    for _, row in dom_df_page.iterrows():
+        for tc in ["texte_dom", "Text"]:
+            row_text = (row.get(tc) or "")
+            if isinstance(row_text, str) and block_text and (
+                    block_text.lower() in row_text.lower() or row_text.lower() in block_text.lower()):
+                return row["xpath"], 1.0
+    for _, row in dom_df_page.iterrows():
+        row_xpath = (row.get("xpath") or "")
+        if isinstance(row_xpath, str) and row_xpath.strip() and row_xpath.strip() in json.dumps(vision_page_struct):
+            return row["xpath"], 0.9
+    return None, 0.0
+
+
+def test_text_index_matches_legacy_fallback():
+    rng = np.random.default_rng(5)
+    words = ["Accueil", "menu", "Contact", "nos offres", "é", "ok", "Mentions légales", "Panier (2)"]
+
+    def phrase():
+        return " ".join(rng.choice(words, int(rng.integers(1, 4))))
+
+    rows = 150
+    texte = [phrase() for _ in range(rows)]
+    texte[7], texte[9], texte[11] = np.nan, None, ""
+    other = [phrase().upper() if i % 5 == 0 else np.nan for i in range(rows)]
+    df = pd.DataFrame({"texte_dom": texte, "Text": other, "tag": "a",
+                       "xpath": [f"/html/body/a[{i}]" for i in range(rows)]})
+    # Mots coupés en bord de bloc (suffixe, préfixe, fragment), ponctuation seule
+    blocks = [phrase() for _ in range(40)] + ["", "cc", "nu Con", "ccuei", "s offres", "(2)", "-", "ALES",
+                                              "Accueil menu Contact Panier (2) nos", "xyz introuvable"]
+    vision = {"page": "p1", "blocks": [
+        {"id": i, "type_detected": "contenu", "text": text, "confidence": 0.5, "bbox": [0, 0, 10, 10]}
+        for i, text in enumerate(blocks)
+    ]}
+    # Une ligne au texte vide est contenue dans tout texte de bloc
+    fused = fuse_page(df, vision)
+    assert all(record["dom_xpath"] == _legacy_fallback(df, vision, text)[0] for record, text in zip(fused, blocks))
+    assert fused[-1]["dom_xpath"] is not None
+    # Sans elle, le texte introuvable retombe sur l'XPath cité dans la structure vision
+    df = df.drop(index=11).reset_index(drop=True)
+    vision["note"] = "cible /html/body/a[42] signalée"
+    fused = fuse_page(df, vision)
+    for record, text in zip(fused, blocks):
+        assert record["dom_xpath"] == _legacy_fallback(df, vision, text)[0]
+    assert fused[-1]["dom_xpath"] == "/html/body/a[42]"
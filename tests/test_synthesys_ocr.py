@@ -0,0 +1,86 @@
+import json
+
+import cv2
+import numpy as np
+
+from modules.synthesys import VisionCache, build_vision_structures, image_digest, words_to_blocks
+
+
+def fake_ocr(image, lang):
+    """Un mot par zone sombre (à la place de tesseract), coordonnées relatives à l'image reçue."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    contours, _ = cv2.findContours((gray < 128).astype(np.uint8), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return [(f"mot{w}", 90.0, x, y, w, h) for x, y, w, h in sorted(cv2.boundingRect(c) for c in contours)]
+
+
+def _image(path, widths):
+    image = np.full((400, 600, 3), 255, np.uint8)
+    for i, w in enumerate(widths):
+        cv2.rectangle(image, (40, 40 + i * 80), (40 + w, 70 + i * 80), (0, 0, 0), -1)
+    cv2.imwrite(str(path), image)
+    return str(path)
+
+
+def test_words_are_assigned_like_per_block_ocr():
+    boxes = [(0, 0, 100, 50), (0, 40, 100, 50), (200, 0, 50, 50)]
+    words = [
+        ("Bonjour", 91.0, 10, 10, 40, 20),
+        ("à", 0.0, 60, 10, 10, 20),         # confiance nulle : moyenne seulement
+        ("", 95.0, 70, 10, 10, 20),         # texte vide : moyenne seulement
+        ("tous", 89.0, 10, 44, 30, 10),     # centre dans les deux premiers blocs : le premier
+        ("bruit", -1.0, 10, 60, 20, 20),    # confiance absente : ignoré
+        ("dehors", 80.0, 500, 500, 10, 10),
+    ]
+    assert words_to_blocks(words, boxes) == [
+        ("Bonjour tous", (91.0 + 0.0 + 95.0 + 89.0) / 4 / 100.0),
+        ("", 0.0),
+        ("", 0.0),
+    ]
+    assert words_to_blocks([], boxes) == [("", 0.0)] * 3
+    assert words_to_blocks(words, []) == []
+
+
+def test_build_uses_one_ocr_per_image_and_content_cache(tmp_path, monkeypatch):
+    first = _image(tmp_path / "a.png", [200, 120])
+    second = _image(tmp_path / "b.png", [300])
+    calls = []
+
+    def counting_ocr(image, lang):
+        calls.append(lang)
+        return fake_ocr(image, lang)
+
+    cache_dir = str(tmp_path / "cache")
+    results = build_vision_structures([first, second], workers=1, cache_dir=cache_dir, ocr=counting_ocr)
+    assert len(calls) == 2
+    assert [struct["page"] for _, struct, _ in results] == ["a.png", "b.png"]
+    texts = sorted(block["text"] for block in results[0][1]["blocks"])
+    assert texts == ["mot121", "mot201"]
+
+    # Contenu inchangé (même sous un autre nom) : aucun OCR
+    copy = tmp_path / "copie.png"
+    copy.write_bytes(open(second, "rb").read())
+    again = build_vision_structures([first, str(copy)], workers=1, cache_dir=cache_dir, ocr=counting_ocr)
+    assert len(calls) == 2
+    assert again[1][1]["page"] == "copie.png"
+    assert again[0][1]["blocks"] == json.loads(json.dumps(results[0][1]["blocks"]))
+    assert VisionCache(cache_dir, "eng+fra").get(image_digest(first))["width"] == 600
+    assert VisionCache(cache_dir, "fra").get(image_digest(first)) is None
+
+
+def test_process_pool_keeps_order_and_reports_errors(tmp_path):
+    paths = [_image(tmp_path / f"p{i}.png", [100 + 40 * i]) for i in range(3)]
+    broken = tmp_path / "cassee.png"
+    broken.write_bytes(b"pas une image")
+    paths.insert(1, str(broken))
+    results = build_vision_structures(paths, workers=2, cache_dir=None, ocr=fake_ocr)
+    assert [path for path, _, _ in results] == paths
+    assert results[1][1] is None and results[1][2]
+    assert [struct["blocks"][0]["text"] for _, struct, _ in results if struct] == ["mot101", "mot141", "mot181"]
+
+
+def test_missing_image_with_cache_is_reported_not_raised(tmp_path):
+    present = _image(tmp_path / "a.png", [200])
+    missing = str(tmp_path / "absente.png")
+    results = build_vision_structures([missing, present], workers=1, cache_dir=str(tmp_path / "cache"), ocr=fake_ocr)
+    assert results[0][0] == missing and results[0][1] is None and "absente.png" in results[0][2]
+    assert results[1][1]["page"] == "a.png"
@@ -0,0 +1,161 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.synthesys import DomInfo, TabEvent, VisualInfo, call_vision_ai_for_focus_events
+from modules.titles_analyzer import TitlesAnalyzer
+from utils.report_paths import run_directory
+from utils.vision_client import VisionClient
+
+FOCUS_ANSWER = {
+    "focus_visible": {"ok": False, "score": 0.2, "comment": "focus invisible"},
+    "role_appearance_match": {"ok": True, "score": 0.8, "comment": "ok"},
+    "label_match": {"ok": True, "score": 0.9, "comment": "ok"},
+    "global_score": 0.6,
+    "issues": ["focus"],
+}
+
+
+@contextmanager
+def stand_in_api(delay=0.05, throttle_first=0):
+    """Serveur local imitant /v1/chat/completions : répond en écho au prompt, 429 sur les premières requêtes."""
+    state = {"requests": [], "active": 0, "peak": 0, "throttled": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                state["requests"].append(payload)
+                throttle = state["throttled"] < throttle_first
+                state["throttled"] += throttle
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(delay)
+            prompt = payload["messages"][0]["content"][0]["text"]
+            if throttle:
+                status, body = 429, {"message": "Requests rate limit exceeded"}
+            elif "vide" in prompt:
+                status, body = 200, {"choices": []}
+            elif "focus" in prompt:
+                status, body = 200, {"choices": [{"message": {"content": json.dumps(FOCUS_ANSWER)}}]}
+            else:
+                images = len(payload["messages"][0]["content"]) - 1
+                answer = {"ok": 1, "score": 0.5, "comment": f"{prompt.splitlines()[-1]} / {images} image(s)"}
+                status, body = 200, {"choices": [{"message": {"content": f"Voici : {json.dumps(answer)}"}}]}
+            with lock:
+                state["active"] -= 1
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "0")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions", state
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _image(path, content=b"\x89PNG capture"):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_batch_is_concurrent_bounded_retried_and_cached(tmp_path):
+    shared = _image(tmp_path / "page.png")
+    items = [(f"Analyse\nsection {i}", [shared]) for i in range(8)]
+    cache_dir = str(tmp_path / "cache")
+    with stand_in_api(throttle_first=2) as (url, state):
+        client = VisionClient("clé", "modele-a", url=url, concurrency=3, cache_dir=cache_dir, backoff=0.01)
+        results = client.run(items)
+        assert [provider for _, provider in results] == ["api"] * 8
+        assert [json.loads(text.split(" : ", 1)[1])["comment"] for text, _ in results] == [
+            f"section {i} / 1 image(s)" for i in range(8)]
+        assert 1 < state["peak"] <= 3
+        assert client.stats["retries"] == 2 and len(state["requests"]) == 10
+        # Une seule lecture / un seul encodage de la capture pour tout le lot
+        assert client.encoder.reads == 1
+        first_image = state["requests"][0]["messages"][0]["content"][1]["image_url"]
+        assert first_image.startswith("data:image/png;base64,")
+
+        # Relance : tout vient du cache, même pour une copie de la capture
+        copy = _image(tmp_path / "copie.png")
+        again = VisionClient("clé", "modele-a", url=url, cache_dir=cache_dir).run(
+            [(prompt, [copy]) for prompt, _ in items])
+        assert again == [(text, "cache") for text, _ in results]
+        assert len(state["requests"]) == 10
+
+        # Autre modèle ou autre contenu d'image : nouvelle requête
+        VisionClient("clé", "modele-b", url=url, cache_dir=cache_dir).run(items[:1])
+        _image(tmp_path / "page.png", b"\x89PNG autre capture")
+        VisionClient("clé", "modele-a", url=url, cache_dir=cache_dir).run(items[:1])
+        assert len(state["requests"]) == 12
+
+
+def test_rate_limit_and_exhausted_retries(tmp_path):
+    with stand_in_api(delay=0.0, throttle_first=100) as (url, state):
+        client = VisionClient("clé", "m", url=url, cache_dir="", max_retries=2, backoff=0.01)
+        assert client.run([("prompt", [])]) == [(None, "api_error")]
+        assert len(state["requests"]) == 3 and client.stats["errors"] == 1
+
+    with stand_in_api(delay=0.0) as (url, state):
+        client = VisionClient("clé", "m", url=url, cache_dir="", concurrency=4, requests_per_minute=600)
+        started = time.monotonic()
+        client.run([(f"p{i}", []) for i in range(4)])
+        # 600/min : une requête toutes les 100 ms
+        assert time.monotonic() - started >= 0.3
+
+
+def test_unexpected_response_is_not_cached(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    with stand_in_api(delay=0.0) as (url, state):
+        for _ in range(2):
+            client = VisionClient("clé", "m", url=url, cache_dir=cache_dir)
+            assert client.run([("réponse vide", [])]) == [(None, "api")]
+        assert len(state["requests"]) == 2 and client.stats.get("cache_hits", 0) == 0
+
+
+def test_callers_batch_through_shared_client(tmp_path, monkeypatch):
+    screenshot = _image(tmp_path / "full.png")
+    with stand_in_api() as (url, state):
+        monkeypatch.setenv("MISTRAL_API_URL", url)
+        monkeypatch.setenv("MISTRAL_API_KEY", "clé")
+        monkeypatch.setenv("MISTRAL_CACHE_DIR", str(tmp_path / "cache"))
+
+        events = [
+            TabEvent(page_id="p", page_url="https://exemple.fr", step_index=i, total_steps=3, timestamp="t",
+                     dom=DomInfo(xpath=f"/html/body/a[{i}]", tag="a", role="link", name_computed=f"lien {i}"),
+                     visual=VisualInfo(screenshot_file=screenshot, focus_bbox=[0, 0, 10, 10],
+                                       crop_file=_image(tmp_path / f"crop{i}.png", bytes([i]))))
+            for i in range(3)
+        ]
+        analyzed = call_vision_ai_for_focus_events(events)
+        assert [event.a11y_analysis.focus_visible.ok for event in analyzed] == [False] * 3
+        assert all(len(p["messages"][0]["content"]) == 3 for p in state["requests"])
+
+        analyzer = TitlesAnalyzer(driver=None, logger=None)
+        sections = [{"heading_index": i, "heading_text": f"Titre {i}", "heading_level": 2,
+                     "section_screenshot_path": screenshot if i != 1 else ""} for i in range(3)]
+        (tmp_path / "reports").mkdir()
+        with run_directory(str(tmp_path)):
+            results = analyzer._generate_ai_results_9_1_2(sections)
+            assert [row["comment"] for row in results] == [
+                "Niveau: 2 / 1 image(s)", "missing_section_screenshot", "Niveau: 2 / 1 image(s)"]
+            assert [row.get("provider") for row in results] == ["api", None, "api"]
+            # Nouvel audit des mêmes sections : réponses lues dans le cache
+            rerun = TitlesAnalyzer(driver=None, logger=None)._generate_ai_results_9_1_2(sections)
+        assert [row.get("provider") for row in rerun] == ["cache", None, "cache"]
+        assert len(state["requests"]) == 5
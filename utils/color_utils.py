@@ -1,4 +1,114 @@
+"""
+Calculs de contraste WCAG 2.x : parsing des couleurs CSS calculées, luminance relative,
+ratios de contraste (scalaires et vectorisés NumPy pour une page entière).
+"""
+import re
+
+import numpy as np
+
+# Seuils WCAG 2.x (critère 1.4.3 niveau AA / 1.4.6 niveau AAA)
+AA_NORMAL_TEXT = 4.5
+AA_LARGE_TEXT = 3.0
+AAA_NORMAL_TEXT = 7.0
+AAA_LARGE_TEXT = 4.5
+
+# Texte de grande taille : 18pt (24px) ou 14pt (18.66px) en gras (font-weight >= 700)
+LARGE_TEXT_PX = 24.0
+LARGE_BOLD_TEXT_PX = 18.66
+BOLD_WEIGHT = 700
+
+_RGB_FUNC = re.compile(r"rgba?\(\s*([^)]*)\)", re.IGNORECASE)
+
+
+def parse_css_color(value):
+    """
+    Convertit une couleur CSS calculée (`rgb()`, `rgba()`, `#rgb[a]`, `#rrggbb[aa]`, `transparent`)
+    en tuple (r, g, b, a) avec r, g, b dans [0, 255] et a dans [0, 1]. Retourne None si non reconnue.
+    """
+    if not value:
+        return None
+    s = str(value).strip().lower()
+    if s == "transparent":
+        return (0.0, 0.0, 0.0, 0.0)
+    m = _RGB_FUNC.fullmatch(s)
+    if m:
+        parts = [p for p in re.split(r"[\s,/]+", m.group(1).strip()) if p]
+        if len(parts) < 3:
+            return None
+        try:
+            channels = []
+            for p in parts[:3]:
+                channels.append(float(p[:-1]) * 2.55 if p.endswith("%") else float(p))
+            alpha = 1.0
+            if len(parts) >= 4:
+                a = parts[3]
+                alpha = float(a[:-1]) / 100.0 if a.endswith("%") else float(a)
+        except ValueError:
+            return None
+        return (channels[0], channels[1], channels[2], max(0.0, min(1.0, alpha)))
+    if s.startswith("#"):
+        h = s[1:]
+        if len(h) in (3, 4):
+            h = "".join(c * 2 for c in h)
+        if len(h) not in (6, 8):
+            return None
+        try:
+            r, g, b = (int(h[i:i + 2], 16) for i in (0, 2, 4))
+            a = int(h[6:8], 16) / 255.0 if len(h) == 8 else 1.0
+        except ValueError:
+            return None
+        return (float(r), float(g), float(b), a)
+    return None
+
+
+def relative_luminance_array(rgb):
+    """Luminance relative WCAG pour un tableau (..., 3) de composantes sRGB 0-255."""
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def composite_over_array(fg_rgba, bg_rgb):
+    """Compose une couleur (N, 4) semi-transparente sur un fond opaque (N, 3)."""
+    fg = np.asarray(fg_rgba, dtype=np.float64)
+    bg = np.asarray(bg_rgb, dtype=np.float64)
+    alpha = np.clip(fg[..., 3:4], 0.0, 1.0)
+    return fg[..., :3] * alpha + bg * (1.0 - alpha)
+
+
+def contrast_ratio_array(fg_rgba, bg_rgb):
+    """Ratios de contraste WCAG (N,) entre textes (N, 4) RGBA et fonds effectifs (N, 3) opaques."""
+    fg = composite_over_array(fg_rgba, bg_rgb)
+    l1 = relative_luminance_array(fg)
+    l2 = relative_luminance_array(bg_rgb)
+    return (np.maximum(l1, l2) + 0.05) / (np.minimum(l1, l2) + 0.05)
+
+
+def large_text_mask(font_size_px, font_weight):
+    """Masque booléen « texte de grande taille » au sens WCAG (taille en px, graisse numérique)."""
+    size = np.asarray(font_size_px, dtype=np.float64)
+    weight = np.asarray(font_weight, dtype=np.float64)
+    return (size >= LARGE_TEXT_PX) | ((size >= LARGE_BOLD_TEXT_PX) & (weight >= BOLD_WEIGHT))
+
+
+def required_ratio_array(font_size_px, font_weight, level="AA"):
+    """Seuil de contraste requis par élément selon sa taille de texte (AA par défaut, ou AAA)."""
+    large = large_text_mask(font_size_px, font_weight)
+    if level == "AAA":
+        return np.where(large, AAA_LARGE_TEXT, AAA_NORMAL_TEXT)
+    return np.where(large, AA_LARGE_TEXT, AA_NORMAL_TEXT)
+
 
 def calculate_contrast_ratio(foreground, background):
-    # À compléter avec le calcul WCAG réel
-    return 7.0  # valeur factice à remplacer
+    """
+    Ratio de contraste WCAG entre deux couleurs CSS (chaînes ou tuples RGB[A]).
+    Un fond semi-transparent est composé sur du blanc ; le texte est composé sur le fond.
+    """
+    fg = parse_css_color(foreground) if isinstance(foreground, str) else foreground
+    bg = parse_css_color(background) if isinstance(background, str) else background
+    if fg is None or bg is None:
+        raise ValueError(f"Couleur non reconnue : {foreground!r} / {background!r}")
+    fg = tuple(fg) + (1.0,) * (4 - len(fg))
+    bg = tuple(bg) + (1.0,) * (4 - len(bg))
+    bg_rgb = composite_over_array([bg], [[255.0, 255.0, 255.0]])
+    return float(contrast_ratio_array([fg], bg_rgb)[0])
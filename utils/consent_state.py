@@ -0,0 +1,173 @@
+"""
+État de consentement persistant par origine : après acceptation du bandeau cookies, les cookies
+et le localStorage de l'origine sont enregistrés sur disque (format `storage_state` de Playwright),
+puis réinjectés avant la première navigation des audits suivants — navigateur Selenium (CDP) ou
+contexte Playwright, y compris dans chaque processus d'un parcours de site. Le bandeau n'est
+alors plus traité et la page n'est plus rechargée.
+"""
+import json
+import logging
+import os
+import re
+import time
+from urllib.parse import urlsplit
+
+from utils.log_utils import log_with_step
+
+DEFAULT_CONSENT_DIR = ".consent"
+DEFAULT_MAX_AGE_DAYS = 30
+
+# Lecture du localStorage de la page courante
+LOCAL_STORAGE_SCRIPT = r"""
+var out = {};
+try {
+  for (var i = 0; i < localStorage.length; i++) {
+    var k = localStorage.key(i);
+    out[k] = localStorage.getItem(k);
+  }
+} catch (e) {}
+return out;
+"""
+
+# Restauration au chargement de chaque document de l'origine, sans écraser une valeur posée par le site
+_RESTORE_TEMPLATE = r"""
+(function () {
+  if (location.origin !== %s) return;
+  var items = %s;
+  try {
+    for (var k in items) { if (localStorage.getItem(k) === null) localStorage.setItem(k, items[k]); }
+  } catch (e) {}
+})();
+"""
+
+_SAME_SITE = {"lax": "Lax", "strict": "Strict", "none": "None"}
+
+
+def origin_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _playwright_cookie(cookie):
+    """Cookie Selenium (ou déjà au format Playwright) → cookie `storage_state` Playwright."""
+    expires = cookie.get("expires", cookie.get("expiry", -1))
+    return {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain", ""),
+        "path": cookie.get("path", "/"),
+        "expires": float(expires) if expires is not None else -1,
+        "httpOnly": bool(cookie.get("httpOnly", False)),
+        "secure": bool(cookie.get("secure", False)),
+        "sameSite": _SAME_SITE.get(str(cookie.get("sameSite", "Lax")).lower(), "Lax"),
+    }
+
+
+class ConsentStore:
+    """Un fichier JSON par origine dans `directory` ; les états plus vieux que `max_age_days` sont ignorés."""
+
+    def __init__(self, directory=DEFAULT_CONSENT_DIR, max_age_days=DEFAULT_MAX_AGE_DAYS, logger=None):
+        self.directory = os.path.abspath(directory)
+        self.max_age_s = max_age_days * 86400 if max_age_days else None
+        self.logger = logger
+
+    def path_for(self, url):
+        name = re.sub(r"[^A-Za-z0-9.-]+", "_", origin_of(url)).strip("_")
+        return os.path.join(self.directory, f"{name}.json")
+
+    def load(self, url):
+        """État `storage_state` de l'origine de `url`, ou None (absent, illisible ou expiré)."""
+        path = self.path_for(url)
+        try:
+            if self.max_age_s and time.time() - os.path.getmtime(path) > self.max_age_s:
+                return None
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        # Cookies expirés écartés (les cookies de session, expires = -1, sont conservés)
+        state["cookies"] = [c for c in state.get("cookies", []) if c.get("expires", -1) < 0 or c["expires"] > now]
+        has_storage = any(o.get("localStorage") for o in state.get("origins", []))
+        return state if state["cookies"] or has_storage else None
+
+    def save(self, url, cookies, local_storage):
+        """Enregistre l'état de l'origine (écriture atomique) ; retourne l'état enregistré."""
+        origin = origin_of(url)
+        state = {
+            "cookies": [_playwright_cookie(c) for c in cookies],
+            "origins": [{"origin": origin,
+                         "localStorage": [{"name": k, "value": v} for k, v in (local_storage or {}).items()]}],
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(url)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+        self._log(logging.INFO, f"État de consentement enregistré pour {origin} "
+                                f"({len(state['cookies'])} cookies, {len(local_storage or {})} clés localStorage)")
+        return state
+
+    def forget(self, url):
+        try:
+            os.remove(self.path_for(url))
+            return True
+        except OSError:
+            return False
+
+    def capture_selenium(self, driver, url):
+        """Relève cookies et localStorage de la page courante (après acceptation du bandeau)."""
+        try:
+            cookies = driver.get_cookies()
+            local_storage = driver.execute_script(LOCAL_STORAGE_SCRIPT) or {}
+        except Exception as e:
+            self._log(logging.WARNING, f"Capture de l'état de consentement impossible : {e}")
+            return None
+        return self.save(url, cookies, local_storage)
+
+    def inject_selenium(self, driver, state):
+        """
+        Pose l'état avant toute navigation : cookies par CDP `Network.setCookie`, localStorage par
+        un script exécuté au chargement de chaque document de l'origine. Sans CDP, navigue sur
+        l'origine pour poser cookies et localStorage. Retourne True si l'état a été injecté.
+        """
+        try:
+            for cookie in state.get("cookies", []):
+                params = {k: cookie[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")}
+                if cookie.get("expires", -1) >= 0:
+                    params["expires"] = cookie["expires"]
+                driver.execute_cdp_cmd("Network.setCookie", params)
+            previous = getattr(driver, "_consent_script_id", None)
+            if previous:
+                driver.execute_cdp_cmd("Page.removeScriptToEvaluateOnNewDocument", {"identifier": previous})
+            source = "".join(
+                _RESTORE_TEMPLATE % (json.dumps(o["origin"]), json.dumps({i["name"]: i["value"] for i in o["localStorage"]}))
+                for o in state.get("origins", []) if o.get("localStorage")
+            )
+            if source:
+                added = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+                driver._consent_script_id = (added or {}).get("identifier")
+            return True
+        except Exception:
+            return self._inject_by_navigation(driver, state)
+
+    def _inject_by_navigation(self, driver, state):
+        try:
+            for entry in state.get("origins", []):
+                driver.get(entry["origin"])
+                for cookie in state.get("cookies", []):
+                    selenium_cookie = {k: cookie[k] for k in ("name", "value", "path", "secure", "httpOnly")}
+                    if cookie.get("expires", -1) >= 0:
+                        selenium_cookie["expiry"] = int(cookie["expires"])
+                    driver.add_cookie(selenium_cookie)
+                for item in entry.get("localStorage", []):
+                    driver.execute_script("localStorage.setItem(arguments[0], arguments[1]);", item["name"], item["value"])
+            return True
+        except Exception as e:
+            self._log(logging.WARNING, f"Injection de l'état de consentement impossible : {e}")
+            return False
+
+    def _log(self, level, message):
+        if self.logger:
+            log_with_step(self.logger, level, "CONSENTEMENT", message)
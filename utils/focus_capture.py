@@ -0,0 +1,159 @@
+"""
+Captures des étapes de focus clavier : découpe (clip) autour de l'élément focalisé demandée au
+navigateur, vignette basse résolution optionnelle de tout le viewport, et encodage / écriture
+disque sur un pool de threads pour que la boucle TAB n'attende jamais la compression PNG.
+"""
+import base64
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw
+
+from utils.report_paths import reports_path
+
+FOCUS_CAPTURE_MODES = ('clip', 'viewport')
+
+
+def draw_focus_highlight(img, x, y, width, height):
+    """Cadre rouge/jaune/rouge autour d'un rectangle (pixels image), borné à l'image."""
+    draw = ImageDraw.Draw(img)
+    img_width, img_height = img.size
+    x1 = max(0, min(x, img_width))
+    y1 = max(0, min(y, img_height))
+    x2 = max(0, min(x + width, img_width))
+    y2 = max(0, min(y + height, img_height))
+    draw.rectangle([x1 - 2, y1 - 2, x2 + 2, y2 + 2], outline='red', width=2)
+    draw.rectangle([x1 - 1, y1 - 1, x2 + 1, y2 + 1], outline='yellow', width=1)
+    draw.rectangle([x1, y1, x2, y2], outline='red', width=1)
+    return img
+
+
+def _write_highlighted(data, path, rect, crop=None, resize=None):
+    """
+    Tâche de fond : décode la capture, recadre / réduit si demandé, encadre le rectangle
+    (exprimé en px CSS dans le repère de `data`) et écrit le PNG.
+    """
+    if isinstance(data, str):
+        data = base64.b64decode(data)
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert('RGB')
+        # Rapport px image / px CSS (écrans haute densité, `clip.scale`)
+        scale = img.size[0] / float(rect['frame_width']) if rect.get('frame_width') else 1.0
+        if crop:
+            img = img.crop(tuple(int(round(v * scale)) for v in crop))
+        if resize:
+            img = img.resize((max(1, int(img.size[0] * resize)), max(1, int(img.size[1] * resize))))
+            scale *= resize
+        draw_focus_highlight(
+            img,
+            int(round(rect['x'] * scale)), int(round(rect['y'] * scale)),
+            int(round(rect['width'] * scale)), int(round(rect['height'] * scale)),
+        )
+        img.save(path, format='PNG', compress_level=3)
+    return path
+
+
+class FocusCapture:
+    """
+    Captures par étape de focus. En mode 'clip', seule une zone élargie de `padding` px autour de
+    l'élément est demandée au navigateur (CDP `Page.captureScreenshot` + `clip`, recadrage du
+    viewport sinon) ; en mode 'viewport', tout le viewport est capturé comme auparavant.
+    `thumbnail_scale` (ex. 0.25) ajoute une vignette du viewport entier.
+    """
+
+    def __init__(self, driver, output_dir=None, mode='viewport',
+                 padding=24, thumbnail_scale=None, max_workers=2):
+        if mode not in FOCUS_CAPTURE_MODES:
+            raise ValueError(f"Mode de capture focus inconnu : {mode}")
+        self.driver = driver
+        self.output_dir = output_dir or reports_path('focus_screenshots')
+        self.mode = mode
+        self.padding = padding
+        self.thumbnail_scale = thumbnail_scale
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.pending = []
+        self.step_costs_ms = []
+        self.use_cdp = hasattr(driver, 'execute_cdp_cmd')
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def _cdp_capture(self, clip, fmt='png', quality=None):
+        params = {'format': fmt, 'clip': dict(clip)}
+        if quality:
+            params['quality'] = quality
+        return self.driver.execute_cdp_cmd('Page.captureScreenshot', params)['data']
+
+    def capture(self, descriptor, index, suffix='1'):
+        """
+        Capture l'étape `index` à partir d'un descripteur de focus (utils.focus_tracker) et planifie
+        l'écriture. Retourne (chemin, chemin_vignette) ; seule la capture est faite dans l'appel.
+        """
+        started = time.perf_counter()
+        rect = descriptor['rect']
+        viewport = descriptor.get('viewport') or {}
+        vw = viewport.get('width') or (rect['x'] + rect['width'])
+        vh = viewport.get('height') or (rect['y'] + rect['height'])
+        path = os.path.join(self.output_dir, f"focus_{index:03d}_{suffix}.png")
+        thumb_path = None
+        full_frame = None
+
+        if self.mode == 'clip':
+            # Zone élargie autour de l'élément, bornée au viewport (px CSS, repère viewport)
+            x0 = max(0, rect['x'] - self.padding)
+            y0 = max(0, rect['y'] - self.padding)
+            x1 = min(vw, rect['x'] + rect['width'] + self.padding)
+            y1 = min(vh, rect['y'] + rect['height'] + self.padding)
+            local = {'x': rect['x'] - x0, 'y': rect['y'] - y0, 'width': rect['width'],
+                     'height': rect['height'], 'frame_width': max(1, x1 - x0)}
+            if self.use_cdp:
+                # Le clip CDP est exprimé en coordonnées document
+                page = descriptor.get('position') or rect
+                dx, dy = page['x'] - rect['x'], page['y'] - rect['y']
+                data = self._cdp_capture({'x': x0 + dx, 'y': y0 + dy, 'width': max(1, x1 - x0),
+                                          'height': max(1, y1 - y0), 'scale': 1})
+                self.pending.append(self.executor.submit(_write_highlighted, data, path, local))
+            else:
+                # Sans CDP : capture du viewport, recadrée en tâche de fond
+                full_frame = self.driver.get_screenshot_as_png()
+                self.pending.append(self.executor.submit(
+                    _write_highlighted, full_frame, path, dict(local, frame_width=vw), crop=(x0, y0, x1, y1)))
+        else:
+            full_frame = self.driver.get_screenshot_as_png()
+            self.pending.append(self.executor.submit(
+                _write_highlighted, full_frame, path, dict(rect, frame_width=vw)))
+
+        if self.thumbnail_scale:
+            thumb_path = os.path.join(self.output_dir, f"focus_{index:03d}_{suffix}_thumb.png")
+            if full_frame is None and self.use_cdp:
+                # Vignette produite directement à basse résolution par le navigateur
+                scroll = descriptor.get('position') or rect
+                frame = self._cdp_capture({'x': scroll['x'] - rect['x'], 'y': scroll['y'] - rect['y'],
+                                           'width': vw, 'height': vh, 'scale': self.thumbnail_scale},
+                                          fmt='jpeg', quality=60)
+                self.pending.append(self.executor.submit(
+                    _write_highlighted, frame, thumb_path, dict(rect, frame_width=vw)))
+            else:
+                frame = full_frame if full_frame is not None else self.driver.get_screenshot_as_png()
+                self.pending.append(self.executor.submit(
+                    _write_highlighted, frame, thumb_path, dict(rect, frame_width=vw),
+                    resize=self.thumbnail_scale))
+
+        self.step_costs_ms.append((time.perf_counter() - started) * 1000.0)
+        return path, thumb_path
+
+    @property
+    def last_cost_ms(self):
+        return self.step_costs_ms[-1] if self.step_costs_ms else 0.0
+
+    def close(self):
+        """Attend la fin des écritures ; retourne le nombre de fichiers en échec."""
+        failures = 0
+        for future in self.pending:
+            try:
+                future.result()
+            except Exception:
+                failures += 1
+        self.pending = []
+        self.executor.shutdown(wait=True)
+        return failures
@@ -0,0 +1,232 @@
+"""
+Capture événementielle du parcours clavier : un écouteur `focusin` installé dans la page enregistre
+chaque transition de focus avec son descripteur complet ; Python envoie les TAB et vide le tampon
+en un seul appel, la fin d'une étape étant signalée par l'événement (pas de `time.sleep`).
+"""
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+
+FOCUS_TRACKER_MAX_TEXT = 200
+
+FOCUS_TRACKER_INSTALL_SCRIPT = r"""
+var maxText = arguments[0] || 200;
+if (window.__rgaaFocusTracker) { return window.__rgaaFocusTracker.seq; }
+var INTERACTIVE_TAGS = {a: 1, button: 1, input: 1, select: 1, textarea: 1};
+var INTERACTIVE_ROLES = {button: 1, link: 1, menuitem: 1, tab: 1, option: 1, checkbox: 1,
+                         radio: 1, textbox: 1, combobox: 1, slider: 1, spinbutton: 1};
+var BASIC = ['id', 'class', 'title', 'alt', 'type', 'value', 'placeholder', 'tabindex'];
+
+function bounded(s) {
+  s = (s || '').replace(/\s+/g, ' ').trim();
+  return s.length > maxText ? s.slice(0, maxText) : s;
+}
+
+function xpathOf(el) {
+  var parts = [];
+  for (; el && el.nodeType === 1 && el !== document.documentElement; el = el.parentElement) {
+    var i = 1;
+    for (var s = el.previousElementSibling; s; s = s.previousElementSibling) {
+      if (s.tagName === el.tagName) i++;
+    }
+    parts.unshift(el.tagName.toLowerCase() + '[' + i + ']');
+  }
+  return '/html/' + parts.join('/');
+}
+
+function cssOf(el) {
+  var parts = [];
+  for (; el && el.nodeType === 1; el = el.parentElement) {
+    if (el.id && document.querySelectorAll('#' + CSS.escape(el.id)).length === 1) {
+      parts.unshift('#' + CSS.escape(el.id));
+      break;
+    }
+    var tag = el.tagName.toLowerCase();
+    if (tag === 'html') { parts.unshift(tag); break; }
+    var i = 1;
+    for (var s = el.previousElementSibling; s; s = s.previousElementSibling) {
+      if (s.tagName === el.tagName) i++;
+    }
+    parts.unshift(tag + ':nth-of-type(' + i + ')');
+  }
+  return parts.join(' > ');
+}
+
+function accessibleName(el, text) {
+  var ids = el.getAttribute('aria-labelledby');
+  if (ids) {
+    var n = ids.split(/\s+/).map(function (id) {
+      var ref = document.getElementById(id);
+      return ref ? ref.textContent : '';
+    }).join(' ');
+    if (bounded(n)) return {name: bounded(n), source: 'aria-labelledby', priority: 1};
+  }
+  var label = el.getAttribute('aria-label');
+  if (label && label.trim()) return {name: bounded(label), source: 'aria-label', priority: 2};
+  var lab = el.labels && el.labels.length ? el.labels[0] : null;
+  if (lab && bounded(lab.textContent)) return {name: bounded(lab.textContent), source: 'label', priority: 3};
+  var img = el.tagName === 'A' ? el.querySelector('img[alt]') : null;
+  var alt = el.getAttribute('alt') || (img ? img.getAttribute('alt') : '');
+  if (alt && alt.trim()) return {name: bounded(alt), source: 'alt', priority: 4};
+  var title = el.getAttribute('title');
+  if (title && title.trim()) return {name: bounded(title), source: 'title', priority: 5};
+  if (text) return {name: text, source: 'text', priority: 6};
+  var ph = el.getAttribute('placeholder');
+  if (ph && ph.trim()) return {name: bounded(ph), source: 'placeholder', priority: 7};
+  return {name: '', source: 'none', priority: 0};
+}
+
+function describe(el, seq) {
+  var r = el.getBoundingClientRect();
+  var cs = getComputedStyle(el);
+  var tag = el.tagName.toLowerCase();
+  var text = bounded(el.innerText || '');
+  var aria = {};
+  for (var i = 0; i < el.attributes.length; i++) {
+    var a = el.attributes[i];
+    if (a.name === 'role' || a.name.indexOf('aria-') === 0) aria[a.name] = a.value;
+  }
+  var basic = {};
+  BASIC.forEach(function (k) { basic[k] = el.getAttribute(k) || ''; });
+  var visible = !(cs.display === 'none' || cs.visibility === 'hidden' || r.width === 0 || r.height === 0);
+  var role = el.getAttribute('role');
+  var interactive = !el.disabled && (INTERACTIVE_TAGS[tag] === 1 || el.tabIndex >= 0 || INTERACTIVE_ROLES[role] === 1);
+  var parentRoles = [];
+  for (var p = el.parentElement; p && p !== document.body && p !== document.documentElement; p = p.parentElement) {
+    if (p.getAttribute('role')) parentRoles.push(p.getAttribute('role'));
+  }
+  var img = tag === 'a' ? el.querySelector('img') : null;
+  return {
+    seq: seq, t: performance.now(), tag: tag, text: text,
+    href: el.getAttribute('href') ? el.href : null,
+    xpath: xpathOf(el), css_selector: cssOf(el),
+    accessible_name: accessibleName(el, text),
+    aria_attributes: aria, basic_attributes: basic,
+    rect: {x: Math.round(r.left), y: Math.round(r.top), width: Math.round(r.width), height: Math.round(r.height)},
+    position: {x: Math.round(r.left + window.scrollX), y: Math.round(r.top + window.scrollY),
+               width: Math.round(r.width), height: Math.round(r.height)},
+    viewport: {width: window.innerWidth, height: window.innerHeight},
+    is_visible: visible, is_enabled: !el.disabled, focusable: visible && interactive,
+    image_alt: img ? img.getAttribute('alt') : null,
+    parent_roles: parentRoles
+  };
+}
+
+var tracker = {seq: 0, buffer: [], elements: new Map(), waiter: null};
+window.__rgaaFocusTracker = tracker;
+document.addEventListener('focusin', function (ev) {
+  var el = ev.target;
+  if (!el || el.nodeType !== 1) return;
+  tracker.seq++;
+  tracker.elements.set(tracker.seq, el);
+  try { tracker.buffer.push(describe(el, tracker.seq)); }
+  catch (e) { tracker.buffer.push({seq: tracker.seq, tag: el.tagName.toLowerCase(), error: String(e)}); }
+  if (tracker.waiter) tracker.waiter();
+}, true);
+return 0;
+"""
+
+# arguments[0] = nombre d'événements attendus, arguments[1] = délai max (ms).
+# Rend la main dès que le tampon contient assez d'événements (signalé par focusin), sinon au délai.
+FOCUS_TRACKER_DRAIN_SCRIPT = r"""
+var done = arguments[arguments.length - 1];
+var expected = arguments[0] || 0;
+var timeoutMs = arguments[1] || 500;
+var tracker = window.__rgaaFocusTracker;
+if (!tracker) { done(null); return; }
+function flush() {
+  var out = tracker.buffer;
+  tracker.buffer = [];
+  tracker.waiter = null;
+  // Seuls les éléments du lot rendu restent référencés : la Map ne croît pas avec le parcours
+  var keepFrom = out.length ? out[0].seq : tracker.seq + 1;
+  tracker.elements.forEach(function (el, seq) { if (seq < keepFrom) tracker.elements.delete(seq); });
+  done(out);
+}
+if (tracker.buffer.length >= expected) { flush(); return; }
+var timer = setTimeout(flush, timeoutMs);
+tracker.waiter = function () {
+  if (tracker.buffer.length >= expected) { clearTimeout(timer); flush(); }
+};
+"""
+
+FOCUS_TRACKER_ELEMENT_SCRIPT = r"""
+var tracker = window.__rgaaFocusTracker;
+return tracker ? (tracker.elements.get(arguments[0]) || null) : null;
+"""
+
+
+def focus_identifier(descriptor):
+    """
+    Identifiant « tag|id=…|pos=x,y » (même format que `_get_element_identifier` des navigateurs
+    clavier) calculé depuis un descripteur, sans appel WebDriver.
+    """
+    attrs = descriptor.get("basic_attributes") or {}
+    parts = [descriptor.get("tag", "")]
+    text = (descriptor.get("text") or "").strip()
+    if attrs.get("id"):
+        parts.append(f"id={attrs['id']}")
+    elif text:
+        parts.append(f"text={text[:50]}")
+    elif descriptor.get("href"):
+        parts.append(f"href={descriptor['href'][:50]}")
+    elif attrs.get("class"):
+        parts.append(f"class={attrs['class'][:30]}")
+    elif attrs.get("type"):
+        parts.append(f"type={attrs['type']}")
+    rect = descriptor.get("rect")
+    if rect:
+        parts.append(f"pos={rect['x']},{rect['y']}")
+    return "|".join(parts)
+
+
+class FocusTracker:
+    """Pilote les TAB et récupère les transitions de focus enregistrées dans la page."""
+
+    def __init__(self, driver, timeout=0.5, max_text=FOCUS_TRACKER_MAX_TEXT):
+        self.driver = driver
+        self.timeout = timeout
+        self.max_text = max_text
+        self.round_trips = 0
+
+    def install(self):
+        self.driver.execute_script(FOCUS_TRACKER_INSTALL_SCRIPT, self.max_text)
+        self.round_trips += 1
+
+    def press_tab(self, count=1):
+        """Envoie `count` TAB en une seule action WebDriver."""
+        ActionChains(self.driver).send_keys(*([Keys.TAB] * count)).perform()
+        self.round_trips += 1
+
+    def drain(self, expected=0):
+        """Vide le tampon ; attend au plus `timeout` que `expected` transitions soient enregistrées."""
+        events = self.driver.execute_async_script(
+            FOCUS_TRACKER_DRAIN_SCRIPT, expected, int(self.timeout * 1000)
+        )
+        self.round_trips += 1
+        if events is None:
+            # Tracker perdu (navigation, rechargement) : réinstallation, les TAB envoyés sont perdus
+            self.install()
+            return []
+        return events
+
+    def element(self, seq):
+        """
+        WebElement correspondant à une transition du dernier lot vidé (si un appel Selenium sur
+        l'élément est nécessaire) ; les éléments des lots précédents ne sont plus référencés.
+        """
+        self.round_trips += 1
+        return self.driver.execute_script(FOCUS_TRACKER_ELEMENT_SCRIPT, seq)
+
+    def walk(self, max_steps, drain_every=1):
+        """
+        Génère les descripteurs de focus dans l'ordre, par lots de `drain_every` TAB
+        (un envoi + une vidange par lot). S'arrête après `max_steps` TAB.
+        """
+        self.install()
+        sent = 0
+        while sent < max_steps:
+            batch = min(drain_every, max_steps - sent)
+            self.press_tab(batch)
+            sent += batch
+            for descriptor in self.drain(batch):
+                yield descriptor
@@ -0,0 +1,260 @@
+"""
+Cache disque persistant des images, adressé par contenu (SHA-256). Un index JSON associe chaque
+URL à son blob et à ses validateurs HTTP (ETag, Last-Modified, fraîcheur Cache-Control), et chaque
+blob à ses caractéristiques (format, dimensions, taille, empreinte) calculées une seule fois.
+La taille totale est bornée par une éviction LRU. Plusieurs processus (navigateurs du parcours de
+site) peuvent partager le cache : l'écriture de l'index se fait sous verrou de fichier, en
+fusionnant les mises à jour de chacun avec l'index présent sur disque.
+"""
+import email.utils
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+from PIL import Image
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+# Emplacement par défaut, partagé entre exécutions (rendu absolu par core.config.Config)
+DEFAULT_CACHE_DIR = '.image_cache'
+
+
+def _freshness_deadline(headers, now):
+    """Date limite de fraîcheur (timestamp) d'après Cache-Control / Expires, ou 0."""
+    cache_control = headers.get('Cache-Control', '') or ''
+    if 'no-cache' in cache_control or 'no-store' in cache_control:
+        return 0
+    m = _MAX_AGE.search(cache_control)
+    if m:
+        return now + int(m.group(1))
+    expires = headers.get('Expires')
+    if expires:
+        try:
+            return email.utils.parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+
+@contextmanager
+def _file_lock(path):
+    """Verrou exclusif inter-processus sur `path` (fichier créé au besoin)."""
+    with open(path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def image_facts(path):
+    """Format, dimensions intrinsèques et taille d'un fichier image (dimensions None si illisible)."""
+    facts = {'format': '', 'width': None, 'height': None, 'size': os.path.getsize(path)}
+    try:
+        with Image.open(path) as img:
+            facts.update(format=img.format or '', width=img.size[0], height=img.size[1])
+    except Exception:
+        with open(path, 'rb') as f:
+            head = f.read(512).lstrip()
+        if head.startswith(b'<svg') or (head.startswith(b'<?xml') and b'<svg' in head):
+            facts['format'] = 'SVG'
+    return facts
+
+
+class ImageCache:
+    """Cache d'images partagé entre les exécutions (thread-safe, index sauvegardé par `save`)."""
+
+    INDEX_NAME = 'index.json'
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.blob_dir = os.path.join(cache_dir, 'blobs')
+        self.index_path = os.path.join(cache_dir, self.INDEX_NAME)
+        self.lock_path = self.index_path + '.lock'
+        self._lock = threading.Lock()
+        # Entrées modifiées par ce processus depuis la dernière sauvegarde (fusion dans `save`)
+        self._dirty_urls = set()
+        self._dirty_blobs = set()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.urls, self.blobs = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data.get('urls', {}), data.get('blobs', {})
+        except (OSError, ValueError):
+            return {}, {}
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def lookup(self, url):
+        """Entrée d'URL (validateurs + caractéristiques du blob) si le blob est présent, sinon None."""
+        with self._lock:
+            entry = self.urls.get(url)
+            if not entry or entry['sha256'] not in self.blobs:
+                return None
+            if not os.path.exists(self._blob_path(entry['sha256'])):
+                self.blobs.pop(entry['sha256'], None)
+                return None
+            return dict(entry, facts=dict(self.blobs[entry['sha256']]))
+
+    def is_fresh(self, entry, now=None):
+        return entry.get('fresh_until', 0) > (now or time.time())
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def touch(self, url, headers=None):
+        """Marque l'URL comme utilisée (réponse 304 ou entrée fraîche) ; met à jour la fraîcheur."""
+        now = time.time()
+        with self._lock:
+            entry = self.urls.get(url)
+            if not entry:
+                return
+            if headers is not None:
+                entry['fresh_until'] = _freshness_deadline(headers, now)
+                entry['etag'] = headers.get('ETag') or entry.get('etag')
+                entry['last_modified'] = headers.get('Last-Modified') or entry.get('last_modified')
+                self._dirty_urls.add(url)
+            blob = self.blobs.get(entry['sha256'])
+            if blob:
+                blob['last_access'] = now
+                self._dirty_blobs.add(entry['sha256'])
+
+    def store_file(self, url, path, headers):
+        """
+        Ajoute le fichier téléchargé `path` au cache (lien physique si possible) et indexe l'URL.
+        Retourne les caractéristiques du blob.
+        """
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        blob_path = self._blob_path(digest)
+        now = time.time()
+        with self._lock:
+            known = self.blobs.get(digest)
+        if known is None or not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            _link_or_copy(path, blob_path)
+            facts = image_facts(blob_path)
+            facts['sha256'] = digest
+        else:
+            facts = dict(known)
+        facts['last_access'] = now
+        with self._lock:
+            self.blobs[digest] = facts
+            self.urls[url] = {
+                'sha256': digest,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'fresh_until': _freshness_deadline(headers, now),
+            }
+            self._dirty_urls.add(url)
+            self._dirty_blobs.add(digest)
+        return dict(facts)
+
+    def materialize(self, digest, dest):
+        """Place le blob à `dest` (lien physique si possible, sinon copie)."""
+        if os.path.exists(dest):
+            os.remove(dest)
+        _link_or_copy(self._blob_path(digest), dest)
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(b.get('size', 0) for b in self.blobs.values())
+
+    def evict(self):
+        """Supprime les blobs les moins récemment utilisés jusqu'à repasser sous `max_bytes`."""
+        removed = 0
+        with self._lock:
+            total = sum(b.get('size', 0) for b in self.blobs.values())
+            for digest, blob in sorted(self.blobs.items(), key=lambda kv: kv[1].get('last_access', 0)):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(self._blob_path(digest))
+                except OSError:
+                    pass
+                total -= blob.get('size', 0)
+                del self.blobs[digest]
+                removed += 1
+            if removed:
+                self.urls = {u: e for u, e in self.urls.items() if e['sha256'] in self.blobs}
+        return removed
+
+    def _merge_disk_index(self):
+        """
+        Index sur disque (écrit entre-temps par d'autres processus) complété par les entrées
+        modifiées ici : une URL mise à jour ici l'emporte, l'accès le plus récent d'un blob est gardé.
+        """
+        disk_urls, disk_blobs = self._load_index()
+        for url in self._dirty_urls:
+            if url in self.urls:
+                disk_urls[url] = self.urls[url]
+        for digest in self._dirty_blobs:
+            blob = self.blobs.get(digest)
+            if blob is None:
+                continue
+            known = disk_blobs.get(digest)
+            if known is not None:
+                blob = dict(blob, last_access=max(blob.get('last_access', 0), known.get('last_access', 0)))
+            disk_blobs[digest] = blob
+        self.urls, self.blobs = disk_urls, disk_blobs
+        self._dirty_urls.clear()
+        self._dirty_blobs.clear()
+
+    def save(self):
+        """
+        Fusionne l'index avec celui du disque, évince si nécessaire puis l'écrit de manière
+        atomique, le tout sous verrou de fichier (processus concurrents).
+        """
+        with _file_lock(self.lock_path):
+            with self._lock:
+                self._merge_disk_index()
+            self.evict()
+            with self._lock:
+                payload = {'urls': self.urls, 'blobs': self.blobs}
+                tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f)
+                os.replace(tmp_path, self.index_path)
+
+
+def _link_or_copy(src, dest):
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
@@ -0,0 +1,131 @@
+"""
+Téléchargement concurrent des images : une session HTTP partagée (pool de connexions),
+un nombre borné de workers, une limite de connexions simultanées par hôte et une file
+dédoublonnée par URL résolue.
+"""
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def image_local_path(output_dir, image_url):
+    """Chemin local d'une image : empreinte MD5 de l'URL résolue + extension du chemin."""
+    file_hash = hashlib.md5(image_url.encode()).hexdigest()
+    file_extension = os.path.splitext(urlparse(image_url).path)[1] or '.jpg'
+    return os.path.join(output_dir, f"{file_hash}{file_extension}")
+
+
+class ImageDownloader:
+    """
+    Télécharge un lot d'URL en parallèle. Chaque URL n'est téléchargée qu'une fois ;
+    `download_all` retourne {url: {'status', 'local_path', 'bytes'}} avec les statuts
+    historiques d'ImageAnalyzer ('success', 'error_http_404', 'error_timeout'…), complétés par
+    'cache' ('fresh', 'revalidated', 'miss') et 'facts' (format, dimensions, taille, sha256) si un
+    cache est fourni.
+    """
+
+    def __init__(self, output_dir, max_workers=8, per_host=4, timeout=10, verify=False, cache=None):
+        self.output_dir = output_dir
+        # utils.image_cache.ImageCache optionnel (requêtes conditionnelles, caractéristiques réutilisées)
+        self.cache = cache
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.verify = verify
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._host_slots = {}
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.wall_time = 0.0
+        self.requested = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _fetch(self, url):
+        local_path = image_local_path(self.output_dir, url)
+        if urlparse(url).scheme not in ('http', 'https'):
+            return {'status': 'error_unsupported_scheme', 'local_path': '', 'bytes': 0}
+        cached = self.cache.lookup(url) if self.cache else None
+        try:
+            if cached and self.cache.is_fresh(cached):
+                # Entrée encore fraîche (Cache-Control / Expires) : aucune requête
+                self.cache.touch(url)
+                self.cache.materialize(cached['sha256'], local_path)
+                return {'status': 'success', 'local_path': local_path, 'bytes': 0,
+                        'cache': 'fresh', 'facts': cached['facts']}
+            headers = self.cache.conditional_headers(cached) if cached else {}
+            with self._host_slot(url):
+                response = self.session.get(url, stream=True, timeout=self.timeout, headers=headers)
+                try:
+                    if response.status_code == 304 and cached:
+                        self.cache.touch(url, response.headers)
+                        self.cache.materialize(cached['sha256'], local_path)
+                        return {'status': 'success', 'local_path': local_path, 'bytes': 0,
+                                'cache': 'revalidated', 'facts': cached['facts']}
+                    if response.status_code != 200:
+                        return {'status': f'error_http_{response.status_code}', 'local_path': '', 'bytes': 0}
+                    size = 0
+                    # Fichier temporaire puis remplacement : ne jamais écrire dans un blob lié
+                    part_path = local_path + '.part'
+                    with open(part_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=65536):
+                            f.write(chunk)
+                            size += len(chunk)
+                    os.replace(part_path, local_path)
+                finally:
+                    response.close()
+            with self._lock:
+                self.total_bytes += size
+            result = {'status': 'success', 'local_path': local_path, 'bytes': size, 'cache': 'miss' if self.cache else ''}
+            if self.cache:
+                result['facts'] = self.cache.store_file(url, local_path, response.headers)
+            return result
+        except requests.exceptions.Timeout:
+            return {'status': 'error_timeout', 'local_path': '', 'bytes': 0}
+        except requests.exceptions.RequestException as e:
+            return {'status': f'error_request_{str(e)}', 'local_path': '', 'bytes': 0}
+        except Exception as e:
+            return {'status': f'error_unknown_{str(e)}', 'local_path': '', 'bytes': 0}
+
+    def download_all(self, urls):
+        """Télécharge les URL (résolues) dédoublonnées ; retourne les résultats par URL."""
+        self.requested = len(urls)
+        unique = list(dict.fromkeys(u for u in urls if u))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(unique) or 1))) as executor:
+            results = dict(zip(unique, executor.map(self._fetch, unique)))
+        self.wall_time += time.perf_counter() - started
+        return results
+
+    def summary(self, results):
+        """Résumé texte : URL uniques, références, octets et durée."""
+        ok = sum(1 for r in results.values() if r['status'] == 'success')
+        text = (
+            f"{len(results)} URL uniques pour {self.requested} références, {ok} téléchargées, "
+            f"{self.total_bytes / 1024:.1f} Ko en {self.wall_time:.2f}s"
+        )
+        if self.cache:
+            hits = sum(1 for r in results.values() if r.get('cache') in ('fresh', 'revalidated'))
+            text += f", {hits} servies par le cache"
+        return text
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.save()
@@ -1,10 +1,77 @@
-
 from PIL import Image
 import io
 
-def simulate_daltonism(image_bytes, mode):
-    img = Image.open(io.BytesIO(image_bytes)).convert('RGB')
-    img = img.convert('L').convert('RGB')  # À remplacer par un vrai filtre
+import numpy as np
+
+# Matrices de simulation (Machado, Oliveira & Fernandes 2009, sévérité 1.0) en RGB linéaire.
+# Achromatopsie : luminance relative Rec. 709 recopiée sur les trois canaux.
+DALTONISM_MATRICES = {
+    'protanopia': np.array([
+        [0.152286, 1.052583, -0.204868],
+        [0.114503, 0.786281, 0.099216],
+        [-0.003882, -0.048116, 1.051998],
+    ]),
+    'deuteranopia': np.array([
+        [0.367322, 0.860646, -0.227968],
+        [0.280085, 0.672501, 0.047413],
+        [-0.011820, 0.042940, 0.968881],
+    ]),
+    'tritanopia': np.array([
+        [1.255528, -0.076749, -0.178779],
+        [-0.078411, 0.930809, 0.147602],
+        [0.004733, 0.691367, 0.303900],
+    ]),
+    'achromatopsia': np.tile([0.2126, 0.7152, 0.0722], (3, 1)),
+}
+DALTONISM_MODES = tuple(DALTONISM_MATRICES)
+
+# Tables de conversion sRGB <-> linéaire (évite les puissances pixel par pixel)
+_SRGB = np.arange(256) / 255.0
+SRGB_TO_LINEAR = np.where(_SRGB <= 0.04045, _SRGB / 12.92, ((_SRGB + 0.055) / 1.055) ** 2.4).astype(np.float32)
+_LINEAR_STEPS = 4096
+_LIN = np.linspace(0.0, 1.0, _LINEAR_STEPS)
+LINEAR_TO_SRGB = np.rint(255.0 * np.where(
+    _LIN <= 0.0031308, _LIN * 12.92, 1.055 * _LIN ** (1 / 2.4) - 0.055)).astype(np.uint8)
+
+# Nombre de pixels traités par bloc (borne la mémoire des intermédiaires float32)
+_CHUNK_PIXELS = 1 << 20
+
+
+def decode_rgb(image_bytes):
+    """Décode une image (PNG…) en tableau (H, W, 3) uint8 contigu."""
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        return np.ascontiguousarray(np.asarray(img.convert('RGB'), dtype=np.uint8))
+
+
+def encode_png(rgb, compress_level=3):
+    """Encode un tableau (H, W, 3) uint8 en PNG."""
     output = io.BytesIO()
-    img.save(output, format='PNG')
+    Image.fromarray(rgb, 'RGB').save(output, format='PNG', compress_level=compress_level)
     return output.getvalue()
+
+
+def simulate_daltonism_array(rgb, modes=DALTONISM_MODES):
+    """
+    Simule plusieurs types de daltonisme sur une image (H, W, 3) uint8 décodée une seule fois.
+    Les matrices de tous les modes sont empilées et appliquées en un seul produit matriciel
+    par bloc de lignes ; l'image source n'est jamais copiée. Retourne {mode: tableau uint8}.
+    """
+    height, width = rgb.shape[:2]
+    stacked = np.concatenate([DALTONISM_MATRICES[m].T for m in modes], axis=1).astype(np.float32)
+    outputs = {m: np.empty((height, width, 3), dtype=np.uint8) for m in modes}
+    rows = max(1, _CHUNK_PIXELS // max(width, 1))
+    for y0 in range(0, height, rows):
+        y1 = min(y0 + rows, height)
+        linear = SRGB_TO_LINEAR[rgb[y0:y1]].reshape(-1, 3)
+        simulated = linear @ stacked
+        np.clip(simulated, 0.0, 1.0, out=simulated)
+        index = (simulated * (_LINEAR_STEPS - 1) + 0.5).astype(np.uint16)
+        srgb = LINEAR_TO_SRGB[index]
+        for k, mode in enumerate(modes):
+            outputs[mode][y0:y1] = srgb[:, 3 * k:3 * k + 3].reshape(y1 - y0, width, 3)
+    return outputs
+
+
+def simulate_daltonism(image_bytes, mode):
+    rgb = decode_rgb(image_bytes)
+    return encode_png(simulate_daltonism_array(rgb, (mode,))[mode])
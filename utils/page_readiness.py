@@ -0,0 +1,194 @@
+"""
+Détection adaptative de la stabilité d'une page, en remplacement des attentes fixes : un moniteur
+installé dans la page suit les requêtes en cours, les mutations du DOM (MutationObserver), le
+chargement des polices et des images ; l'attente se termine dès que la page est calme pendant
+`quiet_ms`, au plus tard après `timeout` secondes. Le temps mesuré est journalisé.
+
+Requêtes suivies : fetch / XHR (interceptés), scripts externes, feuilles de style et iframes
+insérés dans le document (en attente jusqu'à leur événement load / error), images non différées
+(`img.complete`) ; chaque ressource terminée (PerformanceObserver) relance la fenêtre de calme.
+Le moniteur est enregistré avant la navigation (`install_page_readiness` : script exécuté à la
+création de chaque document) pour voir aussi les ressources du chargement initial ; à défaut, il
+est installé au premier appel de `wait_for_page_ready` et ne suit que les insertions suivantes
+(le chargement initial est alors couvert par `document.readyState`).
+"""
+import logging
+import time
+
+from utils.log_utils import log_with_step
+
+# Bornes par défaut (modifiables par la configuration, cf. `set_readiness_defaults`)
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_QUIET_MS = 500
+
+# Installe le moniteur (idempotent, une instance par document). Sans `return` au niveau supérieur :
+# utilisable comme script WebDriver et comme script d'initialisation de document.
+PAGE_READINESS_INSTALL_SCRIPT = r"""
+(function () {
+if (window.__rgaaReadiness) { return; }
+var m = {inflight: 0, lastNetwork: performance.now(), lastMutation: performance.now(), timedOut: false};
+window.__rgaaReadiness = m;
+function done() { m.inflight = Math.max(0, m.inflight - 1); m.lastNetwork = performance.now(); }
+if (window.fetch) {
+  var origFetch = window.fetch;
+  window.fetch = function () {
+    m.inflight++; m.lastNetwork = performance.now();
+    return origFetch.apply(this, arguments).then(
+      function (r) { done(); return r; },
+      function (e) { done(); throw e; });
+  };
+}
+// Scripts, feuilles de style et iframes insérés : en attente jusqu'à load / error. Ceux insérés avant
+// la fin du chargement retardent l'événement load du document : terminés dès readyState 'complete'.
+var loading = new Map();
+function loadable(el) {
+  switch (el.tagName) {
+    case 'SCRIPT': return !!el.src && /^$|javascript|ecmascript|module/i.test(el.type || '');
+    case 'LINK': return !!el.href && /(^|\s)stylesheet(\s|$)/i.test(el.rel || '');
+    case 'IFRAME': return !!el.src && el.src !== 'about:blank';
+  }
+  return false;
+}
+function track(el) {
+  if (loading.has(el) || !loadable(el)) return;
+  loading.set(el, document.readyState !== 'complete'); m.lastNetwork = performance.now();
+  function settle() { loading.delete(el); m.lastNetwork = performance.now(); }
+  el.addEventListener('load', settle, {once: true});
+  el.addEventListener('error', settle, {once: true});
+}
+m.pendingResources = function () {
+  var complete = document.readyState === 'complete';
+  loading.forEach(function (early, el) { if (!el.isConnected || (early && complete)) loading.delete(el); });
+  return loading.size;
+};
+var origSend = XMLHttpRequest.prototype.send;
+XMLHttpRequest.prototype.send = function () {
+  m.inflight++; m.lastNetwork = performance.now();
+  this.addEventListener('loadend', done, {once: true});
+  return origSend.apply(this, arguments);
+};
+try {
+  new PerformanceObserver(function (list) {
+    list.getEntries().forEach(function (e) { m.lastNetwork = Math.max(m.lastNetwork, e.responseEnd || e.startTime); });
+  }).observe({type: 'resource', buffered: true});
+} catch (e) {}
+new MutationObserver(function (mutations) {
+  m.lastMutation = performance.now();
+  mutations.forEach(function (mu) {
+    for (var i = 0; i < mu.addedNodes.length; i++) {
+      var node = mu.addedNodes[i];
+      if (node.nodeType !== 1) continue;
+      track(node);
+      if (node.firstElementChild) node.querySelectorAll('script[src], link[href], iframe[src]').forEach(track);
+    }
+  });
+}).observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+})();
+"""
+
+# arguments[0] = fenêtre de calme (ms), arguments[1] = borne (ms). Rend {ready, elapsed_ms, pending}.
+# Une page qui n'a jamais été calme (animation continue) n'attend plus les mutations aux appels suivants.
+PAGE_READINESS_WAIT_SCRIPT = r"""
+var callback = arguments[arguments.length - 1];
+var quietMs = arguments[0], timeoutMs = arguments[1];
+var m = window.__rgaaReadiness;
+var start = performance.now();
+function pending() {
+  var now = performance.now(), out = [];
+  if (document.readyState !== 'complete') out.push('readyState');
+  if (m.inflight > 0 || m.pendingResources() > 0 || now - m.lastNetwork < quietMs) out.push('network');
+  if (!m.timedOut && now - m.lastMutation < quietMs) out.push('mutations');
+  if (document.fonts && document.fonts.status !== 'loaded') out.push('fonts');
+  var imgs = document.images;
+  for (var i = 0; i < imgs.length; i++) {
+    var img = imgs[i];
+    if (!img.complete && img.loading !== 'lazy') { out.push('images'); break; }
+  }
+  return out;
+}
+function check() {
+  var p = pending(), elapsed = performance.now() - start;
+  if (!p.length) { callback({ready: true, elapsed_ms: Math.round(elapsed), pending: []}); return; }
+  if (elapsed >= timeoutMs) {
+    if (p.indexOf('mutations') >= 0) m.timedOut = true;
+    callback({ready: false, elapsed_ms: Math.round(elapsed), pending: p});
+    return;
+  }
+  setTimeout(check, 50);
+}
+check();
+"""
+
+
+def set_readiness_defaults(timeout=None, quiet_ms=None):
+    """Bornes par défaut de toutes les attentes (configuration --ready-timeout / --ready-quiet)."""
+    global DEFAULT_TIMEOUT, DEFAULT_QUIET_MS
+    if timeout is not None:
+        DEFAULT_TIMEOUT = float(timeout)
+    if quiet_ms is not None:
+        DEFAULT_QUIET_MS = int(quiet_ms)
+
+
+def install_page_readiness(driver):
+    """
+    Enregistre le moniteur avant toute navigation (CDP `Page.addScriptToEvaluateOnNewDocument`) :
+    il est alors actif dès la création de chaque document de l'onglet. Idempotent ; retourne False
+    si le driver n'expose pas CDP (le moniteur sera installé à la première attente).
+    """
+    if getattr(driver, "_readiness_script_id", None):
+        return True
+    try:
+        added = driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": PAGE_READINESS_INSTALL_SCRIPT})
+    except Exception:
+        return False
+    driver._readiness_script_id = (added or {}).get("identifier") or True
+    return True
+
+
+def _script_timeout(driver):
+    """Délai de script courant du driver (secondes), None s'il n'est pas lisible."""
+    try:
+        return driver.timeouts.script
+    except Exception:
+        return getattr(driver, "script_timeout", None)
+
+
+def wait_for_page_ready(driver, timeout=None, quiet_ms=None, logger=None, label="", step_tag="READY"):
+    """
+    Attend que la page soit stable (document chargé, réseau et DOM calmes pendant `quiet_ms`,
+    polices et images chargées), au plus `timeout` secondes. Retourne
+    {'ready', 'settle_ms', 'pending'} ; n'échoue jamais (la page est alors analysée en l'état).
+    """
+    timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    quiet_ms = DEFAULT_QUIET_MS if quiet_ms is None else quiet_ms
+    started = time.perf_counter()
+    result = {"ready": False, "pending": []}
+    previous_timeout = None
+    try:
+        driver.execute_script(PAGE_READINESS_INSTALL_SCRIPT)
+        # Marge au-delà de la borne JS pour le délai de script WebDriver, rétabli ensuite
+        if hasattr(driver, "set_script_timeout"):
+            previous_timeout = _script_timeout(driver)
+            driver.set_script_timeout(max(30, timeout + 5))
+        outcome = driver.execute_async_script(PAGE_READINESS_WAIT_SCRIPT, quiet_ms, int(timeout * 1000))
+        if isinstance(outcome, dict):
+            result = outcome
+    except Exception as e:
+        result = {"ready": False, "pending": [f"erreur: {e}"]}
+    finally:
+        if previous_timeout is not None:
+            try:
+                driver.set_script_timeout(previous_timeout)
+            except Exception:
+                pass
+    result["settle_ms"] = round((time.perf_counter() - started) * 1000.0)
+    if logger:
+        where = f" ({label})" if label else ""
+        if result.get("ready"):
+            log_with_step(logger, logging.INFO, step_tag, f"Page stable en {result['settle_ms']} ms{where}")
+        else:
+            log_with_step(
+                logger, logging.WARNING, step_tag,
+                f"Page non stabilisée après {result['settle_ms']} ms{where} : {', '.join(result.get('pending') or [])}",
+            )
+    return result
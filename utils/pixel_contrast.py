@@ -0,0 +1,130 @@
+"""
+Vérification des contrastes par échantillonnage de pixels : une capture pleine page décodée une
+seule fois, puis estimation texte / fond par regroupement d'histogramme sur chaque rectangle de texte.
+Utile quand le style calculé ne suffit pas (dégradés, images de fond, superpositions).
+"""
+import base64
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from utils.color_utils import relative_luminance_array
+
+# Quantification de l'histogramme : 4 bits par canal (4096 classes)
+HISTOGRAM_BITS = 4
+# Part minimale des pixels d'une classe pour être candidate « couleur du texte » (écarte l'anticrénelage)
+MIN_FOREGROUND_SHARE = 0.02
+# Au-delà de ce nombre de rectangles, l'échantillonnage est réparti sur un pool de processus
+PROCESS_POOL_THRESHOLD = 2000
+
+_WORKER_SHM = None
+_WORKER_IMAGE = None
+
+
+def capture_full_page(driver):
+    """
+    Capture unique de la page entière (CDP `Page.captureScreenshot` hors viewport si disponible,
+    sinon viewport courant). Retourne (png_bytes, origine_x, origine_y, largeur_css) : origine et
+    largeur permettent de ramener les rectangles (coordonnées document, px CSS) dans l'image.
+    """
+    if hasattr(driver, "execute_cdp_cmd"):
+        try:
+            metrics = driver.execute_cdp_cmd("Page.getLayoutMetrics", {})
+            size = metrics.get("cssContentSize") or metrics.get("contentSize")
+            width, height = int(size["width"]), int(size["height"])
+            shot = driver.execute_cdp_cmd("Page.captureScreenshot", {
+                "format": "png",
+                "captureBeyondViewport": True,
+                "clip": {"x": 0, "y": 0, "width": width, "height": height, "scale": 1},
+            })
+            return base64.b64decode(shot["data"]), 0, 0, width
+        except Exception:
+            pass
+    sx, sy, vw = driver.execute_script("return [window.scrollX, window.scrollY, window.innerWidth];")
+    return driver.get_screenshot_as_png(), int(sx), int(sy), int(vw)
+
+
+def scale_rects(rects, origin_x, origin_y, css_width, image_width):
+    """Convertit des rectangles [x, y, w, h] (px CSS document) en pixels image (N, 4) int."""
+    r = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+    scale = image_width / float(css_width) if css_width else 1.0
+    r[:, 0] -= origin_x
+    r[:, 1] -= origin_y
+    return np.rint(r * scale).astype(np.int64)
+
+
+def estimate_text_colors(crop):
+    """
+    Estime (texte, fond) d'un rectangle (h, w, 3) : la classe d'histogramme la plus peuplée donne
+    le fond, la classe suffisamment représentée la plus contrastée avec lui donne le texte.
+    Les couleurs renvoyées sont les moyennes des pixels de chaque classe.
+    """
+    px = crop.reshape(-1, 3)
+    shift = 8 - HISTOGRAM_BITS
+    q = (px >> shift).astype(np.int32)
+    codes = (q[:, 0] << (2 * HISTOGRAM_BITS)) | (q[:, 1] << HISTOGRAM_BITS) | q[:, 2]
+    nbins = 1 << (3 * HISTOGRAM_BITS)
+    counts = np.bincount(codes, minlength=nbins)
+    occupied = np.flatnonzero(counts)
+    occ_counts = counts[occupied]
+    sums = np.stack(
+        [np.bincount(codes, weights=px[:, c], minlength=nbins)[occupied] for c in range(3)], axis=1
+    )
+    means = sums / occ_counts[:, None]
+    bg_index = int(np.argmax(occ_counts))
+    lum = relative_luminance_array(means)
+    contrast = (np.maximum(lum, lum[bg_index]) + 0.05) / (np.minimum(lum, lum[bg_index]) + 0.05)
+    contrast[occ_counts < MIN_FOREGROUND_SHARE * len(px)] = 0.0
+    contrast[bg_index] = 0.0
+    fg_index = int(np.argmax(contrast)) if contrast.max() > 0 else bg_index
+    return means[fg_index], means[bg_index]
+
+
+def _sample(image, rects):
+    """Échantillonne une série de rectangles (pixels image) sur une image partagée, sans copie."""
+    height, width = image.shape[:2]
+    fg = np.full((len(rects), 3), np.nan)
+    bg = np.full((len(rects), 3), np.nan)
+    for i, (x, y, w, h) in enumerate(rects):
+        x0, y0 = max(int(x), 0), max(int(y), 0)
+        x1, y1 = min(int(x + w), width), min(int(y + h), height)
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            continue
+        fg[i], bg[i] = estimate_text_colors(image[y0:y1, x0:x1])
+    return fg, bg
+
+
+def _init_worker(shm_name, shape):
+    global _WORKER_SHM, _WORKER_IMAGE
+    _WORKER_SHM = shared_memory.SharedMemory(name=shm_name)
+    _WORKER_IMAGE = np.ndarray(shape, dtype=np.uint8, buffer=_WORKER_SHM.buf)
+
+
+def _sample_in_worker(rects):
+    return _sample(_WORKER_IMAGE, rects)
+
+
+def sample_text_colors(image, rects, max_workers=None, pool_threshold=PROCESS_POOL_THRESHOLD):
+    """
+    Estime (texte, fond) pour chaque rectangle (N, 4) en pixels image. Retourne deux tableaux
+    (N, 3) ; NaN pour les rectangles hors image. Au-delà de `pool_threshold` rectangles, l'image
+    décodée est placée une fois en mémoire partagée et les lots sont traités par un pool de processus.
+    """
+    rects = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+    workers = max_workers or os.cpu_count() or 1
+    if len(rects) < pool_threshold or workers < 2:
+        return _sample(image, rects)
+
+    shm = shared_memory.SharedMemory(create=True, size=image.nbytes)
+    try:
+        np.ndarray(image.shape, dtype=np.uint8, buffer=shm.buf)[:] = image
+        chunks = np.array_split(rects, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, image.shape)) as executor:
+            parts = list(executor.map(_sample_in_worker, chunks))
+    finally:
+        shm.close()
+        shm.unlink()
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
@@ -0,0 +1,31 @@
+"""
+Répertoire de sortie de l'audit en cours. Par défaut les rapports sont écrits comme toujours,
+relativement au répertoire courant (`reports/…`, `rapport_analyse_*.csv`) ; un moteur qui exécute
+plusieurs audits dans le même processus (threads, tâches asyncio) fixe un répertoire propre à
+chaque audit avec `run_directory`, la valeur suivant le contexte (contextvars) de l'audit.
+"""
+import contextvars
+import os
+from contextlib import contextmanager
+
+_RUN_DIR = contextvars.ContextVar("rgaa_run_dir", default="")
+
+
+def run_path(*parts):
+    """Chemin relatif au répertoire de l'audit courant (répertoire courant par défaut)."""
+    return os.path.join(_RUN_DIR.get(), *parts) if _RUN_DIR.get() else os.path.join(*parts)
+
+
+def reports_path(*parts):
+    """Chemin dans le dossier `reports` de l'audit courant."""
+    return run_path("reports", *parts)
+
+
+@contextmanager
+def run_directory(path):
+    """Redirige les rapports écrits dans ce contexte (et les threads lancés avec lui) vers `path`."""
+    token = _RUN_DIR.set(path)
+    try:
+        yield path
+    finally:
+        _RUN_DIR.reset(token)
@@ -0,0 +1,225 @@
+"""
+Filtrage des requêtes réseau pendant l'audit : un profil (types de ressources, domaines, motifs
+d'URL, liste d'autorisation) écarte les balises analytiques, publicités, traceurs et flux vidéo
+qui ralentissent le chargement sans servir l'analyse. Les requêtes bloquées sont conservées avec
+leur motif et écrites dans `reports/blocked_requests.csv` pour que les résultats restent explicables.
+
+Playwright intercepte chaque requête (`context.route`) et applique tout le profil. Avec Selenium,
+le blocage passe par CDP `Network.setBlockedURLs`, qui ne connaît que des motifs d'URL : les
+domaines et les extensions des types bloqués y sont traduits, la liste d'autorisation et le
+blocage des scripts tiers ne s'appliquent pas. Les motifs d'URL suivent la syntaxe CDP des deux
+côtés : seul `*` est un joker, `?` désigne le début de la chaîne de requête.
+"""
+import csv
+import json
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+from utils.log_utils import log_with_step
+from utils.report_paths import reports_path
+
+# Traceurs, mesure d'audience et régies publicitaires courants (sous-domaines compris)
+TRACKER_DOMAINS = (
+    "google-analytics.com", "analytics.google.com", "googletagmanager.com", "googlesyndication.com",
+    "googleadservices.com", "doubleclick.net", "adservice.google.com", "connect.facebook.net",
+    "facebook.com/tr", "hotjar.com", "hotjar.io", "clarity.ms", "matomo.cloud", "xiti.com",
+    "atinternet-solutions.com", "mouseflow.com", "criteo.com", "criteo.net", "taboola.com",
+    "outbrain.com", "adnxs.com", "amazon-adsystem.com", "scorecardresearch.com", "quantserve.com",
+    "bing.com/bat", "bat.bing.com", "snap.licdn.com", "ads.linkedin.com", "static.ads-twitter.com",
+    "analytics.tiktok.com", "segment.io", "cdn.segment.com", "mixpanel.com", "newrelic.com",
+    "nr-data.net", "fullstory.com", "smartadserver.com", "contentsquare.net", "kameleoon.eu",
+    "abtasty.com",
+)
+
+# Plateformes de consentement : jamais bloquées (la gestion du bandeau cookies en dépend)
+CONSENT_DOMAINS = (
+    "didomi.io", "privacy-center.org", "cookielaw.org", "onetrust.com", "axept.io", "axeptio.eu",
+    "tarteaucitron.io", "cookiebot.com", "usercentrics.eu", "trustcommander.net", "commander1.com",
+)
+
+# Extensions des flux média (traduction du type « media » en motifs d'URL pour Selenium)
+MEDIA_EXTENSIONS = ("mp4", "webm", "m3u8", "mpd", "m4s", "mov", "ogv", "mp3", "ogg", "wav")
+
+# Points de collecte des traceurs hébergés sur le domaine du site (`?` littéral : chaîne de requête)
+TRACKER_PATTERNS = ("*/collect?*", "*/pixel?*", "*/beacon", "*/beacon?*")
+
+PROFILES = {
+    "off": None,
+    # Audit : les ressources qui participent au rendu (CSS, polices, images, scripts du site) passent
+    "audit": {
+        "block_types": ["media", "ping", "beacon"],
+        "block_domains": list(TRACKER_DOMAINS),
+        "block_patterns": list(TRACKER_PATTERNS),
+        "allow_domains": list(CONSENT_DOMAINS),
+        "block_third_party_scripts": False,
+    },
+    # Strict : en plus, tous les scripts tiers hors consentement, websockets et flux d'événements
+    "strict": {
+        "block_types": ["media", "ping", "beacon", "websocket", "eventsource"],
+        "block_domains": list(TRACKER_DOMAINS),
+        "block_patterns": list(TRACKER_PATTERNS),
+        "allow_domains": list(CONSENT_DOMAINS),
+        "block_third_party_scripts": True,
+    },
+}
+
+
+def _host(url):
+    try:
+        return (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+
+
+def _site(host):
+    """Domaine enregistrable approché (deux derniers labels) pour distinguer les requêtes tierces."""
+    return ".".join(host.split(".")[-2:])
+
+
+def _pattern_regex(pattern):
+    """Motif d'URL à la manière de CDP `Network.setBlockedURLs` : `*` joker, tout autre caractère littéral."""
+    return re.compile(".*".join(re.escape(part) for part in pattern.split("*")), re.DOTALL)
+
+
+def _domain_matches(url, host, domain):
+    """`domain` couvre l'hôte et ses sous-domaines ; « hôte/chemin » restreint à un préfixe de chemin."""
+    name, _, path = domain.partition("/")
+    if host != name and not host.endswith("." + name):
+        return False
+    return not path or urlsplit(url).path.lstrip("/").startswith(path)
+
+
+class RequestFilter:
+    """Profil de filtrage ; `match` rend le motif de blocage d'une requête, ou None si elle passe."""
+
+    def __init__(self, name="custom", block_types=(), block_domains=(), block_patterns=(),
+                 allow_domains=(), block_third_party_scripts=False):
+        self.name = name
+        self.block_types = {t.lower() for t in block_types}
+        self.block_domains = tuple(d.lower() for d in block_domains)
+        self.block_patterns = tuple(block_patterns)
+        self._pattern_regexes = tuple((p, _pattern_regex(p)) for p in self.block_patterns)
+        self.allow_domains = tuple(d.lower() for d in allow_domains)
+        self.block_third_party_scripts = bool(block_third_party_scripts)
+        self.blocked = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_profile(cls, profile):
+        """Profil nommé (`off`, `audit`, `strict`) ou fichier JSON ; None pour `off`."""
+        if not profile or profile == "off":
+            return None
+        if profile in PROFILES:
+            return cls(name=profile, **PROFILES[profile])
+        if os.path.isfile(profile):
+            with open(profile, encoding="utf-8") as f:
+                spec = json.load(f)
+            spec.setdefault("name", os.path.splitext(os.path.basename(profile))[0])
+            return cls(**spec)
+        raise ValueError(f"Profil réseau inconnu : {profile} (off, audit, strict ou fichier JSON)")
+
+    def for_page(self):
+        """Copie vierge du profil (journal de requêtes bloquées propre à une page)."""
+        return RequestFilter(self.name, self.block_types, self.block_domains, self.block_patterns,
+                             self.allow_domains, self.block_third_party_scripts)
+
+    def match(self, url, resource_type="", page_url=""):
+        if not url.startswith(("http://", "https://")):
+            return None
+        host = _host(url)
+        if any(_domain_matches(url, host, d) for d in self.allow_domains):
+            return None
+        resource_type = (resource_type or "").lower()
+        if resource_type in self.block_types:
+            return f"type:{resource_type}"
+        for domain in self.block_domains:
+            if _domain_matches(url, host, domain):
+                return f"domaine:{domain}"
+        for pattern, regex in self._pattern_regexes:
+            if regex.fullmatch(url):
+                return f"motif:{pattern}"
+        if (self.block_third_party_scripts and resource_type == "script" and page_url
+                and _site(host) != _site(_host(page_url))):
+            return "script tiers"
+        return None
+
+    def record(self, url, resource_type, reason):
+        with self._lock:
+            self.blocked.append({"url": url, "type": resource_type or "", "reason": reason})
+
+    def summary(self):
+        """Nombre de requêtes bloquées par motif."""
+        return Counter(entry["reason"] for entry in self.blocked)
+
+    def url_patterns(self):
+        """Motifs génériques CDP (`Network.setBlockedURLs`) équivalents au profil, pour Selenium."""
+        patterns = []
+        for domain in self.block_domains:
+            name, _, path = domain.partition("/")
+            suffix = f"/{path}*" if path else "/*"
+            patterns += [f"*://{name}{suffix}", f"*://*.{name}{suffix}"]
+        patterns += list(self.block_patterns)
+        if "media" in self.block_types:
+            patterns += [f"*.{ext}" for ext in MEDIA_EXTENSIONS] + [f"*.{ext}?*" for ext in MEDIA_EXTENSIONS]
+        return patterns
+
+    def apply_to_selenium(self, driver):
+        """Active le blocage CDP sur un driver Chrome ; False si le navigateur ne le permet pas."""
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.url_patterns()})
+            return True
+        except Exception:
+            return False
+
+    def collect_selenium_log(self, driver, page_url=""):
+        """
+        Relève les requêtes bloquées par CDP dans le journal « performance » de Chrome
+        (driver créé avec `performance_log=True`). Retourne le nombre de requêtes ajoutées.
+        """
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            return 0
+        requests, added = {}, 0
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            params = message.get("params", {})
+            if message.get("method") == "Network.requestWillBeSent":
+                requests[params.get("requestId")] = (params.get("request", {}).get("url", ""), params.get("type", ""))
+            elif (message.get("method") == "Network.loadingFailed"
+                  and params.get("blockedReason") == "inspector"):
+                # « inspector » = bloquée par Network.setBlockedURLs ; CSP, contenu mixte, CORB… ne
+                # relèvent pas du profil
+                url, resource_type = requests.get(params.get("requestId"), ("", params.get("type", "")))
+                reason = self.match(url, resource_type, page_url) or "motif CDP"
+                self.record(url, resource_type.lower(), reason)
+                added += 1
+        return added
+
+    def write_report(self, path=None):
+        """Écrit la liste des requêtes bloquées (CSV) ; retourne le chemin du fichier."""
+        path = path or reports_path("blocked_requests.csv")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["URL", "Type", "Motif"])
+            for entry in self.blocked:
+                writer.writerow([entry["url"], entry["type"], entry["reason"]])
+        return path
+
+    def log_summary(self, logger, label="", step_tag="RESEAU"):
+        where = f" ({label})" if label else ""
+        detail = ", ".join(f"{reason} : {count}" for reason, count in self.summary().most_common(5))
+        log_with_step(
+            logger, logging.INFO, step_tag,
+            f"Profil réseau '{self.name}' : {len(self.blocked)} requête(s) bloquée(s){where}"
+            + (f" — {detail}" if detail else ""),
+        )
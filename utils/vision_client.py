@@ -0,0 +1,324 @@
+"""
+Client partagé des API de vision (format chat/completions de Mistral), utilisé par l'analyse des
+évènements de tabulation (`modules.synthesys`) et le module Titres.
+
+Les requêtes d'un lot partent en parallèle depuis une boucle asyncio (appels `requests` dans des
+threads) : nombre de requêtes simultanées borné, débit maximal par minute, reprises avec attente
+exponentielle sur 429 / 5xx / erreurs réseau (en-tête Retry-After respecté). Les réponses sont
+gardées sur disque, indexées par (empreinte du prompt, empreintes du contenu des images, modèle) :
+un audit relancé sur les mêmes captures ne rappelle pas l'API. Chaque image n'est lue et encodée
+en base64 qu'une fois par exécution, même si elle accompagne plusieurs requêtes.
+
+Réglages (variables d'environnement, sinon `.mistral_config.json`) : MISTRAL_API_URL,
+MISTRAL_API_KEY, MISTRAL_MODEL, MISTRAL_MAX_CONCURRENCY, MISTRAL_REQUESTS_PER_MINUTE,
+MISTRAL_CACHE_DIR (vide = pas de cache).
+"""
+import asyncio
+import base64
+import email.utils
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.log_utils import log_with_step
+
+DEFAULT_API_URL = "https://api.mistral.ai/v1/chat/completions"
+DEFAULT_CACHE_DIR = ".vision_ai_cache"
+DEFAULT_CONCURRENCY = 4
+SETTING_KEYS = ("MISTRAL_API_URL", "MISTRAL_API_KEY", "MISTRAL_MODEL", "MISTRAL_MAX_CONCURRENCY",
+                "MISTRAL_REQUESTS_PER_MINUTE", "MISTRAL_CACHE_DIR")
+# Réponses HTTP qui justifient une nouvelle tentative
+RETRY_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+def load_vision_settings(config_path=".mistral_config.json"):
+    """Réglages de l'API de vision : variables d'environnement, complétées par le fichier local."""
+    settings = {key: os.environ.get(key) for key in SETTING_KEYS}
+    if not all(settings.values()) and os.path.exists(config_path):
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                cfg = json.load(f)
+            for key in SETTING_KEYS:
+                if settings[key] is None and cfg.get(key) is not None:
+                    settings[key] = str(cfg[key])
+        except Exception as e:
+            print(f"[load_vision_settings] Erreur lecture {config_path}: {e}")
+    return settings
+
+
+def extract_json(text):
+    """JSON contenu dans une réponse textuelle du modèle (objet ou liste, éventuellement entouré de texte)."""
+    if not isinstance(text, str):
+        return None
+    stripped = text.strip()
+    try:
+        return json.loads(stripped)
+    except Exception:
+        pass
+    for opening, closing in (("[", "]"), ("{", "}")):
+        start = stripped.find(opening)
+        end = stripped.rfind(closing)
+        if start != -1 and end > start:
+            try:
+                return json.loads(stripped[start:end + 1])
+            except Exception:
+                continue
+    return None
+
+
+def response_output(body):
+    """Sortie du modèle dans une réponse chat/completions (ou champs output / result / text)."""
+    if not isinstance(body, dict):
+        return None
+    text_out = None
+    choices = body.get("choices")
+    if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+        text_out = (choices[0].get("message") or {}).get("content")
+    return text_out or body.get("output") or body.get("result") or body.get("text")
+
+
+def _retry_after(value):
+    """Délai (s) d'un en-tête Retry-After (secondes ou date HTTP), None s'il est absent ou illisible."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class ImageEncoder:
+    """
+    Images des requêtes encodées une seule fois : par fichier (chemin, taille, date de modification)
+    et par contenu (deux captures identiques partagent leur encodage).
+    """
+
+    def __init__(self):
+        self._by_file = {}
+        self._by_digest = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def encode(self, path):
+        """(empreinte SHA-256 du contenu, URL data:) de l'image ; None si le fichier est absent."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        file_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._by_file.get(file_key)
+        if cached:
+            return cached
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self.reads += 1
+            data_url = self._by_digest.get(digest)
+            if data_url is None:
+                mime = "image/png" if os.path.splitext(path)[1].lower() == ".png" else "image/jpeg"
+                data_url = f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}"
+                self._by_digest[digest] = data_url
+            self._by_file[file_key] = (digest, data_url)
+        return digest, data_url
+
+
+class RateLimiter:
+    """Au plus `per_minute` débuts de requête par minute, régulièrement espacés (0 ou None = sans limite)."""
+
+    def __init__(self, per_minute=None):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class ResponseCache:
+    """Réponses de l'API sur disque, un fichier JSON par clé (écriture atomique)."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, body):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(body, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+class VisionClient:
+    """
+    Client d'un modèle de vision. `run([(prompt, [images]), ...])` retourne, dans l'ordre, des
+    couples (sortie du modèle, provenance) : "api", "cache" ou "api_error" (sortie None).
+    """
+
+    def __init__(self, api_key, model, url=DEFAULT_API_URL, concurrency=DEFAULT_CONCURRENCY,
+                 requests_per_minute=None, cache_dir=DEFAULT_CACHE_DIR, max_retries=4, backoff=1.0,
+                 timeout=90, temperature=0.1, logger=None):
+        self.api_key = api_key
+        self.model = model
+        self.url = url
+        self.concurrency = max(1, int(concurrency))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.temperature = temperature
+        self.logger = logger
+        self.encoder = ImageEncoder()
+        self.limiter = RateLimiter(requests_per_minute)
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.stats = {"requests": 0, "retries": 0, "cache_hits": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_settings(cls, default_model, config_path=".mistral_config.json", logger=None, **overrides):
+        """Client configuré par `load_vision_settings` ; None sans clé d'API."""
+        settings = load_vision_settings(config_path)
+        if not settings["MISTRAL_API_KEY"]:
+            return None
+        cache_dir = settings["MISTRAL_CACHE_DIR"]
+        options = {
+            "url": settings["MISTRAL_API_URL"] or DEFAULT_API_URL,
+            "concurrency": int(settings["MISTRAL_MAX_CONCURRENCY"] or DEFAULT_CONCURRENCY),
+            "requests_per_minute": float(settings["MISTRAL_REQUESTS_PER_MINUTE"] or 0) or None,
+            "cache_dir": DEFAULT_CACHE_DIR if cache_dir is None else cache_dir,
+        }
+        options.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(settings["MISTRAL_API_KEY"], settings["MISTRAL_MODEL"] or default_model, logger=logger, **options)
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _warn(self, message):
+        if self.logger:
+            log_with_step(self.logger, logging.WARNING, "VISION IA", message)
+        else:
+            print(f"[vision-ai] {message}")
+
+    def cache_key(self, prompt, digests):
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        material = json.dumps([prompt_hash, list(digests), self.model, self.temperature])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _payload(self, prompt, data_urls):
+        content = [{"type": "text", "text": prompt}]
+        content.extend({"type": "image_url", "image_url": data_url} for data_url in data_urls)
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": content}],
+            "temperature": self.temperature,
+        }
+
+    def _post(self, payload):
+        """Appel HTTP bloquant (exécuté dans un thread) : (statut, corps JSON ou None, Retry-After)."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        response = self.session.post(self.url, headers=headers, json=payload, timeout=self.timeout)
+        try:
+            body = response.json()
+        except ValueError:
+            body = {"output": response.text}
+        return response.status_code, body, _retry_after(response.headers.get("Retry-After"))
+
+    async def _complete(self, prompt, image_paths, semaphore):
+        encoded = [image for image in await asyncio.gather(
+            *(asyncio.to_thread(self.encoder.encode, path) for path in image_paths)) if image]
+        key = self.cache_key(prompt, [digest for digest, _ in encoded])
+        if self.cache:
+            cached = self.cache.get(key)
+            output = response_output(cached) if cached is not None else None
+            if output is not None:
+                self._count("cache_hits")
+                return output, "cache"
+
+        payload = self._payload(prompt, [data_url for _, data_url in encoded])
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.limiter.wait()
+                self._count("requests")
+                delay = None
+                try:
+                    status, body, delay = await asyncio.to_thread(self._post, payload)
+                except requests.RequestException as e:
+                    status, body, problem = None, None, str(e)
+                else:
+                    if 200 <= status < 300:
+                        output = response_output(body)
+                        # Réponse inattendue ou vide : renvoyée telle quelle mais jamais mise en cache
+                        if self.cache and output is not None:
+                            self.cache.put(key, body)
+                        return output, "api"
+                    problem = f"HTTP {status}"
+                    if status not in RETRY_STATUSES:
+                        break
+                if attempt == self.max_retries:
+                    break
+                self._count("retries")
+                if delay is None:
+                    delay = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+                await asyncio.sleep(delay)
+        self._count("errors")
+        self._warn(f"Appel vision IA impossible ({problem})")
+        return None, "api_error"
+
+    async def run_async(self, items):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        return await asyncio.gather(*(self._complete(prompt, paths, semaphore) for prompt, paths in items))
+
+    def run(self, items):
+        """Exécute un lot de requêtes (prompt, chemins d'images) ; résultats dans l'ordre du lot."""
+        items = list(items)
+        if not items:
+            return []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.run_async(items))
+        # Appel depuis une boucle asyncio : le lot tourne dans sa propre boucle, sur un autre thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.run_async(items)).result()
+
+    def close(self):
+        self.session.close()